@@ -494,9 +494,10 @@ async def _auto_approve_pending_items(supabase) -> int:
     - 5-minute TTL gate — the sweep runs at most once per window instead of
       on every briefing load (the dedicated decision_pulse sweeps every 30 min,
       so skipping an inline run is safe for freshness).
-    - Batch pattern lookup — all entity_extraction patterns are loaded in ONE
-      query and passed as patterns_map, so compute_pattern_confidence skips its
-      per-row fallback DB chain (was up to 6 sequential queries per row).
+    - Batch pattern lookup — compute_pattern_confidence resolves from the
+      tenant's entity_extraction pattern snapshot (core/lib/telemetry.py),
+      loaded once, so no row pays the per-hash fallback chain (was up to 6
+      sequential queries per row).
 
     Returns the number of items auto-approved.
     """
@@ -521,22 +522,6 @@ async def _auto_approve_pending_items(supabase) -> int:
         print(f"[Briefing] Auto-approval imports failed (non-fatal): {e}")
         return 0
 
-    # ── Batch pattern lookup: one query, keyed by deterministic feature_hash ──
-    patterns_map: dict = {}
-    try:
-        pat_res = await exec_query(
-            supabase.table("subsystem_patterns") \
-            .select("feature_hash, total_count, correct_count, corrected_count, soft_accepted_count, feature_json, first_seen, last_seen") \
-            .eq("subsystem", "entity_extraction")
-        )
-        for p in (pat_res.data or []):
-            fh = p.get("feature_hash")
-            if fh:
-                patterns_map[fh] = p
-        print(f"[Briefing] Auto-approval: loaded {len(patterns_map)} patterns in 1 query")
-    except Exception as e:
-        print(f"[Briefing] Pattern batch fetch error (non-fatal): {e}")
-
     # ── Auto-approve high-confidence graph edges ──
     try:
         pending_q = supabase.table("pending_graph_edges") \
@@ -552,8 +537,7 @@ async def _auto_approve_pending_items(supabase) -> int:
                 "target_type": row.get("target_type"),
             }
             try:
-                pr = await compute_pattern_confidence(
-                    features, "entity_extraction", patterns_map=patterns_map)
+                pr = await compute_pattern_confidence(features, "entity_extraction")
                 if pr.get("recommendation") in ("approve", "auto_approve"):
                     await process_pending_edge_decision(row["id"], "approve", auto_decided=True)
                     auto_count += 1
@@ -578,8 +562,7 @@ async def _auto_approve_pending_items(supabase) -> int:
                 "has_context": bool(row.get("source_text")),
             }
             try:
-                pr = await compute_pattern_confidence(
-                    features, "entity_extraction", patterns_map=patterns_map)
+                pr = await compute_pattern_confidence(features, "entity_extraction")
                 if pr.get("recommendation") in ("approve", "auto_approve"):
                     await process_graph_pending_decision(row["id"], "approve", auto_decided=True)
                     auto_count += 1
@@ -12,11 +12,13 @@ from urllib.parse import urlencode, quote
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from core.lib.audit_logger import audit_log_sync, trace_id_var
+from core.lib.audit_logger import audit_log_sync, flush_audit_logs, trace_id_var
 from core.lib.telemetry import emit_observation
+from core.lib.tracing import render_prometheus
 from core.lib.decision_features import build_decision_features
+from core.lib.entity_detector import invalidate_entity_index
 from core.decisions import record_decision
 from core.actions import begin_action_context, clear_action_context
 
@@ -66,12 +68,19 @@ async def lifespan(app):
 
     Also upgrades the thread pool from default (min(32, 6)=6) to 16 workers
     because interrogate_brain fires 17+ sync Supabase calls via asyncio.to_thread().
+
+    On shutdown, drains the buffered audit writer so queued audit/DLQ and
+    LLM instrumentation rows are not lost with the container.
     """
     yield
+    flush_audit_logs()
 
 
 app = FastAPI(title="Integrated-OS", lifespan=lifespan)
 
+# /api/queue-cron without Modal drains inline — keep it well inside a request.
+QUEUE_INLINE_DEADLINE_S = 60
+
 # CORS allowlist (audit 2.3): the API is consumed by the Flutter app (native,
 # no CORS) and the Next.js dashboard. Wildcard origins were a defense-in-depth
 # hole — restrict to the env-driven ALLOWED_ORIGINS list (comma-separated),
@@ -290,6 +299,56 @@ async def pulse_cron_route(request: Request):
         "total_due": len(due),
     }
 
+# --- JOB QUEUE HEARTBEAT (cron-job.org — scales queue workers by depth) ---
+@app.get("/api/queue-cron")
+@app.post("/api/queue-cron")
+async def queue_cron_route(request: Request):
+    """Triggered by cron-job.org every minute — sizes the job queue drain.
+
+    Reads the claimable depth of each durable queue (enrichment, retrieval
+    index, DLQ) and tops its drain_job_queue Modal workers up to the
+    depth-scaled target (core/lib/job_runner.plan_queue_workers), then
+    returns. Each spawn reserves a worker slot the worker frees on exit, so
+    workers from earlier ticks count against the target. Empty queues
+    spawn nothing. Without the Modal SDK (local dev / tests) each non-empty
+    queue is drained inline for a bounded time instead.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    cron_secret = os.getenv("CRON_SECRET", os.getenv("PULSE_SECRET"))
+    if not cron_secret:
+        raise HTTPException(status_code=500, detail="CRON_SECRET missing")
+    if auth_header != f"Bearer {cron_secret}" and request.headers.get("x-pulse-secret") != cron_secret:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    from core.lib.job_runner import (
+        plan_queue_workers, release_worker_slot, reserve_worker_slot, run_queue_worker,
+    )
+
+    plan = await plan_queue_workers()
+    if not plan:
+        return {"success": True, "mode": "fanout", "spawned": {}}
+
+    try:
+        import modal
+    except ImportError:
+        results = [await run_queue_worker(name, deadline_s=QUEUE_INLINE_DEADLINE_S) for name in plan]
+        return {"success": True, "mode": "inline_fallback", "results": results}
+
+    spawned = {}
+    fn = modal.Function.from_name("rhodey-os", "drain_job_queue")
+    for name, workers in plan.items():
+        for _ in range(workers):
+            worker_id = reserve_worker_slot(name)
+            try:
+                await fn.spawn.aio(queue=name, worker_id=worker_id)
+                spawned[name] = spawned.get(name, 0) + 1
+            except Exception as e:
+                # Unspawned capacity just waits for the next tick.
+                release_worker_slot(name, worker_id)
+                audit_log_sync("job_runner", "WARNING", f"drain_job_queue spawn failed for {name}: {e}")
+                break
+    return {"success": True, "mode": "fanout", "spawned": spawned, "planned": plan}
+
 # --- THE SENTINEL WATCHER (Vercel Cron) ---
 @app.get("/api/sentinel")
 @app.post("/api/sentinel")
@@ -436,6 +495,25 @@ async def admin_spend_route(request: Request, days: int = 7):
     return {"days": days, "users": users}
 
 
+# --- METRICS (span latency histograms, Prometheus text format) ---
+@app.get("/api/metrics")
+async def metrics_route(request: Request):
+    """Per-span latency histograms of THIS container (core/lib/tracing.py).
+
+    Admin-only (same bearer/x-pulse-secret gate as /api/health). Each
+    container keeps its own histograms since start, so a scrape reflects
+    the container that served it — label by instance when aggregating.
+    """
+    auth_header = request.headers.get("Authorization", "")
+    cron_secret = os.getenv("CRON_SECRET", os.getenv("PULSE_SECRET"))
+    if not cron_secret:
+        raise HTTPException(status_code=500, detail="CRON_SECRET missing")
+    if auth_header != f"Bearer {cron_secret}" and request.headers.get("x-pulse-secret") != cron_secret:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # --- GET TASKS (for Today tab — active + overdue) ---
 @app.get("/api/tasks")
 async def get_tasks_route(request: Request, status: str = None, limit: int = 50, offset: int = 0,
@@ -3882,6 +3960,7 @@ async def graph_node_rename_route(pending_id: str, request: Request):
                 return {"success": True, "message": "Label unchanged"}
                 
             supabase.table('graph_nodes').update({'label': new_label}).eq('id', pending_id).execute()
+            invalidate_entity_index()
             
             # Update pending edges referencing this live node
             supabase.table('pending_graph_edges').update({'source_label': new_label}).eq('source_label', old_label).execute()
@@ -1,9 +1,24 @@
 """
 Audit Logger - Replaces print() with permanent audit trail.
 Writes to Supabase audit_logs table for observability.
+
+Writes are buffered: callers enqueue a row and return immediately; a
+background thread bulk-inserts the buffer every AUDIT_FLUSH_INTERVAL_S or
+once AUDIT_FLUSH_BATCH rows are waiting (one insert per table per flush).
+The buffer is bounded — when full the OLDEST row is dropped and the drop
+count is written as a WARNING on the next flush. Call flush_audit_logs()
+before a process exits (FastAPI lifespan, Modal workers; atexit backstop).
+
+The same writer carries other write-behind rows (LLM instrumentation:
+model_registry, llm_spend) via enqueue_row(); a table that needs more than a
+plain bulk insert registers its own writer with register_bulk_writer().
 """
+import atexit
+import collections
+from typing import Callable
 import json
 import contextvars
+import threading
 import traceback
 from core.services.db import get_supabase
 
@@ -45,6 +60,149 @@ def _owner_attr() -> str | None:
     except Exception:
         return None
 
+
+# ── Buffered writer ─────────────────────────────────────────────────────────
+
+AUDIT_QUEUE_MAX = 5000        # rows held in memory before drop-oldest kicks in
+AUDIT_FLUSH_BATCH = 100       # flush early once this many rows are waiting
+AUDIT_FLUSH_INTERVAL_S = 2.0  # otherwise flush at least this often
+
+
+class _AuditWriter:
+    """Bounded in-memory buffer drained by one daemon thread.
+
+    Rows are (table, row) pairs so audit_logs, system_audit_logs and
+    dead_letter_queue share the pipeline. Rows with different key sets are
+    inserted separately — PostgREST bulk inserts take one column list, and
+    owner_id must stay absent (not null) on the pre-db/78 schema.
+    """
+
+    def __init__(self, max_queue: int = AUDIT_QUEUE_MAX,
+                 batch_size: int = AUDIT_FLUSH_BATCH,
+                 interval_s: float = AUDIT_FLUSH_INTERVAL_S):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self._buf: collections.deque = collections.deque()
+        self._cond = threading.Condition()
+        self._dropped: collections.Counter = collections.Counter()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, table: str, row: dict) -> None:
+        with self._cond:
+            if len(self._buf) >= self.max_queue:
+                dropped_table, _ = self._buf.popleft()
+                self._dropped[dropped_table] += 1
+            self._buf.append((table, row))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+            if len(self._buf) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        """Drain the buffer on the calling thread. Never raises."""
+        while True:
+            batch, dropped = self._take()
+            if not batch and not dropped:
+                return
+            self._write(batch, dropped)
+
+    def _take(self) -> tuple[list, collections.Counter]:
+        with self._cond:
+            batch = list(self._buf)
+            self._buf.clear()
+            dropped, self._dropped = self._dropped, collections.Counter()
+        return batch, dropped
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._buf) < self.batch_size:
+                    self._cond.wait(self.interval_s)
+            self.flush()
+
+    def _write(self, batch: list, dropped: collections.Counter) -> None:
+        if dropped:
+            total = sum(dropped.values())
+            by_table = ", ".join(f"{t}: {n}" for t, n in sorted(dropped.items()))
+            print(f"⚠️ AUDIT BUFFER FULL: dropped {total} oldest entries ({by_table})")
+            batch.insert(0, ("audit_logs", {
+                "service": "audit_logger",
+                "level": "WARNING",
+                "message": f"Audit buffer full — dropped {total} oldest entries ({by_table})",
+                "metadata": json.dumps({"dropped": total, "by_table": dict(dropped)}),
+            }))
+        if not supabase:
+            return
+        groups: dict = {}
+        for table, row in batch:
+            groups.setdefault((table, tuple(sorted(row))), []).append(row)
+        for (table, _), rows in groups.items():
+            try:
+                bulk_writer = _bulk_writers.get(table)
+                if bulk_writer is not None:
+                    bulk_writer(rows)
+                else:
+                    supabase.table(table).insert(rows).execute()
+            except Exception as e:
+                print(f"⚠️ AUDIT LOG FAILURE: {e} | {len(rows)} row(s) for {table} lost")
+
+
+_writer = _AuditWriter()
+
+# table → callable(rows) replacing the plain bulk insert for that table.
+_bulk_writers: dict[str, Callable[[list], None]] = {}
+
+
+def register_bulk_writer(table: str, writer: Callable[[list], None]) -> None:
+    """Route flushed rows for `table` through `writer(rows)` (e.g. an RPC
+    that also maintains an aggregate). Runs on the writer thread; raising
+    counts the rows as lost, same as a failed insert."""
+    _bulk_writers[table] = writer
+
+
+def enqueue_row(table: str, row: dict) -> None:
+    """Queue one row for `table` on the buffered writer. Never raises."""
+    try:
+        if not supabase:
+            return
+        _writer.submit(table, row)
+    except Exception as e:
+        print(f"⚠️ AUDIT LOG FAILURE: {e} | {table} row not queued")
+
+
+def flush_audit_logs() -> None:
+    """Write every buffered audit/DLQ/instrumentation row now. Call before
+    process exit."""
+    _writer.flush()
+
+
+atexit.register(flush_audit_logs)
+
+
+def _audit_row(service: str, level: str, message: str, metadata: dict = None) -> dict:
+    meta = metadata or {}
+    tid = trace_id_var.get()
+    if tid:
+        meta['trace_id'] = tid
+
+    log_data = {
+        "service": service,
+        "level": level,
+        "message": message[:500] if message else "(empty)",
+        "metadata": json.dumps(meta),
+    }
+    # owner_id is attribution-only and only exists post-db/78. Sending
+    # the key (even null) on the pre-db/78 schema makes PostgREST reject
+    # the insert (PGRST204 unknown column) — found by Tier 4 on live.
+    owner_id = _owner_attr()
+    if owner_id:
+        log_data["owner_id"] = owner_id
+    return log_data
+
+
 async def audit_log(service: str, level: str, message: str, metadata: dict = None):
     """
     Write an audit log entry to Supabase audit_logs table.
@@ -55,60 +213,19 @@ async def audit_log(service: str, level: str, message: str, metadata: dict = Non
         message: Log message (truncated to 500 chars)
         metadata: Additional context (error stack, memory_id, etc.)
     """
-    try:
-        if not supabase:
-            return
-            
-        meta = metadata or {}
-        tid = trace_id_var.get()
-        if tid:
-            meta['trace_id'] = tid
-            
-        log_data = {
-            "service": service,
-            "level": level,
-            "message": message[:500] if message else "(empty)",
-            "metadata": json.dumps(meta),
-        }
-        # owner_id is attribution-only and only exists post-db/78. Sending
-        # the key (even null) on the pre-db/78 schema makes PostgREST reject
-        # the insert (PGRST204 unknown column) — found by Tier 4 on live.
-        owner_id = _owner_attr()
-        if owner_id:
-            log_data["owner_id"] = owner_id
-        supabase.table('audit_logs').insert(log_data).execute()
-    except Exception as e:
-        # Fallback to print if audit_logs write fails
-        print(f"⚠️ AUDIT LOG FAILURE: {e} | Original: [{service}] {level}: {message}")
+    audit_log_sync(service, level, message, metadata)
 
 
 def audit_log_sync(service: str, level: str, message: str, metadata: dict = None):
     """
     Synchronous version of audit_log.
-    Use in non-async contexts (e.g., webhook.py).
+    Use in non-async contexts (e.g., webhook.py). Only enqueues — the
+    buffered writer does the insert off the caller's path.
     """
     try:
         if not supabase:
             return
-            
-        meta = metadata or {}
-        tid = trace_id_var.get()
-        if tid:
-            meta['trace_id'] = tid
-            
-        log_data = {
-            "service": service,
-            "level": level,
-            "message": message[:500] if message else "(empty)",
-            "metadata": json.dumps(meta),
-        }
-        # owner_id is attribution-only and only exists post-db/78. Sending
-        # the key (even null) on the pre-db/78 schema makes PostgREST reject
-        # the insert (PGRST204 unknown column) — found by Tier 4 on live.
-        owner_id = _owner_attr()
-        if owner_id:
-            log_data["owner_id"] = owner_id
-        supabase.table('audit_logs').insert(log_data).execute()
+        _writer.submit('audit_logs', _audit_row(service, level, message, metadata))
     except Exception as e:
         print(f"⚠️ AUDIT LOG FAILURE: {e} | Original: [{service}] {level}: {message}")
 
@@ -188,7 +305,7 @@ def log_audit(function_name: str, event_type: str, message: str, raw_input=None)
             "message": str(message)[:1000] if message else None,
             "raw_input": str(raw_input)[:1000] if raw_input else None
         }
-        supabase.table("system_audit_logs").insert(log_data).execute()
+        _writer.submit("system_audit_logs", log_data)
     except Exception as e:
         print(f"⚠️ SYSTEM AUDIT LOG FAILURE: {e} | {function_name} | {message}")
 
@@ -206,7 +323,7 @@ def write_dlq(source_table: str, source_id: str, content: str, failure_reason: s
             "content": str(content)[:2000] if content else None,
             "failure_reason": str(failure_reason)[:1000] if failure_reason else None
         }
-        supabase.table("dead_letter_queue").insert(dlq_data).execute()
+        _writer.submit("dead_letter_queue", dlq_data)
         
         # Also log to audit_logs
         log_audit("write_dlq", "dlq_write", f"DLQ entry created for {source_table} {source_id}", raw_input=failure_reason)
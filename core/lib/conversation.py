@@ -1,4 +1,5 @@
 from core.services.db import maybe_single_safe, tenant_aware_client
+import asyncio
 import uuid
 import re
 from datetime import datetime, timezone
@@ -8,6 +9,13 @@ from core.llm.constants import CLASSIFICATION_MODEL
 
 SESSION_TIMEOUT_MINUTES = 60
 MAX_HISTORY_TOKENS = 5000
+# get_history reads newest-first in pages of this many rows until the token
+# budget is met (a 5000-token budget is typically one or two pages).
+HISTORY_PAGE_ROWS = 40
+# Rolling thread summary: fold once this many rows sit past the watermark,
+# reading at most SUMMARY_FOLD_MAX_ROWS per fold.
+SUMMARY_FOLD_MIN_ROWS = 4
+SUMMARY_FOLD_MAX_ROWS = 40
 # An anchor only reflects "this thread is about X" while X was mentioned
 # recently. Older anchors must not steer routing (e.g. an old Ashraya anchor
 # biasing a later unrelated personal task).
@@ -632,56 +640,6 @@ def get_or_create_session(chat_id: int, message_text: str = None) -> tuple:
     thread_id, active_anchor = resolve_thread(chat_id, message_text)
     return thread_id, get_history(thread_id), active_anchor
 
-def _compress_to_summary(pairs: list) -> str:
-    """K1: Abstractive summary of overflow conversation pairs via LLM.
-
-    Generates 2-3 sentence summary capturing topic, decisions, key outcomes.
-    Falls back to extractive concatenation if LLM unavailable (fail-open).
-    """
-    parts = []
-    for p in pairs:
-        user = p.get('user')
-        bot = p.get('bot')
-        user_content = (user or {}).get('content', '').strip()
-        bot_content = (bot or {}).get('content', '').strip() if bot else ''
-        if user_content:
-            parts.append(f"User: {user_content[:200]}")
-        if bot_content:
-            parts.append(f"Rhodey: {bot_content[:200]}")
-    if not parts:
-        return ""
-
-    raw = "\n".join(parts)
-    if len(raw) > 3000:
-        raw = raw[:3000] + "..."
-
-    try:
-        prompt = f"""Summarize this conversation thread in 2-3 sentences.
-Capture: the topic, any decisions made, and key outcomes.
-Be concise — this will be used as memory context for future replies.
-
-Conversation:
-{raw}
-
-Summary:"""
-        resp = call_llm_with_fallback_sync(prompt, model=CLASSIFICATION_MODEL, is_critical=False)
-        summary = resp.text.strip()
-        if summary and len(summary) < 600:
-            return summary
-    except Exception:
-        pass
-
-    # Fail-open: fall back to extractive concatenation
-    condensed = " · ".join(p[:150] for p in parts)
-    return condensed[:800]
-
-def _store_thread_summary(session_id: str, summary: str):
-    """Persist thread summary to conversation_threads row."""
-    try:
-        tenant_aware_client().table('conversation_threads').update({'summary': summary}).eq('id', session_id).execute()
-    except Exception:
-        pass
-
 def _store_thread_summary_if_missing(session_id: str, summary: str):
     """Persist thread summary idempotently, only if it doesn't already exist."""
     try:
@@ -693,11 +651,13 @@ def _store_thread_summary_if_missing(session_id: str, summary: str):
     except Exception:
         pass
 
-def _compress_to_classify_summary(pairs: list) -> str:
+def _compress_to_classify_summary(pairs: list, previous: str = "") -> str:
     """K1: Generate a topic-level summary specifically for classification context.
     
     Captures what was discussed, explicitly avoiding specific actions or receipts
-    to prevent context leakage biasing future classifications.
+    to prevent context leakage biasing future classifications. `previous` is
+    the thread's current rolling summary (covering everything before `pairs`);
+    the result folds the new pairs into it.
     """
     parts = []
     for p in pairs:
@@ -716,12 +676,13 @@ def _compress_to_classify_summary(pairs: list) -> str:
     if len(raw) > 3000:
         raw = raw[:3000] + "..."
 
+    earlier = f"Topic summary of the earlier conversation:\n{previous}\n\n" if previous else ""
     try:
         prompt = f"""Summarize the overarching topic of this conversation in 1-2 sentences.
 Focus strictly on WHAT is being discussed (the subject matter).
 Do NOT include specific actions taken, receipts, bot responses, or outcomes.
 
-Conversation:
+{earlier}Conversation:
 {raw}
 
 Topic Summary:"""
@@ -733,100 +694,132 @@ Topic Summary:"""
         pass
     return ""
 
+def _pair_rows(rows: list) -> list:
+    """Group chronological conversation rows into user+bot pairs."""
+    pairs = []
+    i = 0
+    while i < len(rows):
+        if rows[i]['role'] != 'user':
+            # Orphan bot row (its user turn is outside the rows read).
+            pairs.append({'user': None, 'bot': rows[i]})
+            i += 1
+            continue
+        bot_msg = None
+        if i + 1 < len(rows) and rows[i + 1]['role'] == 'bot':
+            bot_msg = rows[i + 1]
+        pairs.append({'user': rows[i], 'bot': bot_msg})
+        i += 2 if bot_msg else 1
+    return pairs
+
+def _pair_tokens(pair: dict) -> int:
+    return (
+        ((pair.get('user') or {}).get('token_count') or 0) +
+        ((pair.get('bot') or {}).get('token_count') or 0)
+    )
+
+def _fold_thread_summary(session_id: str) -> bool:
+    """Fold rows past the thread's summary watermark into its rolling summary.
+
+    Reads at most SUMMARY_FOLD_MAX_ROWS rows after `summary_through_id`
+    (db/108) and asks for previous summary + new rows → new summary, so the
+    prompt and the read stay bounded however long the thread is; a backlog
+    larger than the cap catches up over successive folds. The write is a
+    compare-and-set on the watermark: a concurrent fold of the same rows
+    loses instead of double-applying. Returns True when the summary moved.
+    """
+    supabase = tenant_aware_client()
+    t_res = supabase.table('conversation_threads') \
+        .select('summary, summary_through_id').eq('id', session_id).execute()
+    if not t_res.data:
+        return False
+    previous = t_res.data[0].get('summary') or ''
+    through = t_res.data[0].get('summary_through_id')
+
+    query = supabase.table('conversations').select('id, role, content').eq('thread_id', session_id)
+    if through is None:
+        # No watermark yet: seed from the newest rows — a pre-existing
+        # summary stands in for anything older.
+        rows = query.order('id', desc=True).limit(SUMMARY_FOLD_MAX_ROWS).execute().data or []
+        rows.reverse()
+    else:
+        rows = query.gt('id', through).order('id').limit(SUMMARY_FOLD_MAX_ROWS).execute().data or []
+    if len(rows) < SUMMARY_FOLD_MIN_ROWS:
+        return False
+
+    summary = _compress_to_classify_summary(_pair_rows(rows), previous)
+    if not summary:
+        return False  # LLM unavailable — watermark stays, next fold retries
+    update = supabase.table('conversation_threads') \
+        .update({'summary': summary, 'summary_through_id': rows[-1]['id']}) \
+        .eq('id', session_id)
+    update = update.is_('summary_through_id', 'null') if through is None \
+        else update.eq('summary_through_id', through)
+    update.execute()
+    return True
+
 async def _background_summary_check(session_id: str):
-    """Best-effort background job to generate/update the thread summary.
+    """Best-effort background job to keep the rolling thread summary current.
 
     Direction B: summaries are an EPISODIC INDEX for retrieval / future
     close-extraction — they are deliberately NOT fed into any prompt
-    (no raw or summarized transcript in LLM context). Fires eagerly every
-    3 user exchanges so short threads always have a current summary.
+    (no raw or summarized transcript in LLM context). Runs after every bot
+    reply and folds once SUMMARY_FOLD_MIN_ROWS rows (two exchanges) have
+    accumulated, so short threads always have a current summary and long
+    ones never re-read their whole history.
     """
     try:
-        conv_res = tenant_aware_client().table('conversations').select('id').eq('thread_id', session_id).eq('role', 'user').execute()
-        user_count = len(conv_res.data or [])
-        if user_count < 2 or user_count % 3 != 0:
-            return  # Generate every 3rd user exchange (2, 5, 8, 11...)
-            
-        all_pairs = get_history(session_id, max_tokens=8000)
-        summary = _compress_to_classify_summary(all_pairs)
-        if summary:
-            # Always update the summary (not if_missing) so it stays fresh
-            _store_thread_summary(session_id, summary)
+        await asyncio.to_thread(_fold_thread_summary, session_id)
     except Exception as e:
         from core.lib.audit_logger import audit_log_sync
         audit_log_sync("conversation", "WARNING", f"Background summary generation failed: {e}")
 
+def _history_window(column: str, session_id: str, max_tokens: int) -> list:
+    """Newest rows of a conversation whose token_count covers `max_tokens`.
+
+    Pages newest-first on the (column, id DESC) index (db/108), keyset on
+    id, and stops at the first user row once the budget is exceeded — the
+    window then starts on a pair boundary and holds every pair the budget
+    could keep. Returns rows in chronological order.
+    """
+    rows, used, before_id = [], 0, None
+    while True:
+        query = tenant_aware_client().table('conversations') \
+            .select('id, role, intent, content, token_count') \
+            .eq(column, session_id)
+        if before_id is not None:
+            query = query.lt('id', before_id)
+        page = query.order('id', desc=True).limit(HISTORY_PAGE_ROWS).execute().data or []
+        for row in page:
+            rows.append(row)
+            used += row.get('token_count') or 0
+            if used > max_tokens and row['role'] == 'user':
+                rows.reverse()
+                return rows
+        if len(page) < HISTORY_PAGE_ROWS:
+            rows.reverse()
+            return rows
+        before_id = page[-1]['id']
+
 def get_history(session_id: str, max_tokens: int = MAX_HISTORY_TOKENS) -> list:
     """
     Get conversation history for a thread (session_id = thread_id), truncated by token budget.
-    Builds user+bot pairs, drops oldest pairs from front until within max_tokens.
-    On first overflow, compresses dropped pairs into a thread summary and stores it.
+    Reads only the newest rows the budget can hold (_history_window), builds
+    user+bot pairs, and drops oldest pairs from the front until within
+    max_tokens — cost is bounded by the budget, not the thread's length.
+    Everything older is covered by the rolling thread summary
+    (_fold_thread_summary / get_thread_summary).
     """
-    res = tenant_aware_client().table('conversations') \
-        .select('role, intent, content, token_count') \
-        .eq('thread_id', session_id) \
-        .order('created_at') \
-        .execute()
-        
-    rows = res.data or []
+    rows = _history_window('thread_id', session_id, max_tokens)
     # Fallback to session_id if no rows found (for old conversations before migration)
     if not rows:
-        res = tenant_aware_client().table('conversations') \
-            .select('role, intent, content, token_count') \
-            .eq('session_id', session_id) \
-            .order('created_at') \
-            .execute()
-        rows = res.data or []
-
+        rows = _history_window('session_id', session_id, max_tokens)
     if not rows:
         return []
 
-    pairs = []
-    i = 0
-    while i < len(rows):
-        user_msg = rows[i] if rows[i]['role'] == 'user' else None
-        bot_msg = None
-        if i + 1 < len(rows) and rows[i + 1]['role'] == 'bot':
-            bot_msg = rows[i + 1]
-            i += 2
-        else:
-            i += 1
-        pairs.append({'user': user_msg, 'bot': bot_msg})
-
-    if not pairs:
-        return []
-
-    total = sum(
-        (p.get('user') or {}).get('token_count', 0) +
-        (p.get('bot') or {}).get('token_count', 0)
-        for p in pairs
-    )
-
-    if total <= max_tokens:
-        return pairs
-
-    # Overflow: capture dropped pairs before popping
-    overflow = []
+    pairs = _pair_rows(rows)
+    total = sum(_pair_tokens(p) for p in pairs)
     while total > max_tokens and len(pairs) > 1:
-        removed = pairs.pop(0)
-        total -= (
-            (removed.get('user') or {}).get('token_count', 0) +
-            (removed.get('bot') or {}).get('token_count', 0)
-        )
-        overflow.append(removed)
-
-    # Lazy summarization: store overflow summary only if thread has none yet
-    if overflow:
-        try:
-            t_res = tenant_aware_client().table('conversation_threads') \
-                .select('summary').eq('id', session_id).execute()
-            if t_res.data and not t_res.data[0].get('summary'):
-                summary = _compress_to_summary(overflow)
-                if summary:
-                    _store_thread_summary(session_id, summary)
-        except Exception:
-            pass
-
+        total -= _pair_tokens(pairs.pop(0))
     return pairs
 
 def get_thread_summary(thread_id: str) -> str:
@@ -878,7 +871,6 @@ def log_exchange(session_id: str, role: str, intent: str, content: str, chat_id:
         
         # Store embedding for user exchanges (Fix C — fire-and-forget)
         if role == 'user' and insert_res.data:
-            import asyncio
             try:
                 exchange_id = insert_res.data[0].get('id')
                 if exchange_id:
@@ -888,7 +880,6 @@ def log_exchange(session_id: str, role: str, intent: str, content: str, chat_id:
                 pass  # No running event loop
         
         if role == 'bot':
-            import asyncio
             try:
                 loop = asyncio.get_running_loop()
                 loop.create_task(_background_summary_check(session_id))
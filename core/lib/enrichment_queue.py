@@ -2,7 +2,8 @@
 
 Fire-and-forget enrichment (asyncio.create_task) is killed when Vercel returns a
 response. This module queues enrichment jobs synchronously during creation, then
-processes them in the sentinel piggyback with atomic claim + retry.
+processes them on the durable job runner (core/lib/job_runner.py): the
+drain_job_queue worker, with the sentinel piggyback as a per-tenant backstop.
 
 Job types:
   task_graph   → write_graph_edges_for_task + extract_and_link_entities
@@ -13,6 +14,7 @@ import json
 from datetime import datetime, timezone
 from core.services.db import maybe_single_safe, tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
+from core.lib.job_runner import JobQueue, register_queue, run_queue
 
 supabase = tenant_aware_client()
 
@@ -29,6 +31,7 @@ def enqueue_enrichment(
     full_text: str = None,           # NEW: original message text
     pending_org_id: int = None,      # NEW: pending org from EntityContext
     entity_context: dict = None,     # NEW: serialized EntityContext
+    priority: int = 0,               # higher is claimed first (db/112)
 ) -> bool:
     """Enqueue an enrichment job. Returns True if queued, False if skipped/duplicate.
 
@@ -69,6 +72,8 @@ def enqueue_enrichment(
             insert_data["pending_org_id"] = pending_org_id
         if entity_context:
             insert_data["entity_context"] = json.dumps(entity_context)
+        if priority:
+            insert_data["priority"] = priority
 
         supabase.table("pending_enrichment_jobs").insert(insert_data).execute()
         return True
@@ -78,122 +83,58 @@ def enqueue_enrichment(
 
 
 async def process_pending_enrichment(max_jobs: int = 3) -> int:
-    """Process pending enrichment jobs. Called by sentinel piggyback.
+    """Process pending enrichment jobs. Called by the sentinel piggyback.
 
-    Uses atomic claim via claim_pending_enrichment_job RPC to prevent
-    double-processing on concurrent sentinel runs.
+    A per-tenant backstop for the dedicated queue worker (drain_job_queue):
+    claims up to max_jobs of the current tenant's jobs through the job
+    runner (core/lib/job_runner.py — leased batch claim, retry backoff,
+    dead_letter after MAX_RETRIES attempts).
 
     Returns number of jobs processed.
     """
-    try:
-        rows = (
-            supabase.table("pending_enrichment_jobs")
-            .select("id, job_type, target_type, target_id, content, related_id, retry_count, "
-                    "related_org_id, full_text, pending_org_id, entity_context")
-            .eq("status", "pending")
-            .order("created_at", desc=False)
-            .limit(max_jobs)
-            .execute()
-        )
-    except Exception as e:
-        audit_log_sync("enrichment_queue", "WARNING", f"fetch pending jobs failed: {e}")
-        return 0
-
-    if not rows or not rows.data:
-        return 0
-
-    processed = 0
-    for job in rows.data:
-        job_id = job["id"]
-        job_type = job["job_type"]
-        target_id = job["target_id"]
-        content = job["content"]
-        related_id = job.get("related_id")
-        related_org_id = job.get("related_org_id")
-        full_text = job.get("full_text")
-        pending_org_id = job.get("pending_org_id")
-        entity_context_raw = job.get("entity_context")
-
-        # Parse entity_context from JSONB
-        entity_context = None
-        if entity_context_raw:
-            try:
-                entity_context = json.loads(entity_context_raw) if isinstance(entity_context_raw, str) else entity_context_raw
-            except Exception:
-                entity_context = None
-
-        # Atomic claim — call RPC
+    from core.services.db import get_tenant
+    stats = await run_queue("pending_enrichment_jobs", max_jobs=max_jobs, owner=get_tenant())
+    return stats.processed
+
+
+async def _run_enrichment_job(job: dict) -> bool:
+    """Job runner handler: dispatch one claimed job on its job_type."""
+    job_type = job["job_type"]
+    target_id = job["target_id"]
+    content = job["content"]
+    related_id = job.get("related_id")
+    related_org_id = job.get("related_org_id")
+    full_text = job.get("full_text")
+    pending_org_id = job.get("pending_org_id")
+    entity_context_raw = job.get("entity_context")
+
+    # Parse entity_context from JSONB
+    entity_context = None
+    if entity_context_raw:
         try:
-            claimed = supabase.rpc("claim_pending_enrichment_job", {"job_id": job_id}).execute()
-            if not claimed or not claimed.data:
-                continue  # Another sentinel run already claimed it
-        except Exception as e:
-            audit_log_sync(
-                "enrichment_queue", "WARNING", f"claim failed for job {job_id}: {e}"
-            )
-            continue
-
-        success = False
-        if job_type == "task_graph":
-            success = await _process_task_graph_enrichment(
-                target_id=target_id, content=content, related_id=related_id,
-                related_org_id=related_org_id, full_text=full_text,
-                pending_org_id=pending_org_id, entity_context=entity_context,
-            )
-        elif job_type == "note_enrich":
-            success = await _process_note_enrichment(
-                memory_id=target_id, content=content, source=related_id or "enrichment_queue",
-                related_org_id=related_org_id, full_text=full_text,
-                pending_org_id=pending_org_id, entity_context=entity_context,
-            )
-        elif job_type == "doc_enrich":
-            success = await _process_doc_enrichment(
-                document_id=target_id, content=content
-            )
-        else:
-            audit_log_sync(
-                "enrichment_queue", "WARNING",
-                f"Unknown job_type '{job_type}' for job {job_id}"
-            )
-
-        retry_count = (job.get("retry_count") or 0) + 1
-        if success:
-            try:
-                supabase.table("pending_enrichment_jobs") \
-                    .update({
-                        "status": "completed",
-                        "completed_at": datetime.now(timezone.utc).isoformat(),
-                    }) \
-                    .eq("id", job_id) \
-                    .execute()
-            except Exception:
-                pass
-            audit_log_sync(
-                "enrichment_queue", "INFO",
-                f"Completed {job_type} for {job['target_type']} {target_id} (job {job_id})"
-            )
-        else:
-            new_status = "dead_letter" if retry_count >= MAX_RETRIES else "failed"
-            try:
-                supabase.table("pending_enrichment_jobs") \
-                    .update({
-                        "status": new_status,
-                        "error": f"Failed after {retry_count} attempt(s)",
-                    }) \
-                    .eq("id", job_id) \
-                    .execute()
-            except Exception:
-                pass
-            audit_log_sync(
-                "enrichment_queue",
-                "WARNING" if new_status == "failed" else "ERROR",
-                f"{job_type} for {job['target_type']} {target_id} → {new_status} "
-                f"(attempt {retry_count})"
-            )
-
-        processed += 1
-
-    return processed
+            entity_context = json.loads(entity_context_raw) if isinstance(entity_context_raw, str) else entity_context_raw
+        except Exception:
+            entity_context = None
+
+    if job_type == "task_graph":
+        return await _process_task_graph_enrichment(
+            target_id=target_id, content=content, related_id=related_id,
+            related_org_id=related_org_id, full_text=full_text,
+            pending_org_id=pending_org_id, entity_context=entity_context,
+        )
+    if job_type == "note_enrich":
+        return await _process_note_enrichment(
+            memory_id=target_id, content=content, source=related_id or "enrichment_queue",
+            related_org_id=related_org_id, full_text=full_text,
+            pending_org_id=pending_org_id, entity_context=entity_context,
+        )
+    if job_type == "doc_enrich":
+        return await _process_doc_enrichment(document_id=target_id, content=content)
+    audit_log_sync(
+        "enrichment_queue", "WARNING",
+        f"Unknown job_type '{job_type}' for job {job['id']}"
+    )
+    return False
 
 
 async def _process_task_graph_enrichment(
@@ -390,3 +331,12 @@ async def _process_doc_enrichment(document_id: int, content: str) -> bool:
             f"doc_enrich failed for document {document_id}: {e}"
         )
         return False
+
+
+register_queue(JobQueue(
+    table="pending_enrichment_jobs",
+    service="enrichment_queue",
+    handler=_run_enrichment_job,
+    describe=lambda job: f"{job.get('job_type')} for {job.get('target_type')} {job.get('target_id')} (job {job.get('id')})",
+    max_attempts=MAX_RETRIES,
+))
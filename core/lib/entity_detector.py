@@ -1,7 +1,8 @@
 """Deterministic Entity Detector — no LLM.
 
 Three-phase entity detection that replaces the old LLM-based entity extraction:
-1. DB Lookup — match text against graph_nodes, people, orgs, projects via n-grams
+1. DB Lookup — match text against known graph_nodes labels/aliases via a
+   per-tenant token trie (one linear scan of the text, see _EntityIndex)
 2. Pattern Match — detect unregistered entities using structural text patterns
 3. Output — returns detected entities with types and DB IDs where found
 
@@ -18,8 +19,9 @@ Replaces:
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 import re
+import time
 
-from core.services.db import tenant_aware_client
+from core.services.db import get_tenant, tenant_aware_client
 
 
 @dataclass
@@ -137,13 +139,6 @@ def _normalize(s: str) -> str:
     return ' '.join(s.split())
 
 
-def _get_ngrams(words: list[str], n: int) -> set[str]:
-    ngrams = set()
-    for i in range(len(words) - n + 1):
-        ngrams.add(' '.join(words[i:i+n]))
-    return ngrams
-
-
 def _find_capitalized_phrases(text: str) -> list[tuple[str, int, int]]:
     """Find capitalized phrases in text. Returns [(phrase, start, end)]."""
     # M17: the user's OWN display name + root label are skipped (a tenant's
@@ -208,12 +203,136 @@ def _is_url_text(text: str) -> bool:
     return bool(re.match(r'^https?://\S+$', text.strip()))
 
 
+# ── Known-entity index (Phase 1) ─────────────────────────────────────────────
+
+_ENTITY_TYPES = ['person', 'organization', 'place', 'event', 'animal', 'emotional_state']
+
+# Phase 1 used to compare 1–4 word n-grams of the text against every label;
+# labels longer than that never matched, and the trie keeps that bound.
+_MAX_LABEL_WORDS = 4
+
+_entity_index_cache: dict[str, tuple] = {}  # tenant-key -> (ts, _EntityIndex)
+_ENTITY_INDEX_TTL = 300  # seconds — backstop for writes that skip invalidation
+
+
+class _EntityIndex:
+    """Token trie over normalized labels and aliases of live graph nodes.
+
+    Each terminal holds the ordinals of the entries it names; `match` walks
+    the trie from every word of the text (≤ _MAX_LABEL_WORDS steps each) and
+    returns entries in build order, so dedup in detect_entities keeps the
+    same winner the old per-node loop did.
+    """
+
+    def __init__(self):
+        self.entries: List[dict] = []
+        self._root: dict = {}
+
+    def add(self, phrase: str, entry_no: int) -> None:
+        words = _normalize(phrase).split()
+        if not words or len(words) > _MAX_LABEL_WORDS:
+            return
+        node = self._root
+        for w in words:
+            node = node.setdefault(w, {})
+        node.setdefault(None, []).append(entry_no)
+
+    def match(self, text: str) -> List[dict]:
+        words = _normalize(text).split()
+        hits: set = set()
+        for i in range(len(words)):
+            node = self._root
+            for w in words[i:i + _MAX_LABEL_WORDS]:
+                node = node.get(w)
+                if node is None:
+                    break
+                hits.update(node.get(None, ()))
+        return [self.entries[n] for n in sorted(hits)]
+
+
+def _build_entity_index(supabase) -> _EntityIndex:
+    """One graph_nodes read → _EntityIndex. Raises on DB failure.
+
+    Entry order reproduces the old three passes: non-hypothetical nodes of
+    every type first (db_id = legacy db_record_id for orgs/people when set),
+    then the remaining orgs, then the remaining people (db_id = node id).
+    """
+    from core.lib.graph_rules import _meta_aliases
+
+    res = supabase.table('graph_nodes') \
+        .select('id, label, type, db_record_id, epistemic_status, metadata') \
+        .in_('type', _ENTITY_TYPES) \
+        .eq('is_current', True) \
+        .execute()
+    rows = [n for n in (res.data or []) if n.get('label') and n.get('id')]
+
+    # neq('epistemic_status', 'hypothetical') never matched NULL status in
+    # PostgREST, so NULL counts as "not asserted" here too.
+    def _asserted(node) -> bool:
+        return node.get('epistemic_status') not in (None, 'hypothetical')
+
+    ordered: List[Tuple[dict, str]] = []
+    for node in rows:
+        if not _asserted(node):
+            continue
+        # Use db_record_id (domain table PK) instead of node['id']
+        # (graph_nodes UUID) — memories.organization_id/project_id FK to
+        # domain tables, not graph_nodes. All three types have
+        # db_record_id set via create_graph_node_with_db_record.
+        if node['type'] in ('organization', 'person') and node.get('db_record_id'):
+            ordered.append((node, str(node['db_record_id'])))
+        else:
+            ordered.append((node, node['id']))
+    # Consolidation (migration 74/75): orgs/people are graph nodes and their
+    # id IS the domain id — matched even while not yet asserted.
+    for node_type in ('organization', 'person'):
+        for node in rows:
+            if node['type'] == node_type and not _asserted(node):
+                ordered.append((node, str(node['id'])))
+
+    index = _EntityIndex()
+    for node, db_id in ordered:
+        entry_no = len(index.entries)
+        index.entries.append({'label': node['label'], 'type': node['type'], 'db_id': db_id})
+        index.add(node['label'], entry_no)
+        for alias in _meta_aliases(node):
+            index.add(alias, entry_no)
+    return index
+
+
+def _get_entity_index(supabase) -> _EntityIndex:
+    """Per-tenant cached _EntityIndex (get_tenant key). Raises on DB failure
+    without caching, so the next call retries instead of serving an empty
+    index as if it were grounded.
+    """
+    _key = get_tenant() or "__legacy__"
+    _cached = _entity_index_cache.get(_key)
+    if _cached is not None and (time.time() - _cached[0]) < _ENTITY_INDEX_TTL:
+        return _cached[1]
+    _entity_index_cache.pop(_key, None)  # stale → evict, cap growth
+    index = _build_entity_index(supabase)
+    _entity_index_cache[_key] = (time.time(), index)
+    return index
+
+
+def invalidate_entity_index(user_id: str | None = None, all_tenants: bool = False) -> None:
+    """Drop the cached known-entity index for a tenant (default: current).
+
+    Called after graph nodes are created, merged or renamed so the next
+    detect_entities call sees the change instead of waiting out the TTL.
+    """
+    if all_tenants:
+        _entity_index_cache.clear()
+        return
+    _entity_index_cache.pop(user_id or get_tenant() or "__legacy__", None)
+
+
 # ── Main Function ────────────────────────────────────────────────────────────
 
 def detect_entities(text: str) -> List[DetectedEntity]:
     """Three-phase deterministic entity detection. No LLM.
 
-    Phase 1: DB Lookup — match text against known entities via n-grams
+    Phase 1: DB Lookup — match text against known labels/aliases (cached index)
     Phase 2: Pattern Match — find unregistered entities via structural patterns
 
     Returns a deduplicated list of DetectedEntity objects.
@@ -248,109 +367,19 @@ def detect_entities(text: str) -> List[DetectedEntity]:
     # ════════════════════════════════════════════════════════════════════════
 
     try:
-        # Fetch all known entities
-        gn_res = supabase.table('graph_nodes') \
-            .select('label, type, id, db_record_id') \
-            .in_('type', ['person', 'organization', 'place',
-                          'event', 'animal', 'emotional_state']) \
-            .neq('epistemic_status', 'hypothetical') \
-            .eq('is_current', True) \
-            .execute()
-        graph_nodes = gn_res.data or []
-
-        # Consolidation (migration 74): orgs/people come from live graph nodes.
-        # db ids below are the LEGACY domain-table ids (orgs: organizations.id,
-        # people: people.id) preserved in node metadata — memories FKs depend on them.
-        orgs_res = supabase.table('graph_nodes') \
-            .select('id, label, metadata, db_record_id') \
-            .eq('type', 'organization') \
-            .eq('is_current', True) \
-            .execute()
-        import json as _json
-        orgs = []
-        for _n in orgs_res.data or []:
-            _meta = _n.get('metadata') or {}
-            if isinstance(_meta, str):
-                try:
-                    _meta = _json.loads(_meta)
-                except Exception:
-                    _meta = {}
-            # Graph-first (migration 75): the org id IS the graph node id
-            orgs.append({'name': _n.get('label'), 'id': _n.get('id')})
-        orgs = [o for o in orgs if o.get('id')]
-
-        people_res = supabase.table('graph_nodes') \
-            .select('id, label, metadata, db_record_id') \
-            .eq('type', 'person') \
-            .eq('is_current', True) \
-            .execute()
-        people = []
-        for _n in people_res.data or []:
-            _meta = _n.get('metadata') or {}
-            if isinstance(_meta, str):
-                try:
-                    _meta = _json.loads(_meta)
-                except Exception:
-                    _meta = {}
-            # Graph-first (migration 75): the person id IS the graph node id
-            people.append({'name': _n.get('label'), 'id': _n.get('id')})
-        people = [p for p in people if p.get('id')]
-
+        index = _get_entity_index(supabase)
     except Exception as e:
         audit_log_sync("entity_detector", "WARNING", f"Phase 1 DB fetch failed: {e}")
-        graph_nodes = []
-        orgs = []
-        people = []
+        index = None
         db_grounded = False
 
-    # Build n-gram index from text
-    norm_text = _normalize(text)
-    words = norm_text.split()
-    text_ngrams: set = set()
-    for i in range(1, 5):
-        text_ngrams.update(_get_ngrams(words, i))
-
-    # Match graph nodes
-    for node in graph_nodes:
-        norm_label = _normalize(node['label'])
-        if norm_label in text_ngrams:
-            # Use db_record_id (domain table PK) instead of node['id']
-            # (graph_nodes UUID) — memories.organization_id/project_id FK to
-            # domain tables, not graph_nodes. All three types have
-            # db_record_id set via create_graph_node_with_db_record.
-            if node['type'] in ('organization', 'person') and node.get('db_record_id'):
-                db_id_val = str(node['db_record_id'])
-            else:
-                db_id_val = node['id']
+    if index is not None:
+        for hit in index.match(text):
             _add(DetectedEntity(
-                label=node['label'],
-                type=node['type'],
-                source='db_lookup',
-                db_id=db_id_val,
-                is_new=False,
-            ))
-
-    # Match organizations by name
-    for org in orgs:
-        norm_name = _normalize(org['name'])
-        if norm_name in text_ngrams:
-            _add(DetectedEntity(
-                label=org['name'],
-                type='organization',
-                source='db_lookup',
-                db_id=str(org['id']),
-                is_new=False,
-            ))
-
-    # Match people by name
-    for p in people:
-        norm_name = _normalize(p['name'])
-        if norm_name in text_ngrams:
-            _add(DetectedEntity(
-                label=p['name'],
-                type='person',
+                label=hit['label'],
+                type=hit['type'],
                 source='db_lookup',
-                db_id=str(p['id']),
+                db_id=hit['db_id'],
                 is_new=False,
             ))
 
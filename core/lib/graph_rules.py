@@ -852,6 +852,11 @@ def execute_graph_node_merge(source_id: str, target_id: str, provenance: str = "
     
     # Update target node meta
     supabase.table("graph_nodes").update({"metadata": merged_meta}).eq("id", target_id).execute()
+
+    # The loser's label/aliases must stop resolving in detect_entities now,
+    # not after the index TTL.
+    from core.lib.entity_detector import invalidate_entity_index
+    invalidate_entity_index()
     
     from core.lib.audit_logger import audit_log_sync
 
@@ -1030,6 +1035,8 @@ def persist_label(route: str, resolution: dict, source_info: dict) -> str:
                 "metadata": source_info
             }, on_conflict="owner_id, normalized_label, type").execute()
             if res.data:
+                from core.lib.entity_detector import invalidate_entity_index
+                invalidate_entity_index()
                 return res.data[0]["id"]
         except Exception as e:
             if hasattr(e, "code") and e.code == "23505":
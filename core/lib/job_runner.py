@@ -0,0 +1,412 @@
+"""Durable job runner — leased batch claiming for the table-backed queues.
+
+pending_enrichment_jobs (core/lib/enrichment_queue.py) and
+pending_retrieval_index_jobs (core/retrieval/pipeline.py) used to be drained
+by the sentinel piggyback, a few jobs per 5-minute cycle, one claim round
+trip per job, strictly serial. The runner drains any registered queue:
+
+  * claim — one claim_queue_jobs RPC (db/112) leases a whole batch, highest
+    priority first, FOR UPDATE SKIP LOCKED so parallel workers split the
+    backlog;
+  * run — jobs execute under a semaphore (bounded concurrency), each in its
+    owner's tenant_scope (a worker drains every tenant's rows);
+  * finish — completed / retry later (run_after backoff) / dead_letter once
+    max_attempts claims are used up. The update is guarded by the lease
+    token, so a worker whose lease expired cannot overwrite the job's new
+    owner. Expired leases are simply claimable again — no zombie sweep.
+
+Queues register at import (register_queue), like the audit writer's bulk
+writers. The dedicated entry point is run_queue_worker() — the
+drain_job_queue Modal function, sized by claimable depth from
+/api/queue-cron (plan_queue_workers). The cron ticks every minute but a
+worker lives up to 15 minutes, so each spawn holds a slot in a Redis
+sorted set until it exits (or its slot expires) and the plan only tops a
+queue up to its target. The sentinel keeps a small per-tenant run_queue()
+as a backstop.
+
+Until db/112 is deployed the claim falls back to the legacy select +
+conditional-update loop: one batch per run, no leases.
+"""
+
+import asyncio
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from core.lib.audit_logger import audit_log_sync
+from core.lib.redis_cache import acquire_lock, get_redis, release_lock
+from core.services.db import (
+    _missing_table_error, channel_tenant_scope, exec_query, get_supabase, tenant_scope,
+)
+
+JOB_LEASE_S = int(os.getenv("JOB_LEASE_S", "600"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "10"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+
+# Worker sizing for /api/queue-cron: one drain_job_queue worker per
+# JOBS_PER_WORKER claimable jobs, at most JOB_MAX_WORKERS live per queue.
+JOBS_PER_WORKER = int(os.getenv("JOBS_PER_WORKER", "50"))
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "5"))
+
+# Stop claiming new batches after this long — leaves the in-flight batch
+# room to finish inside the Modal function's 900s timeout.
+WORKER_DEADLINE_S = 780
+
+# A worker slot outlives the worker's 900s Modal timeout plus cold start, so
+# a crashed worker that never released its slot frees it on its own.
+WORKER_SLOT_TTL_S = 960
+_WORKERS_KEY = "job_runner:workers:{}"
+
+# The DLQ (audit_logs service='dlq', core/skills/dlq_consumer.py) is not a
+# claimable table; the worker runs its per-tenant consumer under this name.
+DLQ_QUEUE = "dlq"
+# process_dlq is not leased — only one DLQ worker may run at a time.
+DLQ_LOCK_KEY = "job_runner:dlq_lock"
+
+
+@dataclass
+class JobQueue:
+    """A table-backed queue the runner can drain.
+
+    handler(job) gets the full row and returns True on success; an
+    exception counts as a failure. A failed attempt becomes claimable again
+    after retry_delay_s * 2**(attempt-1).
+    """
+    table: str
+    service: str
+    handler: Callable[[dict], Awaitable[bool]]
+    describe: Callable[[dict], str] = lambda job: f"job {job.get('id')}"
+    max_attempts: int = 3
+    retry_delay_s: int = 60
+    lease_s: int = JOB_LEASE_S
+    enabled: Callable[[], bool] = lambda: True
+    after_run: Optional[Callable[[], Awaitable[None]]] = None
+
+
+@dataclass
+class QueueRunStats:
+    """Outcome counts of one run_queue call."""
+    queue: str
+    claimed: int = 0
+    completed: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.retried + self.dead_lettered
+
+    def describe(self) -> str:
+        return (
+            f"{self.queue}: {self.completed} completed, {self.retried} retry later, "
+            f"{self.dead_lettered} dead-lettered in {self.elapsed_s:.1f}s"
+        )
+
+
+_queues: Dict[str, JobQueue] = {}
+
+# claim_queue_jobs (db/112): None = untried, True = deployed, False = missing.
+_claim_rpc: Optional[bool] = None
+
+
+def register_queue(queue: JobQueue) -> None:
+    _queues[queue.table] = queue
+
+
+def registered_queues() -> Dict[str, JobQueue]:
+    # Queue owners register at import.
+    import core.lib.enrichment_queue  # noqa: F401
+    import core.retrieval.pipeline  # noqa: F401
+    return dict(_queues)
+
+
+def _unwrap(row):
+    # SETOF jsonb comes back as bare objects; tolerate the {fn: obj} shape.
+    if isinstance(row, dict) and set(row) == {"claim_queue_jobs"}:
+        return row["claim_queue_jobs"]
+    return row
+
+
+async def claim_jobs(queue: JobQueue, limit: int, owner: Optional[str] = None) -> List[dict]:
+    """Lease up to `limit` ready jobs. Each returned row's retry_count is
+    this attempt's number; leased rows carry their lease_token."""
+    global _claim_rpc
+    if limit <= 0:
+        return []
+    if _claim_rpc is not False:
+        try:
+            res = await exec_query(get_supabase().rpc("claim_queue_jobs", {
+                "p_queue": queue.table,
+                "p_limit": limit,
+                "p_lease_seconds": queue.lease_s,
+                "p_max_attempts": queue.max_attempts,
+                "p_owner": owner,
+            }))
+            _claim_rpc = True
+            return [r for r in map(_unwrap, res.data or []) if isinstance(r, dict)]
+        except Exception as e:
+            if not _missing_table_error(str(e), "claim_queue_jobs"):
+                audit_log_sync(queue.service, "WARNING", f"claim_queue_jobs failed for {queue.table}: {e}")
+                return []
+            _claim_rpc = False
+    return await _claim_legacy(queue, limit, owner)
+
+
+async def _claim_legacy(queue: JobQueue, limit: int, owner: Optional[str]) -> List[dict]:
+    """Pre-db/112: select pending rows, then claim each with a conditional
+    UPDATE (status still 'pending'). A lost race just drops the row."""
+    client = get_supabase()
+    query = client.table(queue.table).select("*").eq("status", "pending")
+    if owner:
+        query = query.eq("owner_id", owner)
+    try:
+        rows = await exec_query(query.order("created_at", desc=False).limit(limit))
+    except Exception as e:
+        audit_log_sync(queue.service, "WARNING", f"fetch pending {queue.table} failed: {e}")
+        return []
+
+    async def _claim(job: dict) -> Optional[dict]:
+        attempt = (job.get("retry_count") or 0) + 1
+        try:
+            res = await exec_query(
+                client.table(queue.table)
+                .update({
+                    "status": "processing",
+                    "started_at": datetime.now(timezone.utc).isoformat(),
+                    "retry_count": attempt,
+                })
+                .eq("id", job["id"])
+                .eq("status", "pending")
+            )
+        except Exception as e:
+            audit_log_sync(queue.service, "WARNING", f"claim failed for {queue.table} {job['id']}: {e}")
+            return None
+        return {**job, "retry_count": attempt} if res.data else None
+
+    claimed = await asyncio.gather(*(_claim(job) for job in rows.data or []))
+    return [job for job in claimed if job]
+
+
+async def _finish(queue: JobQueue, job: dict, ok: bool, error: Optional[str]) -> str:
+    """Record the attempt's outcome. Returns the job's new status."""
+    attempt = int(job.get("retry_count") or 0)
+    now = datetime.now(timezone.utc)
+    token = job.get("lease_token")
+    if ok:
+        status = "completed"
+        fields = {"status": status, "completed_at": now.isoformat(), "error": None}
+    else:
+        status = "dead_letter" if attempt >= queue.max_attempts else "pending"
+        fields = {"status": status, "error": f"{error} (attempt {attempt})"}
+        if token and status == "pending":
+            delay = queue.retry_delay_s * (2 ** max(attempt - 1, 0))
+            fields["run_after"] = (now + timedelta(seconds=delay)).isoformat()
+    if token:
+        fields.update({"lease_token": None, "lease_expires_at": None})
+
+    query = get_supabase().table(queue.table).update(fields).eq("id", job["id"])
+    query = query.eq("lease_token", token) if token else query.eq("status", "processing")
+    try:
+        res = await exec_query(query)
+        if token and not res.data:
+            audit_log_sync(queue.service, "WARNING",
+                           f"{queue.describe(job)}: lease lost before finish, outcome dropped")
+    except Exception as e:
+        audit_log_sync(queue.service, "WARNING", f"{queue.describe(job)}: finish failed: {e}")
+    return status
+
+
+async def _run_job(queue: JobQueue, job: dict, stats: QueueRunStats) -> None:
+    owner = job.get("owner_id")
+    error = None
+    try:
+        with tenant_scope(owner) if owner else channel_tenant_scope():
+            ok = bool(await queue.handler(job))
+        if not ok:
+            error = "handler returned False"
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"[:500]
+
+    status = await _finish(queue, job, ok, error)
+    attempt = job.get("retry_count") or 0
+    if status == "completed":
+        stats.completed += 1
+        audit_log_sync(queue.service, "INFO", f"Completed {queue.describe(job)} (attempt {attempt})")
+    elif status == "pending":
+        stats.retried += 1
+        audit_log_sync(queue.service, "WARNING", f"{queue.describe(job)} attempt {attempt} failed: {error}")
+    else:
+        stats.dead_lettered += 1
+        audit_log_sync(queue.service, "ERROR",
+                       f"{queue.describe(job)} → dead_letter after {attempt} attempt(s): {error}")
+
+
+async def run_queue(
+    name: str,
+    *,
+    max_jobs: Optional[int] = None,
+    batch_size: int = JOB_BATCH_SIZE,
+    concurrency: int = JOB_CONCURRENCY,
+    deadline_s: Optional[float] = None,
+    owner: Optional[str] = None,
+) -> QueueRunStats:
+    """Claim and run batches until the queue is empty, max_jobs have been
+    claimed, or deadline_s has passed. owner narrows the claim to one
+    tenant (sentinel backstop)."""
+    queue = registered_queues()[name]
+    stats = QueueRunStats(name)
+    if not queue.enabled():
+        return stats
+    started = time.monotonic()
+    gate = asyncio.Semaphore(max(1, concurrency))
+
+    async def _gated(job: dict) -> None:
+        async with gate:
+            await _run_job(queue, job, stats)
+
+    while deadline_s is None or time.monotonic() - started < deadline_s:
+        want = batch_size if max_jobs is None else min(batch_size, max_jobs - stats.claimed)
+        jobs = await claim_jobs(queue, want, owner)
+        if not jobs:
+            break
+        stats.claimed += len(jobs)
+        await asyncio.gather(*(_gated(job) for job in jobs))
+        if _claim_rpc is not True:
+            break  # legacy claim has no run_after: a re-claim would retry at once
+
+    if stats.processed and queue.after_run:
+        try:
+            await queue.after_run()
+        except Exception as e:
+            audit_log_sync(queue.service, "WARNING", f"{name} after_run failed: {e}")
+    stats.elapsed_s = time.monotonic() - started
+    return stats
+
+
+def _count(name: str):
+    return get_supabase().table(name).select("id", count="exact").limit(1)
+
+
+async def queue_depth(name: str) -> int:
+    """Jobs a claim would hand out right now, across tenants: pending rows
+    past their run_after backoff plus processing rows whose lease expired.
+    Rows still backing off are not counted — a worker would claim nothing."""
+    if name == DLQ_QUEUE:
+        from core.skills.dlq_consumer import dlq_depth
+        return await dlq_depth()
+    now = datetime.now(timezone.utc).isoformat()
+    try:
+        counts = await asyncio.gather(
+            exec_query(_count(name).eq("status", "pending").is_("run_after", "null")),
+            exec_query(_count(name).eq("status", "pending").lte("run_after", now)),
+            exec_query(_count(name).eq("status", "processing").lt("lease_expires_at", now)),
+        )
+    except Exception as e:
+        if not _missing_table_error(str(e), "run_after") and not _missing_table_error(str(e), "lease_expires_at"):
+            raise
+        # Before db/112: no backoff or leases, every pending row is ready.
+        counts = [await exec_query(_count(name).eq("status", "pending"))]
+    return sum(res.count or 0 for res in counts)
+
+
+def reserve_worker_slot(name: str) -> Optional[str]:
+    """Count a worker against `name` until release_worker_slot or expiry.
+
+    Returns the slot id to hand the worker, or None without Redis (the
+    plan then sees no live workers; drain_job_queue's max_containers still
+    bounds the total)."""
+    client = get_redis()
+    if client is None:
+        return None
+    worker_id = uuid.uuid4().hex
+    key = _WORKERS_KEY.format(name)
+    try:
+        pipeline = client.pipeline()
+        pipeline.zadd(key, {worker_id: time.time() + WORKER_SLOT_TTL_S})
+        pipeline.expire(key, WORKER_SLOT_TTL_S)
+        pipeline.exec()
+        return worker_id
+    except Exception as e:
+        audit_log_sync("job_runner", "WARNING", f"reserve_worker_slot failed for {name}: {e}")
+        return None
+
+
+def release_worker_slot(name: str, worker_id: Optional[str]) -> None:
+    client = get_redis()
+    if client is None or not worker_id:
+        return
+    try:
+        client.zrem(_WORKERS_KEY.format(name), worker_id)
+    except Exception as e:
+        audit_log_sync("job_runner", "WARNING", f"release_worker_slot failed for {name}: {e}")
+
+
+def live_workers(name: str) -> int:
+    """Workers spawned for `name` that have not exited or expired yet."""
+    client = get_redis()
+    if client is None:
+        return 0
+    key = _WORKERS_KEY.format(name)
+    try:
+        pipeline = client.pipeline()
+        pipeline.zremrangebyscore(key, 0, time.time())
+        pipeline.zcard(key)
+        return int(pipeline.exec()[1])
+    except Exception as e:
+        audit_log_sync("job_runner", "WARNING", f"live_workers failed for {name}: {e}")
+        return 0
+
+
+async def plan_queue_workers() -> Dict[str, int]:
+    """Workers to start per queue this tick: the depth-scaled target minus
+    the workers still running from earlier ticks."""
+    targets = {}
+    for name, queue in registered_queues().items():
+        if not queue.enabled():
+            continue
+        depth = await queue_depth(name)
+        targets[name] = min(JOB_MAX_WORKERS, math.ceil(depth / JOBS_PER_WORKER))
+    targets[DLQ_QUEUE] = 1 if await queue_depth(DLQ_QUEUE) else 0
+    plan = {name: target - live_workers(name) for name, target in targets.items() if target}
+    return {name: n for name, n in plan.items() if n > 0}
+
+
+async def run_queue_worker(
+    name: str, deadline_s: float = WORKER_DEADLINE_S, worker_id: Optional[str] = None,
+) -> dict:
+    """One worker's run: drain `name` until empty or the deadline, then
+    free the slot /api/queue-cron reserved for it (worker_id).
+
+    The DLQ consumer runs once per tenant (its items are audit_logs rows
+    with their own backoff, read through the tenant facade), under a lock.
+    """
+    try:
+        if name == DLQ_QUEUE:
+            return await _run_dlq_worker()
+        stats = await run_queue(name, deadline_s=deadline_s)
+        if stats.claimed:
+            print(f"[job-runner] {stats.describe()}", flush=True)
+        return {"queue": name, "claimed": stats.claimed, "completed": stats.completed,
+                "retried": stats.retried, "dead_lettered": stats.dead_lettered}
+    finally:
+        release_worker_slot(name, worker_id)
+
+
+async def _run_dlq_worker() -> dict:
+    # A slow run must not overlap the next tick's: both would retry the
+    # same dead letters.
+    if not acquire_lock(DLQ_LOCK_KEY, ttl=WORKER_SLOT_TTL_S):
+        return {"queue": DLQ_QUEUE, "skipped": "already_running"}
+    try:
+        from core.services.db import arun_tenant_fanout
+        from core.skills.dlq_consumer import process_dlq
+        results = await arun_tenant_fanout(process_dlq, job_name="dlq_consumer")
+        results = results if isinstance(results, list) else [results]
+        return {"queue": DLQ_QUEUE, "processed": sum(r.get("processed", 0) for r in results)}
+    finally:
+        release_lock(DLQ_LOCK_KEY)
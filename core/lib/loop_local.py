@@ -0,0 +1,76 @@
+"""Per-event-loop singletons, closed when their loop shuts down.
+
+httpx connections belong to the loop that opened them. One process can run
+several loops at once (api/index.py's _run_batch_concurrently threads each
+asyncio.run a worker) and Modal runs every input under a fresh
+asyncio.run. A module-global client plus a "which loop" marker therefore
+rebuilt the pool whenever two loops alternated and never closed the one it
+replaced. LoopLocal keeps one value per running loop instead:
+
+    _http = LoopLocal(lambda: httpx.AsyncClient(...), aclose=lambda c: c.aclose())
+    client = _http.get()   # inside a coroutine
+
+Entries are weakly keyed by the loop. Teardown rides on the loop's
+async-generator hooks: asyncio.run() (and any runner calling
+loop.shutdown_asyncgens()) finalizes a sentinel generator armed for the
+value, which awaits `aclose(value)` before the loop closes.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopLocal(Generic[T]):
+    """One `factory()` value per running event loop."""
+
+    def __init__(self, factory: Callable[[], T],
+                 aclose: Optional[Callable[[T], Awaitable[None]]] = None):
+        self._factory = factory
+        self._aclose = aclose
+        self._lock = threading.Lock()
+        # loop -> (value, teardown generator or None)
+        self._entries: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        """The running loop's value, created on first use."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._entries.get(loop)
+            if entry is None:
+                value = self._factory()
+                entry = (value, self._arm_teardown(loop, value))
+                self._entries[loop] = entry
+        return entry[0]
+
+    def peek(self) -> Optional[T]:
+        """The running loop's value if one was created, else None."""
+        entry = self._entries.get(asyncio.get_running_loop())
+        return entry[0] if entry else None
+
+    def _arm_teardown(self, loop, value):
+        if self._aclose is None:
+            return None
+
+        async def _teardown():
+            try:
+                yield
+            finally:
+                with self._lock:
+                    entry = self._entries.get(loop)
+                    if entry is not None and entry[0] is value:
+                        del self._entries[loop]
+                await self._aclose(value)
+
+        gen = _teardown()
+        # Step to the yield right here, on the loop's own thread: the first
+        # iteration registers the generator with this loop's asyncgen hooks,
+        # so shutdown_asyncgens() runs the finally block.
+        try:
+            gen.asend(None).send(None)
+        except StopIteration:
+            pass
+        return gen
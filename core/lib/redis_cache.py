@@ -2,6 +2,11 @@ import os
 import json
 import time
 
+import httpx
+
+from core.lib.loop_local import LoopLocal
+from core.lib.tracing import traced
+
 try:
     from core.lib.audit_logger import audit_log_sync
 except Exception:
@@ -31,6 +36,11 @@ def get_redis():
                     audit_log_sync("redis", "WARNING", f"Failed to initialize Upstash Redis: {e}")
     return _redis_client
 
+def _decode(data):
+    if isinstance(data, str):
+        return json.loads(data)
+    return data # upstash_redis might auto-deserialize if it detected json
+
 def cache_get(key: str):
     """Fetch from Redis. Returns None on miss or error."""
     client = get_redis()
@@ -40,9 +50,7 @@ def cache_get(key: str):
         data = client.get(key)
         if data is None:
             return None
-        if isinstance(data, str):
-            return json.loads(data)
-        return data # upstash_redis might auto-deserialize if it detected json
+        return _decode(data)
     except Exception as e:
         audit_log_sync("redis", "WARNING", f"cache_get failed for {key}: {e}")
         return None
@@ -67,6 +75,135 @@ def cache_delete(key: str):
     except Exception as e:
         audit_log_sync("redis", "WARNING", f"cache_delete failed for {key}: {e}")
 
+def cache_get_many(keys: list) -> dict:
+    """Fetch many JSON values in one MGET. Returns {key: value} for hits only;
+    {} on error or when Redis is unavailable."""
+    return _decode_hits(keys, cache_mget_raw(keys))
+
+def cache_set_many(mapping: dict, ttl: int = 60):
+    """Store many JSON values with a TTL in one pipeline. Silently fails."""
+    cache_mset_raw({k: json.dumps(v) for k, v in mapping.items()}, ttl)
+
+def _decode_hits(keys: list, values: list) -> dict:
+    hits = {}
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        try:
+            hits[key] = _decode(value)
+        except ValueError:
+            continue
+    return hits
+
+def cache_mget_raw(keys: list) -> list:
+    """Fetch many raw string values in one MGET. None per miss; all None on
+    error or when Redis is unavailable. No JSON decoding — for callers that
+    store compact encodings (e.g. packed embedding vectors)."""
+    client = get_redis()
+    if client is None or not keys:
+        return [None] * len(keys)
+    try:
+        values = client.mget(*keys)
+        return list(values) if values else [None] * len(keys)
+    except Exception as e:
+        audit_log_sync("redis", "WARNING", f"cache_mget_raw failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+def cache_mset_raw(mapping: dict, ttl: int = 60):
+    """Store many raw string values with a TTL in one pipeline. Silently fails."""
+    client = get_redis()
+    if client is None or not mapping:
+        return
+    try:
+        pipeline = client.pipeline()
+        for key, value in mapping.items():
+            pipeline.set(key, value, ex=ttl)
+        pipeline.exec()
+    except Exception as e:
+        audit_log_sync("redis", "WARNING", f"cache_mset_raw failed for {len(mapping)} keys: {e}")
+
+# ── Async API ────────────────────────────────────────────────────────────────
+# Talks to the Upstash REST endpoint directly over a pooled httpx.AsyncClient
+# (keep-alive, one pipeline POST per batch) so async callers stop wrapping the
+# blocking client in asyncio.to_thread. Same key/value encoding as the sync
+# API above — the two are interchangeable on the same keys.
+
+_ASYNC_TIMEOUT_S = 5.0
+
+def _rest_credentials():
+    url = os.getenv("UPSTASH_REDIS_REST_URL") or os.getenv("UPSTASH_REDIS_URL")
+    token = os.getenv("UPSTASH_REDIS_REST_TOKEN") or os.getenv("UPSTASH_REDIS_TOKEN")
+    if not (url and token and url.startswith("http")):
+        return None
+    return url.rstrip("/"), token
+
+def _new_async_http():
+    url, token = _rest_credentials()
+    return httpx.AsyncClient(
+        base_url=url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=_ASYNC_TIMEOUT_S,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+
+# One pooled client per running loop, closed at that loop's shutdown
+# (core/lib/loop_local.py) — concurrent asyncio.run workers each keep theirs.
+_async_http = LoopLocal(_new_async_http, aclose=lambda client: client.aclose())
+
+def _get_async_http():
+    """Pooled client for the running loop (None when Redis is unconfigured)."""
+    if _rest_credentials() is None:
+        return None
+    return _async_http.get()
+
+@traced("redis.pipeline")
+async def _apipeline(commands: list):
+    """Run commands in one Upstash /pipeline request. Returns one result per
+    command, or None on transport error / when Redis is unavailable."""
+    client = _get_async_http()
+    if client is None or not commands:
+        return None
+    resp = await client.post("/pipeline", json=commands)
+    resp.raise_for_status()
+    return [item.get("result") if isinstance(item, dict) else None for item in resp.json()]
+
+async def acache_mget_raw(keys: list) -> list:
+    """Async cache_mget_raw: one MGET over the pooled client."""
+    if not keys:
+        return []
+    try:
+        results = await _apipeline([["MGET", *keys]])
+    except Exception as e:
+        audit_log_sync("redis", "WARNING", f"acache_mget_raw failed for {len(keys)} keys: {e}")
+        results = None
+    values = results[0] if results else None
+    return list(values) if values else [None] * len(keys)
+
+async def acache_mset_raw(mapping: dict, ttl: int = 60):
+    """Async cache_mset_raw: every SET EX in one pipeline request."""
+    if not mapping:
+        return
+    try:
+        await _apipeline([["SET", k, v, "EX", str(ttl)] for k, v in mapping.items()])
+    except Exception as e:
+        audit_log_sync("redis", "WARNING", f"acache_mset_raw failed for {len(mapping)} keys: {e}")
+
+async def acache_get_many(keys: list) -> dict:
+    """Async cache_get_many: {key: value} for hits, one round trip."""
+    return _decode_hits(keys, await acache_mget_raw(keys))
+
+async def acache_set_many(mapping: dict, ttl: int = 60):
+    """Async cache_set_many: one pipeline round trip. Silently fails."""
+    await acache_mset_raw({k: json.dumps(v) for k, v in mapping.items()}, ttl)
+
+async def acache_get(key: str):
+    """Async cache_get. Returns None on miss or error."""
+    return (await acache_get_many([key])).get(key)
+
+async def acache_set(key: str, value, ttl: int = 60):
+    """Async cache_set. Silently fails."""
+    await acache_set_many({key: value}, ttl)
+
 def acquire_lock(key: str, ttl: int = 60) -> bool:
     """Try to acquire a lock via Redis. Returns True if acquired, False if locked by another process. Returns True if Redis is unavailable (fail open)."""
     client = get_redis()
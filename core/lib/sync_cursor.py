@@ -0,0 +1,72 @@
+"""Per-tenant incremental-sync cursors persisted in core_config.
+
+Mail ingest used to re-list the last 48h of every mailbox on every tick and
+lean on the message_id dedup to discard what it had already seen. Providers
+can tell us what changed instead — Gmail via users.history.list from a
+stored historyId, Microsoft Graph via a delta query's deltaLink — as long
+as the token survives between ticks. This module is that storage: one
+core_config row per (tenant, source), content is a small JSON dict whose
+shape belongs to the caller:
+
+    gmail   → {"history_id": "123456", "label": "Archive", "label_id": "Label_7"}
+    outlook → {"delta_link": "https://graph.microsoft.com/v1.0/...$deltatoken=..."}
+
+Both providers expire tokens (Gmail ~a week of history, Graph on its own
+schedule); callers treat a missing or rejected cursor the same way — a
+bounded full scan, then save a fresh cursor — so losing a row is only ever
+a slower tick, never a missed message.
+
+Callers advance the cursor only after the messages it covers have been
+handled; a tick that hit retryable errors leaves it in place so the next
+tick re-reads the same window (the message_id dedup absorbs the overlap).
+"""
+
+import json
+from datetime import datetime, timezone
+
+from core.lib.audit_logger import audit_log_sync
+from core.services.db import core_config_upsert
+
+GMAIL_HISTORY_CURSOR = "gmail_history_cursor"
+OUTLOOK_INBOX_DELTA_CURSOR = "outlook_inbox_delta_cursor"
+
+
+def load_sync_cursor(supabase, key: str) -> dict:
+    """Stored cursor state for `key`, or {} when absent or unreadable.
+
+    core_config.content is a TEXT column, so rows come back as a JSON
+    string (older writers) or a dict — both are accepted.
+    """
+    try:
+        res = (
+            supabase.table("core_config")
+            .select("content")
+            .eq("key", key)
+            .limit(1)
+            .maybe_single()
+            .execute()
+        )
+        data = getattr(res, "data", None)
+        if not data:
+            return {}
+        content = data.get("content")
+        if isinstance(content, str) and content.strip():
+            content = json.loads(content)
+        return content if isinstance(content, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_sync_cursor(supabase, key: str, state: dict) -> bool:
+    """Persist cursor state for `key`; False (and a WARNING) on failure."""
+    try:
+        # .execute() is mandatory — supabase-py builds requests lazily; a
+        # bare core_config_upsert(...) is a silent no-op.
+        core_config_upsert(supabase, {
+            "key": key,
+            "content": {**state, "updated_at": datetime.now(timezone.utc).isoformat()},
+        }).execute()
+        return True
+    except Exception as e:
+        audit_log_sync("sync_cursor", "WARNING", f"cursor save failed for {key}: {e}")
+        return False
@@ -3,18 +3,34 @@ Tier 5 Meta-Cognitive Layer — Telemetry module.
 
 Provides:
 - emit_observation() — record a structured observation from any subsystem
+  (write-behind; flush_observations() forces the pending batch out)
 - hash_features() — deterministic feature hashing for pattern grouping
 - get_pattern_summary() — fetch patterns for a subsystem
 - compute_pattern_confidence() — inference: given features, what's the predicted outcome?
 - weekly_synthesis() — cross-subsystem pattern extractor for weekend briefings
 """
 
+import asyncio
 import hashlib
 import json
+import threading
+import time
+from contextlib import nullcontext
 from typing import Any, Optional
 from datetime import datetime, timezone, timedelta
 
-from core.services.db import core_config_upsert, maybe_single_safe, tenant_aware_client
+from core.services.db import (
+    _missing_table_error,
+    amaybe_single_safe,
+    async_tenant_aware_client,
+    core_config_upsert,
+    exec_query,
+    get_tenant,
+    maybe_single_safe,
+    scan_pages,
+    tenant_aware_client,
+    tenant_scope,
+)
 from core.lib.audit_logger import audit_log_sync
 
 # Minimum observations required before a pattern is considered meaningful
@@ -185,6 +201,12 @@ async def emit_observation(
     This is the primary telemetry ingestion point. Every subsystem calls this
     when Danny provides feedback (correction, approval, rejection, engagement).
 
+    Write-behind: the observation is queued in process and this returns
+    without a database round trip. A background flush (TELEMETRY_FLUSH_DELAY_S
+    after the first queued observation, sooner past
+    TELEMETRY_FLUSH_MAX_PENDING) writes the telemetry rows and the coalesced
+    pattern increments — see flush_observations().
+
     Args:
         subsystem: 'classification', 'entity_extraction', 'context_retrieval',
                    'task_routing', 'decision_pulse', 'email_pipeline', 'practices'
@@ -202,11 +224,10 @@ async def emit_observation(
         source: 'webhook', 'pulse', 'sentinel', etc.
 
     Returns:
-        True if observation was recorded, False on failure (fail-open)
+        True if the observation was queued, False on failure (fail-open)
     """
     try:
-        supabase = tenant_aware_client()
-        supabase.table("subsystem_telemetry").insert({
+        row = {
             "subsystem": subsystem,
             "event_type": event_type,
             "features": features,
@@ -217,11 +238,9 @@ async def emit_observation(
             "latency_ms": latency_ms,
             "session_id": session_id,
             "source": source,
-        }).execute()
-
-        # Also upsert the pattern counter
-        await _update_pattern_count(subsystem, features, outcome)
-
+        }
+        pending = _buffer.add(get_tenant(), row, subsystem, features, outcome)
+        _schedule_flush(immediate=pending >= TELEMETRY_FLUSH_MAX_PENDING)
         return True
     except Exception as e:
         # Fail-open: telemetry should never crash the calling subsystem
@@ -229,58 +248,179 @@ async def emit_observation(
         return False
 
 
-async def _update_pattern_count(subsystem: str, features: dict, outcome: str) -> None:
+# ── Write-behind sink ────────────────────────────────────────────────────────
+# Observations buffer per tenant; pattern increments coalesce per feature
+# hash so a burst of N observations of one pattern is a single counter delta.
+# A flush is one subsystem_telemetry insert plus one
+# increment_subsystem_patterns call (db/107) per tenant. The flush task
+# catches the cancellation asyncio.run() sends pending tasks at shutdown and
+# flushes before exiting, so cron scripts do not drop their tail.
+
+TELEMETRY_FLUSH_DELAY_S = 1.0
+TELEMETRY_FLUSH_MAX_PENDING = 200
+
+
+class _ObservationBuffer:
+    """Pending telemetry rows and summed pattern increments, per tenant."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict[Optional[str], list[dict]] = {}
+        self._counts: dict[tuple, dict] = {}
+        self._size = 0
+
+    def add(self, owner: Optional[str], row: dict, subsystem: str,
+            features: dict, outcome: str) -> int:
+        """Queue one observation; returns the number now pending."""
+        feature_hash = hash_features(features, subsystem)
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._rows.setdefault(owner, []).append(row)
+            inc = self._counts.get((owner, subsystem, feature_hash))
+            if inc is None:
+                inc = self._counts[(owner, subsystem, feature_hash)] = {
+                    "subsystem": subsystem,
+                    "feature_hash": feature_hash,
+                    "feature_json": features,
+                    "total": 0, "correct": 0, "corrected": 0,
+                    "first_seen": now,
+                }
+            inc["total"] += 1
+            inc["correct"] += 1 if outcome in ("correct", "confirmed") else 0
+            inc["corrected"] += 1 if outcome in ("corrected", "rejected") else 0
+            inc["last_seen"] = now
+            self._size += 1
+            return self._size
+
+    def drain(self) -> dict[Optional[str], tuple[list[dict], list[dict]]]:
+        """Take everything pending: {owner: (telemetry rows, increments)}."""
+        with self._lock:
+            rows, counts = self._rows, self._counts
+            self._rows, self._counts, self._size = {}, {}, 0
+        out = {owner: (owner_rows, []) for owner, owner_rows in rows.items()}
+        for (owner, _, _), inc in counts.items():
+            out.setdefault(owner, ([], []))[1].append(inc)
+        return out
+
+
+_buffer = _ObservationBuffer()
+_flush_tasks: set = set()
+
+# None until the first flush; False once increment_subsystem_patterns (db/107)
+# is confirmed missing, so pre-migration deploys stop paying a failed RPC.
+_increment_rpc: Optional[bool] = None
+
+
+def _schedule_flush(immediate: bool = False) -> None:
+    """Ensure a flush task is pending on the running loop."""
+    loop = asyncio.get_running_loop()
+    if not immediate and any(t.get_loop() is loop for t in _flush_tasks):
+        return
+    task = loop.create_task(_flush_later(0 if immediate else TELEMETRY_FLUSH_DELAY_S))
+    _flush_tasks.add(task)
+    task.add_done_callback(_flush_tasks.discard)
+
+
+async def _flush_later(delay: float) -> None:
+    try:
+        await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        # Loop shutdown: write the tail, then honour the cancellation.
+        await flush_observations()
+        raise
+    await flush_observations()
+
+
+async def flush_observations() -> int:
+    """Write every queued observation now. Returns how many were flushed.
+
+    Per tenant: one bulk subsystem_telemetry insert and one atomic counter
+    call. Fail-open — a failed write is audited and dropped, exactly as the
+    inline writes were.
+    """
+    flushed = 0
+    for owner, (rows, increments) in _buffer.drain().items():
+        with (tenant_scope(owner) if owner else nullcontext()):
+            try:
+                supabase = async_tenant_aware_client()
+                if rows:
+                    await supabase.table("subsystem_telemetry").insert(rows).execute()
+            except Exception as e:
+                audit_log_sync("telemetry", "WARNING",
+                               f"telemetry flush failed ({len(rows)} rows): {e}")
+            if increments:
+                await _apply_pattern_increments(increments)
+                for subsystem in {inc["subsystem"] for inc in increments}:
+                    invalidate_pattern_snapshot(subsystem, owner)
+        flushed += len(rows)
+    return flushed
+
+
+async def _apply_pattern_increments(increments: list[dict]) -> None:
+    """Add coalesced deltas to subsystem_patterns in one atomic call (db/107),
+    falling back to the per-pattern path when the RPC is not deployed."""
+    global _increment_rpc
+    if _increment_rpc is not False:
+        try:
+            await async_tenant_aware_client().rpc("increment_subsystem_patterns", {"p_rows": increments}).execute()
+            _increment_rpc = True
+            return
+        except Exception as e:
+            if _missing_table_error(str(e), "increment_subsystem_patterns"):
+                _increment_rpc = False
+            else:
+                audit_log_sync("telemetry", "WARNING",
+                               f"increment_subsystem_patterns failed, updating per pattern: {e}")
+    for inc in increments:
+        await _update_pattern_count(inc)
+
+
+async def _update_pattern_count(inc: dict) -> None:
     """
-    Upsert the rolling pattern counter for this feature combination.
+    Upsert the rolling pattern counter for one coalesced increment.
 
     This is the "local pattern learner" — it simply counts observations
-    per feature hash. No ML, no model — just counting.
+    per feature hash. No ML, no model — just counting. Read-modify-write,
+    so only the pre-db/107 fallback: concurrent writers can lose increments.
     """
     try:
-        supabase = tenant_aware_client()
-        feature_hash = hash_features(features, subsystem)
+        supabase = async_tenant_aware_client()
 
         # Try to find existing pattern row
-        existing = maybe_single_safe(
+        existing = await amaybe_single_safe(
             supabase.table("subsystem_patterns")
             .select("id, total_count, correct_count, corrected_count")
-            .eq("subsystem", subsystem)
-            .eq("feature_hash", feature_hash)
+            .eq("subsystem", inc["subsystem"])
+            .eq("feature_hash", inc["feature_hash"])
         )
 
-        now = datetime.now(timezone.utc).isoformat()
-        is_correct = outcome in ("correct", "confirmed")
-        is_corrected = outcome in ("corrected", "rejected")
-
         if existing and existing.data:
             row = existing.data
-            new_total = row["total_count"] + 1
-            new_correct = row["correct_count"] + (1 if is_correct else 0)
-            new_corrected = row["corrected_count"] + (1 if is_corrected else 0)
+            new_total = row["total_count"] + inc["total"]
+            new_correct = row["correct_count"] + inc["correct"]
+            new_corrected = row["corrected_count"] + inc["corrected"]
             new_confidence = new_correct / new_total if new_total > 0 else 0.0
 
-            supabase.table("subsystem_patterns").update({
+            await supabase.table("subsystem_patterns").update({
                 "total_count": new_total,
                 "correct_count": new_correct,
                 "corrected_count": new_corrected,
                 "confidence": new_confidence,
-                "last_seen": now,
+                "last_seen": inc["last_seen"],
             }).eq("id", row["id"]).execute()
         else:
-            # First observation: set confidence based on actual outcome
-            # For rejections/errors (is_corrected=True, is_correct=False),
-            # confidence starts at 0.0 since it represents 0% approval rate.
-            initial_confidence = 1.0 if is_correct else 0.0
-            supabase.table("subsystem_patterns").insert({
-                "subsystem": subsystem,
-                "feature_hash": feature_hash,
-                "feature_json": features,
-                "total_count": 1,
-                "correct_count": 1 if is_correct else 0,
-                "corrected_count": 1 if is_corrected else 0,
-                "confidence": initial_confidence,
-                "first_seen": now,
-                "last_seen": now,
+            # First observation(s): confidence is the observed approval rate,
+            # so a first rejection/error starts at 0.0.
+            await supabase.table("subsystem_patterns").insert({
+                "subsystem": inc["subsystem"],
+                "feature_hash": inc["feature_hash"],
+                "feature_json": inc["feature_json"],
+                "total_count": inc["total"],
+                "correct_count": inc["correct"],
+                "corrected_count": inc["corrected"],
+                "confidence": inc["correct"] / inc["total"] if inc["total"] else 0.0,
+                "first_seen": inc["first_seen"],
+                "last_seen": inc["last_seen"],
             }).execute()
     except Exception as e:
         # Fail-open
@@ -393,6 +533,87 @@ async def get_pattern_summary(
         return []
 
 
+# ── Pattern snapshot index ───────────────────────────────────────────────────
+# compute_pattern_confidence walks a fallback chain of up to six feature
+# hashes, and composite/cross-subsystem scoring repeats that per related
+# subsystem — one query per hash per item. The snapshot holds one tenant's
+# subsystem_patterns rows for one subsystem, keyed by feature_hash, plus its
+# suggest_approved overrides, so every lookup in a scoring run resolves from
+# memory. In-process writers (flush_observations, the suggest-mode approve
+# handler, prune_orphaned_patterns) invalidate it; the TTL bounds staleness
+# from writes made by other workers.
+
+PATTERN_SNAPSHOT_TTL_S = 60.0
+_SNAPSHOT_PAGE = 1000  # PostgREST's default max-rows per response
+_SNAPSHOT_COLUMNS = (
+    "feature_hash, total_count, correct_count, corrected_count, "
+    "soft_accepted_count, feature_json, first_seen, last_seen"
+)
+
+
+class _PatternSnapshot:
+    __slots__ = ("rows", "approved", "loaded_at")
+
+    def __init__(self, rows: dict, approved: set, loaded_at: float):
+        self.rows = rows          # {feature_hash: pattern row}
+        self.approved = approved  # feature hashes with a suggest_approved override
+        self.loaded_at = loaded_at
+
+
+_snapshots: dict[tuple[Optional[str], str], _PatternSnapshot] = {}
+
+
+async def get_pattern_snapshot(subsystem: str) -> Optional[_PatternSnapshot]:
+    """The current tenant's snapshot for `subsystem` (loaded on first use or
+    after TTL/invalidation). None when it cannot be loaded — callers fall
+    back to per-hash queries."""
+    key = (get_tenant(), subsystem)
+    snap = _snapshots.get(key)
+    if snap is not None and time.monotonic() - snap.loaded_at < PATTERN_SNAPSHOT_TTL_S:
+        return snap
+    try:
+        snap = await _load_pattern_snapshot(subsystem)
+    except Exception as e:
+        audit_log_sync("telemetry", "WARNING", f"pattern snapshot load failed for {subsystem}: {e}")
+        return None
+    _snapshots[key] = snap
+    return snap
+
+
+async def _load_pattern_snapshot(subsystem: str) -> _PatternSnapshot:
+    supabase = tenant_aware_client()
+
+    def _scan() -> dict:
+        rows: dict = {}
+        for page in scan_pages(supabase, "subsystem_patterns", _SNAPSHOT_COLUMNS,
+                               filters=lambda q: q.eq("subsystem", subsystem),
+                               page_size=_SNAPSHOT_PAGE):
+            for row in page:
+                if row.get("feature_hash"):
+                    rows[row["feature_hash"]] = row
+        return rows
+
+    # Keyset scan (one index range scan per page, however deep) run off the
+    # event loop like exec_query — the sync client blocks while it pages.
+    rows = await asyncio.to_thread(_scan)
+
+    prefix = f"suggest_approved:{subsystem}:"
+    overrides = await exec_query(
+        supabase.table("core_config").select("key").like("key", f"{prefix}%")
+    )
+    approved = {r["key"][len(prefix):] for r in (overrides.data or []) if r.get("key")}
+    return _PatternSnapshot(rows, approved, time.monotonic())
+
+
+def invalidate_pattern_snapshot(subsystem: Optional[str] = None, owner: Optional[str] = None) -> None:
+    """Drop cached snapshots for a tenant (default: the current one) — one
+    subsystem, or all of them when `subsystem` is None."""
+    owner = owner if owner is not None else get_tenant()
+    for key in list(_snapshots):
+        if key[0] == owner and (subsystem is None or key[1] == subsystem):
+            _snapshots.pop(key, None)
+
+
 async def compute_pattern_confidence(
     features: dict,
     subsystem: str,
@@ -409,9 +630,15 @@ async def compute_pattern_confidence(
 
     This prevents the "14 dimensions → zero matches → always review" problem.
 
+    Lookups resolve from the tenant's pattern snapshot (one load per
+    subsystem per PATTERN_SNAPSHOT_TTL_S); `patterns_map` ({feature_hash:
+    row}) overrides it. Per-hash queries are only the fallback when the
+    snapshot cannot be loaded.
+
     Args:
         features: Current item's features
         subsystem: Subsystem name
+        patterns_map: Optional pre-fetched {feature_hash: row} map
 
     Returns:
         {
@@ -423,6 +650,11 @@ async def compute_pattern_confidence(
     """
     try:
         supabase = tenant_aware_client()
+        approved_hashes = None
+        if patterns_map is None:
+            snapshot = await get_pattern_snapshot(subsystem)
+            if snapshot is not None:
+                patterns_map, approved_hashes = snapshot.rows, snapshot.approved
 
         # Build fallback feature sets by progressively stripping dimensions
         # Each iteration strips one more dimension from the previous set.
@@ -440,10 +672,8 @@ async def compute_pattern_confidence(
         for i, fb_features in enumerate(fallback_sets):
             feature_hash = hash_features(fb_features, subsystem)
             if patterns_map is not None:
-                # Batch path: the caller pre-fetched all patterns for this
-                # subsystem in ONE query and passes the {feature_hash: row}
-                # map in — turns the per-item fallback chain (up to 6
-                # sequential DB queries) into a single in-memory lookup.
+                # Snapshot (or caller-supplied map): the whole fallback chain
+                # is in-memory lookups instead of up to 6 sequential queries.
                 row_data = patterns_map.get(feature_hash)
             else:
                 row = maybe_single_safe(
@@ -531,7 +761,11 @@ async def compute_pattern_confidence(
         # This makes the handler's "will auto-approve from now on"
         # acknowledgement true instead of an overclaim (the key was written
         # but never read).
-        if matched_hash and recommendation not in ("approve",):
+        if matched_hash and recommendation not in ("approve",) and approved_hashes is not None:
+            if matched_hash in approved_hashes:
+                recommendation = "approve"
+                rule += " (user-approved)"
+        elif matched_hash and recommendation not in ("approve",):
             try:
                 override = maybe_single_safe(
                     supabase.table("core_config")
@@ -627,6 +861,8 @@ async def prune_orphaned_patterns(dry_run: bool = False) -> dict:
         if orphans and not dry_run:
             supabase.table("subsystem_patterns").delete().in_("id", orphans).execute()
             deleted = len(orphans)
+            for subsystem in subsystems_affected:
+                invalidate_pattern_snapshot(subsystem)
             audit_log_sync(
                 "telemetry", "INFO",
                 f"Pruned {deleted} orphaned call_pipeline patterns (stale feature hash). "
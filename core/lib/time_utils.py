@@ -47,6 +47,11 @@ def get_user_timezone(user_id: str | None = None) -> tzinfo:
         name = resolve_timezone(user_id)
     except Exception:
         name = None
+    return timezone_from_name(name)
+
+
+def timezone_from_name(name: str | None) -> tzinfo:
+    """IANA name → tzinfo (cached); missing/invalid names fall back to IST."""
     if not name:
         name = "Asia/Kolkata"
     if name in _tz_cache:
@@ -0,0 +1,385 @@
+"""
+Span tracing and in-process latency histograms.
+
+Replaces core/lib/query_timer: instead of ad-hoc mark() timestamps in a
+global dict, work is timed with nested spans held in a contextvar, so a
+span opened inside an asyncio task or an asyncio.to_thread worker nests
+under whatever span was current when that task/thread was started.
+
+    with trace_request("webhook"):          # root, keyed on the trace id
+        checkpoint("core_config")           # phase boundary (old mark())
+        async with span("webhook.synthesis"):
+            ...
+
+    @traced("llm.generate")
+    async def generate(...): ...
+
+Every finished span is recorded in a per-name latency histogram
+(LatencyHistogram — log-linear buckets, HDR-style: ~3% relative error at
+any magnitude, fixed memory). When the root finishes it prints one summary
+line to stdout (Modal logs, zero HTTP calls — same as query_timer did):
+
+    [PERF:3f2a9c1d04e2] TOTAL=4.8s | core_config=0.1s | classify=1.2s | ...
+        || llm.generate=2x3.1s | db.exec_query=14x0.9s
+
+render_prometheus() exposes the histograms (served by /api/metrics).
+
+Automatic instrumentation: exec_query, generate_content_with_fallback,
+get_embedding and redis_cache._apipeline carry @traced; PostgREST
+builder .execute() (sync and async) and upstash-redis commands are patched
+once by instrument_postgrest()/instrument_redis(), called from
+core/services/db.py at import.
+
+The trace id is audit_logger's trace_id_var (D3), read lazily —
+audit_logger imports core.services.db, which imports this module.
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Histograms are process-lifetime; span names are code-defined (plus table,
+# RPC and Redis command names), this only guards against a runaway caller.
+MAX_SPAN_NAMES = 512
+OVERFLOW_SPAN_NAME = "other"
+
+# Quantiles exported per span name.
+EXPORT_QUANTILES = (0.5, 0.9, 0.99)
+
+# 2**SUB_BUCKET_BITS linear sub-buckets per power of two.
+SUB_BUCKET_BITS = 5
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+class LatencyHistogram:
+    """Fixed-precision latency histogram (microsecond resolution).
+
+    Values below 2**SUB_BUCKET_BITS us are counted exactly; above that each
+    power of two is split into 2**SUB_BUCKET_BITS equal buckets, so a
+    bucket is never wider than ~3% of its value. Memory is bounded by the
+    number of distinct buckets hit (a few hundred at most).
+    """
+
+    __slots__ = ("_lock", "_buckets", "count", "total_s", "max_s")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    @staticmethod
+    def _bucket(us: int) -> int:
+        shift = us.bit_length() - SUB_BUCKET_BITS
+        if shift <= 0:
+            return us
+        return (us >> shift) << shift
+
+    @staticmethod
+    def _bucket_top(lower: int) -> int:
+        shift = lower.bit_length() - SUB_BUCKET_BITS
+        return lower if shift <= 0 else lower + (1 << shift) - 1
+
+    def record(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        key = self._bucket(int(seconds * 1_000_000))
+        with self._lock:
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+            self.count += 1
+            self.total_s += seconds
+            if seconds > self.max_s:
+                self.max_s = seconds
+
+    def quantile(self, q: float) -> float:
+        """Value (seconds) at quantile q — the top of the bucket holding it,
+        capped at the recorded max."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, int(q * self.count + 0.999999))
+            seen = 0
+            for lower in sorted(self._buckets):
+                seen += self._buckets[lower]
+                if seen >= rank:
+                    return min(self._bucket_top(lower) / 1_000_000, self.max_s)
+            return self.max_s
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one latency sample for a span name."""
+    hist = _histograms.get(name)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.get(name)
+            if hist is None:
+                if len(_histograms) >= MAX_SPAN_NAMES:
+                    name = OVERFLOW_SPAN_NAME
+                hist = _histograms.setdefault(name, LatencyHistogram())
+    hist.record(seconds)
+
+
+def get_histogram(name: str) -> Optional[LatencyHistogram]:
+    return _histograms.get(name)
+
+
+def reset_histograms() -> None:
+    """Drop all recorded samples (tests)."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class Span:
+    """One timed unit of work. Usable as a sync or async context manager.
+
+    A request root (trace_request) owns the per-request aggregates —
+    checkpoints and per-name totals of every span nested under it — and
+    prints the summary line when it closes. A span opened outside any
+    request (cron, workers) only feeds the histograms.
+    """
+
+    __slots__ = ("name", "parent", "root", "start", "duration_s", "is_request",
+                 "_token", "_checkpoints", "_last_checkpoint", "_totals", "_lock")
+
+    def __init__(self, name: str, is_request: bool = False):
+        self.name = name
+        self.is_request = is_request
+        self.parent: Optional["Span"] = None
+        self.root: "Span" = self
+        self.start = 0.0
+        self.duration_s: Optional[float] = None
+        self._token = None
+        self._checkpoints: List[tuple] = []
+        self._last_checkpoint = 0.0
+        self._totals: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "Span":
+        self.parent = None if self.is_request else _current_span.get()
+        self.root = self.parent.root if self.parent is not None else self
+        self.start = self._last_checkpoint = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_s = time.perf_counter() - self.start
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in a different context than it was entered (a span
+            # handed across tasks) — restore the parent explicitly.
+            _current_span.set(self.parent)
+        observe(self.name, self.duration_s)
+        if self.root is not self:
+            self.root._add_total(self.name, self.duration_s)
+        elif self.is_request:
+            print(self.summary())
+        return False
+
+    async def __aenter__(self) -> "Span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+    def _add_total(self, name: str, seconds: float) -> None:
+        with self._lock:
+            agg = self._totals.setdefault(name, [0, 0.0])
+            agg[0] += 1
+            agg[1] += seconds
+
+    def checkpoint(self, name: str) -> float:
+        now = time.perf_counter()
+        with self._lock:
+            elapsed = now - self._last_checkpoint
+            self._last_checkpoint = now
+            self._checkpoints.append((name, elapsed))
+        observe(f"{self.name}.{name}", elapsed)
+        return elapsed
+
+    def summary(self) -> str:
+        from core.lib.audit_logger import get_trace_id
+        total = self.duration_s if self.duration_s is not None else time.perf_counter() - self.start
+        line = f"[PERF:{get_trace_id() or self.name}] TOTAL={total:.1f}s"
+        if self._checkpoints:
+            line += " | " + " | ".join(f"{n}={s:.1f}s" for n, s in self._checkpoints)
+        if self._totals:
+            ranked = sorted(self._totals.items(), key=lambda kv: kv[1][1], reverse=True)
+            line += " || " + " | ".join(f"{n}={c}x{s:.1f}s" for n, (c, s) in ranked)
+        return line
+
+
+def span(name: str) -> Span:
+    """Open a span nested under the current one (a root if there is none)."""
+    return Span(name)
+
+
+def trace_request(name: str) -> Span:
+    """Open a request root, detached from any span the caller is inside.
+
+    The summary line is keyed on the audit_logger trace id current when the
+    root closes, so the id may be assigned after the root is opened.
+    """
+    return Span(name, is_request=True)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def checkpoint(name: str) -> None:
+    """Close the current phase of the request root (old query_timer.mark).
+
+    Records the time since the previous checkpoint (or the root's start)
+    on the summary line and in the '<root>.<name>' histogram. No-op
+    outside a request root.
+    """
+    current = _current_span.get()
+    if current is not None and current.root.is_request:
+        current.root.checkpoint(name)
+
+
+def traced(name: str):
+    """Decorator: run each call of a sync or async function in a span."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with Span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ── Prometheus exposition ────────────────────────────────────────────────
+
+METRIC_NAME = "rhodey_span_duration_seconds"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """All span histograms as one Prometheus summary (text format 0.0.4)."""
+    lines = [
+        f"# HELP {METRIC_NAME} In-process span latency by span name.",
+        f"# TYPE {METRIC_NAME} summary",
+    ]
+    max_lines = [
+        f"# HELP {METRIC_NAME}_max Slowest span observed by span name.",
+        f"# TYPE {METRIC_NAME}_max gauge",
+    ]
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    for name, hist in items:
+        label = _label(name)
+        for q in EXPORT_QUANTILES:
+            lines.append(f'{METRIC_NAME}{{span="{label}",quantile="{q}"}} {hist.quantile(q):.6f}')
+        lines.append(f'{METRIC_NAME}_sum{{span="{label}"}} {hist.total_s:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{span="{label}"}} {hist.count}')
+        max_lines.append(f'{METRIC_NAME}_max{{span="{label}"}} {hist.max_s:.6f}')
+    return "\n".join(lines + max_lines) + "\n"
+
+
+# ── Library instrumentation ──────────────────────────────────────────────
+
+_instrumented: set = set()
+
+
+def _postgrest_span_name(builder) -> str:
+    try:
+        req = builder.request
+        parts = str(req.path).rstrip("/").rsplit("/", 2)
+        if len(parts) == 3 and parts[1] == "rpc":
+            return f"postgrest.rpc.{parts[2]}"
+        return f"postgrest.{req.http_method.lower()}.{parts[-1]}"
+    except Exception:
+        return "postgrest.execute"
+
+
+def _in_postgrest_span() -> bool:
+    # MaybeSingle/Explain builders call the base execute(); time it once.
+    current = _current_span.get()
+    return current is not None and current.name.startswith("postgrest.")
+
+
+def instrument_postgrest() -> None:
+    """Wrap every PostgREST request builder's execute() in a span
+    ('postgrest.<method>.<table>' / 'postgrest.rpc.<fn>'). Idempotent."""
+    if "postgrest" in _instrumented:
+        return
+    _instrumented.add("postgrest")
+    try:
+        from postgrest._sync import request_builder as sync_rb
+        from postgrest._async import request_builder as async_rb
+    except Exception:
+        return
+
+    def _wrap_sync(execute):
+        @functools.wraps(execute)
+        def traced_execute(self, *args, **kwargs):
+            if _in_postgrest_span():
+                return execute(self, *args, **kwargs)
+            with Span(_postgrest_span_name(self)):
+                return execute(self, *args, **kwargs)
+        return traced_execute
+
+    def _wrap_async(execute):
+        @functools.wraps(execute)
+        async def traced_execute(self, *args, **kwargs):
+            if _in_postgrest_span():
+                return await execute(self, *args, **kwargs)
+            with Span(_postgrest_span_name(self)):
+                return await execute(self, *args, **kwargs)
+        return traced_execute
+
+    for module, wrap in ((sync_rb, _wrap_sync), (async_rb, _wrap_async)):
+        for obj in list(vars(module).values()):
+            if (isinstance(obj, type) and obj.__module__ == module.__name__
+                    and "execute" in obj.__dict__):
+                obj.execute = wrap(obj.__dict__["execute"])
+
+
+def instrument_redis() -> None:
+    """Wrap upstash-redis commands ('redis.<COMMAND>') and pipeline flushes
+    ('redis.pipeline') in spans. Idempotent."""
+    if "redis" in _instrumented:
+        return
+    _instrumented.add("redis")
+    try:
+        from upstash_redis.client import Redis, Pipeline
+    except Exception:
+        return
+
+    execute = Redis.execute
+
+    @functools.wraps(execute)
+    def traced_execute(self, command, *args, **kwargs):
+        name = str(command[0]).upper() if command else "command"
+        with Span(f"redis.{name}"):
+            return execute(self, command, *args, **kwargs)
+
+    pipeline_exec = Pipeline.exec
+
+    @functools.wraps(pipeline_exec)
+    def traced_exec(self, *args, **kwargs):
+        with Span("redis.pipeline"):
+            return pipeline_exec(self, *args, **kwargs)
+
+    Redis.execute = traced_execute
+    Pipeline.exec = traced_exec
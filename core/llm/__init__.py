@@ -3,7 +3,7 @@ from .errors import LLMError, ProviderTimeout, DeadlineExceeded, BreakerOpenErro
 from .constants import Outcome, SAFE_HOLD_CLASSIFICATION, CLASSIFICATION_MODEL, SYNTHESIS_MODEL, EMBEDDING_MODEL
 from .config import LLMConfig, WorkloadProfile
 from .fallback import generate_content_with_fallback
-from .embedding import get_embedding
+from .embedding import get_embedding, get_embeddings
 
 __all__ = [
     "LLMResponse",
@@ -23,4 +23,5 @@ __all__ = [
     "WorkloadProfile",
     "generate_content_with_fallback",
     "get_embedding",
+    "get_embeddings",
 ]
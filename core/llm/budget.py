@@ -5,11 +5,15 @@ MONTHLY credit (USD) that the OPERATOR owns — it lives on `users` as an
 editable column (`users.monthly_credit_usd`), not in code. The cycle resets
 on the user's signup day-of-month (anniversary billing: joined the 14th →
 credit refreshes every 14th). Spend is read from the `llm_spend` ledger
-(db/85) — one row per LLM outcome, written by instrument.py.
+(db/85) — one row per LLM outcome, written by instrument.py — and kept as a
+running per-cycle total in llm_credit_balance (db/110), so the per-call
+credit check reads one row instead of summing the cycle's ledger.
 
     - resolve_monthly_credit(uid)   users.monthly_credit_usd → env → default
     - cycle_start_utc(uid)          most recent signup-day boundary ≤ now
-    - cycle_spend_usd(uid)          SUM(llm_spend) since cycle start
+    - cycle_spend_usd(uid)          running balance for the cycle (db/110)
+    - ledger_cycle_spend_usd(uid)   SUM(llm_spend) since cycle start
+    - reconcile_credit_balance(uid) re-derive the balance from the ledger
     - credit_remaining(uid)         max(0, credit − spent)
     - credit_warning(uid)           True when ≤ WARN_THRESHOLD of credit left
     - credit_exhausted(uid)         True when remaining ≤ 0 → hard block
@@ -21,6 +25,11 @@ Semantics:
     the warning zone (≤20% of credit left) but keeps serving. At exactly 0
     it degrades to safe-hold until the next cycle — you can never spend
     past the credit you set.
+  - Spend rows are write-behind (record_llm_spend queues, the audit
+    writer flushes in bulk). The running balance is cached per worker for
+    _BALANCE_TTL_S and bumped by every spend this worker queues, so spend
+    made on OTHER workers can overshoot the credit by at most one TTL plus
+    one flush interval of calls.
   - Fail-open on ledger errors (documented): a dead ledger must not brick
     the product; the rate limiter still protects bursts. This is "heavily
     reduced risk", not absolute immunity (AGENTS.md standard).
@@ -32,8 +41,8 @@ import os
 from datetime import datetime, timedelta, timezone
 from calendar import monthrange
 
-from core.services.db import get_tenant, get_supabase
-from core.lib.audit_logger import audit_log_sync
+from core.services.db import _missing_table_error, get_tenant, get_supabase
+from core.lib.audit_logger import audit_log_sync, enqueue_row, register_bulk_writer
 from core.lib.rate_limiter import SlidingWindowLimiter
 from core.llm.cost import estimate_cost_usd
 
@@ -63,6 +72,15 @@ _LEGACY_LIMITER_KEY = "rhodey:rate_limit:llm:legacy"
 _user_row_cache: dict[str, tuple[float, dict | None]] = {}
 _USER_ROW_TTL_S = 60.0
 
+# ── Running balance (db/110): uid → (expires_at, cycle_start iso, spent).
+#    Short TTL — other workers' spend lands in the table, not here — and
+#    overwritten with the post-increment total by every local spend.
+_balance_cache: dict[str, tuple[float, str, float]] = {}
+_BALANCE_TTL_S = 10.0
+
+# None = untried, False = db/110 not deployed (sum the ledger), True = in use.
+_balance_enabled: bool | None = None
+
 
 def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
@@ -171,11 +189,12 @@ def resolve_monthly_credit(uid: str | None = None) -> float:
 
 # ── Ledger reads / writes ───────────────────────────────────────────────
 
-def cycle_spend_usd(uid: str) -> float:
+def ledger_cycle_spend_usd(uid: str) -> float:
     """Sum est_cost_usd of this user's llm_spend rows since cycle start.
 
     Raw client with an explicit owner filter — same reasoning as _user_row:
-    the uid IS the scope, safe with or without a tenant context.
+    the uid IS the scope, safe with or without a tenant context. Pre-db/110
+    fallback for cycle_spend_usd; the ledger stays the source of truth.
     """
     start = cycle_start_utc(uid)
     res = (
@@ -195,6 +214,105 @@ def cycle_spend_usd(uid: str) -> float:
     return total
 
 
+def _note_balance_error(e: Exception, what: str) -> None:
+    """Disable the running balance when db/110 is provably missing."""
+    global _balance_enabled
+    msg = str(e)
+    if any(_missing_table_error(msg, name) for name in
+           ("llm_credit_balance", "log_llm_spend_batch", "reconcile_llm_credit_balance")):
+        _balance_enabled = False
+    else:
+        audit_log_sync("llm_budget", "WARNING", f"credit balance {what} failed: {e}")
+
+
+def _cache_balance(uid: str, cycle_start: str, spent: float) -> float:
+    _balance_cache[uid] = (_now_utc().timestamp() + _BALANCE_TTL_S, cycle_start, spent)
+    return spent
+
+
+def _reconcile_balance(uid: str, cycle_start: str) -> float:
+    """Overwrite the cycle's balance with SUM(llm_spend); returns it."""
+    res = get_supabase().rpc("reconcile_llm_credit_balance", {
+        "p_cycle_start": cycle_start,
+        "p_owner": uid,
+    }).execute()
+    return float(res.data or 0.0)
+
+
+def _read_balance(uid: str, cycle_start: str) -> float | None:
+    """The cycle's running balance, seeding it on first read of the cycle.
+    None when db/110 is unavailable (caller sums the ledger)."""
+    global _balance_enabled
+    if _balance_enabled is False:
+        return None
+    try:
+        res = (
+            get_supabase()
+            .table("llm_credit_balance")
+            .select("spent_usd")
+            .eq("owner_id", uid)
+            .eq("cycle_start", cycle_start)
+            .limit(1)
+            .execute()
+        )
+        if res.data:
+            spent = float(res.data[0].get("spent_usd") or 0.0)
+        else:
+            # No row for this cycle yet — one ledger SUM per tenant per cycle.
+            spent = _reconcile_balance(uid, cycle_start)
+    except Exception as e:
+        _note_balance_error(e, "read")
+        return None
+    _balance_enabled = True
+    return spent
+
+
+def cycle_spend_usd(uid: str) -> float:
+    """This user's spend since cycle start.
+
+    Read from the db/110 running balance (one keyed row, cached
+    _BALANCE_TTL_S); sums the ledger only when the balance is unavailable.
+    """
+    start = cycle_start_utc(uid).isoformat()
+    cached = _balance_cache.get(uid)
+    if cached and cached[0] > _now_utc().timestamp() and cached[1] == start:
+        return cached[2]
+    spent = _read_balance(uid, start)
+    if spent is None:
+        spent = ledger_cycle_spend_usd(uid)
+    return _cache_balance(uid, start, spent)
+
+
+def reconcile_credit_balance(uid: str) -> float | None:
+    """Re-derive this cycle's balance from the llm_spend ledger.
+
+    Returns the drift corrected (ledger − stored balance, USD), or None when
+    db/110 is not deployed or the reconcile failed.
+    """
+    global _balance_enabled
+    if not uid or _balance_enabled is False:
+        return None
+    start = cycle_start_utc(uid).isoformat()
+    try:
+        res = (
+            get_supabase()
+            .table("llm_credit_balance")
+            .select("spent_usd")
+            .eq("owner_id", uid)
+            .eq("cycle_start", start)
+            .limit(1)
+            .execute()
+        )
+        stored = float(res.data[0].get("spent_usd") or 0.0) if res.data else 0.0
+        spent = _reconcile_balance(uid, start)
+    except Exception as e:
+        _note_balance_error(e, "reconcile")
+        return None
+    _balance_enabled = True
+    _cache_balance(uid, start, spent)
+    return spent - stored
+
+
 def credit_remaining(uid: str | None) -> float:
     """max(0, credit − spent this cycle). Legacy (no uid): unlimited."""
     if not uid:
@@ -238,13 +356,21 @@ def record_llm_spend(
     output_tokens: int,
     outcome: str,
 ) -> None:
-    """Append one row to the llm_spend ledger (owner-scoped insert)."""
+    """Queue one llm_spend ledger row (write-behind; never blocks the caller).
+
+    The row rides the buffered audit writer and is flushed in bulk by
+    _write_spend_rows. This worker's cached balance moves immediately, so
+    its own credit gate does not wait for the flush.
+    """
     if not uid:
         return  # legacy mode: no tenant, no per-user ledger
     try:
         cost = estimate_cost_usd(model, input_tokens, output_tokens)
-        get_supabase().table("llm_spend").insert({
+        start = cycle_start_utc(uid).isoformat()
+        enqueue_row("llm_spend", {
             "owner_id": uid,  # raw client: stamp explicitly (uid IS the scope)
+            "ts": _now_utc().isoformat(),
+            "cycle_start": start,
             "model": model,
             "provider": provider,
             "workload": workload,
@@ -252,11 +378,36 @@ def record_llm_spend(
             "output_tokens": output_tokens,
             "est_cost_usd": cost,
             "outcome": outcome,
-        }).execute()
+        })
+        cached = _balance_cache.get(uid)
+        if cached and cached[1] == start:
+            _balance_cache[uid] = (cached[0], start, cached[2] + cost)
     except Exception as e:
         audit_log_sync("llm_budget", "WARNING", f"llm_spend record failed: {e}")
 
 
+def _write_spend_rows(rows: list) -> None:
+    """Bulk writer for queued llm_spend rows (runs on the writer thread).
+
+    db/111 log_llm_spend_batch inserts the rows and moves each tenant's
+    running balance in one transaction. Without it (or if it fails) the rows
+    are plain-inserted so the ledger stays complete; the daily reconcile
+    folds them into the balance.
+    """
+    if _balance_enabled is not False:
+        try:
+            get_supabase().rpc("log_llm_spend_batch", {"p_rows": rows}).execute()
+            return
+        except Exception as e:
+            _note_balance_error(e, "spend flush")
+    get_supabase().table("llm_spend").insert(
+        [{k: v for k, v in row.items() if k != "cycle_start"} for row in rows]
+    ).execute()
+
+
+register_bulk_writer("llm_spend", _write_spend_rows)
+
+
 # ── Per-tenant rate limiter ─────────────────────────────────────────────
 
 _tenant_limiters: dict[str, SlidingWindowLimiter] = {}
@@ -275,9 +426,10 @@ def tenant_llm_limiter(uid: str | None = None, max_calls: int = DEFAULT_LLM_RPM)
 
 
 def clear_cache() -> None:
-    """Drop cached limiters + user rows (tests / config changes)."""
+    """Drop cached limiters, user rows and balances (tests / config changes)."""
     _tenant_limiters.clear()
     _user_row_cache.clear()
+    _balance_cache.clear()
 
 
 def current_tenant() -> str | None:
@@ -1,31 +1,78 @@
 import time
 import asyncio
-import hashlib
-from collections import OrderedDict
+from typing import Dict, List, Optional
 from .response import EmbeddingResult
+from .embedding_cache import embedding_cache
 from .constants import Outcome, EMBEDDING_MODEL
 from .instrument import log_embedding_outcome
 from .config import WorkloadProfile
 from .retry import get_jittered_backoff
 from core.lib.audit_logger import audit_log_sync
+from core.lib.loop_local import LoopLocal
+from core.lib.tracing import traced
 
 EMBEDDING_DIMENSION = 768
 
-# LRU Cache for embeddings (process lifetime)
-_EMBEDDING_CACHE = OrderedDict()
-_MAX_CACHE_SIZE = 500
+# Gemini embed_content takes a list of contents; 100 is its per-request cap.
+EMBED_BATCH_MAX = 100
+# Concurrent get_embedding() callers arriving within this window share one
+# batched request (see _EmbeddingCoalescer).
+EMBED_COALESCE_WINDOW_S = 0.01
 
+
+def _empty_text_result() -> EmbeddingResult:
+    return EmbeddingResult(vector=[0.0] * EMBEDDING_DIMENSION, success=False, degraded=True, degraded_reason="empty_text", provider="none", model="none", latency_ms=0)
+
+
+@traced("llm.embedding")
 async def get_embedding(text: str) -> EmbeddingResult:
     if not text or not text.strip():
-        return EmbeddingResult(vector=[0.0] * EMBEDDING_DIMENSION, success=False, degraded=True, degraded_reason="empty_text", provider="none", model="none", latency_ms=0)
-        
-    text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-    if text_hash in _EMBEDDING_CACHE:
-        # Move to end to maintain LRU order
-        cached_resp = _EMBEDDING_CACHE.pop(text_hash)
-        _EMBEDDING_CACHE[text_hash] = cached_resp
+        return _empty_text_result()
+
+    # Local tier only here — the shared tier is checked once per coalesced
+    # batch inside get_embeddings (one MGET instead of one GET per caller).
+    cached_resp = embedding_cache.get_local(text, EMBEDDING_MODEL, EMBEDDING_DIMENSION)
+    if cached_resp is not None:
         return cached_resp
 
+    return await _coalescer.submit(text)
+
+
+async def get_embeddings(texts: List[str]) -> List[EmbeddingResult]:
+    """Embed many texts, one Gemini request per EMBED_BATCH_MAX distinct misses.
+
+    Returns one EmbeddingResult per input, in input order. Empty texts and
+    hits in either cache tier (embedding_cache) never reach the API;
+    duplicate texts are embedded once.
+    A failed batch degrades each of its texts to a zero vector, exactly as
+    get_embedding does for a single text.
+    """
+    results: List[Optional[EmbeddingResult]] = [None] * len(texts)
+    wanted = [t for t in texts if t and t.strip()]
+    cached = await embedding_cache.lookup(wanted, EMBEDDING_MODEL, EMBEDDING_DIMENSION) if wanted else {}
+    misses: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            results[i] = _empty_text_result()
+        elif text in cached:
+            results[i] = cached[text]
+        else:
+            misses.setdefault(text, []).append(i)
+
+    unique = list(misses)
+    chunks = [unique[s:s + EMBED_BATCH_MAX] for s in range(0, len(unique), EMBED_BATCH_MAX)]
+    for chunk, chunk_results in zip(chunks, await asyncio.gather(*[_embed_batch(c) for c in chunks])):
+        for text, resp in zip(chunk, chunk_results):
+            for i in misses[text]:
+                results[i] = resp
+    return results
+
+
+async def _embed_batch(texts: List[str]) -> List[EmbeddingResult]:
+    """One embed_content request for `texts` (retried as a unit).
+
+    The limiter is acquired once per request, not per text.
+    """
     start_time = time.time()
     workload = WorkloadProfile.EMBEDDING
     max_retries = 3
@@ -43,7 +90,7 @@ async def get_embedding(text: str) -> EmbeddingResult:
             try:
                 return client.models.embed_content(
                     model=EMBEDDING_MODEL,
-                    contents=text,
+                    contents=texts,
                     config={
                         'output_dimensionality': EMBEDDING_DIMENSION
                     }
@@ -67,30 +114,34 @@ async def get_embedding(text: str) -> EmbeddingResult:
                 timeout=workload.timeout_s
             )
             
-            vector = result.embeddings[0].values
-            
-            resp = EmbeddingResult(
-                vector=vector,
-                success=True,
-                degraded=False,
-                degraded_reason=None,
-                provider="gemini",
-                model=EMBEDDING_MODEL,
-                latency_ms=int((time.time() - start_time) * 1000)
-            )
+            vectors = [e.values for e in result.embeddings]
+            if len(vectors) != len(texts):
+                raise ValueError(f"embed_content returned {len(vectors)} vectors for {len(texts)} texts")
+
+            latency_ms = int((time.time() - start_time) * 1000)
+            resps = [
+                EmbeddingResult(
+                    vector=vector,
+                    success=True,
+                    degraded=False,
+                    degraded_reason=None,
+                    provider="gemini",
+                    model=EMBEDDING_MODEL,
+                    latency_ms=latency_ms
+                )
+                for vector in vectors
+            ]
             
             # Record successful retry if not first attempt
             if attempt > 0:
-                log_embedding_outcome(resp, Outcome.RETRY_SUCCESS)
+                log_embedding_outcome(resps[0], Outcome.RETRY_SUCCESS, batch_size=len(texts))
             else:
-                log_embedding_outcome(resp, Outcome.SUCCESS)
+                log_embedding_outcome(resps[0], Outcome.SUCCESS, batch_size=len(texts))
                 
-            # Cache the successful result
-            _EMBEDDING_CACHE[text_hash] = resp
-            if len(_EMBEDDING_CACHE) > _MAX_CACHE_SIZE:
-                _EMBEDDING_CACHE.popitem(last=False)
+            # Cache the successful results (local + shared tier)
+            await embedding_cache.store(dict(zip(texts, resps)), EMBEDDING_MODEL, EMBEDDING_DIMENSION)
                 
-            return resp
+            return resps
             
         except Exception as e:
             is_timeout = isinstance(e, asyncio.TimeoutError) or isinstance(e, TimeoutError)
@@ -116,18 +167,89 @@ async def get_embedding(text: str) -> EmbeddingResult:
             
             if attempt < max_retries - 1 and is_retryable:
                 delay = get_jittered_backoff(attempt)
-                audit_log_sync("llm", "WARNING", f"Embedding retry (attempt {attempt+1}/{max_retries}), retrying in {delay:.1f}s... {error_desc}")
+                audit_log_sync("llm", "WARNING", f"Embedding retry (attempt {attempt+1}/{max_retries}, batch={len(texts)}), retrying in {delay:.1f}s... {error_desc}")
                 await asyncio.sleep(delay)
                 continue
                 
-            resp = EmbeddingResult(
-                vector=[0.0] * EMBEDDING_DIMENSION,
-                success=False,
-                degraded=True,
-                degraded_reason=f"gemini_embedding_failed: {error_desc}",
-                provider="fallback_chain",
-                model="none",
-                latency_ms=int((time.time() - start_time) * 1000)
-            )
-            log_embedding_outcome(resp, Outcome.EMBEDDING_ZERO_VECTOR_FALLBACK)
-            return resp
+            latency_ms = int((time.time() - start_time) * 1000)
+            resps = [
+                EmbeddingResult(
+                    vector=[0.0] * EMBEDDING_DIMENSION,
+                    success=False,
+                    degraded=True,
+                    degraded_reason=f"gemini_embedding_failed: {error_desc}",
+                    provider="fallback_chain",
+                    model="none",
+                    latency_ms=latency_ms
+                )
+                for _ in texts
+            ]
+            log_embedding_outcome(resps[0], Outcome.EMBEDDING_ZERO_VECTOR_FALLBACK, batch_size=len(texts))
+            return resps
+
+
+class _CoalesceWindow:
+    """One event loop's waiting texts and armed timer."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.pending: Dict[str, List[asyncio.Future]] = {}
+        self.timer = None
+        self.tasks: set = set()  # strong refs — the loop only keeps weak ones
+
+
+class _EmbeddingCoalescer:
+    """Merges concurrent single-text get_embedding() calls into batches.
+
+    The first caller in an idle window arms a timer; everyone who arrives
+    before it fires (or before EMBED_BATCH_MAX distinct texts are waiting)
+    shares one get_embeddings() request. Windows are per event loop
+    (LoopLocal): worker threads each running asyncio.run coalesce among
+    their own callers, and a batch only ever runs on the loop its futures
+    belong to.
+    """
+
+    def __init__(self, window_s: float = EMBED_COALESCE_WINDOW_S,
+                 max_batch: int = EMBED_BATCH_MAX):
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._windows = LoopLocal(lambda: _CoalesceWindow(asyncio.get_running_loop()))
+
+    async def submit(self, text: str) -> EmbeddingResult:
+        window = self._windows.get()
+        fut = window.loop.create_future()
+        window.pending.setdefault(text, []).append(fut)
+        if len(window.pending) >= self.max_batch:
+            self._dispatch(window)
+        elif window.timer is None:
+            window.timer = window.loop.call_later(self.window_s, self._dispatch, window)
+        return await fut
+
+    def _dispatch(self, window: _CoalesceWindow) -> None:
+        # Always on window.loop's thread: called from submit() or its timer.
+        if window.timer is not None:
+            window.timer.cancel()
+            window.timer = None
+        pending, window.pending = window.pending, {}
+        if pending:
+            task = window.loop.create_task(self._run(pending))
+            window.tasks.add(task)
+            task.add_done_callback(window.tasks.discard)
+
+    @staticmethod
+    async def _run(pending: Dict[str, List[asyncio.Future]]) -> None:
+        try:
+            results = await get_embeddings(list(pending))
+        except Exception as e:
+            for futs in pending.values():
+                for fut in futs:
+                    if not fut.done():
+                        fut.set_exception(e)
+            return
+        for futs, resp in zip(pending.values(), results):
+            for fut in futs:
+                if not fut.done():
+                    fut.set_result(resp)
+
+
+_coalescer = _EmbeddingCoalescer()
@@ -0,0 +1,173 @@
+"""Two-tier embedding cache shared by every embedding consumer.
+
+Tier 1 is a process-local LRU bounded by BYTES (vectors held packed, not as
+Python float lists). Tier 2 is Upstash Redis, so vectors survive Modal
+container restarts and are shared across containers. Both tiers store the
+vector as packed little-endian floats — base64 on the wire because the
+Upstash REST API is JSON — which is ~5x smaller than a JSON float list and
+needs no JSON parse on a hit.
+
+Keys are (model, dimension, sha256(text)): a model or dimension change can
+never serve a stale vector. Only successful, non-degraded embeddings are
+cached. Redis is best-effort — any failure degrades to a local-only cache.
+"""
+
+import base64
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .response import EmbeddingResult
+from core.lib.redis_cache import acache_mget_raw, acache_mset_raw
+
+LOCAL_MAX_BYTES = 16 * 1024 * 1024   # ~5k 768-dim float32 vectors
+SHARED_TTL_S = 30 * 86400            # vectors are deterministic per model
+# 'f' = float32 (lossless for what Gemini returns in practice); 'e' = float16
+# halves storage again at ~1e-3 relative error — too lossy for vectors that
+# are written back to pgvector, so float32 is the default.
+VECTOR_FORMAT = "f"
+_KEY_PREFIX = "emb:v1"
+
+
+def cache_key(text: str, model: str, dimension: int) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{_KEY_PREFIX}:{model}:{dimension}:{digest}"
+
+
+def pack_vector(vector: List[float], fmt: str = VECTOR_FORMAT) -> bytes:
+    return fmt.encode() + struct.pack(f"<{len(vector)}{fmt}", *vector)
+
+
+def unpack_vector(blob: bytes) -> List[float]:
+    fmt = chr(blob[0])
+    size = struct.calcsize(fmt)
+    return list(struct.unpack(f"<{(len(blob) - 1) // size}{fmt}", blob[1:]))
+
+
+class EmbeddingCache:
+    """Byte-bounded local LRU in front of the shared Redis tier."""
+
+    def __init__(self, max_bytes: int = LOCAL_MAX_BYTES, shared_ttl_s: int = SHARED_TTL_S):
+        self.max_bytes = max_bytes
+        self.shared_ttl_s = shared_ttl_s
+        self._local: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "evictions": 0}
+
+    # ── local tier ──────────────────────────────────────────────────────────
+
+    def _local_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            blob = self._local.get(key)
+            if blob is not None:
+                self._local.move_to_end(key)
+            return blob
+
+    def _local_put(self, key: str, blob: bytes) -> None:
+        with self._lock:
+            old = self._local.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._local[key] = blob
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes and len(self._local) > 1:
+                _, evicted = self._local.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.stats["evictions"] += 1
+
+    # ── public API ──────────────────────────────────────────────────────────
+
+    async def lookup(self, texts: List[str], model: str, dimension: int
+                     ) -> Dict[str, EmbeddingResult]:
+        """Return {text: cached result} for the texts found in either tier.
+
+        Local hits cost nothing; the remaining texts are fetched from Redis in
+        one async MGET and promoted into the local tier.
+        """
+        found: Dict[str, EmbeddingResult] = {}
+        remote: List[Tuple[str, str]] = []
+        for text in dict.fromkeys(texts):
+            key = cache_key(text, model, dimension)
+            blob = self._local_get(key)
+            if blob is not None:
+                self.stats["local_hits"] += 1
+                found[text] = _result(blob, model)
+            else:
+                remote.append((text, key))
+        if not remote:
+            return found
+
+        values = await acache_mget_raw([k for _, k in remote])
+        for (text, key), value in zip(remote, values):
+            blob = _decode(value)
+            if blob is None:
+                self.stats["misses"] += 1
+                continue
+            self.stats["shared_hits"] += 1
+            self._local_put(key, blob)
+            found[text] = _result(blob, model)
+        return found
+
+    def get_local(self, text: str, model: str, dimension: int) -> Optional[EmbeddingResult]:
+        """Local-tier only (no I/O) — the single-text fast path."""
+        blob = self._local_get(cache_key(text, model, dimension))
+        if blob is None:
+            return None
+        self.stats["local_hits"] += 1
+        return _result(blob, model)
+
+    async def store(self, items: Dict[str, EmbeddingResult], model: str, dimension: int) -> None:
+        """Write successful results to both tiers (Redis in one pipeline)."""
+        shared: Dict[str, str] = {}
+        for text, resp in items.items():
+            if not resp.success or resp.degraded or not resp.vector:
+                continue
+            key = cache_key(text, model, dimension)
+            blob = pack_vector(resp.vector)
+            self._local_put(key, blob)
+            shared[key] = base64.b64encode(blob).decode("ascii")
+        if shared:
+            await acache_mset_raw(shared, self.shared_ttl_s)
+
+    def clear(self) -> None:
+        """Drop the local tier (tests)."""
+        with self._lock:
+            self._local.clear()
+            self._bytes = 0
+
+    @property
+    def local_bytes(self) -> int:
+        return self._bytes
+
+
+def _decode(value) -> Optional[bytes]:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return base64.b64decode(value)
+    except Exception:
+        return None
+
+
+def _result(blob: bytes, model: str) -> EmbeddingResult:
+    return EmbeddingResult(
+        vector=unpack_vector(blob),
+        success=True,
+        degraded=False,
+        degraded_reason=None,
+        provider="gemini",
+        model=model,
+        latency_ms=0,
+    )
+
+
+embedding_cache = EmbeddingCache()
+
+
+def embedding_cache_stats() -> dict:
+    """Hit/miss counters plus local-tier size, for health/diagnostics."""
+    return {**embedding_cache.stats, "local_bytes": embedding_cache.local_bytes,
+            "local_entries": len(embedding_cache._local)}
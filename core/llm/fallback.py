@@ -15,9 +15,11 @@ from .budget import (
     WARN_THRESHOLD, credit_remaining, current_tenant, resolve_monthly_credit,
 )
 from core.lib.audit_logger import audit_log_sync
+from core.lib.tracing import traced
 
 gemini_breaker = CircuitBreaker("gemini", threshold=4, window_s=60)
 
+@traced("llm.generate")
 async def generate_content_with_fallback(
     prompt: str,
     workload: LLMConfig = WorkloadProfile.INTERACTIVE,
@@ -64,7 +66,8 @@ async def generate_content_with_fallback(
     if uid:
         # Per-user MONTHLY credit (table-driven; cycle = signup day). Soft
         #    warn near the limit (keep serving), hard block at 0 (safe hold).
-        #    One credit_remaining() call feeds both decisions (single SUM).
+        #    One credit_remaining() call feeds both decisions (one cached
+        #    running-balance read, db/110).
         try:
             remaining = credit_remaining(uid)
             if remaining <= 0:
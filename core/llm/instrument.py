@@ -1,5 +1,4 @@
-from core.services.db import get_supabase
-from core.lib.audit_logger import audit_log_sync
+from core.lib.audit_logger import audit_log_sync, enqueue_row
 from .constants import Outcome
 from .response import LLMResponse, EmbeddingResult
 from .budget import current_tenant, record_llm_spend
@@ -17,7 +16,8 @@ def log_llm_outcome(response: LLMResponse, outcome: Outcome, prompt: str = ""):
         
     audit_log_sync("llm", status, msg)
 
-    # M6: every outcome lands in the llm_spend ledger (owner-scoped). Token
+    # M6: every outcome lands in the llm_spend ledger (owner-scoped, queued
+    # write-behind — see budget.record_llm_spend). Token
     # estimates mirror model_registry below so the ledger and registry agree.
     try:
         input_tokens = len(str(prompt)) // 4 if prompt else 0
@@ -38,7 +38,8 @@ def log_llm_outcome(response: LLMResponse, outcome: Outcome, prompt: str = ""):
     
     # Log to model_registry if successful (owner-scoped — raw client, so
     # stamp owner_id explicitly; skip when no tenant context, same convention
-    # as the llm_spend ledger above).
+    # as the llm_spend ledger above). Queued on the buffered writer like the
+    # audit and spend rows: nothing here blocks the caller on a round trip.
     uid = current_tenant()
     if response.success and not response.degraded and uid:
         try:
@@ -47,7 +48,7 @@ def log_llm_outcome(response: LLMResponse, outcome: Outcome, prompt: str = ""):
             if response.function_calls:
                 output_tokens += len(str(response.function_calls)) // 4
 
-            get_supabase().table('model_registry').insert({
+            enqueue_row('model_registry', {
                 "owner_id": uid,  # raw client: stamp explicitly (uid IS the scope)
                 "model_name": response.model,
                 "provider": response.provider,
@@ -55,17 +56,19 @@ def log_llm_outcome(response: LLMResponse, outcome: Outcome, prompt: str = ""):
                 "output_tokens": output_tokens,
                 "latency_ms": response.latency_ms,
                 "success": True
-            }).execute()
+            })
         except Exception as e:
             audit_log_sync("llm", "WARNING", f"Failed to log to model_registry: {e}")
 
-def log_embedding_outcome(result: EmbeddingResult, outcome: Outcome):
+def log_embedding_outcome(result: EmbeddingResult, outcome: Outcome, batch_size: int = 1):
     status = "WARNING" if result.degraded else "INFO"
     if not result.success and not result.degraded:
         status = "ERROR"
         
     msg = f"Embed[{result.provider}:{result.model}] {outcome.value} " \
           f"({result.latency_ms}ms)"
+    if batch_size > 1:
+        msg += f" batch={batch_size}"
           
     if result.degraded_reason:
         msg += f" reason: {result.degraded_reason}"
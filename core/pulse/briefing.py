@@ -25,7 +25,14 @@ from core.lib.redis_cache import acquire_lock, release_lock
 from core.decisions import record_decision
 from core.pulse.models import PulseOutput
 from core.pulse.llm import supabase
-from core.services.db import active_user_ids, get_tenant, resolve_telegram_chat_id, tenant_scope
+from core.services.db import (
+    active_user_ids,
+    afanout_tenants,
+    get_supabase,
+    get_tenant,
+    resolve_telegram_chat_id,
+    tenant_scope,
+)
 from core.pulse.utils import format_error
 from core.pulse.memory import (
     write_outcome_memory,
@@ -386,6 +393,15 @@ def _auto_expire_recurring_tasks():
 # MAIN PULSE ENGINE
 # ──────────────────────────────────────────
 
+# Inline multi-tenant fan-out (process_pulse). The cap defaults to the
+# shared TENANT_FANOUT_CONCURRENCY; the per-tenant deadline sits under the
+# 900s worker timeout so a hung tenant is cancelled (_process_pulse_impl
+# marks its pulse_runs row failed and releases its lock on the way out)
+# while the others still finish.
+BRIEFING_FANOUT_CONCURRENCY = int(os.getenv("BRIEFING_FANOUT_CONCURRENCY", "0")) or None
+BRIEFING_TENANT_DEADLINE_S = float(os.getenv("BRIEFING_TENANT_DEADLINE_S", "600"))
+
+
 def _user_briefing_due(uid: str) -> bool:
     """M9.7 gate: is THIS heartbeat one of this tenant's briefing slots?
 
@@ -436,8 +452,8 @@ def _recently_briefed(uid: str, within_minutes: int = 25) -> bool:
 
 
 async def process_pulse(auth_secret: str = None, request_id: str = None, trigger: str = "api"):
-    """(M6 fan-out + M9.7 gate) Iterate all active users, one tenant-scoped
-    briefing each. Cron traffic carries no API key; each active user gets
+    """(M6 fan-out + M9.7 gate) Brief all active users concurrently (bounded),
+    one tenant-scoped briefing each. Cron traffic carries no API key; each active user gets
     their own briefing under tenant_scope(). A per-tenant failure is
     isolated and reported without aborting the other tenants.
 
@@ -455,17 +471,21 @@ async def process_pulse(auth_secret: str = None, request_id: str = None, trigger
     if not uids:
         return await _process_pulse_impl(auth_secret, request_id, trigger)
     gated = trigger == "cron"
-    results = []
-    any_briefed = False
-    for uid in uids:
-        try:
-            r = await process_pulse_for_tenant(uid, auth_secret, request_id, trigger)
-            if r.get("briefing"):
-                any_briefed = True
-            results.append(r)
-        except Exception as e:
-            audit_log_sync("briefing", "ERROR", f"Briefing failed for tenant {uid}: {e}")
-            results.append({"tenant": uid, "error": str(e)})
+    # Tenants brief concurrently (bounded; see afanout_tenants) so wall time
+    # tracks the slowest tenant, not the sum. Each gets its own deadline so
+    # one hung tenant cannot eat the worker's timeout for everyone else.
+    summary = await afanout_tenants(
+        lambda uid: process_pulse_for_tenant(uid, auth_secret, request_id, trigger),
+        uids,
+        job_name="briefing",
+        concurrency=BRIEFING_FANOUT_CONCURRENCY,
+        deadline_s=BRIEFING_TENANT_DEADLINE_S,
+    )
+    results = [
+        o.result if o.status == "ok" else {"tenant": o.uid, "error": o.error}
+        for o in summary.outcomes
+    ]
+    any_briefed = any(r.get("briefing") for r in results)
     # Heartbeat freshness: when the heartbeat wakes and NO tenant is due, the
     # engine still ran — keep the channel tenant's pulse_last_success fresh so
     # the health check reports a healthy pipeline instead of a stale one.
@@ -482,6 +502,7 @@ async def process_pulse(auth_secret: str = None, request_id: str = None, trigger
         "tenants": len(uids),
         "briefed": any_briefed,
         "results": results,
+        "fanout": summary.describe(),
     }
 
 
@@ -489,23 +510,69 @@ def due_tenant_ids(trigger: str = "cron") -> list[str]:
     """Active users whose briefing is due RIGHT NOW (cheap gate, no LLM).
 
     Used by the /api/pulse-cron fan-out (Option B) to decide which tenants
-    get a dedicated brief_tenant Modal worker. Mirrors the per-tenant gate
-    inside process_pulse's loop so behavior is identical whether a tenant is
-    briefed inline or in its own container. Fail-closed: any gate error
-    means NOT due — never a surprise briefing, never another tenant's row.
+    get a dedicated brief_tenant Modal worker. Applies the same gate as
+    process_pulse_for_tenant, but set-based: every tenant's schedule,
+    timezone and recent completed run come from one query each (see
+    _due_tenants), so the heartbeat's cost stays flat as tenants grow.
+    Fail-closed: any gate error means NOT due — never a surprise briefing,
+    never another tenant's row.
     """
-    due = []
-    for uid in active_user_ids():
+    uids = active_user_ids()
+    if trigger != "cron":
+        return uids
+    return _due_tenants(uids)
+
+
+def _due_tenants(uids: list[str], now_utc: datetime | None = None) -> list[str]:
+    """Bulk _user_briefing_due + _recently_briefed over `uids`, in order."""
+    if not uids:
+        return []
+    try:
+        from core.services.briefing_schedule import (
+            resolve_briefing_schedules,
+            briefing_due_now,
+        )
+        from core.services.user_settings import resolve_timezones
+        from core.lib.time_utils import timezone_from_name
+        schedules = resolve_briefing_schedules(uids)
+        timezones = resolve_timezones(uids)
+    except Exception as e:
+        audit_log_sync("briefing", "WARNING", f"Bulk due-check failed (fail-closed, none due): {e}")
+        return []
+    now_utc = now_utc or datetime.now(timezone.utc)
+    slot_due = []
+    for uid in uids:
         try:
-            with tenant_scope(uid):
-                if trigger != "cron":
-                    due.append(uid)
-                    continue
-                if _user_briefing_due(uid) and not _recently_briefed(uid):
-                    due.append(uid)
+            local_now = now_utc.astimezone(timezone_from_name(timezones.get(uid)))
+            if briefing_due_now(schedules[uid], local_now):
+                slot_due.append(uid)
         except Exception as e:
             audit_log_sync("briefing", "WARNING", f"Due-check failed for tenant {uid}: {e}")
-    return due
+    if not slot_due:
+        return []
+    briefed = _recently_briefed_many(slot_due, now_utc)
+    return [uid for uid in slot_due if uid not in briefed]
+
+
+def _recently_briefed_many(uids: list[str], now_utc: datetime, within_minutes: int = 25) -> set[str]:
+    """Bulk _recently_briefed: the subset of `uids` with a completed main
+    pulse run in the window, from one `owner_id IN (...)` read. Errors →
+    empty set, matching the per-tenant helper's False."""
+    try:
+        cutoff = (now_utc - timedelta(minutes=within_minutes)).isoformat()
+        res = (
+            get_supabase()
+            .table("pulse_runs")
+            .select("owner_id")
+            .eq("pulse_type", "main")
+            .eq("status", "completed")
+            .gte("completed_at", cutoff)
+            .in_("owner_id", uids)
+            .execute()
+        )
+        return {str(r.get("owner_id")) for r in (res.data or [])}
+    except Exception:
+        return set()
 
 
 async def process_pulse_for_tenant(
@@ -681,6 +748,8 @@ async def _process_pulse_impl(auth_secret: str = None, request_id: str = None, t
         # CONTEXT ASSEMBLY — PARALLEL PHASE 1
         # Independent DB/LLM queries that can run simultaneously
         # ═══════════════════════════════════════
+        # One Redis MGET for every ContextProvider cache the assembly reads.
+        await context_provider.prefetch()
         (
             people,
             orgs_list,
@@ -1580,3 +1649,13 @@ async def _process_pulse_impl(auth_secret: str = None, request_id: str = None, t
             await complete_pulse_run(supabase, run_id, status="failed", error_message=str(e))
         release_lock(lock_key)
         return {"error": str(e)}
+    except BaseException as e:
+        # Cancellation (the fan-out deadline's asyncio.wait_for) is not an
+        # Exception: without this the tenant stayed locked for the full TTL
+        # and its run sat in 'running' until the next reap.
+        audit_log_sync("pulse", "WARNING", f"Pulse cancelled: {type(e).__name__}")
+        if run_id:
+            await complete_pulse_run(supabase, run_id, status="failed",
+                error_message=f"cancelled ({type(e).__name__})")
+        release_lock(lock_key)
+        raise
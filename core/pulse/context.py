@@ -5,16 +5,23 @@ import asyncio
 import json
 from datetime import datetime, timezone, timedelta
 
-from core.services.db import tenant_aware_client, get_tenant
+from core.services.db import tenant_aware_client, async_tenant_aware_client, get_tenant
 from core.services.google_service import get_google_calendar_events
 from core.services.outlook_service import get_outlook_calendar_events
-from core.lib.redis_cache import cache_get, cache_set, cache_delete
+from core.lib.redis_cache import acache_get_many, cache_get, cache_set, cache_delete
 from core.lib.time_utils import age_tag, resolve_relative_dates
 from core.lib.audit_logger import audit_log_sync
 from core.lib.constants import BOT_SENDERS
 from core.retrieval.config import config as retrieval_config
+from core.retrieval.similarity import cosine_similarity
 
 supabase = tenant_aware_client()
+asupabase = async_tenant_aware_client()
+
+# How long a Redis miss seen by ContextProvider.prefetch() stays trusted: the
+# getter that follows the prefetch goes straight to the DB instead of paying
+# a second round trip to re-learn the miss.
+_PREFETCH_MISS_GRACE_S = 5
 
 class SimpleCache:
     """A lightweight TTL cache to avoid redundant DB queries. Backed by Redis if configured.
@@ -31,6 +38,8 @@ class SimpleCache:
         self.redis_key = redis_key
         # tenant-scoped key -> (data, fetched_at)
         self._mem = {}
+        # tenant-scoped key -> checked_at, for misses seen by prefetch()
+        self._known_miss = {}
 
     def _key(self):
         """Effective storage key: redis_key namespaced by the current tenant."""
@@ -39,6 +48,17 @@ class SimpleCache:
         uid = get_tenant()
         return f"{self.redis_key}:{uid}" if uid else self.redis_key
 
+    def fresh(self, key, now):
+        entry = self._mem.get(key)
+        return entry is not None and now - entry[1] < self.ttl
+
+    def prime(self, key, data, now):
+        """Record a batched Redis read for `key` (data None = miss)."""
+        if data is not None:
+            self._mem[key] = (data, now)
+        else:
+            self._known_miss[key] = now
+
     def get(self):
         key = self._key()
         if key is None:
@@ -49,6 +69,9 @@ class SimpleCache:
             if now - entry[1] < self.ttl:
                 return entry[0]
             self._mem.pop(key, None)  # expired → evict, cap memory growth
+        checked = self._known_miss.pop(key, None)
+        if checked is not None and now - checked < _PREFETCH_MISS_GRACE_S:
+            return None
         redis_data = cache_get(key)
         if redis_data is not None:
             self._mem[key] = (redis_data, now)
@@ -67,6 +90,7 @@ class SimpleCache:
         if key is None:
             return
         self._mem.pop(key, None)
+        self._known_miss.pop(key, None)
         cache_delete(key)
 
 
@@ -87,14 +111,27 @@ class ContextProvider:
         }
         
     def cosine_similarity(self, vec_a, vec_b):
-        if not vec_a or not vec_b:
-            return 0.0
-        dot = sum(a * b for a, b in zip(vec_a, vec_b))
-        norm_a = sum(a * a for a in vec_a) ** 0.5
-        norm_b = sum(b * b for b in vec_b) ** 0.5
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
+        return cosine_similarity(vec_a, vec_b)
+
+    async def prefetch(self, *names):
+        """Warm the named caches (default: all) from Redis in one MGET.
+
+        Each cold SimpleCache.get() is its own blocking Redis round trip;
+        hydration touches up to six of them. Call this first and the getters
+        are served from memory (or go straight to the DB on a known miss).
+        """
+        now = time.time()
+        pending = {}
+        for name in names or self.caches:
+            cache = self.caches[name]
+            key = cache._key()
+            if key is not None and not cache.fresh(key, now):
+                pending[key] = cache
+        if not pending:
+            return
+        hits = await acache_get_many(list(pending))
+        for key, cache in pending.items():
+            cache.prime(key, hits.get(key), now)
 
     async def get_organizations(self):
         cached = self.caches['organizations'].get()
@@ -105,7 +142,7 @@ class ContextProvider:
         # nodes; enrichment lives on the node's metadata. `id` is the graph
         # NODE id (mirror table removed) — the same id tasks.organization_id,
         # projects.organization_id and project_organizations now reference.
-        res = supabase.table('graph_nodes') \
+        res = await asupabase.table('graph_nodes') \
             .select('id, label, metadata, db_record_id') \
             .eq('type', 'organization') \
             .eq('is_current', True) \
@@ -135,7 +172,7 @@ class ContextProvider:
         if cached is not None:
             return cached
             
-        res = supabase.table('tasks')\
+        res = await asupabase.table('tasks')\
             .select('id, title, organization_id, pending_org_id, priority, created_at, reminder_at, status, direction, committed_to')\
             .eq('is_current', True)\
             .not_.in_('status', ['done', 'cancelled'])\
@@ -213,7 +250,7 @@ class ContextProvider:
         if cached is not None:
             return cached
         
-        res = supabase.table('graph_nodes') \
+        res = await asupabase.table('graph_nodes') \
             .select('id, label, type, normalized_label') \
             .in_('type', ['person', 'organization']) \
             .eq('is_current', True) \
@@ -229,7 +266,7 @@ class ContextProvider:
             
         # Consolidation (migration 74): people come from live person graph
         # nodes — enrichment lives on the node's metadata.
-        res = supabase.table('graph_nodes') \
+        res = await asupabase.table('graph_nodes') \
             .select('id, label, metadata, db_record_id') \
             .eq('type', 'person') \
             .eq('is_current', True) \
@@ -259,7 +296,7 @@ class ContextProvider:
             return cached
             
         since_utc = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
-        res = supabase.table('tasks') \
+        res = await asupabase.table('tasks') \
             .select('title, organization_id, updated_at') \
             .eq('is_current', True) \
             .eq('status', 'done') \
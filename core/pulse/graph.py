@@ -1,5 +1,5 @@
 from core.llm.constants import SYNTHESIS_MODEL
-from core.services.db import exec_query, maybe_single_safe, tenant_aware_client
+from core.services.db import amaybe_single_safe, async_tenant_aware_client, exec_query, maybe_single_safe, tenant_aware_client
 from core.llm import get_embedding
 from core.llm.fallback import generate_content_with_fallback
 import json
@@ -9,12 +9,14 @@ import difflib
 from typing import Optional
 from core.lib.audit_logger import audit_log_sync
 from core.lib.telemetry import emit_observation
+from core.lib.entity_detector import invalidate_entity_index
 from core.services.briefing_refresh import fire_briefing_refresh
 from core.lib.graph_rules import find_similar_node, resolve_alias, canonicalize_relationship, normalize_label_display, get_canonical_id, normalize_label, NOISE_LABELS, insert_pending_edge, make_memory_preview
 from core.decisions import record_decision
 from core.lib.node_tables import resolve_merge_proposal
 
 supabase = tenant_aware_client()
+asupabase = async_tenant_aware_client()
 
 
 def is_valid_uuid(val: str) -> bool:
@@ -165,7 +167,7 @@ async def create_graph_node_with_db_record(
             # enrichment (organization_name, last_interaction_date).
             existing_meta = {}
             try:
-                ex_res = maybe_single_safe(supabase.table('graph_nodes').select('metadata').eq('type', 'person').eq('normalized_label', normalize_label(label)))
+                ex_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('metadata').eq('type', 'person').eq('normalized_label', normalize_label(label)))
                 if ex_res and ex_res.data:
                     em = ex_res.data.get('metadata') or {}
                     if isinstance(em, str):
@@ -177,7 +179,7 @@ async def create_graph_node_with_db_record(
             except Exception:
                 pass
 
-            upsert_res = supabase.table("graph_nodes").upsert(
+            upsert_res = await asupabase.table("graph_nodes").upsert(
                 {
                     "label": label,
                     "type": "person",
@@ -199,12 +201,13 @@ async def create_graph_node_with_db_record(
             if not graph_node_id:
                 raise Exception("Graph node id missing after upsert")
             audit_log_sync("pulse", "INFO", f"Person node ready: '{label}' (node {graph_node_id})")
+            invalidate_entity_index()
 
             # Resolve org from source_text for the pending edge + enrichment.
             # Read live org NODES (mirror table gone).
             matched_org_name = None
             if source_text and source_text.strip() not in ("", "batch"):
-                orgs_res = supabase.table('graph_nodes').select('label').eq('type', 'organization').eq('is_current', True).execute()
+                orgs_res = await asupabase.table('graph_nodes').select('label').eq('type', 'organization').eq('is_current', True).execute()
                 source_lower = source_text.lower()
                 for o in (orgs_res.data or []):
                     oname = (o.get('label') or '').strip()
@@ -241,7 +244,7 @@ async def create_graph_node_with_db_record(
             # Read-modify-write so re-approval never wipes a previously-set
             # organization_name / last_interaction_date.
             try:
-                node_meta_res = maybe_single_safe(supabase.table('graph_nodes').select('metadata').eq('id', graph_node_id))
+                node_meta_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('metadata').eq('id', graph_node_id))
                 node_meta = (node_meta_res.data.get('metadata') or {}) if node_meta_res and node_meta_res.data else {}
                 if isinstance(node_meta, str):
                     try:
@@ -259,7 +262,7 @@ async def create_graph_node_with_db_record(
                 # is the person id everywhere — no legacy mirror id exists.
                 node_meta['people_id'] = graph_node_id
                 node_meta['enrichment'] = enrich
-                supabase.table('graph_nodes').update({'metadata': node_meta, 'db_record_id': graph_node_id}).eq('id', graph_node_id).execute()
+                await asupabase.table('graph_nodes').update({'metadata': node_meta, 'db_record_id': graph_node_id}).eq('id', graph_node_id).execute()
             except Exception:
                 pass
 
@@ -287,7 +290,7 @@ async def create_graph_node_with_db_record(
             # Merge with existing metadata on re-approval (never wipe enrichment).
             existing_meta = {}
             try:
-                ex_res = maybe_single_safe(supabase.table('graph_nodes').select('metadata').eq('type', node_type).eq('normalized_label', normalize_label(label)))
+                ex_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('metadata').eq('type', node_type).eq('normalized_label', normalize_label(label)))
                 if ex_res and ex_res.data:
                     em = ex_res.data.get('metadata') or {}
                     if isinstance(em, str):
@@ -301,7 +304,7 @@ async def create_graph_node_with_db_record(
             enrich = dict(existing_meta.get('enrichment') or {})
             enrich.setdefault('is_active', True)
 
-            upsert_res = supabase.table("graph_nodes").upsert(
+            upsert_res = await asupabase.table("graph_nodes").upsert(
                 {
                     "label": label,
                     "type": node_type,
@@ -324,10 +327,11 @@ async def create_graph_node_with_db_record(
             if not graph_node_id:
                 raise Exception("Graph node id missing after upsert")
             audit_log_sync("pulse", "INFO", f"Org node ready: '{label}' (node {graph_node_id})")
+            invalidate_entity_index()
 
             # Self-canonical identity: node's own UUID is the org id
             try:
-                node_meta_res = maybe_single_safe(supabase.table('graph_nodes').select('metadata').eq('id', graph_node_id))
+                node_meta_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('metadata').eq('id', graph_node_id))
                 node_meta = (node_meta_res.data.get('metadata') or {}) if node_meta_res and node_meta_res.data else {}
                 if isinstance(node_meta, str):
                     try:
@@ -335,7 +339,7 @@ async def create_graph_node_with_db_record(
                     except Exception:
                         node_meta = {}
                 node_meta['organization_id'] = graph_node_id
-                supabase.table('graph_nodes').update({'metadata': node_meta, 'db_record_id': graph_node_id}).eq('id', graph_node_id).execute()
+                await asupabase.table('graph_nodes').update({'metadata': node_meta, 'db_record_id': graph_node_id}).eq('id', graph_node_id).execute()
             except Exception:
                 pass
 
@@ -398,7 +402,7 @@ async def _backfill_existing_content_for_entity(
 
         # ── Backfill memories (notes) that mention this entity label ──
         try:
-            mem_res = supabase.table('memories') \
+            mem_res = await asupabase.table('memories') \
                 .select('id, metadata') \
                 .eq('is_current', True) \
                 .eq('memory_type', 'note') \
@@ -430,7 +434,7 @@ async def _backfill_existing_content_for_entity(
                         current_meta['organization_name'] = label
 
                     try:
-                        supabase.table('memories') \
+                        await asupabase.table('memories') \
                             .update({'metadata': current_meta}) \
                             .eq('id', mem['id']) \
                             .eq('is_current', True) \
@@ -453,7 +457,7 @@ async def _backfill_existing_content_for_entity(
 
         # ── Backfill open tasks that mention this entity label ──
         try:
-            task_res = supabase.table('tasks') \
+            task_res = await asupabase.table('tasks') \
                 .select('id, organization_id, title') \
                 .eq('is_current', True) \
                 .not_.in_('status', ['done', 'cancelled']) \
@@ -476,7 +480,7 @@ async def _backfill_existing_content_for_entity(
 
                     if update_data:
                         try:
-                            supabase.table('tasks') \
+                            await asupabase.table('tasks') \
                                 .update(update_data) \
                                 .eq('id', task['id']) \
                                 .execute()
@@ -685,7 +689,7 @@ async def _ensure_danny_edge(label: str, node_type: str):
         root_name = _root_person_label()
         if not root_name:
             return  # no root person resolvable → no root edge
-        root_res = maybe_single_safe(supabase.table("graph_nodes").select("id").eq("type", "person").ilike("label", root_name).eq('is_current', True))
+        root_res = await amaybe_single_safe(asupabase.table("graph_nodes").select("id").eq("type", "person").ilike("label", root_name).eq('is_current', True))
         if not root_res or not root_res.data:
             return
         danny_id = root_res.data["id"]
@@ -693,7 +697,7 @@ async def _ensure_danny_edge(label: str, node_type: str):
         label = normalize_label_display(label)
         # Resolve through aliases table (e.g. Sunju → Sunjula Daniel)
         label = resolve_alias(label)
-        target_res = maybe_single_safe(supabase.table("graph_nodes").select("id, canonical_id").ilike("label", label).eq('is_current', True))
+        target_res = await amaybe_single_safe(asupabase.table("graph_nodes").select("id, canonical_id").ilike("label", label).eq('is_current', True))
         if not target_res or not target_res.data:
             return
         target_id = target_res.data["id"]
@@ -701,8 +705,8 @@ async def _ensure_danny_edge(label: str, node_type: str):
         if target_res.data.get("canonical_id"):
             target_id = get_canonical_id(target_id)
 
-        existing = maybe_single_safe(
-            supabase.table("graph_edges").select("id")
+        existing = await amaybe_single_safe(
+            asupabase.table("graph_edges").select("id")
             .eq("source_node_id", danny_id)
             .eq("target_node_id", target_id)
             .eq("relationship", rel)
@@ -710,7 +714,7 @@ async def _ensure_danny_edge(label: str, node_type: str):
         )
 
         if not existing or not existing.data:
-            supabase.table("graph_edges").insert({
+            await asupabase.table("graph_edges").insert({
                 "source_node_id": danny_id,
                 "target_node_id": target_id,
                 "relationship": rel,
@@ -731,7 +735,7 @@ def _extract_mentioned_labels(source_text: str, known_labels: list[str]) -> list
 async def _infer_additional_edges(label: str, node_type: str, source_text: str) -> list[str]:
     """Call Gemini to extract additional relationships from the source text involving the new node or mentioned entities."""
     try:
-        nodes_res = supabase.table("graph_nodes").select("label").eq('is_current', True).execute()
+        nodes_res = await asupabase.table("graph_nodes").select("label").eq('is_current', True).execute()
         if not nodes_res or not nodes_res.data:
             return []
             
@@ -818,7 +822,7 @@ Format:
 async def process_graph_pending_decision(pending_id: int, decision: str, context: str = None, new_label: str = None, auto_decided: bool = False) -> dict:
     """Process a pending node decision (approve/reject/unreject)."""
     try:
-        pending_res = maybe_single_safe(supabase.table('pending_nodes').select('*').eq('id', pending_id))
+        pending_res = await amaybe_single_safe(asupabase.table('pending_nodes').select('*').eq('id', pending_id))
         if not pending_res or not pending_res.data:
             return {"success": False, "action": "not_found", "message": "Graph item not found."}
         pending_item = pending_res.data
@@ -833,16 +837,16 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
         if decision == 'unreject':
             if status != 'rejected':
                 return {"success": False, "action": "not_rejected", "message": "Item is not rejected."}
-            supabase.table('pending_nodes').update({'status': 'pending'}).eq('id', pending_id).execute()
+            await asupabase.table('pending_nodes').update({'status': 'pending'}).eq('id', pending_id).execute()
             return {"success": True, "action": "unrejected", "message": f"Un-rejected node {pending_item['label']}"}
 
         # ── Reject ──
         if decision == 'reject':
             label = pending_item['label']
-            supabase.table('pending_nodes').update({'status': 'rejected'}).eq('id', pending_id).execute()
+            await asupabase.table('pending_nodes').update({'status': 'rejected'}).eq('id', pending_id).execute()
             # Cascade reject edges
-            supabase.table('pending_graph_edges').update({'status': 'rejected'}).eq('source_label', label).execute()
-            supabase.table('pending_graph_edges').update({'status': 'rejected'}).eq('target_label', label).execute()
+            await asupabase.table('pending_graph_edges').update({'status': 'rejected'}).eq('source_label', label).execute()
+            await asupabase.table('pending_graph_edges').update({'status': 'rejected'}).eq('target_label', label).execute()
             try:
                 record_decision(
                     decision_type="graph_node_rejection",
@@ -882,18 +886,18 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
 
         # ── Merge Proposed: Approve = accept merge, Reject = create standalone ──
         if status == 'merge_proposed':
-            merge_proposals_res = supabase.table('merge_proposals').select('*').eq('origin_table', 'pending_nodes').eq('origin_id', pending_id).eq('status', 'proposed').limit(1).execute()
+            merge_proposals_res = await asupabase.table('merge_proposals').select('*').eq('origin_table', 'pending_nodes').eq('origin_id', pending_id).eq('status', 'proposed').limit(1).execute()
             mp = (merge_proposals_res.data or [None])[0]
             if decision == 'approve':
                 if mp:
                     from core.lib.graph_rules import execute_graph_node_merge, get_canonical_id
                     label = pending_item['label']
-                    node_res = maybe_single_safe(supabase.table('graph_nodes').select('id').ilike('label', label).eq('is_current', True))
+                    node_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('id').ilike('label', label).eq('is_current', True))
                     source_node_id = node_res.data['id'] if node_res and node_res.data else None
                     if source_node_id:
                         winner_id = get_canonical_id(mp['target_node_id'])
                         execute_graph_node_merge(source_node_id, winner_id, 'merge_accept')
-                    supabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
+                    await asupabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
                     resolve_merge_proposal(mp['id'], 'accepted')
                 fire_briefing_refresh(source="graph_node_decision")
                 return {"success": True, "action": "merged", "message": f"Merged '{pending_item['label']}' into target node."}
@@ -903,7 +907,7 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
                 result = await create_graph_node_with_db_record(label=label, node_type=node_type,
                     source_text=pending_item.get('source_text', ''), context=context, source_tag='pending_approval', force=True)
                 if result.get('success'):
-                    supabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
+                    await asupabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
                     if mp:
                         resolve_merge_proposal(mp['id'], 'rejected')
                     fire_briefing_refresh(source="graph_node_decision")
@@ -919,15 +923,15 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
             if new_label and new_label.strip() and new_label.strip() != label:
                 old_label = label
                 label = new_label.strip()
-                supabase.table('pending_graph_edges').update({'source_label': label}).eq('source_label', old_label).execute()
-                supabase.table('pending_graph_edges').update({'target_label': label}).eq('target_label', old_label).execute()
-                supabase.table('pending_nodes').update({'label': label, 'status': status}).eq('id', pending_id).execute()
+                await asupabase.table('pending_graph_edges').update({'source_label': label}).eq('source_label', old_label).execute()
+                await asupabase.table('pending_graph_edges').update({'target_label': label}).eq('target_label', old_label).execute()
+                await asupabase.table('pending_nodes').update({'label': label, 'status': status}).eq('id', pending_id).execute()
 
             # Auto-approve any pending root→KNOWS edge for this label
             root_label = _root_person_label()
             danny_edge_res = (
-                maybe_single_safe(
-                    supabase.table("pending_graph_edges")
+                await amaybe_single_safe(
+                    asupabase.table("pending_graph_edges")
                     .select("id")
                     .eq("source_label", root_label)
                     .eq("target_label", label)
@@ -952,10 +956,10 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
                 if result.get('action') == 'merge_proposed':
                     merge_target_id = result.get('merge_candidate_id')
                     # Get target label from graph_nodes
-                    target_res = supabase.table('graph_nodes').select('label').eq('id', merge_target_id).single().execute()
+                    target_res = await asupabase.table('graph_nodes').select('label').eq('id', merge_target_id).single().execute()
                     target_label = target_res.data['label'] if target_res and target_res.data else merge_target_id
                     # Insert merge_proposal row so the Merges tab shows it
-                    supabase.table('merge_proposals').insert({
+                    await asupabase.table('merge_proposals').insert({
                         'source_label': label,
                         'source_type': node_type,
                         'target_node_id': merge_target_id,
@@ -965,9 +969,9 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
                         'origin_table': 'pending_nodes',
                         'origin_id': pending_id,
                     }).execute()
-                    supabase.table('pending_nodes').update({'status': 'merge_proposed'}).eq('id', pending_id).execute()
+                    await asupabase.table('pending_nodes').update({'status': 'merge_proposed'}).eq('id', pending_id).execute()
                 else:
-                    supabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
+                    await asupabase.table('pending_nodes').update({'status': 'approved'}).eq('id', pending_id).execute()
 
                     # ── Resolve pending_org_id on tasks and memories ──
                     if node_type == 'organization' and result.get('node_id'):
@@ -1008,7 +1012,7 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
                 # After org approval, add follow_up signal for relationship linking
                 if node_type == 'organization' and result.get('action') != 'merge_proposed':
                     try:
-                        orgs_res = supabase.table('graph_nodes') \
+                        orgs_res = await asupabase.table('graph_nodes') \
                             .select('id, label') \
                             .eq('type', 'organization') \
                             .eq('is_current', True) \
@@ -1032,7 +1036,7 @@ async def process_graph_pending_decision(pending_id: int, decision: str, context
 
 async def process_pending_edge_decision(pending_id: int, decision: str, new_source: str = None, new_target: str = None, new_rel: str = None, context: str | None = None, auto_decided: bool = False) -> dict:
     try:
-        pe_res = maybe_single_safe(supabase.table('pending_graph_edges').select('*').eq('id', pending_id))
+        pe_res = await amaybe_single_safe(asupabase.table('pending_graph_edges').select('*').eq('id', pending_id))
         if not pe_res or not pe_res.data:
             return {"success": False, "action": "not_found", "message": "Pending edge not found."}
             
@@ -1041,7 +1045,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
             return {"success": False, "action": "already_processed", "message": "Already processed."}
             
         if decision == 'reject':
-            supabase.table('pending_graph_edges').update({
+            await asupabase.table('pending_graph_edges').update({
                 'status': 'rejected',
                 'approval_source': 'auto_approve' if auto_decided else 'hitl'
             }).eq('id', pending_id).execute()
@@ -1084,22 +1088,22 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
             rel = (new_rel or pe['relationship']).upper()
 
             from core.lib.graph_rules import validate_edge
-            s_node_res = maybe_single_safe(supabase.table('graph_nodes').select('id, type, label').ilike('label', s_label).eq('is_current', True))
-            t_node_res = maybe_single_safe(supabase.table('graph_nodes').select('id, type, label').ilike('label', t_label).eq('is_current', True))
+            s_node_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('id, type, label').ilike('label', s_label).eq('is_current', True))
+            t_node_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('id, type, label').ilike('label', t_label).eq('is_current', True))
 
             s_data = getattr(s_node_res, 'data', None)
             t_data = getattr(t_node_res, 'data', None)
 
             # FUZZY MATCH FALLBACK for person/org (if exact match fails)
             if not s_data and pe.get('source_type') in ('person', 'organization') and len(s_label) > 3:
-                fuzzy_res = supabase.table('graph_nodes').select('id, type, label').eq('type', pe['source_type']).ilike('label', f"{s_label} %").eq('is_current', True).execute()
+                fuzzy_res = await asupabase.table('graph_nodes').select('id, type, label').eq('type', pe['source_type']).ilike('label', f"{s_label} %").eq('is_current', True).execute()
                 if fuzzy_res and fuzzy_res.data and len(fuzzy_res.data) == 1:
                     s_data = fuzzy_res.data[0]
                     s_label = s_data['label']
                     audit_log_sync("pulse", "INFO", f"Fuzzy matched source '{pe['source_label']}' to '{s_label}'")
                     
             if not t_data and pe.get('target_type') in ('person', 'organization') and len(t_label) > 3:
-                fuzzy_res = supabase.table('graph_nodes').select('id, type, label').eq('type', pe['target_type']).ilike('label', f"{t_label} %").eq('is_current', True).execute()
+                fuzzy_res = await asupabase.table('graph_nodes').select('id, type, label').eq('type', pe['target_type']).ilike('label', f"{t_label} %").eq('is_current', True).execute()
                 if fuzzy_res and fuzzy_res.data and len(fuzzy_res.data) == 1:
                     t_data = fuzzy_res.data[0]
                     t_label = t_data['label']
@@ -1107,7 +1111,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
 
             if not s_data or not t_data:
                 missing = s_label if not s_data else t_label
-                supabase.table('pending_graph_edges').update({
+                await asupabase.table('pending_graph_edges').update({
                     'status': 'rejected',
                     'approval_source': 'auto_approve' # validation failed
                 }).eq('id', pending_id).execute()
@@ -1122,7 +1126,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
                 rel = canonicalize_relationship(rel, s_type, t_type)
                 vr = validate_edge(s_type, rel, t_type)
                 if vr["action"] == "auto_reject":
-                    supabase.table('pending_graph_edges').update({
+                    await asupabase.table('pending_graph_edges').update({
                         'status': 'rejected',
                         'approval_source': 'auto_approve'
                     }).eq('id', pending_id).execute()
@@ -1140,7 +1144,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
                 if memories:
                     meta["contributing_memories"] = memories
 
-            supabase.table('graph_edges').upsert({
+            await asupabase.table('graph_edges').upsert({
                 'source_node_id': s_id,
                 'target_node_id': t_id,
                 'relationship': rel,
@@ -1149,7 +1153,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
                 'metadata': meta
             }, on_conflict="source_node_id,relationship,target_node_id", ignore_duplicates=True).execute()
             
-            supabase.table('pending_graph_edges').update({
+            await asupabase.table('pending_graph_edges').update({
                 'status': 'approved',
                 'approval_source': 'auto_approve' if auto_decided else 'hitl',
                 'source_label': s_label,
@@ -1196,10 +1200,10 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
             try:
                 if rel == "WORKS_AT" and pe.get('source_type') == 'person':
                     # Backfill organization_name into the person node's enrichment
-                    t_node_res = supabase.table('graph_nodes').select('label').eq('id', t_id).limit(1).execute()
+                    t_node_res = await asupabase.table('graph_nodes').select('label').eq('id', t_id).limit(1).execute()
                     t_label = t_node_res.data[0]['label'] if t_node_res and t_node_res.data and t_node_res.data[0].get('label') else None
                     if t_label:
-                        node_res = maybe_single_safe(supabase.table('graph_nodes').select('metadata').eq('id', s_id))
+                        node_res = await amaybe_single_safe(asupabase.table('graph_nodes').select('metadata').eq('id', s_id))
                         if node_res and node_res.data:
                             node_meta = node_res.data.get('metadata') or {}
                             if isinstance(node_meta, str):
@@ -1210,7 +1214,7 @@ async def process_pending_edge_decision(pending_id: int, decision: str, new_sour
                             enrich = node_meta.get('enrichment') or {}
                             enrich['organization_name'] = t_label
                             node_meta['enrichment'] = enrich
-                            supabase.table('graph_nodes').update({'metadata': node_meta}).eq('id', s_id).execute()
+                            await asupabase.table('graph_nodes').update({'metadata': node_meta}).eq('id', s_id).execute()
                             audit_log_sync("pulse", "INFO", f"Backfill: Set enrichment.organization_name for '{s_label}' via WORKS_AT approval")
             except Exception as backfill_err:
                 audit_log_sync("pulse", "WARNING", f"Edge approval backfill failed for {rel} '{s_label}': {backfill_err}")
@@ -1229,7 +1233,7 @@ async def write_graph_edges_for_task(task_id: int, task_title: str, task_descrip
     Now also creates task→org BELONGS_TO edge when organization_id is provided.
     """
     try:
-        supabase.table('graph_nodes').upsert({
+        await asupabase.table('graph_nodes').upsert({
             "label": task_title,
             "type": "task",
             "normalized_label": normalize_label(task_title),
@@ -1242,7 +1246,7 @@ async def write_graph_edges_for_task(task_id: int, task_title: str, task_descrip
 
         # Task→Organization BELONGS_TO edge
         if organization_id:
-            org_node = supabase.table('graph_nodes') \
+            org_node = await asupabase.table('graph_nodes') \
                 .select('id, label') \
                 .eq('type', 'organization') \
                 .filter('metadata->>organization_id', 'eq', str(organization_id)) \
@@ -1251,7 +1255,7 @@ async def write_graph_edges_for_task(task_id: int, task_title: str, task_descrip
 
             if not org_node or not org_node.data:
                 # Fallback: match by db_record_id
-                org_node = supabase.table('graph_nodes') \
+                org_node = await asupabase.table('graph_nodes') \
                     .select('id, label') \
                     .eq('type', 'organization') \
                     .eq('db_record_id', str(organization_id)) \
@@ -1279,16 +1283,17 @@ async def write_graph_edges_for_task(task_id: int, task_title: str, task_descrip
         if people_cache is not None:
             all_people = people_cache
         else:
-            all_people = supabase.table('graph_nodes') \
+            people_res = await asupabase.table('graph_nodes') \
                 .select('id, label') \
                 .eq('type', 'person') \
                 .eq('is_current', True) \
-                .execute().data or []
+                .execute()
+            all_people = people_res.data or []
 
         for person in (all_people or []):
             pname = person.get('name') or person.get('label') or ''
             if pname.lower() in search_text:
-                person_node = supabase.table('graph_nodes') \
+                person_node = await asupabase.table('graph_nodes') \
                     .select('id') \
                     .eq('type', 'person') \
                     .eq('is_current', True) \
@@ -1320,15 +1325,15 @@ async def hybrid_search_graph(query: str, node_id: str = None) -> str:
     try:
         nodes_res = None
         if node_id:
-            nodes_res = supabase.table('graph_nodes').select('id, label').eq('id', node_id).limit(1).execute()
+            nodes_res = await asupabase.table('graph_nodes').select('id, label').eq('id', node_id).limit(1).execute()
             
         if not nodes_res or not nodes_res.data:
-            nodes_res = supabase.table('graph_nodes').select('id, label').ilike('label', f'%{query}%').eq('is_current', True).limit(1).execute()
+            nodes_res = await asupabase.table('graph_nodes').select('id, label').ilike('label', f'%{query}%').eq('is_current', True).limit(1).execute()
 
         if not nodes_res.data:
             try:
                 query_embedding = (await get_embedding(query)).vector
-                vector_res = supabase.rpc('match_graph_nodes', {
+                vector_res = await asupabase.rpc('match_graph_nodes', {
                     'query_embedding': query_embedding,
                     'match_count': 1,
                     'match_threshold': 0.65
@@ -1344,7 +1349,7 @@ async def hybrid_search_graph(query: str, node_id: str = None) -> str:
         primary_node = nodes_res.data[0]
         primary_id = primary_node['id']
 
-        edges_res = supabase.table('graph_edges').select('source_node_id, target_node_id, relationship').or_(f'source_node_id.eq.{primary_id},target_node_id.eq.{primary_id}').eq('is_current', True).execute()
+        edges_res = await asupabase.table('graph_edges').select('source_node_id, target_node_id, relationship').or_(f'source_node_id.eq.{primary_id},target_node_id.eq.{primary_id}').eq('is_current', True).execute()
 
         if not edges_res.data:
             return ""
@@ -1358,7 +1363,7 @@ async def hybrid_search_graph(query: str, node_id: str = None) -> str:
                 connected_ids.add(edge['source_node_id'])
 
         if connected_ids:
-            labels_res = supabase.table('graph_nodes').select('id, label').in_('id', list(connected_ids)).execute()
+            labels_res = await asupabase.table('graph_nodes').select('id, label').in_('id', list(connected_ids)).execute()
             if not labels_res.data:
                 return ""
             label_map = {str(n['id']): n['label'] for n in labels_res.data}
@@ -1388,7 +1393,7 @@ async def get_graph_centrality_context() -> str:
     """
     try:
         # Get the top 5 most connected nodes
-        res = supabase.rpc('get_most_connected_nodes', {'limit_count': 3}).execute()
+        res = await asupabase.rpc('get_most_connected_nodes', {'limit_count': 3}).execute()
         
         if not res.data:
             return ""
@@ -1422,7 +1427,7 @@ async def check_task_dependencies(active_tasks: list) -> str:
             task_title = task.get('title', '')
 
             # Get the graph node for this task
-            task_node_res = supabase.table('graph_nodes') \
+            task_node_res = await asupabase.table('graph_nodes') \
                 .select('id') \
                 .eq('type', 'task') \
                 .filter('metadata->>task_id', 'eq', str(task_id)) \
@@ -1436,7 +1441,7 @@ async def check_task_dependencies(active_tasks: list) -> str:
             task_node_id = task_node_res.data['id']
 
             # Find edges where this task DEPENDS_ON another task
-            dep_edges = supabase.table('graph_edges') \
+            dep_edges = await asupabase.table('graph_edges') \
                 .select('source_node_id, target_node_id, relationship, metadata') \
                 .eq('source_node_id', task_node_id) \
                 .eq('is_current', True) \
@@ -1449,7 +1454,7 @@ async def check_task_dependencies(active_tasks: list) -> str:
                     target_id = edge.get('target_node_id')
 
                     # Find the target node's task_id from metadata
-                    target_node_res = supabase.table('graph_nodes') \
+                    target_node_res = await asupabase.table('graph_nodes') \
                         .select('id, label, metadata') \
                         .eq('id', target_id) \
                         .maybe_single() \
@@ -1515,7 +1520,7 @@ async def analyze_communication_patterns(people: list) -> str:
             # Person node: people now come from graph_nodes (consolidation),
             # so person_id IS the node id itself.
             person_node_id = str(person_id)
-            person_node_res = supabase.table('graph_nodes') \
+            person_node_res = await asupabase.table('graph_nodes') \
                 .select('id') \
                 .eq('id', person_node_id) \
                 .eq('type', 'person') \
@@ -1527,7 +1532,7 @@ async def analyze_communication_patterns(people: list) -> str:
                 continue
 
             # Count INVOLVES edges (task involvements)
-            involves_edges = supabase.table('graph_edges') \
+            involves_edges = await asupabase.table('graph_edges') \
                 .select('source_node_id, target_node_id') \
                 .eq('relationship', 'INVOLVES') \
                 .or_(f'source_node_id.eq.{person_node_id},target_node_id.eq.{person_node_id}') \
@@ -1540,7 +1545,7 @@ async def analyze_communication_patterns(people: list) -> str:
             email_count = 0
             try:
                 linked = person.get('people_id') or person.get('db_record_id')
-                email_res = supabase.table('messages') \
+                email_res = await asupabase.table('messages') \
                     .select('id', count='exact') \
                     .eq('channel', 'email') \
                     .or_(f'sender_name.ilike.%{person_name}%' + (f',linked_person_id.eq.{linked}' if linked else '')) \
@@ -1617,7 +1622,7 @@ async def fetch_graph_task_context(people: list, active_tasks: list) -> str:
             legacy = p.get('people_id')
             if legacy and p.get('name'):
                 people_ids[str(legacy)] = p['name']
-        person_nodes = supabase.table('graph_nodes') \
+        person_nodes = await asupabase.table('graph_nodes') \
             .select('id, label, metadata') \
             .eq('type', 'person') \
             .eq('is_current', True) \
@@ -1639,7 +1644,7 @@ async def fetch_graph_task_context(people: list, active_tasks: list) -> str:
                 node_to_person[node['id']] = people_ids[str(people_id)]
 
         # Find INVOLVES edges linking person nodes to task nodes
-        task_nodes = supabase.table('graph_nodes') \
+        task_nodes = await asupabase.table('graph_nodes') \
             .select('id, metadata') \
             .eq('type', 'task') \
             .eq('is_current', True) \
@@ -1668,7 +1673,7 @@ async def fetch_graph_task_context(people: list, active_tasks: list) -> str:
             return ""
 
         # Get INVOLVES edges
-        edges_res = supabase.table('graph_edges') \
+        edges_res = await asupabase.table('graph_edges') \
             .select('source_node_id, target_node_id, relationship') \
             .in_('relationship', ['INVOLVES', 'MANAGES', 'ASSIGNED_TO']) \
             .eq('is_current', True) \
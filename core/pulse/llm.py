@@ -1,6 +1,7 @@
 from core.services.db import tenant_aware_client
 from core.llm import get_embedding
 from core.lib.audit_logger import audit_log_sync
+from core.retrieval.similarity import cosine_similarity as _cosine_similarity
 
 supabase = tenant_aware_client()
 
@@ -52,12 +53,5 @@ async def is_already_in_email_queue(title: str) -> bool:
 
 
 def cosine_similarity(a: list, b: list) -> float:
-    """Cosine similarity between two vectors."""
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = sum(x * x for x in a) ** 0.5
-    norm_b = sum(x * x for x in b) ** 0.5
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+    """Cosine similarity between two vectors (core.retrieval.similarity)."""
+    return _cosine_similarity(a, b)
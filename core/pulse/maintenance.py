@@ -10,11 +10,12 @@ Sweeps restored (from the old architecture):
   3. run_people_enrichment()    — enrich people table from graph edges
   4. run_weekly_housekeeping()  — stale tasks, pending nodes/edges, clarifications
   5. run_retry_failed_runs()    — retry failed retrieval index runs
+  6. run_credit_reconcile()     — re-derive the LLM credit balance from the ledger
 """
 
 import json
 from datetime import datetime, timezone, timedelta
-from core.services.db import tenant_aware_client
+from core.services.db import get_tenant, tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
 from core.retrieval.config import config as retrieval_config
 from core.retrieval.pipeline import process_pending_index_jobs, retry_failed_index_runs
@@ -103,6 +104,23 @@ def run_graph_edge_expiry(expiry_days: int = 90) -> int:
         return 0
 
 
+def run_credit_reconcile() -> float | None:
+    """Re-derive the current tenant's LLM credit balance (db/110) from the
+    llm_spend ledger, correcting any drift from fallback inserts or a lost
+    increment. Returns the drift in USD, or None (no tenant / not deployed).
+    """
+    uid = get_tenant()
+    if not uid:
+        return None
+    from core.llm.budget import reconcile_credit_balance
+    drift = reconcile_credit_balance(uid)
+    if drift is not None:
+        level = "WARNING" if abs(drift) >= 0.01 else "INFO"
+        audit_log_sync("maintenance", level,
+                       f"Credit reconcile: balance corrected by ${drift:+.4f}")
+    return drift
+
+
 def run_weekly_housekeeping() -> dict:
     """Full weekly sweep — stale tasks, pending nodes/edges, clarifications.
 
@@ -1,8 +1,9 @@
 from core.context import execute_context_strategy, BRIEFING_CONFIG, HINDSIGHT_CONFIG
-from core.services.db import tenant_aware_client
+from core.services.db import _missing_table_error, exec_query, tenant_aware_client
 from core.llm import get_embedding
 import asyncio
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 from core.lib.audit_logger import audit_log_sync
 from core.lib.time_utils import age_tag
 from core.llm.fallback import generate_content_with_fallback
@@ -210,44 +211,83 @@ async def generate_after_action_report() -> str:
         audit_log_sync("pulse", "ERROR", f"Daily reflection error: {e}")
     return ""
 
-async def detect_temporal_patterns() -> str:
+# ±days around today for the seasonal variant of detect_temporal_patterns;
+# 0 keeps the section strictly "on this day".
+TEMPORAL_WINDOW_DAYS = 0
+TEMPORAL_MAX_MEMORIES = 10
+
+# db/109 memories_on_this_day: None = untried, False = not deployed (use the
+# recent-rows fallback), True = in use.
+_on_this_day_rpc: Optional[bool] = None
+
+
+async def _on_this_day_memories(today, window_days: int) -> Optional[list]:
+    """Previous years' memories within ±window_days of today's month-day,
+    newest first — one indexed RPC. None means fall back."""
+    global _on_this_day_rpc
+    if _on_this_day_rpc is False:
+        return None
+    try:
+        res = await exec_query(supabase.rpc('memories_on_this_day', {
+            'p_day': today.isoformat(),
+            'p_window_days': window_days,
+            'p_limit': TEMPORAL_MAX_MEMORIES,
+        }))
+    except Exception as e:
+        if _missing_table_error(str(e), "memories_on_this_day"):
+            _on_this_day_rpc = False
+        else:
+            audit_log_sync("pulse", "WARNING", f"memories_on_this_day failed, using recent memories: {e}")
+        return None
+    _on_this_day_rpc = True
+    return res.data or []
+
+
+async def _recent_memories_on_day(today) -> list:
+    """Pre-db/109 fallback: same month-day among the 100 newest memories
+    (PostgREST's LIKE operator cannot be applied to timestamptz columns)."""
+    month_day = f"-{today.month:02}-{today.day:02}"
+    memories_res = await exec_query(
+        supabase.table('memories')
+        .select('content, memory_type, created_at')
+        .order('created_at', desc=True)
+        .limit(100)
+    )
+    return [
+        m for m in (memories_res.data or [])
+        if month_day in m.get('created_at', '')
+    ][:TEMPORAL_MAX_MEMORIES]
+
+
+async def detect_temporal_patterns(window_days: int = TEMPORAL_WINDOW_DAYS) -> str:
     """
     TEMPORAL PATTERN DETECTOR: Surfaces 'On this day' insights from memories
     and detects seasonal patterns in productivity/mood.
+
+    Memories come from previous years via the db/109 month-day index;
+    `window_days` > 0 widens "this day" to ±N days (seasonal patterns).
     """
     try:
         from datetime import date
 
         today = date.today()
         today_str = today.strftime("%B %d")
-        month_day = f"-{today.month:02}-{today.day:02}"
-
-        # Fetch all memories and filter by month-day in Python
-        # (PostgREST's LIKE operator cannot be applied to timestamptz columns)
-        memories_res = supabase.table('memories') \
-            .select('content, memory_type, created_at') \
-            .order('created_at', desc=True) \
-            .limit(100) \
-            .execute()
-
-        if not memories_res.data:
-            return ""
 
-        on_this_day_memories = [
-            m for m in memories_res.data
-            if month_day in m.get('created_at', '')
-        ][:10]
+        on_this_day_memories = await _on_this_day_memories(today, window_days)
+        if on_this_day_memories is None:
+            on_this_day_memories = await _recent_memories_on_day(today)
 
         if not on_this_day_memories:
             return ""
 
-        lines = [f"📅 TEMPORAL PATTERNS (On this day {today_str}):"]
+        header = f"On this day {today_str}" if window_days <= 0 else f"Around {today_str}, ±{window_days} days"
+        lines = [f"📅 TEMPORAL PATTERNS ({header}):"]
         seen = set()
 
         for m in on_this_day_memories:
-            content = m.get('content', '')[:100]
-            mem_type = m.get('memory_type', '')
-            created = m.get('created_at', '')[:4]  # Just the year
+            content = (m.get('content') or '')[:100]
+            mem_type = m.get('memory_type') or ''
+            created = (m.get('created_at') or '')[:4]  # Just the year
 
             if content in seen:
                 continue
@@ -3,7 +3,7 @@
 Algorithm:
 1. Build memory-to-entity bipartite graph from retrieval tables
 2. Compute seed weights (specificity × rarity_factor)
-3. Run PPR from each seed (damping=0.85, iterations=20)
+3. Run PPR from every seed in one batched solve (damping=0.85, iterations=20)
 4. Assign memories using percentile-rank (70th percentile threshold)
 5. Compute quality_score (5 components)
 6. Match against existing clusters (fingerprint + Jaccard)
@@ -18,9 +18,10 @@ import hashlib
 from collections import Counter, defaultdict
 from datetime import datetime, timezone
 
-from core.services.db import maybe_single_safe, tenant_aware_client
+from core.services.db import maybe_single_safe, scan_rows, tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
-from core.retrieval.ppr import personalized_pagerank, build_adjacency_from_edges, normalize_scores
+from core.retrieval.ppr import personalized_pagerank_batch, build_adjacency_from_edges, normalize_scores
+from core.retrieval.similarity import mean_cross_similarity, mean_pairwise_similarity
 
 supabase = tenant_aware_client()
 
@@ -36,21 +37,15 @@ JACCARD_MERGE_THRESHOLD = 0.7        # Jaccard > 0.7 → merge into existing
 JACCARD_RELATED_THRESHOLD = 0.4      # Jaccard 0.4-0.7 → new related cluster
 FINGERPRINT_SEED_COUNT = 5
 FINGERPRINT_MEMBER_COUNT = 5
+NODE_FETCH_CHUNK = 200               # ids per .in_() — keeps the request URL bounded
 
 
 def _fetch_all_degrees() -> dict:
     """Batch-fetch degree for all phrase nodes. Returns {node_id: degree}."""
     try:
-        from_ret = supabase.table("retrieval_edges") \
-            .select("from_node_id") \
-            .execute()
-        to_ret = supabase.table("retrieval_edges") \
-            .select("to_node_id") \
-            .execute()
         degree_map = defaultdict(int)
-        for row in (from_ret.data or []):
+        for row in scan_rows(supabase, "retrieval_edges", "from_node_id, to_node_id"):
             degree_map[row["from_node_id"]] += 1
-        for row in (to_ret.data or []):
             degree_map[row["to_node_id"]] += 1
         return dict(degree_map)
     except Exception:
@@ -103,6 +98,35 @@ def _percentile_threshold(scores: list, percentile: float = 0.7) -> float:
     return sorted_scores[index]
 
 
+def _run_seed_ppr(
+    adjacency: dict,
+    seeds: list,  # list of {"id", "weight", ...} seed dicts
+    phrase_to_memories: dict,  # phrase node_id → set(memory_id)
+) -> dict:  # seed_node_id → {memory_id: score}
+    """Run PPR from every seed in one batched solve, aggregated to memories.
+
+    All seeds share the adjacency, so they are solved together as columns of
+    one personalization matrix (see personalized_pagerank_batch) instead of
+    walking the graph once per seed.
+    """
+    personalizations = {seed["id"]: {seed["id"]: seed["weight"]} for seed in seeds}
+    ppr_by_seed = personalized_pagerank_batch(
+        adjacency, personalizations, damping=PPR_DAMPING, iterations=PPR_ITERATIONS,
+    )
+
+    ppr_results = {}
+    for seed_id, ppr_raw in ppr_by_seed.items():
+        ppr_norm = normalize_scores(ppr_raw)
+
+        # Aggregate phrase scores → memory scores
+        mem_scores = defaultdict(float)
+        for phrase_id, phrase_score in ppr_norm.items():
+            for mid in phrase_to_memories.get(phrase_id, []):
+                mem_scores[mid] = max(mem_scores[mid], phrase_score)
+        ppr_results[seed_id] = dict(mem_scores)
+    return ppr_results
+
+
 def _assign_memories_to_clusters(
     ppr_results: dict,  # seed_node_id → {memory_id: score}
 ) -> dict:  # memory_id → [(cluster_seed_id, score)]
@@ -145,24 +169,12 @@ def _compute_quality_score(
 
     # 1. Intra-cluster similarity
     embeddings = [m.get("embedding") for m in cluster_memories if m.get("embedding")]
-    if len(embeddings) >= 2:
-        sims = []
-        for i in range(len(embeddings)):
-            for j in range(i + 1, len(embeddings)):
-                sim = _cosine_sim(embeddings[i], embeddings[j])
-                sims.append(sim)
-        intra_sim = sum(sims) / len(sims) if sims else 0.0
-    else:
-        intra_sim = 0.0
+    intra_sim = mean_pairwise_similarity(embeddings)
 
     # 2. Phrase-node concentration
     seed_embeddings = [s.get("embedding") for s in seed_phrase_nodes if s.get("embedding")]
     if seed_embeddings and embeddings:
-        concentration_sims = []
-        for seed_emb in seed_embeddings[:3]:
-            for mem_emb in embeddings[:5]:
-                concentration_sims.append(_cosine_sim(seed_emb, mem_emb))
-        concentration = sum(concentration_sims) / len(concentration_sims) if concentration_sims else 0.0
+        concentration = mean_cross_similarity(seed_embeddings[:3], embeddings[:5])
     else:
         concentration = 0.0
 
@@ -229,18 +241,6 @@ def _compute_entropy_modifier(memory_types: list) -> float:
     return 1.0 - (normalized_entropy * 0.3)
 
 
-def _cosine_sim(a: list, b: list) -> float:
-    """Cosine similarity between two vectors."""
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    na = sum(x * x for x in a) ** 0.5
-    nb = sum(y * y for y in b) ** 0.5
-    if na < 1e-10 or nb < 1e-10:
-        return 0.0
-    return dot / (na * nb)
-
-
 def _std_dev_days(dates: list) -> float:
     """Standard deviation of dates in days."""
     if len(dates) < 2:
@@ -315,20 +315,20 @@ async def build_memory_clusters() -> dict:
     }
 
     try:
-        # 1. Fetch all indexed memories with their passage links
-        memories_res = supabase.table("memories") \
-            .select("id, content, memory_type, created_at, embedding") \
-            .eq("embedding_status", "success") \
-            .execute()
-        all_memories = memories_res.data or []
-        audit["total_memories"] = len(all_memories)
-
-        # Sanitize embedding values — PostgreSQL vector values may be
-        # returned as a JSON string ("[0.1, 0.2, ...]") or as a list with
-        # string-typed entries (["0.5", 0.3]) after migrations or backfills.
-        # Either form crashes _cosine_sim() (float * str → TypeError).
-        for m in all_memories:
+        # 1. Fetch all indexed memories with their passage links. Every
+        # table below is keyset-scanned (scan_rows): a bare .execute() was
+        # silently truncated at the PostgREST max-rows cap, and the links
+        # and edges are folded into their maps a page at a time.
+        all_memories = []
+        for m in scan_rows(supabase, "memories", "id, content, memory_type, created_at, embedding",
+                           filters=lambda q: q.eq("embedding_status", "success")):
+            # Sanitize embedding values — PostgreSQL vector values may be
+            # returned as a JSON string ("[0.1, 0.2, ...]") or as a list with
+            # string-typed entries (["0.5", 0.3]) after migrations or backfills.
+            # Either form used to crash the per-pair cosine (float * str → TypeError).
             m["embedding"] = _sanitize_embedding(m.get("embedding"))
+            all_memories.append(m)
+        audit["total_memories"] = len(all_memories)
 
         if len(all_memories) < 10:
             audit_log_sync("memory_clusters", "INFO", f"Too few memories ({len(all_memories)}), skipping clustering")
@@ -337,24 +337,18 @@ async def build_memory_clusters() -> dict:
         memory_map = {m["id"]: m for m in all_memories}
 
         # 2. Fetch passage → memory links
-        link_res = supabase.table("retrieval_memory_bundle_links") \
-            .select("memory_id, passage_id") \
-            .execute()
         passage_to_memories = defaultdict(set)
         memory_to_passages = defaultdict(set)
-        for link in (link_res.data or []):
+        for link in scan_rows(supabase, "retrieval_memory_bundle_links", "memory_id, passage_id"):
             mid = link["memory_id"]
             pid = link["passage_id"]
             passage_to_memories[pid].add(mid)
             memory_to_passages[mid].add(pid)
 
         # 3. Fetch passage → phrase node links
-        ppl_res = supabase.table("retrieval_passage_phrase_links") \
-            .select("passage_id, node_id, weight") \
-            .execute()
         passage_to_nodes = defaultdict(list)
         node_to_passages = defaultdict(set)
-        for ppl in (ppl_res.data or []):
+        for ppl in scan_rows(supabase, "retrieval_passage_phrase_links", "passage_id, node_id"):
             pid = ppl["passage_id"]
             nid = ppl["node_id"]
             passage_to_nodes[pid].append(nid)
@@ -376,18 +370,17 @@ async def build_memory_clusters() -> dict:
             audit_log_sync("memory_clusters", "INFO", "No phrase nodes found, skipping")
             return audit
 
-        nodes_res = supabase.table("retrieval_phrase_nodes") \
-            .select("id, normalized_text, node_type") \
-            .in_("id", list(all_node_ids)) \
-            .execute()
-        node_map = {n["id"]: n for n in (nodes_res.data or [])}
+        node_map = {}
+        node_ids = sorted(all_node_ids)
+        for i in range(0, len(node_ids), NODE_FETCH_CHUNK):
+            chunk = node_ids[i:i + NODE_FETCH_CHUNK]
+            for n in scan_rows(supabase, "retrieval_phrase_nodes", "id, normalized_text, node_type",
+                               filters=lambda q, chunk=chunk: q.in_("id", chunk)):
+                node_map[n["id"]] = n
 
         # Fetch node stats for specificity
-        stats_res = supabase.table("retrieval_node_stats") \
-            .select("node_id, specificity_score, df") \
-            .execute()
         stats_map = {}
-        for s in (stats_res.data or []):
+        for s in scan_rows(supabase, "retrieval_node_stats", "node_id, specificity_score, df"):
             stats_map[s["node_id"]] = s
 
         # 6. Batch-fetch all degrees and compute seed weights
@@ -423,10 +416,10 @@ async def build_memory_clusters() -> dict:
 
         # 7. Run PPR from each seed
         # Build adjacency from retrieval_edges
-        edges_res = supabase.table("retrieval_edges") \
-            .select("from_node_id, to_node_id, weight") \
-            .execute()
-        edges = [(e["from_node_id"], e["to_node_id"], e.get("weight", 1.0)) for e in (edges_res.data or [])]
+        edges = [
+            (e["from_node_id"], e["to_node_id"], e.get("weight", 1.0))
+            for e in scan_rows(supabase, "retrieval_edges", "from_node_id, to_node_id, weight")
+        ]
         adjacency = build_adjacency_from_edges(edges)
 
         # Map phrase nodes → memory IDs (for PPR result aggregation)
@@ -435,19 +428,7 @@ async def build_memory_clusters() -> dict:
             for nid in nids:
                 phrase_to_memories[nid].add(mid)
 
-        ppr_results = {}  # seed_id → {memory_id: score}
-        for seed in seeds:
-            seed_id = seed["id"]
-            personalization = {seed_id: seed["weight"]}
-            ppr_raw = personalized_pagerank(adjacency, personalization, damping=PPR_DAMPING, iterations=PPR_ITERATIONS)
-            ppr_norm = normalize_scores(ppr_raw)
-
-            # Aggregate phrase scores → memory scores
-            mem_scores = defaultdict(float)
-            for phrase_id, phrase_score in ppr_norm.items():
-                for mid in phrase_to_memories.get(phrase_id, []):
-                    mem_scores[mid] = max(mem_scores[mid], phrase_score)
-            ppr_results[seed_id] = dict(mem_scores)
+        ppr_results = _run_seed_ppr(adjacency, seeds, phrase_to_memories)
 
         # 8. Assign memories to clusters
         assignments = _assign_memories_to_clusters(ppr_results)
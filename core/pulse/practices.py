@@ -1,6 +1,6 @@
 from core.llm.constants import SYNTHESIS_MODEL
 from core.services.db import core_config_upsert, tenant_aware_client
-from core.llm import get_embedding
+from core.llm import get_embedding, get_embeddings
 import json
 from datetime import datetime, timezone, timedelta
 from core.lib.time_utils import IST_TIMEZONE
@@ -144,8 +144,9 @@ async def detect_practices():
 
         # ── Step 4: Generate embeddings for all candidates ──
         print(f"📍 detect_practices: Generating embeddings for {len(candidates)} candidates...")
-        for c in candidates:
-            c['embedding'] = (await get_embedding(c['text'])).vector
+        embeddings = await get_embeddings([c['text'] for c in candidates])
+        for c, emb in zip(candidates, embeddings):
+            c['embedding'] = emb.vector
 
         # ── Step 5: Cluster by cosine similarity ──
         clusters = []
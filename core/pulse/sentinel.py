@@ -1,8 +1,10 @@
 from core.context import execute_context_strategy, PRE_FLIGHT_CONFIG
 from core.llm.constants import SYNTHESIS_MODEL
 from core.services.db import (
-    active_user_ids, resolve_telegram_chat_id, tenant_aware_client, tenant_scope,
+    active_user_ids, exec_query, resolve_telegram_chat_id, tenant_aware_client,
+    tenant_scope,
 )
+import asyncio
 import os
 import hashlib
 import json
@@ -674,8 +676,10 @@ Context:
 
         # --- PIGGYBACK: P6 Enrichment Queue Consumer ---
         # Processes pending task_graph and note_enrich jobs that were queued
-        # during create_task_direct / create_note_direct. Runs every sentinel cycle
-        # (every 5 min) up to 3 jobs per cycle to stay within the 30s timeout.
+        # during create_task_direct / create_note_direct. The drain_job_queue
+        # worker (core/lib/job_runner.py, sized by /api/queue-cron) does the
+        # bulk of the work; this is the per-tenant backstop — up to 3 of this
+        # tenant's jobs per cycle, through the same leased claim.
         try:
             from core.lib.enrichment_queue import process_pending_enrichment
             last_enrich_sweep = supabase.table('audit_logs') \
@@ -719,8 +723,8 @@ Context:
         # frequency-gated via audit-log dedup like the zombie sweep.
         try:
             from core.pulse.maintenance import (
-                run_graph_edge_expiry, run_index_queue, run_raw_dump_cleanup,
-                run_retry_failed_runs, run_weekly_housekeeping,
+                run_credit_reconcile, run_graph_edge_expiry, run_index_queue,
+                run_raw_dump_cleanup, run_retry_failed_runs, run_weekly_housekeeping,
             )
             # Index queue: every cycle, capped — matches the documented
             # "sentinel piggyback every ~5 min" design (no-op when retrieval
@@ -761,6 +765,18 @@ Context:
             if not last_maint.data:
                 run_graph_edge_expiry()
 
+            # LLM credit balance reconcile (db/110): at most once per day.
+            last_maint = await exec_query(
+                supabase.table('audit_logs')
+                .select('id')
+                .eq('service', 'maintenance')
+                .ilike('message', '%Credit reconcile%')
+                .gte('created_at', (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat())
+                .limit(1)
+            )
+            if not last_maint.data:
+                await asyncio.to_thread(run_credit_reconcile)
+
             # Weekly housekeeping: self-deduped (20h) inside the function.
             run_weekly_housekeeping()
         except Exception as maint_err:
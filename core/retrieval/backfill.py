@@ -1,6 +1,6 @@
 import asyncio
 from typing import Optional
-from core.services.db import tenant_aware_client
+from core.services.db import scan_pages, scan_rows, tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
 from core.retrieval.config import config, BACKFILL_BATCH_SIZE
 from core.retrieval.pipeline import index_memory
@@ -49,13 +49,11 @@ async def _save_checkpoint(memory_id: int):
 
 async def _get_indexed_ids() -> set:
     """Get set of memory IDs that have a terminal index run."""
-    res = supabase.table("retrieval_index_runs") \
-        .select("source_id") \
-        .eq("source_type", "memory") \
-        .in_("status", ("completed", "dead_letter")) \
-        .execute()
     ids = set()
-    for r in (res.data or []):
+    for r in scan_rows(
+        supabase, "retrieval_index_runs", "source_id",
+        filters=lambda q: q.eq("source_type", "memory").in_("status", ("completed", "dead_letter")),
+    ):
         try:
             ids.add(int(r["source_id"]))
         except (ValueError, TypeError):
@@ -121,39 +119,21 @@ async def backfill_memories(
 
     # --- Forward pass: process all memories in ascending ID order ---
     checkpoint = resume_from_id
-
-    while True:
-        query = supabase.table("memories") \
-            .select("id, content, memory_type, source, metadata, created_at") \
-            .eq("is_current", True) \
-            .eq("pruned", False) \
-            .not_.is_("embedding", "null") \
-            .order("id") \
-            .limit(batch_size)
-
-        if checkpoint:
-            query = query.gt("id", checkpoint)
-
-        res = query.execute()
-        batch = res.data if res and res.data else []
-
-        if not batch:
-            break
-
-        # Filter out already-indexed memories
-        batch = [r for r in batch if r["id"] not in done_ids]
+    pages = scan_pages(
+        supabase, "memories", "id, content, memory_type, source, metadata, created_at",
+        filters=lambda q: q.eq("is_current", True).eq("pruned", False).not_.is_("embedding", "null"),
+        page_size=batch_size,
+        after=checkpoint or None,
+    )
+
+    for page in pages:
+        # Filter out already-indexed memories; a fully filtered page still
+        # advances the checkpoint past it.
+        batch = [r for r in page if r["id"] not in done_ids]
+        checkpoint = page[-1]["id"]
         if not batch:
-            checkpoint = checkpoint or 0
-            checkpoint = max(r["id"] for r in (res.data or [])) if res and res.data else checkpoint
-            # If batch is fully filtered, advance checkpoint beyond this batch
-            # and continue to next batch
-            if len(batch) == 0 and res.data:
-                last_in_raw = res.data[-1]["id"]
-                checkpoint = last_in_raw
-                await _save_checkpoint(last_in_raw)
-                if len(res.data) < batch_size:
-                    break
-                continue
+            await _save_checkpoint(checkpoint)
+            continue
 
         total += len(batch)
 
@@ -166,16 +146,12 @@ async def backfill_memories(
 
         # Save checkpoint at end of batch
         last_id = batch[-1]["id"]
-        checkpoint = last_id
-        await _save_checkpoint(last_id)
+        await _save_checkpoint(checkpoint)
 
         print(f"[BACKFILL] Batch: {processed} processed, {succeeded} OK, "
               f"{failed} fail, {skipped} skip | Last ID: {last_id} | "
               f"~{total}/{total} from batch | continues...", flush=True)
 
-        if len(res.data) < batch_size:
-            break
-
     # --- Partials sweep: pick up any completed_partial or failed runs ---
     partials = supabase.table("retrieval_index_runs") \
         .select("source_type, source_id, retry_count") \
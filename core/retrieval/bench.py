@@ -0,0 +1,511 @@
+"""Offline latency benchmark for associative_retrieve.
+
+eval.py answers "is retrieval right?" against gold data; this answers "is it
+fast?" with a reproducible baseline. A synthetic phrase graph of configurable
+size is served by an in-memory PostgREST stand-in (`FakePostgrest`) and an
+in-memory Redis (`FakeRedis`); the LLM-backed steps (entity extraction, query
+embedding, person resolution) are deterministic stand-ins. Every other line
+of the pipeline runs for real.
+
+Per-stage wall time comes from the pipeline's own debug_trace["stage_ms"],
+so the stages here are exactly the ones associative_retrieve marks:
+entity_resolution, phrase_candidates, subgraph_edges, ppr, aggregation,
+boosts, bundle_assembly.
+
+Output is plain JSON with sorted keys — commit it, rerun on a branch, diff.
+Pass rtt_ms to charge each PostgREST round trip a fixed delay; at 0 the
+numbers are pure in-process cost (query shaping, parsing, scoring).
+
+    python scripts/bench_retrieval.py --nodes 1000 10000 100000 --queries 50
+
+Memory is roughly 3 KB per phrase node: 1M nodes needs several GB.
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+from unittest.mock import patch
+
+from core.llm.response import EmbeddingResult
+from core.retrieval.similarity import cosine_scores
+
+STAGES = (
+    "entity_resolution",
+    "phrase_candidates",
+    "subgraph_edges",
+    "ppr",
+    "aggregation",
+    "boosts",
+    "bundle_assembly",
+)
+PERCENTILES = (50, 95, 99)
+SCHEMA_VERSION = 1
+
+DEFAULT_DIM = 768
+_VECTOR_POOL = 256          # distinct passage embeddings (shared text, bounded memory)
+_LINKS_PER_PASSAGE = 4
+
+# (parent table, embedded table) → (parent column, child column, one-to-many)
+_RELATIONS = {
+    ("retrieval_passage_phrase_links", "retrieval_passages"): ("passage_id", "id", False),
+    ("retrieval_passage_phrase_links", "retrieval_phrase_nodes"): ("node_id", "id", False),
+    ("retrieval_passages", "retrieval_memory_bundle_links"): ("id", "passage_id", True),
+    ("retrieval_phrase_nodes", "retrieval_node_stats"): ("id", "node_id", False),
+}
+
+
+# ── In-memory tables ───────────────────────────────────────────────────────
+
+class _Table:
+    """Rows as tuples plus lazily built hash indexes per column."""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = tuple(columns)
+        self.pos = {c: i for i, c in enumerate(self.columns)}
+        self.rows: List[tuple] = []
+        self._indexes: Dict[str, Dict[object, List[int]]] = {}
+
+    def index(self, column: str) -> Dict[object, List[int]]:
+        idx = self._indexes.get(column)
+        if idx is None:
+            idx = {}
+            i = self.pos[column]
+            for n, row in enumerate(self.rows):
+                idx.setdefault(row[i], []).append(n)
+            self._indexes[column] = idx
+        return idx
+
+    def lookup(self, column: str, values) -> List[int]:
+        idx = self.index(column)
+        out: List[int] = []
+        for v in values:
+            out.extend(idx.get(v, ()))
+        return out
+
+
+def _parse_select(columns: str) -> list:
+    """'a, b, rel!inner(c, rel2!inner(d))' → ['a', 'b', ('rel', True, [...])]."""
+    items, depth, buf = [], 0, ""
+    for ch in columns + ",":
+        if ch == "," and depth == 0:
+            if buf.strip():
+                items.append(buf.strip())
+            buf = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        buf += ch
+    parsed = []
+    for item in items:
+        if "(" in item:
+            head, inner = item.split("(", 1)
+            name, _, hint = head.partition("!")
+            parsed.append((name.strip(), hint == "inner", _parse_select(inner[:-1])))
+        else:
+            parsed.append(item)
+    return parsed
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """The slice of the postgrest-py builder the retrieval path uses."""
+
+    def __init__(self, db: "FakePostgrest", table: str):
+        self.db = db
+        self.name = table
+        self.table = db.tables[table]
+        self.filters: list = []
+        self.projection: list = ["*"]
+        self.row_limit: Optional[int] = None
+        self.single = False
+
+    def select(self, columns: str = "*", **_):
+        self.projection = _parse_select(columns)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in", column, set(values)))
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("in", column, {value}))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(("lt", column, value))
+        return self
+
+    def ilike(self, column, pattern):
+        self.filters.append(("ilike", column, pattern.strip("%").lower()))
+        return self
+
+    def or_(self, expr: str):
+        # Only the "col.in.(1,2),col2.in.(3)" shape the pipeline emits.
+        branches = [(c, {int(v) for v in vals.split(",") if v})
+                    for c, vals in re.findall(r"(\w+)\.in\.\(([^)]*)\)", expr)]
+        self.filters.append(("or", branches, None))
+        return self
+
+    def limit(self, n: int):
+        self.row_limit = n
+        return self
+
+    def maybe_single(self):
+        self.single = True
+        return self
+
+    def execute(self):
+        self.db.charge_round_trip()
+        positions = self._candidates()
+        rows = self.table.rows
+        out = []
+        for n in positions:
+            row = rows[n]
+            if not self._matches(row):
+                continue
+            shaped = self.db.project(self.name, row, self.projection)
+            if shaped is None:
+                continue
+            out.append(shaped)
+            if self.row_limit is not None and len(out) >= self.row_limit:
+                break
+        if self.single:
+            return _Result(out[0]) if out else None
+        return _Result(out)
+
+    def _candidates(self) -> List[int]:
+        for op, column, values in self.filters:
+            if op == "in":
+                return sorted(set(self.table.lookup(column, values)))
+            if op == "or":
+                hits = set()
+                for col, vals in column:
+                    hits.update(self.table.lookup(col, vals))
+                return sorted(hits)
+        return list(range(len(self.table.rows)))
+
+    def _matches(self, row: tuple) -> bool:
+        pos = self.table.pos
+        for op, column, value in self.filters:
+            if op == "in":
+                if row[pos[column]] not in value:
+                    return False
+            elif op == "lt":
+                cell = row[pos[column]]
+                if cell is None or not cell < value:
+                    return False
+            elif op == "ilike":
+                if value not in str(row[pos[column]] or "").lower():
+                    return False
+            elif op == "or":
+                if not any(row[pos[c]] in v for c, v in column):
+                    return False
+        return True
+
+
+class _Rpc:
+    def __init__(self, fn, params):
+        self.fn, self.params = fn, params
+
+    def execute(self):
+        return _Result(self.fn(**self.params))
+
+
+class FakePostgrest:
+    """In-memory stand-in for the tenant-aware Supabase client."""
+
+    def __init__(self, tables: Dict[str, _Table], vector_pool: List[str],
+                 rtt_ms: float = 0.0, server_similarity: bool = True):
+        self.tables = tables
+        self.vector_pool = vector_pool
+        self.rtt_s = rtt_ms / 1000.0
+        self.server_similarity = server_similarity
+        self.round_trips = 0
+
+    def charge_round_trip(self) -> None:
+        self.round_trips += 1
+        if self.rtt_s:
+            time.sleep(self.rtt_s)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> _Rpc:
+        handler = {"search_phrase_nodes": self._search_phrase_nodes}
+        if self.server_similarity:
+            handler["match_passage_similarity"] = self._match_passage_similarity
+        if name not in handler:
+            raise Exception(f"Could not find the function public.{name} in the schema cache")
+        return _Rpc(handler[name], dict(params or {}))
+
+    def project(self, name: str, row: tuple, projection: list) -> Optional[dict]:
+        table = self.tables[name]
+        out: dict = {}
+        for item in projection:
+            if item == "*":
+                out.update(zip(table.columns, row))
+            elif isinstance(item, str):
+                out[item] = row[table.pos[item]]
+            else:
+                child_name, inner, sub = item
+                parent_col, child_col, many = _RELATIONS[(name, child_name)]
+                child = self.tables[child_name]
+                hits = child.lookup(child_col, [row[table.pos[parent_col]]])
+                shaped = [s for s in (self.project(child_name, child.rows[n], sub) for n in hits)
+                          if s is not None]
+                if inner and not shaped:
+                    return None
+                out[child_name] = shaped if many else (shaped[0] if shaped else None)
+        return out
+
+    # ── RPCs ────────────────────────────────────────────────────────────────
+
+    def _search_phrase_nodes(self, query_text: str, result_limit: int = 30, **_):
+        self.charge_round_trip()
+        nodes = self.tables["retrieval_phrase_nodes"]
+        tokens = [t.strip() for t in query_text.split("|") if t.strip()]
+        out = []
+        for n in nodes.lookup("normalized_text", tokens)[:result_limit]:
+            row = dict(zip(nodes.columns, nodes.rows[n]))
+            out.append({"id": row["id"], "normalized_text": row["normalized_text"],
+                        "display_text": row["display_text"], "node_type": row["node_type"],
+                        "rank": 0.1})
+        return out
+
+    def _match_passage_similarity(self, query_embedding, memory_ids, **_):
+        self.charge_round_trip()
+        passages = self.tables["retrieval_passages"]
+        hits = passages.lookup("memory_id", memory_ids)
+        mids = [passages.rows[n][passages.pos["memory_id"]] for n in hits]
+        sims = cosine_scores(query_embedding,
+                             [passages.rows[n][passages.pos["embedding"]] for n in hits])
+        best: Dict[int, float] = {}
+        for mid, sim in zip(mids, sims):
+            best[mid] = max(best.get(mid, sim), sim)
+        return [{"memory_id": m, "max_similarity": s} for m, s in best.items()]
+
+
+class FakeRedis:
+    """acache_get_many / acache_set over a dict (TTL ignored — runs are short)."""
+
+    def __init__(self):
+        self.store: Dict[str, object] = {}
+
+    async def get_many(self, keys: List[str]) -> Dict[str, object]:
+        return {k: self.store[k] for k in keys if k in self.store}
+
+    async def set(self, key: str, value, ttl: int = 60):
+        self.store[key] = value
+
+
+# ── Synthetic graph ────────────────────────────────────────────────────────
+
+class SyntheticGraph:
+    """Deterministic retrieval graph: phrase nodes, passages, memories, edges.
+
+    Passages link to phrase nodes with a popularity skew (low ids are hubs),
+    so seed fan-out and subgraph size grow the way a real graph's do.
+    """
+
+    def __init__(self, n_nodes: int, seed: int = 0, dim: int = DEFAULT_DIM):
+        self.n_nodes = n_nodes
+        self.seed = seed
+        self.dim = dim
+        rng = random.Random(seed)
+        n_passages = max(1, n_nodes // 2)
+        now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        nodes = _Table(("id", "normalized_text", "display_text", "node_type"))
+        stats = _Table(("node_id", "specificity_score"))
+        types = ("concept",) * 18 + ("person", "organization")
+        for i in range(1, n_nodes + 1):
+            text = f"topic{i}"
+            nodes.rows.append((i, text, text.title(), types[i % len(types)]))
+            stats.rows.append((i, round(rng.random(), 3)))
+
+        self.vector_pool = [
+            "[" + ",".join(f"{rng.gauss(0, 1):.4f}" for _ in range(dim)) + "]"
+            for _ in range(_VECTOR_POOL)
+        ]
+        passages = _Table(("id", "memory_id", "text", "raw_text", "passage_index",
+                           "source_type", "source_id", "embedding"))
+        bundles = _Table(("passage_id", "memory_id"))
+        links = _Table(("passage_id", "node_id"))
+        edges = _Table(("from_node_id", "to_node_id", "weight"))
+        memories = _Table(("id", "created_at", "importance_score", "expires_at"))
+        for pid in range(1, n_passages + 1):
+            mid = (pid + 1) // 2
+            picked = sorted({1 + int(n_nodes * rng.random() ** 2)
+                             for _ in range(_LINKS_PER_PASSAGE)})
+            text = "passage about " + " ".join(f"topic{n}" for n in picked)
+            passages.rows.append((pid, mid, text, text, (pid + 1) % 2, "memory", str(mid),
+                                  self.vector_pool[pid % _VECTOR_POOL]))
+            bundles.rows.append((pid, mid))
+            links.rows.extend((pid, n) for n in picked)
+            edges.rows.extend((a, b, round(0.5 + rng.random() / 2, 3))
+                              for a, b in zip(picked, picked[1:]))
+            if pid % 2:
+                created = now - timedelta(days=rng.randrange(365))
+                expires = (now - timedelta(days=1)).isoformat() if rng.random() < 0.01 else None
+                memories.rows.append((mid, created.isoformat(), rng.randint(1, 10), expires))
+        aliases = _Table(("from_node_id", "to_node_id", "weight"))
+        aliases.rows.extend((rng.randint(1, n_nodes), rng.randint(1, n_nodes), 0.8)
+                            for _ in range(max(1, n_nodes // 100)))
+
+        self.tables = {
+            "retrieval_phrase_nodes": nodes,
+            "retrieval_node_stats": stats,
+            "retrieval_passages": passages,
+            "retrieval_memory_bundle_links": bundles,
+            "retrieval_passage_phrase_links": links,
+            "retrieval_edges": edges,
+            "retrieval_alias_edges": aliases,
+            "memories": memories,
+        }
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {name: len(t.rows) for name, t in self.tables.items()}
+
+    def queries(self, n: int) -> List[str]:
+        """n deterministic queries, each naming three (skewed-popular) topics."""
+        rng = random.Random(self.seed + 1)
+        out = []
+        for _ in range(n):
+            a, b, c = (1 + int(self.n_nodes * rng.random() ** 2) for _ in range(3))
+            out.append(f"what happened with topic{a} and topic{b} around topic{c}")
+        return out
+
+    def client(self, rtt_ms: float = 0.0, server_similarity: bool = True) -> FakePostgrest:
+        return FakePostgrest(self.tables, self.vector_pool, rtt_ms, server_similarity)
+
+    def embed(self, text: str) -> List[float]:
+        """Query embedding: a pool vector picked by text hash, so some passages match."""
+        k = int(hashlib.sha256(text.encode()).hexdigest(), 16) % _VECTOR_POOL
+        return [float(v) for v in self.vector_pool[k][1:-1].split(",")]
+
+    def org_labels(self, query: str) -> List[str]:
+        """Entity stand-in: query tokens that name organization nodes."""
+        nodes = self.tables["retrieval_phrase_nodes"]
+        hits = nodes.lookup("normalized_text", query.lower().split())
+        return [nodes.rows[n][2] for n in hits if nodes.rows[n][3] == "organization"]
+
+
+# ── Runner ─────────────────────────────────────────────────────────────────
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    """Linear-interpolated percentile of pre-sorted values."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    values = sorted(samples)
+    out = {f"p{p}": round(_percentile(values, p), 3) for p in PERCENTILES}
+    out["n"] = len(values)
+    return out
+
+
+async def _bench_graph(graph: SyntheticGraph, queries: int, warmup: int,
+                       rtt_ms: float, server_similarity: bool) -> dict:
+    from core.retrieval import search
+
+    client = graph.client(rtt_ms, server_similarity)
+    redis = FakeRedis()
+
+    async def fake_embedding(text: str) -> EmbeddingResult:
+        return EmbeddingResult(vector=graph.embed(text), success=True, degraded=False,
+                               degraded_reason=None, provider="bench", model="bench",
+                               latency_ms=0)
+
+    async def fake_entities(query: str) -> List[str]:
+        return graph.org_labels(query)
+
+    stage_samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+    totals: List[float] = []
+    short_circuited = 0
+    texts = graph.queries(queries + warmup)
+    saved_rpc_flag = search._passage_similarity_rpc
+    search._passage_similarity_rpc = None
+    try:
+        with patch.object(search, "supabase", client), \
+             patch.object(search, "acache_get_many", redis.get_many), \
+             patch.object(search, "acache_set", redis.set), \
+             patch.object(search, "_extract_query_entities", fake_entities), \
+             patch("core.llm.get_embedding", fake_embedding), \
+             patch("core.lib.graph_rules.resolve_person_in_query", lambda q: None), \
+             patch.dict(os.environ, {"RETRIEVAL_DEBUG": "true"}):
+            for i, text in enumerate(texts):
+                t0 = time.perf_counter()
+                bundle = await search.associative_retrieve(text)
+                elapsed = (time.perf_counter() - t0) * 1000
+                if i < warmup:
+                    continue
+                totals.append(elapsed)
+                stages = (bundle.debug_trace or {}).get("stage_ms") or {}
+                if len(stages) < len(STAGES):
+                    short_circuited += 1
+                for name, ms in stages.items():
+                    stage_samples[name].append(ms)
+    finally:
+        search._passage_similarity_rpc = saved_rpc_flag
+
+    return {
+        "nodes": graph.n_nodes,
+        "rows": graph.counts,
+        "stages": {name: summarize(v) for name, v in stage_samples.items()},
+        "total": summarize(totals),
+        "short_circuited": short_circuited,
+        "round_trips_per_query": round(client.round_trips / max(1, len(texts)), 2),
+    }
+
+
+async def run_benchmark(
+    sizes: Sequence[int] = (1000, 10000),
+    queries: int = 50,
+    warmup: int = 5,
+    seed: int = 0,
+    rtt_ms: float = 0.0,
+    dim: int = DEFAULT_DIM,
+    server_similarity: bool = True,
+) -> dict:
+    """Benchmark associative_retrieve over one synthetic graph per size.
+
+    Returns a JSON-ready dict: run config plus, per size, p50/p95/p99 (ms)
+    for every stage and end to end. Queries that end early (no candidates)
+    are counted in short_circuited and contribute only the stages they ran.
+    """
+    runs = []
+    for n in sizes:
+        t0 = time.perf_counter()
+        graph = SyntheticGraph(n, seed=seed, dim=dim)
+        build_s = time.perf_counter() - t0
+        result = await _bench_graph(graph, queries, warmup, rtt_ms, server_similarity)
+        result["build_s"] = round(build_s, 2)
+        runs.append(result)
+    return {
+        "schema": SCHEMA_VERSION,
+        "config": {
+            "queries": queries, "warmup": warmup, "seed": seed, "rtt_ms": rtt_ms,
+            "dim": dim, "server_similarity": server_similarity,
+        },
+        "stages": list(STAGES),
+        "runs": runs,
+    }
+
+
+def run_benchmark_sync(**kwargs) -> dict:
+    return asyncio.run(run_benchmark(**kwargs))
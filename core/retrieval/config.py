@@ -69,6 +69,9 @@ PASSAGE_MIN_CHARS = 80
 PPR_DAMPING = 0.85
 PPR_ITERATIONS = 20
 PPR_TOLERANCE = 1e-6
+# Working-set cap for batched multi-seed PPR: seeds are solved in column
+# blocks sized so one block's per-edge product stays under this many bytes.
+PPR_BATCH_MAX_BYTES = 64 * 1024 * 1024
 
 # Shared with the canonical lite-tier model — one source of truth so a
 # future lite-model upgrade can't silently miss triple extraction.
@@ -3,7 +3,8 @@ import asyncio
 from datetime import datetime, timezone
 from core.services.db import tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
-from core.llm import get_embedding
+from core.lib.job_runner import JobQueue, register_queue, run_queue
+from core.llm import get_embedding, get_embeddings
 from core.retrieval.config import config, INDEX_VERSION, BACKFILL_MAX_CONCURRENCY
 from core.retrieval.chunker import chunk_text, compute_fingerprint
 from core.retrieval.extractor import extract_triples
@@ -88,8 +89,9 @@ async def index_memory(memory_id: int, content: str, memory_type: str,
             _set_run_status(run_id, "completed")
             return True
 
-        # Phase 1: Embed all passages in parallel
-        embed_tasks = [_upsert_passage(p) for p in passages]
+        # Phase 1: Embed all passages in one batched request, then upsert
+        embeddings = await get_embeddings([_passage_embed_text(p) for p in passages])
+        embed_tasks = [_upsert_passage(p, e) for p, e in zip(passages, embeddings)]
         embed_results = await asyncio.gather(*embed_tasks)
         inserted_passages = [
             (p_id, p) for p_id, p in zip(embed_results, passages) if p_id
@@ -215,13 +217,23 @@ async def reembed_passage_with_entities(
         return False
 
 
-async def _upsert_passage(passage: Passage) -> Optional[int]:
+def _passage_embed_text(passage: Passage) -> str:
+    """The text a passage is embedded (and stored in `text`) as."""
+    if config.chunk_enrichment:
+        return _build_enrichment_prefix("retrieval", []) + " " + passage.text
+    return passage.text
+
+
+async def _upsert_passage(passage: Passage, emb_res=None) -> Optional[int]:
     """Upsert a passage, return its ID.
     
     When RETRIEVAL_CHUNK_ENRICHMENT is enabled, stores raw user text in `raw_text`
     and embeds `[source_type] text` (source-type-enriched) in `text` + `embedding`.
     After entity extraction, reembed_passage_with_entities upgrades to
     `[source_type, entity1, entity2] text`.
+
+    `emb_res` is the passage's precomputed embedding (index_memory batches
+    them); when omitted the passage is embedded here.
     """
     try:
         existing = supabase.table("retrieval_passages") \
@@ -236,14 +248,11 @@ async def _upsert_passage(passage: Passage) -> Optional[int]:
             return existing.data["id"]
 
         # Determine what to embed and what to display
-        if config.chunk_enrichment:
-            raw_text = passage.text
-            enriched_text = _build_enrichment_prefix("retrieval", []) + " " + raw_text
-        else:
-            raw_text = passage.text
-            enriched_text = passage.text
+        raw_text = passage.text
+        enriched_text = _passage_embed_text(passage)
 
-        emb_res = await get_embedding(enriched_text)
+        if emb_res is None:
+            emb_res = await get_embedding(enriched_text)
         if not emb_res or not emb_res.vector:
             audit_log_sync("retrieval", "WARNING",
                            f"Embedding returned None for passage {passage.passage_index} "
@@ -438,8 +447,8 @@ def schedule_index_memory(memory_id: int, content: str,
     never indexed and became invisible to associative_retrieve().
 
     This implementation inserts a pending job row synchronously (~5 ms).
-    The sentinel piggyback (process_pending_index_jobs) processes these jobs in
-    batches every ~5 minutes with atomic status claiming and retry tracking.
+    The durable job runner (core/lib/job_runner.py) claims these jobs in
+    leased batches, highest priority first, with retry tracking.
     If a job already exists for this memory (pending/processing), this is a
     no-op — avoids duplicate queue entries.
     """
@@ -471,107 +480,33 @@ def schedule_index_memory(memory_id: int, content: str,
 async def process_pending_index_jobs(max_jobs: int = 2) -> int:
     """Process pending retrieval index jobs.  Called by the sentinel piggyback.
 
-    Processes up to max_jobs per call to stay within the sentinel's 30 s timeout
-    (each index_memory call takes ~10-15 s due to LLM extraction).
-
-    Flow:
-      1. SELECT pending jobs ordered by priority DESC, created_at ASC.
-      2. Atomically claim each job (UPDATE WHERE status='pending').
-      3. Call index_memory() for the claimed job.
-      4. Mark completed / failed.  Failed jobs are retried up to 3 times before
-         being escalated to dead_letter.
+    A per-tenant backstop for the dedicated queue worker (drain_job_queue):
+    claims up to max_jobs of the current tenant's jobs through the job
+    runner (core/lib/job_runner.py) — highest priority first, leased, failed
+    jobs retried with backoff and escalated to dead_letter after 3 attempts.
 
     Returns the number of jobs processed.
     """
-    if not config.indexing_enabled:
-        return 0
-
-    try:
-        rows = supabase.table("pending_retrieval_index_jobs") \
-            .select("id, memory_id, content, memory_type, source, retry_count") \
-            .eq("status", "pending") \
-            .order("priority", desc=True) \
-            .order("created_at", desc=False) \
-            .limit(max_jobs) \
-            .execute()
-    except Exception as e:
-        audit_log_sync("retrieval", "WARNING", f"process_pending_index_jobs: fetch failed: {e}")
-        return 0
-
-    if not rows or not rows.data:
-        return 0
-
-    processed = 0
-    for job in rows.data:
-        job_id = job["id"]
-        memory_id = job["memory_id"]
-
-        # Atomic claim — only one sentinel run wins the race
-        try:
-            claim = supabase.table("pending_retrieval_index_jobs") \
-                .update({
-                    "status": "processing",
-                    "started_at": datetime.now(timezone.utc).isoformat(),
-                }) \
-                .eq("id", job_id) \
-                .eq("status", "pending") \
-                .execute()
-            if not claim.data:
-                continue  # Another sentinel run already claimed it
-        except Exception as e:
-            audit_log_sync("retrieval", "WARNING",
-                           f"process_pending_index_jobs: claim failed for job {job_id}: {e}")
-            continue
-
-        try:
-            success = await index_memory(
-                memory_id=memory_id,
-                content=job["content"],
-                memory_type=job.get("memory_type", "note"),
-                source=job.get("source", "sentinel-sweep"),
-            )
-        except Exception as e:
-            success = False
-            audit_log_sync("retrieval", "ERROR",
-                           f"process_pending_index_jobs: index_memory failed for memory {memory_id}: {e}")
-
-        retry_count = (job.get("retry_count") or 0) + 1
-        if success:
-            try:
-                supabase.table("pending_retrieval_index_jobs") \
-                    .update({
-                        "status": "completed",
-                        "completed_at": datetime.now(timezone.utc).isoformat(),
-                    }) \
-                    .eq("id", job_id) \
-                    .execute()
-            except Exception:
-                pass
-            audit_log_sync("retrieval", "INFO",
-                           f"process_pending_index_jobs: indexed memory {memory_id} (job {job_id})")
-        else:
-            new_status = "dead_letter" if retry_count >= 3 else "pending"
-            try:
-                supabase.table("pending_retrieval_index_jobs") \
-                    .update({
-                        "status": new_status,
-                        "retry_count": retry_count,
-                        "error": f"index_memory returned False (attempt {retry_count})",
-                    }) \
-                    .eq("id", job_id) \
-                    .execute()
-            except Exception:
-                pass
-            audit_log_sync(
-                "retrieval",
-                "WARNING" if new_status == "pending" else "ERROR",
-                f"process_pending_index_jobs: memory {memory_id} attempt {retry_count} "
-                f"→ {new_status}",
-            )
-
-        processed += 1
-
-    if processed:
-        await update_node_stats()
-
-    return processed
+    from core.services.db import get_tenant
+    stats = await run_queue("pending_retrieval_index_jobs", max_jobs=max_jobs, owner=get_tenant())
+    return stats.processed
+
+
+async def _run_index_job(job: dict) -> bool:
+    """Job runner handler: index one claimed memory."""
+    return await index_memory(
+        memory_id=job["memory_id"],
+        content=job["content"],
+        memory_type=job.get("memory_type") or "note",
+        source=job.get("source") or "sentinel-sweep",
+    )
+
+
+register_queue(JobQueue(
+    table="pending_retrieval_index_jobs",
+    service="retrieval",
+    handler=_run_index_job,
+    describe=lambda job: f"index memory {job.get('memory_id')} (job {job.get('id')})",
+    enabled=lambda: config.indexing_enabled,
+    after_run=update_node_stats,
+))
@@ -1,5 +1,10 @@
-from typing import Dict, List, Set, Tuple
-from core.retrieval.config import PPR_DAMPING, PPR_ITERATIONS, PPR_TOLERANCE
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from core.retrieval.config import PPR_BATCH_MAX_BYTES, PPR_DAMPING, PPR_ITERATIONS, PPR_TOLERANCE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 def personalized_pagerank(
@@ -8,9 +13,68 @@ def personalized_pagerank(
     damping: float = PPR_DAMPING,
     iterations: int = PPR_ITERATIONS,
     tolerance: float = PPR_TOLERANCE,
+    graph: Optional["PPRGraph"] = None,
 ) -> Dict[int, float]:
     """Run Personalized PageRank on a graph.
 
+    Dispatches to the sparse NumPy engine (`PPRGraph`) when NumPy is
+    importable, otherwise to the pure-Python reference. Both return the same
+    {node_id: ppr_score} dict for the same inputs (see tests/test_retrieval.py
+    equivalence cases). Callers running many seeds over one adjacency should
+    pass `graph=build_ppr_graph(adjacency)` so the matrix is built once.
+    """
+    if np is None:
+        return personalized_pagerank_reference(adjacency, seed_nodes, damping, iterations, tolerance)
+    if not adjacency or not seed_nodes:
+        return {}
+    if graph is None:
+        graph = PPRGraph(adjacency)
+    return graph.run(seed_nodes, damping, iterations, tolerance)
+
+
+def personalized_pagerank_batch(
+    adjacency: Dict[int, List[Tuple[int, float]]],
+    seed_sets: Dict[Hashable, Dict[int, float]],
+    damping: float = PPR_DAMPING,
+    iterations: int = PPR_ITERATIONS,
+    tolerance: float = PPR_TOLERANCE,
+    graph: Optional["PPRGraph"] = None,
+    max_block_bytes: int = PPR_BATCH_MAX_BYTES,
+) -> Dict[Hashable, Dict[int, float]]:
+    """Run Personalized PageRank for many seed distributions over one graph.
+
+    Args:
+        seed_sets: {key: {node_id: initial_score}} — one personalization per key
+
+    Returns:
+        {key: {node_id: ppr_score}} — each entry equal to what
+        personalized_pagerank returns for that key's seeds alone.
+    """
+    if np is None:
+        return {
+            key: personalized_pagerank_reference(adjacency, seeds, damping, iterations, tolerance)
+            for key, seeds in seed_sets.items()
+        }
+    if not adjacency:
+        return {key: {} for key in seed_sets}
+    if graph is None:
+        graph = PPRGraph(adjacency)
+    return graph.run_many(seed_sets, damping, iterations, tolerance, max_block_bytes)
+
+
+def personalized_pagerank_reference(
+    adjacency: Dict[int, List[Tuple[int, float]]],
+    seed_nodes: Dict[int, float],
+    damping: float = PPR_DAMPING,
+    iterations: int = PPR_ITERATIONS,
+    tolerance: float = PPR_TOLERANCE,
+) -> Dict[int, float]:
+    """Pure-Python Personalized PageRank — the reference implementation.
+
+    Kept as the behavioral spec for `PPRGraph` and as the fallback when NumPy
+    is unavailable. Re-walks the dicts every iteration, so it is O(iterations ×
+    edges) in interpreted Python — do not call it on hot paths.
+
     Args:
         adjacency: {node_id: [(neighbor_id, weight), ...]}
         seed_nodes: {node_id: initial_score} — query-seeded nodes
@@ -65,6 +129,176 @@ def personalized_pagerank(
     return scores
 
 
+class PPRGraph:
+    """Column-normalized transition matrix for sparse PPR power iteration.
+
+    Built once from the same {node_id: [(neighbor_id, weight), ...]} adjacency
+    the reference takes; each `.run()` is then `iterations` sparse mat-vec
+    products instead of dict walks. Semantics match the reference exactly:
+    a node's adjacency list is read as its incoming contributions, each
+    weighted by weight / out_degree(neighbor), where out_degree is the length
+    of the neighbor's own adjacency list (0 → no contribution).
+
+    The matrix is stored CSR (rows sorted, duplicates kept — they sum in the
+    product, as repeated list entries do in the reference). Only non-empty
+    rows are reduced, so nodes with no incoming contributions cost nothing.
+    """
+
+    def __init__(self, adjacency: Dict[int, List[Tuple[int, float]]]):
+        if np is None:
+            raise RuntimeError("PPRGraph requires numpy")
+        node_ids: List[int] = list(adjacency.keys())
+        index: Dict[int, int] = {nid: i for i, nid in enumerate(node_ids)}
+        for neighbors in adjacency.values():
+            for nid, _ in neighbors:
+                if nid not in index:
+                    index[nid] = len(node_ids)
+                    node_ids.append(nid)
+
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for node in node_ids:
+            for neighbor, weight in adjacency.get(node, []):
+                out_degree = len(adjacency.get(neighbor, []))
+                if out_degree > 0:
+                    indices.append(index[neighbor])
+                    data.append(weight / out_degree)
+            indptr.append(len(indices))
+
+        self.node_ids = node_ids
+        self.index = index
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.float64)
+        row_nnz = np.diff(self.indptr)
+        self._rows = np.flatnonzero(row_nnz)
+        self._row_starts = self.indptr[:-1][self._rows]
+
+    @property
+    def size(self) -> int:
+        return len(self.node_ids)
+
+    def matvec(self, x):
+        """Return M @ x for a 1-D score vector or a 2-D (nodes × k) block."""
+        out = np.zeros(x.shape, dtype=np.float64)
+        if self._rows.size:
+            contrib = x[self.indices] * (self.data if x.ndim == 1 else self.data[:, None])
+            out[self._rows] = np.add.reduceat(contrib, self._row_starts, axis=0)
+        return out
+
+    def run(
+        self,
+        seed_nodes: Dict[int, float],
+        damping: float = PPR_DAMPING,
+        iterations: int = PPR_ITERATIONS,
+        tolerance: float = PPR_TOLERANCE,
+    ) -> Dict[int, float]:
+        """Personalized PageRank from one seed distribution.
+
+        Seeds outside the graph are scored too (teleport mass only), matching
+        the reference's node universe of adjacency ∪ neighbors ∪ seeds.
+        """
+        if not self.node_ids or not seed_nodes:
+            return {}
+        seed_total = sum(seed_nodes.values())
+        if seed_total == 0:
+            return {}
+
+        n = self.size
+        extra = [sid for sid in seed_nodes if sid not in self.index]
+        extra_index = {sid: n + i for i, sid in enumerate(extra)}
+        teleport = np.zeros(n + len(extra), dtype=np.float64)
+        for sid, weight in seed_nodes.items():
+            pos = self.index.get(sid, extra_index.get(sid))
+            teleport[pos] = weight / seed_total
+
+        restart = (1.0 - damping) * teleport
+        scores = teleport.copy()
+        for _ in range(iterations):
+            prev = scores
+            scores = restart.copy()
+            scores[:n] += damping * self.matvec(prev[:n])
+            if np.max(np.abs(scores - prev)) < tolerance:
+                break
+
+        values = scores.tolist()
+        return dict(zip(self.node_ids + extra, values))
+
+    def run_many(
+        self,
+        seed_sets: Dict[Hashable, Dict[int, float]],
+        damping: float = PPR_DAMPING,
+        iterations: int = PPR_ITERATIONS,
+        tolerance: float = PPR_TOLERANCE,
+        max_block_bytes: int = PPR_BATCH_MAX_BYTES,
+    ) -> Dict[Hashable, Dict[int, float]]:
+        """Personalized PageRank for many seed distributions at once.
+
+        Personalizations are stacked as columns of a (nodes × seeds) matrix so
+        each iteration walks the edges once for the whole block. A column stops
+        iterating as soon as its own max delta drops under `tolerance` — the
+        same per-run rule as `run()`, so every column equals its solo result.
+        Columns are processed in blocks sized to keep the per-edge product
+        under `max_block_bytes`.
+        """
+        results: Dict[Hashable, Dict[int, float]] = {key: {} for key in seed_sets}
+        keys = [key for key, seeds in seed_sets.items() if seeds and sum(seeds.values()) != 0]
+        if not self.node_ids or not keys:
+            return results
+
+        n = self.size
+        extra_index: Dict[int, int] = {}
+        for key in keys:
+            for sid in seed_sets[key]:
+                if sid not in self.index and sid not in extra_index:
+                    extra_index[sid] = n + len(extra_index)
+        total = n + len(extra_index)
+
+        # float64 per edge (the product) plus ~4 dense vectors per column.
+        column_bytes = 8 * (len(self.data) + 4 * total)
+        block = max(1, int(max_block_bytes // max(column_bytes, 1)))
+
+        for start in range(0, len(keys), block):
+            chunk = keys[start:start + block]
+            teleport = np.zeros((total, len(chunk)), dtype=np.float64)
+            for j, key in enumerate(chunk):
+                seeds = seed_sets[key]
+                seed_total = sum(seeds.values())
+                for sid, weight in seeds.items():
+                    teleport[self.index.get(sid, extra_index.get(sid)), j] = weight / seed_total
+
+            restart = (1.0 - damping) * teleport
+            scores = teleport.copy()
+            active = np.arange(len(chunk))
+            for _ in range(iterations):
+                prev = scores[:, active]
+                nxt = restart[:, active]
+                nxt[:n] += damping * self.matvec(prev[:n])
+                delta = np.max(np.abs(nxt - prev), axis=0)
+                scores[:, active] = nxt
+                active = active[delta >= tolerance]
+                if not active.size:
+                    break
+
+            for j, key in enumerate(chunk):
+                column = scores[:, j]
+                out = dict(zip(self.node_ids, column[:n].tolist()))
+                for sid in seed_sets[key]:
+                    if sid in extra_index:
+                        out[sid] = float(column[extra_index[sid]])
+                results[key] = out
+
+        return results
+
+
+def build_ppr_graph(adjacency: Dict[int, List[Tuple[int, float]]]) -> Optional[PPRGraph]:
+    """Build the reusable transition matrix, or None without NumPy/edges."""
+    if np is None or not adjacency:
+        return None
+    return PPRGraph(adjacency)
+
+
 def build_adjacency_from_edges(
     edges: List[Tuple[int, int, float]],
 ) -> Dict[int, List[Tuple[int, float]]]:
@@ -1,5 +1,5 @@
 import hashlib
-from core.lib.redis_cache import cache_get, cache_set
+from core.lib.redis_cache import acache_get_many, acache_set
 
 import asyncio
 from typing import List, Optional, Dict
@@ -12,6 +12,7 @@ from core.retrieval.config import (
 from core.retrieval.normalizer import expand_shorthand, is_noise_phrase
 from core.retrieval.ppr import build_adjacency_from_edges, personalized_pagerank, normalize_scores
 from core.retrieval.ranking import rank_memories
+from core.retrieval.similarity import cosine_scores
 from core.retrieval.schema import ExplainableBundle, ScoredMemory
 
 _MAX_SUPPORTING_PASSAGES = 5
@@ -44,6 +45,17 @@ async def associative_retrieve(
     """
     start = time.time()
     debug = {}
+    # Per-stage wall time (ms), surfaced in debug_trace — the breakdown the
+    # offline benchmark (core/retrieval/bench.py) reports percentiles over.
+    stage_ms: Dict[str, float] = {}
+    debug["stage_ms"] = stage_ms
+    stage_mark = time.perf_counter()
+
+    def _end_stage(name: str) -> None:
+        nonlocal stage_mark
+        now = time.perf_counter()
+        stage_ms[name] = round((now - stage_mark) * 1000, 3)
+        stage_mark = now
 
     # ──────────────────────────────────────────────────
     # Phase 1: Parse query, fetch embedding, entities
@@ -53,21 +65,26 @@ async def associative_retrieve(
     query_hash = hashlib.sha256(query_norm.encode()).hexdigest()
     # Tenant-namespaced: entity/person resolution results are tenant data —
     # tenant B querying the same text must not receive tenant A's resolved
-    # person/entities from the shared cache. Embedding is deterministic per
-    # query text so it stays global (same vector for everyone).
+    # person/entities from the shared cache. The query embedding goes through
+    # get_embedding's own two-tier cache (core/llm/embedding_cache.py), which
+    # is global — the vector is deterministic per text and model.
     _uid = get_tenant()
     _ns = f":{_uid}" if _uid else ""
     ent_key = f"retrieval:entities:{query_hash}{_ns}"
     pers_key = f"retrieval:person:{query_hash}{_ns}"
-    emb_key = f"retrieval:embedding:{query_hash}"
+
+    # Both per-query cache entries come back in one MGET round trip.
+    cached: Dict[str, object] = {}
+    cache_read = asyncio.create_task(acache_get_many([ent_key, pers_key]))
 
     async def _get_cached_entities():
-        res = await asyncio.to_thread(cache_get, ent_key)
+        cached.update(await cache_read)
+        res = cached.get(ent_key)
         if res is not None:
             return res
         ents = await _extract_query_entities(query)
         if ents:
-            await asyncio.to_thread(cache_set, ent_key, ents, 3600)
+            await acache_set(ent_key, ents, 3600)
         return ents or []
 
     async def _get_cached_person():
@@ -75,25 +92,20 @@ async def associative_retrieve(
         # from the query itself so person-boost fires without a caller hint.
         if active_person_id:
             return {"node_id": active_person_id}
-        res = await asyncio.to_thread(cache_get, pers_key)
+        cached.update(await cache_read)
+        res = cached.get(pers_key)
         if res is not None:
             return res
         from core.lib.graph_rules import resolve_person_in_query
         person = await asyncio.to_thread(resolve_person_in_query, query)
         if person:
-            await asyncio.to_thread(cache_set, pers_key, person, 3600)
+            await acache_set(pers_key, person, 3600)
         return person
 
     async def _get_cached_embedding():
-        res = await asyncio.to_thread(cache_get, emb_key)
-        if res is not None:
-            return res
         from core.llm import get_embedding as _get_embedding
         emb = await _get_embedding(query)
-        vec = emb.vector if emb else None
-        if vec:
-            await asyncio.to_thread(cache_set, emb_key, vec, 86400)
-        return vec
+        return emb.vector if emb else None
 
     llm_task = asyncio.create_task(_get_cached_entities())
     person_task = asyncio.create_task(_get_cached_person())
@@ -121,6 +133,7 @@ async def associative_retrieve(
             pass
 
     query_phrases = list(set(llm_phrases + lex_phrases))
+    _end_stage("entity_resolution")
     debug["query_phrases"] = "[REDACTED]"
     debug["llm_phrases"] = "[REDACTED]"
     debug["lex_phrases"] = "[REDACTED]"
@@ -160,6 +173,7 @@ async def associative_retrieve(
     # 3. Recognition filter
     filtered_nodes = _recognition_filter(phrase_nodes, query_phrases)
     debug["filtered_nodes"] = len(filtered_nodes)
+    _end_stage("phrase_candidates")
 
     if not filtered_nodes:
         return ExplainableBundle(query=query, items=[], latency_ms=int((time.time() - start) * 1000))
@@ -169,6 +183,7 @@ async def associative_retrieve(
 
     edges = await _fetch_subgraph_edges(list(seed_nodes.keys()))
     debug["subgraph_edges"] = len(edges)
+    _end_stage("subgraph_edges")
 
     if not edges:
         return ExplainableBundle(query=query, items=[], latency_ms=int((time.time() - start) * 1000))
@@ -178,6 +193,7 @@ async def associative_retrieve(
     ppr_raw = personalized_pagerank(adjacency, seed_nodes)
     ppr_norm = normalize_scores(ppr_raw)
     debug["ppr_nodes"] = len(ppr_norm)
+    _end_stage("ppr")
 
     # 6. Aggregate PPR → passages → memories
     memory_scores, passage_ids = await _aggregate_to_memories(ppr_norm, list(seed_nodes.keys()))
@@ -203,6 +219,7 @@ async def associative_retrieve(
 
     if not memory_scores:
         return ExplainableBundle(query=query, items=[], latency_ms=int((time.time() - start) * 1000))
+    _end_stage("aggregation")
 
     # 7. Blended ranking
     memory_ids = list(memory_scores.keys())
@@ -236,11 +253,13 @@ async def associative_retrieve(
     )
 
     top_memories = ranked[:top_k]
+    _end_stage("boosts")
 
     # 8. Bundle assembly
     def assemble_b():
         return _assemble_bundles(top_memories, ppr_norm, list(seed_nodes.keys()))
     items = await asyncio.to_thread(assemble_b)
+    _end_stage("bundle_assembly")
 
     latency = int((time.time() - start) * 1000)
 
@@ -452,16 +471,6 @@ async def _aggregate_to_memories(ppr_scores: Dict[int, float], seed_node_ids: Li
     return memory_scores, list(passage_scores.keys())
 
 
-def _cosine_similarity(a: list, b: list) -> float:
-    """Compute cosine similarity between two vectors."""
-    dot = sum(x * y for x, y in zip(a, b))
-    na = sum(x * x for x in a) ** 0.5
-    nb = sum(y * y for y in b) ** 0.5
-    if na < 1e-10 or nb < 1e-10:
-        return 0.0
-    return dot / (na * nb)
-
-
 def _fetch_memory_metadata_boosts(memory_ids: List[int], active_project_id: Optional[int]) -> tuple[Dict[int, float], Dict[int, float], Dict[int, float]]:
     """Fetch recency, importance, and project boosts in a single query."""
     recency = {m: 0.0 for m in memory_ids}
@@ -501,11 +510,54 @@ def _fetch_memory_metadata_boosts(memory_ids: List[int], active_project_id: Opti
         
     return recency, importance, project
 
+# None until the first call; False once match_passage_similarity (db/106) is
+# confirmed missing, so pre-migration deploys stop paying a failed RPC.
+_passage_similarity_rpc: Optional[bool] = None
+
+
 def _compute_semantic_scores(memory_ids: List[int], query_emb: Optional[List[float]]) -> Dict[int, float]:
-    """Compute semantic (embedding) similarity between query and memory passages."""
+    """Compute semantic (embedding) similarity between query and memory passages.
+
+    Max passage similarity per memory. Scored server-side by the
+    match_passage_similarity RPC when deployed; otherwise the embeddings are
+    fetched and scored locally.
+    """
     if not query_emb or not memory_ids:
         return {mid: 0.0 for mid in memory_ids}
 
+    best = _semantic_scores_rpc(memory_ids, query_emb)
+    if best is None:
+        best = _semantic_scores_local(memory_ids, query_emb)
+    return {mid: best.get(mid, 0.0) for mid in memory_ids}
+
+
+def _semantic_scores_rpc(memory_ids: List[int], query_emb: List[float]) -> Optional[Dict[int, float]]:
+    """{memory_id: max similarity} from Postgres, or None to fall back."""
+    global _passage_similarity_rpc
+    if _passage_similarity_rpc is False:
+        return None
+    try:
+        res = supabase.rpc('match_passage_similarity', {
+            'query_embedding': query_emb,
+            'memory_ids': memory_ids,
+        }).execute()
+    except Exception as e:
+        from core.services.db import _missing_table_error
+        if _missing_table_error(str(e), "match_passage_similarity"):
+            _passage_similarity_rpc = False
+        else:
+            from core.lib.audit_logger import audit_log_sync
+            audit_log_sync("retrieval", "WARNING",
+                           f"match_passage_similarity failed, scoring locally: {e}")
+        return None
+    _passage_similarity_rpc = True
+    return {
+        row["memory_id"]: float(row.get("max_similarity") or 0.0)
+        for row in (res.data or []) if row.get("memory_id") is not None
+    }
+
+
+def _semantic_scores_local(memory_ids: List[int], query_emb: List[float]) -> Dict[int, float]:
     try:
         pass_res = supabase.table("retrieval_passages") \
             .select("id, memory_id, embedding") \
@@ -513,19 +565,18 @@ def _compute_semantic_scores(memory_ids: List[int], query_emb: Optional[List[flo
             .execute()
 
         if not pass_res or not pass_res.data:
-            return {mid: 0.0 for mid in memory_ids}
+            return {}
 
-        memory_passages: Dict[int, List[float]] = {}
-        for row in pass_res.data:
-            mid = row.get("memory_id")
-            emb = row.get("embedding")
-            if mid and emb and len(emb) == len(query_emb):
-                sim = _cosine_similarity(query_emb, emb)
-                memory_passages.setdefault(mid, []).append(sim)
+        rows = [r for r in pass_res.data if r.get("memory_id") and r.get("embedding")]
+        sims = cosine_scores(query_emb, [r["embedding"] for r in rows])
 
-        return {mid: max(memory_passages.get(mid, [0.0])) for mid in memory_ids}
+        best: Dict[int, float] = {}
+        for row, sim in zip(rows, sims):
+            mid = row["memory_id"]
+            best[mid] = max(best.get(mid, sim), sim)
+        return best
     except Exception:
-        return {mid: 0.0 for mid in memory_ids}
+        return {}
 
 async def _compute_specificity_boost(phrase_node_ids: List[int], passage_ids: List[int]) -> Dict[int, float]:
     """Map phrase node specificity scores to memories via parallel queries."""
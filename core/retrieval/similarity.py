@@ -0,0 +1,142 @@
+"""Vectorized cosine similarity over stored embeddings.
+
+Candidates are stacked into one float32 matrix, rows pre-normalized, and a
+whole batch is scored with a single matrix-vector (or matrix-matrix)
+product. pgvector columns come back from PostgREST as text ("[0.1,0.2,...]");
+`parse_vector` reads that straight into a float32 array without building a
+Python float list.
+
+Rows that are missing, unparsable, the wrong dimension, or all-zero score
+0.0 — the same answer the old per-pair helpers gave. Falls back to pure
+Python when NumPy is unavailable (same contract, slower).
+"""
+
+import json
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_EPS = 1e-10
+
+
+def parse_vector(value, dim: Optional[int] = None):
+    """pgvector text, list, or array → 1-D float32 array (None if unusable).
+
+    Lists may hold numeric strings (["0.5", 0.3]) after old backfills.
+    Returns None when `dim` is given and the length differs.
+    """
+    if value is None:
+        return None
+    if np is None:
+        vec = _parse_vector_py(value)
+    else:
+        try:
+            if isinstance(value, str):
+                text = value.strip()
+                if text.startswith("[") and text.endswith("]"):
+                    text = text[1:-1]
+                vec = np.fromstring(text, sep=",", dtype=np.float32) if text else None
+            else:
+                vec = np.asarray(value, dtype=np.float32).ravel()
+        except (ValueError, TypeError):
+            vec = None
+    if vec is None or len(vec) == 0:
+        return None
+    if dim is not None and len(vec) != dim:
+        return None
+    return vec
+
+
+def _parse_vector_py(value) -> Optional[List[float]]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return None
+    try:
+        return [float(v) for v in value]
+    except (ValueError, TypeError):
+        return None
+
+
+def normalized_matrix(vectors: Sequence, dim: int):
+    """Stack vectors into an (n × dim) float32 matrix of unit rows.
+
+    Unusable or zero-norm rows stay all-zero, so they score 0.0 against
+    anything.
+    """
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for i, value in enumerate(vectors):
+        vec = parse_vector(value, dim)
+        if vec is not None:
+            matrix[i] = vec
+    norms = np.linalg.norm(matrix, axis=1)
+    ok = norms > _EPS
+    matrix[ok] /= norms[ok, None]
+    matrix[~ok] = 0.0
+    return matrix
+
+
+def cosine_scores(query, vectors: Sequence) -> List[float]:
+    """Cosine similarity of `query` against every vector, in order."""
+    if not len(vectors):
+        return []
+    q = parse_vector(query)
+    if q is None:
+        return [0.0] * len(vectors)
+    if np is None:
+        return [_cosine_py(q, parse_vector(v, len(q))) for v in vectors]
+    qn = np.linalg.norm(q)
+    if qn < _EPS:
+        return [0.0] * len(vectors)
+    return (normalized_matrix(vectors, len(q)) @ (q / qn)).tolist()
+
+
+def cosine_similarity(a, b) -> float:
+    """Cosine similarity of two vectors (0.0 if either is unusable)."""
+    return cosine_scores(a, [b])[0] if a is not None and b is not None else 0.0
+
+
+def mean_pairwise_similarity(vectors: Sequence) -> float:
+    """Mean cosine similarity over all unordered pairs (i < j)."""
+    n = len(vectors)
+    if n < 2:
+        return 0.0
+    first = parse_vector(vectors[0])
+    if first is None:
+        return 0.0
+    if np is None:
+        sims = [_cosine_py(parse_vector(vectors[i]), parse_vector(vectors[j]))
+                for i in range(n) for j in range(i + 1, n)]
+        return sum(sims) / len(sims)
+    m = normalized_matrix(vectors, len(first))
+    gram = m @ m.T
+    return float(gram[np.triu_indices(n, k=1)].mean())
+
+
+def mean_cross_similarity(left: Sequence, right: Sequence) -> float:
+    """Mean cosine similarity over every (left, right) pair."""
+    if not len(left) or not len(right):
+        return 0.0
+    first = parse_vector(left[0])
+    if first is None:
+        return 0.0
+    if np is None:
+        sims = [_cosine_py(parse_vector(a), parse_vector(b)) for a in left for b in right]
+        return sum(sims) / len(sims)
+    dim = len(first)
+    return float((normalized_matrix(left, dim) @ normalized_matrix(right, dim).T).mean())
+
+
+def _cosine_py(a, b) -> float:
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    na = sum(x * x for x in a) ** 0.5
+    nb = sum(y * y for y in b) ** 0.5
+    if na < _EPS or nb < _EPS:
+        return 0.0
+    return dot / (na * nb)
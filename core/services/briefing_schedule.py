@@ -150,7 +150,7 @@ def resolve_briefing_schedule(user_id: str | None = None) -> dict:
     if cached and (time.time() - cached[0]) < _CACHE_TTL_S:
         return cached[1]
 
-    schedule: dict = json.loads(json.dumps(PRESETS[DEFAULT_PRESET]))
+    schedule: dict = _default_schedule()
     if user_id:
         try:
             q = (
@@ -166,11 +166,7 @@ def resolve_briefing_schedule(user_id: str | None = None) -> dict:
             # explicit owner_id filter is the floor either way.
             res = q.execute()
             content = (res.data or {}).get("content") if res.data else None
-            if content:
-                parsed = json.loads(content) if isinstance(content, str) else content
-                validated = _validate_schedule(parsed)
-                if validated is not None:
-                    schedule = validated
+            schedule = _schedule_from_content(content)
         except Exception:
             pass  # fail-closed → DEFAULT_PRESET
 
@@ -179,6 +175,65 @@ def resolve_briefing_schedule(user_id: str | None = None) -> dict:
     return schedule
 
 
+def resolve_briefing_schedules(user_ids: list[str]) -> dict[str, dict]:
+    """resolve_briefing_schedule for many tenants in one query.
+
+    The heartbeat gate's bulk path: every uncached tenant's row is read with
+    a single `owner_id IN (...)` select instead of one round trip each. Same
+    fail-closed contract per tenant — a missing or broken row, or a DB
+    error for the whole batch, resolves to the DEFAULT_PRESET template.
+    """
+    now = time.time()
+    out: dict[str, dict] = {}
+    pending = []
+    for uid in user_ids:
+        cached = _schedule_cache.get(uid)
+        if cached and (now - cached[0]) < _CACHE_TTL_S:
+            out[uid] = cached[1]
+        else:
+            pending.append(uid)
+    if not pending:
+        return out
+
+    contents: dict[str, object] = {}
+    try:
+        res = (
+            get_supabase()
+            .table("core_config")
+            .select("owner_id, content")
+            .eq("key", "briefing_schedule")
+            .in_("owner_id", pending)
+            .execute()
+        )
+        for row in res.data or []:
+            contents.setdefault(str(row.get("owner_id")), row.get("content"))
+    except Exception:
+        pass  # fail-closed → DEFAULT_PRESET for the batch
+
+    for uid in pending:
+        schedule = _schedule_from_content(contents.get(str(uid)))
+        _schedule_cache[uid] = (now, schedule)
+        out[uid] = schedule
+    return out
+
+
+def _default_schedule() -> dict:
+    return json.loads(json.dumps(PRESETS[DEFAULT_PRESET]))
+
+
+def _schedule_from_content(content) -> dict:
+    """A stored row's content → validated schedule (default when unusable)."""
+    if content:
+        try:
+            parsed = json.loads(content) if isinstance(content, str) else content
+        except ValueError:
+            return _default_schedule()
+        validated = _validate_schedule(parsed)
+        if validated is not None:
+            return validated
+    return _default_schedule()
+
+
 def schedule_for_preset(preset_id: str | None) -> dict:
     """The preset template (for seeding/onboarding), or the default."""
     if preset_id and preset_id in PRESETS:
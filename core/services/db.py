@@ -2,12 +2,21 @@ import asyncio
 import contextvars
 import hashlib
 import os
+import time
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 
 import httpx
-from supabase import create_client, Client
+from supabase import create_client, Client, AsyncClient, AsyncClientOptions
 from supabase.lib.client_options import SyncClientOptions
 
+from core.lib.loop_local import LoopLocal
+from core.lib.tracing import instrument_postgrest, instrument_redis, traced
+
+# Span every PostgREST .execute() and Redis command (core/lib/tracing.py).
+instrument_postgrest()
+instrument_redis()
+
 _supabase: Client = None
 
 
@@ -35,6 +44,7 @@ def get_supabase() -> Client:
     return _supabase
 
 
+@traced("db.exec_query")
 async def exec_query(builder):
     """Execute a Supabase query builder off the event loop.
 
@@ -50,6 +60,51 @@ async def exec_query(builder):
     return await asyncio.to_thread(builder.execute)
 
 
+def _new_async_client() -> AsyncClient:
+    """Async supabase client on a pooled HTTP/2 keep-alive transport.
+
+    One multiplexed connection serves every concurrent query from the
+    container, so a `@modal.concurrent` web worker's parallel requests
+    share sockets instead of each holding a thread for a blocking call.
+    """
+    http = httpx.AsyncClient(
+        http2=True,
+        timeout=120.0,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    )
+    return AsyncClient(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
+        AsyncClientOptions(httpx_client=http),
+    )
+
+
+async def _close_async_client(client: AsyncClient) -> None:
+    await client.options.httpx_client.aclose()
+
+
+# One client (and HTTP/2 pool) per running loop, closed at that loop's
+# shutdown — see core/lib/loop_local.py.
+_async_supabase = LoopLocal(lambda: _new_async_client(), aclose=_close_async_client)
+
+
+def get_async_supabase() -> AsyncClient:
+    """Unscoped async client for the running event loop.
+
+    Builders it returns are awaited: `await client.table(...).execute()`.
+    httpx connections belong to the loop that opened them, so each loop
+    (Modal's per-input asyncio.run, the _run_batch_concurrently threads)
+    gets its own pooled client, closed when that loop shuts down. Use
+    async_tenant_aware_client() for tenant data.
+    """
+    return _async_supabase.get()
+
+
+async def amaybe_single_safe(builder):
+    """Async maybe_single_safe for builders from the async client."""
+    return await builder.limit(1).maybe_single().execute()
+
+
 
 def maybe_single_safe(builder):
     """Execute a builder chain with .limit(1).maybe_single() guard.
@@ -103,6 +158,89 @@ def query_list_safe(builder, max_results=100):
     return builder.limit(max_results).execute()
 
 
+SCAN_PAGE_SIZE = 1000
+
+
+def _with_key_column(columns: str, key: str) -> str:
+    """Make sure the keyset column is projected — the cursor is read from it."""
+    cols = [c.strip() for c in columns.split(",")]
+    if "*" in cols or key in cols:
+        return columns
+    return f"{key}, {columns}"
+
+
+def scan_pages(
+    client,
+    table: str,
+    columns: str = "*",
+    *,
+    filters=None,
+    key: str = "id",
+    page_size: int = SCAN_PAGE_SIZE,
+    after=None,
+    max_rows: int | None = None,
+    execute=None,
+):
+    """Yield a table in pages of at most `page_size` rows, keyset-paginated.
+
+    Each page is `WHERE <key> > last ORDER BY <key> LIMIT page_size`, so page
+    N costs the same index range scan as page 1 — `.range(offset, ...)`
+    makes Postgres walk and discard every earlier row, and a concurrent
+    insert/delete shifts the window (rows skipped or returned twice). Only
+    one page is held at a time; callers that aggregate while iterating run
+    in constant memory.
+
+    Usage:
+        for page in scan_pages(supabase, "graph_edges", "metadata",
+                               filters=lambda q: q.eq("is_current", True)):
+            ...
+
+    Args:
+        client: supabase client or tenant facade (tenant_aware_client());
+            through the facade every page is owner-scoped.
+        table: Table name.
+        columns: Projection. `key` is added when missing.
+        filters: Optional callable applied to each page's builder
+            (`lambda q: q.in_(...).eq(...)`). Must not order or limit.
+        key: Unique, orderable cursor column (default the primary key).
+        page_size: Rows per round trip.
+        after: Resume strictly after this key value.
+        max_rows: Stop after this many rows in total.
+        execute: Optional callable running a builder (retry wrappers);
+            defaults to builder.execute().
+
+    Yields:
+        Non-empty lists of row dicts, in ascending `key` order.
+    """
+    columns = _with_key_column(columns, key)
+    run = execute or (lambda q: q.execute())
+    remaining = max_rows
+    last = after
+    while remaining is None or remaining > 0:
+        limit = page_size if remaining is None else min(page_size, remaining)
+        query = client.table(table).select(columns)
+        if filters is not None:
+            query = filters(query)
+        if last is not None:
+            query = query.gt(key, last)
+        res = run(query.order(key).limit(limit))
+        page = (res.data if res else None) or []
+        if not page:
+            return
+        yield page
+        if len(page) < limit:
+            return
+        last = page[-1][key]
+        if remaining is not None:
+            remaining -= len(page)
+
+
+def scan_rows(client, table: str, columns: str = "*", **kwargs):
+    """Row-at-a-time scan_pages() — same arguments, yields row dicts."""
+    for page in scan_pages(client, table, columns, **kwargs):
+        yield from page
+
+
 def zombie_recovery() -> int:
     from datetime import datetime, timezone, timedelta
     # M3: tenant facade — sentinel runs this per-tenant (M4 fan-out); without
@@ -228,15 +366,20 @@ class TenantTable:
 
     Fail-closed: constructing outside a tenant context raises
     TenantRequiredError.
+
+    `client` selects the underlying supabase client — the sync one by
+    default, the async one for async_tenant_table() (same scoping, awaited
+    builders).
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, client=None):
         self._uid = require_tenant()
         self._name = name
+        self._client = client if client is not None else get_supabase()
         # NOTE: do NOT chain .eq() here — the real supabase-py table builder
         # has no filters until .select() is called. Scoping is applied in
         # select()/delete()/update() below.
-        self._inner = get_supabase().table(name)
+        self._inner = self._client.table(name)
         self._keyed = name in _TENANT_KEYED_TABLES
 
     def select(self, columns="*", **kwargs):
@@ -256,12 +399,12 @@ class TenantTable:
     def insert(self, data):
         if self._keyed:
             return self._inner.insert(data)
-        return get_supabase().table(self._name).insert(_inject_owner(data, self._uid))
+        return self._client.table(self._name).insert(_inject_owner(data, self._uid))
 
     def upsert(self, data, on_conflict=None, **kwargs):
         if self._keyed:
             return self._inner.upsert(data, on_conflict=on_conflict, **kwargs)
-        return get_supabase().table(self._name).upsert(
+        return self._client.table(self._name).upsert(
             _inject_owner(data, self._uid), on_conflict=on_conflict, **kwargs
         )
 
@@ -269,7 +412,7 @@ class TenantTable:
         if self._keyed:
             return self._inner.update(data)
         return (
-            get_supabase()
+            self._client
             .table(self._name)
             .update(_inject_owner(data, self._uid))
             .eq("owner_id", self._uid)
@@ -286,6 +429,11 @@ def tenant_table(name: str) -> TenantTable:
     return TenantTable(name)
 
 
+def async_tenant_table(name: str) -> TenantTable:
+    """tenant_table() on the async client — builders are awaited."""
+    return TenantTable(name, get_async_supabase())
+
+
 # ── M3: tenant-mode detection & channel-tenant resolution ──────────────────
 
 _tenant_mode: bool | None = None
@@ -411,6 +559,34 @@ def tenant_aware_client() -> TenantAwareClient:
     return TenantAwareClient()
 
 
+class AsyncTenantAwareClient:
+    """Async twin of TenantAwareClient for `async def` code paths.
+
+    Same routing (tenant_table scoping, owner injection on writes and RPCs,
+    _GLOBAL_RPCS passthrough, legacy unscoped pre-db/78); builders come from
+    the pooled async client, so `.execute()` is awaited instead of blocking
+    the event loop. The one sync call left is tenant_mode_enabled()'s
+    once-per-process probe.
+    """
+
+    def table(self, name):
+        if tenant_mode_enabled():
+            return async_tenant_table(name)
+        return get_async_supabase().table(name)
+
+    def rpc(self, name, params=None):
+        if tenant_mode_enabled():
+            if name in _GLOBAL_RPCS:
+                return get_async_supabase().rpc(name, params or {})
+            return tenant_rpc(name, params, client=get_async_supabase())
+        return get_async_supabase().rpc(name, params or {})
+
+
+def async_tenant_aware_client() -> AsyncTenantAwareClient:
+    """Return the async tenant-aware client facade."""
+    return AsyncTenantAwareClient()
+
+
 @contextmanager
 def channel_tenant_scope():
     """Run a block under the channel tenant — Telegram webhooks and cron
@@ -432,18 +608,19 @@ def channel_tenant_scope():
         yield
 
 
-def tenant_rpc(name: str, params: dict | None = None, inject_owner: bool = True):
+def tenant_rpc(name: str, params: dict | None = None, inject_owner: bool = True, client=None):
     """Call an RPC with owner_id injected (fail-closed without a tenant).
 
     RPC signatures gain an owner_id param during the M3 sweep; set
-    inject_owner=False for admin RPCs that must stay global.
+    inject_owner=False for admin RPCs that must stay global. `client`
+    defaults to the sync client (the async facade passes its own).
     """
     uid = require_tenant()
     payload = dict(params or {})
     if inject_owner:
         owner_param = _RPC_OWNER_PARAM.get(name, "owner_id")
         payload.setdefault(owner_param, uid)
-    return get_supabase().rpc(name, payload)
+    return (client if client is not None else get_supabase()).rpc(name, payload)
 
 
 # RPCs that operate on NO tenant data and must stay global: admin/SQL
@@ -460,6 +637,8 @@ _GLOBAL_RPCS = {"run_sql"}
 _RPC_OWNER_PARAM: dict[str, str] = {
     "archive_terminal_pending_edges": "p_owner",
     "batch_whatsapp_message": "p_owner",
+    "increment_subsystem_patterns": "p_owner",
+    "reconcile_llm_credit_balance": "p_owner",
 }
 
 
@@ -492,7 +671,7 @@ def active_user_ids() -> list[str]:
         return []
 
 
-def core_config_upsert(supabase, row: dict):
+def core_config_upsert(supabase, row: dict | list[dict]):
     """Upsert a core_config row with the conflict target matching tenant mode.
 
     db/78 changed core_config uniqueness from (key) to (owner_id, key), so
@@ -500,7 +679,8 @@ def core_config_upsert(supabase, row: dict):
     tenant facade injects owner_id into the payload, making 'owner_id,key'
     correct in tenant mode; legacy unscoped mode (pre-db/78, no owner_id
     column) keeps 'key'. Every core_config upsert must go through here — a
-    bare on_conflict='key' 400s once db/78 lands.
+    bare on_conflict='key' 400s once db/78 lands. A list of rows upserts in
+    one request.
     """
     if tenant_mode_enabled():
         return supabase.table("core_config").upsert(row, on_conflict="owner_id,key")
@@ -584,23 +764,115 @@ def run_tenant_fanout(fn, *args, job_name: str = "fanout", **kwargs):
     return results
 
 
-async def arun_tenant_fanout(afn, *args, job_name: str = "fanout", **kwargs):
-    """Async variant of run_tenant_fanout — awaits afn per tenant scope."""
+async def arun_tenant_fanout(afn, *args, job_name: str = "fanout", concurrency: int = 1, **kwargs):
+    """Async variant of run_tenant_fanout — awaits afn per tenant scope.
+
+    `concurrency` > 1 runs up to that many tenants at once (see
+    afanout_tenants); results keep active_user_ids() order either way.
+    """
     uids = active_user_ids()
     if not uids:
         with channel_tenant_scope():
             return await afn(*args, **kwargs)
-    results = []
-    for uid in uids:
-        try:
-            with tenant_scope(uid):
-                print(f"── {job_name} · tenant {uid[:8]} ──", flush=True)
-                results.append(await afn(*args, **kwargs))
-        except Exception as e:
-            from core.lib.audit_logger import audit_log_sync
-            audit_log_sync(job_name, "ERROR", f"{job_name} failed for tenant {uid}: {e}")
-            print(f"❌ {job_name} failed for tenant {uid}: {e}", flush=True)
-    return results
+    summary = await afanout_tenants(
+        lambda uid: afn(*args, **kwargs), uids,
+        job_name=job_name, concurrency=concurrency,
+    )
+    return summary.results
+
+
+# ── Concurrent tenant fan-out ──────────────────────────────────────────────
+# Tenants are independent, so a serial loop makes the Nth tenant wait for
+# N-1 full runs. afanout_tenants runs them as asyncio tasks under a
+# semaphore: each task copies the context at creation, so tenant_scope()
+# inside it never leaks into a sibling. LLM calls still queue on the shared
+# Redis-backed limiters (core/lib/rate_limiter.py) — the cap keeps a large
+# tenant list from parking dozens of runs on the same limiter window.
+
+TENANT_FANOUT_CONCURRENCY = int(os.getenv("TENANT_FANOUT_CONCURRENCY", "4"))
+
+
+@dataclass
+class TenantRunOutcome:
+    """One tenant's fan-out result. status: 'ok' | 'error' | 'timeout'."""
+    uid: str
+    status: str
+    result: object = None
+    error: str | None = None
+    elapsed_s: float = 0.0
+
+
+@dataclass
+class FanoutSummary:
+    """Per-tenant outcomes of one afanout_tenants call, in input order."""
+    job_name: str
+    outcomes: list[TenantRunOutcome] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def results(self) -> list:
+        return [o.result for o in self.outcomes if o.status == "ok"]
+
+    def count(self, status: str) -> int:
+        return sum(1 for o in self.outcomes if o.status == status)
+
+    def describe(self) -> str:
+        slowest = max(self.outcomes, key=lambda o: o.elapsed_s, default=None)
+        line = (
+            f"{self.job_name}: {len(self.outcomes)} tenants in {self.elapsed_s:.1f}s — "
+            f"{self.count('ok')} ok, {self.count('error')} failed, "
+            f"{self.count('timeout')} timed out"
+        )
+        if slowest is not None:
+            line += f" (slowest {slowest.uid[:8]} {slowest.elapsed_s:.1f}s)"
+        return line
+
+
+async def afanout_tenants(
+    run_one,
+    uids: list[str],
+    *,
+    job_name: str = "fanout",
+    concurrency: int | None = None,
+    deadline_s: float | None = None,
+) -> FanoutSummary:
+    """Await run_one(uid) for every tenant, each under its own tenant_scope.
+
+    At most `concurrency` tenants run at once (TENANT_FANOUT_CONCURRENCY by
+    default); wall time tracks the slowest tenant rather than the sum. A
+    tenant exceeding `deadline_s` is cancelled and reported as 'timeout';
+    an exception is audit-logged and reported as 'error'. Neither aborts
+    the other tenants.
+    """
+    from core.lib.audit_logger import audit_log_sync
+
+    limit = max(1, concurrency or TENANT_FANOUT_CONCURRENCY)
+    gate = asyncio.Semaphore(limit)
+    started = time.monotonic()
+
+    async def _one(uid: str) -> TenantRunOutcome:
+        async with gate:
+            t0 = time.monotonic()
+            try:
+                with tenant_scope(uid):
+                    print(f"── {job_name} · tenant {uid[:8]} ──", flush=True)
+                    result = await asyncio.wait_for(run_one(uid), deadline_s)
+                return TenantRunOutcome(uid, "ok", result, elapsed_s=time.monotonic() - t0)
+            except asyncio.TimeoutError:
+                msg = f"{job_name} timed out for tenant {uid} after {deadline_s:.0f}s"
+                audit_log_sync(job_name, "ERROR", msg)
+                print(f"⏱ {msg}", flush=True)
+                return TenantRunOutcome(uid, "timeout", error=msg, elapsed_s=time.monotonic() - t0)
+            except Exception as e:
+                audit_log_sync(job_name, "ERROR", f"{job_name} failed for tenant {uid}: {e}")
+                print(f"❌ {job_name} failed for tenant {uid}: {e}", flush=True)
+                return TenantRunOutcome(uid, "error", error=str(e), elapsed_s=time.monotonic() - t0)
+
+    outcomes = await asyncio.gather(*(_one(uid) for uid in uids))
+    summary = FanoutSummary(job_name, list(outcomes), time.monotonic() - started)
+    if len(uids) > 1:
+        print(summary.describe(), flush=True)
+    return summary
 
 
 def resolve_user_by_api_key(api_key: str) -> dict | None:
@@ -292,6 +292,35 @@ def resolve_timezone(user_id: str | None = None) -> str:
     return _env_timezone()
 
 
+def resolve_timezones(user_ids: list[str]) -> dict[str, str]:
+    """resolve_timezone for many users: cached settings first, then ONE
+    `user_id IN (...)` read for the rest. Fail-open per user → env/default."""
+    out = {}
+    pending = []
+    for uid in user_ids:
+        cached = _settings_cache.get(uid)
+        if cached is not None:
+            out[uid] = cached.timezone or _env_timezone()
+        else:
+            pending.append(uid)
+    if pending:
+        found = {}
+        try:
+            res = (
+                get_supabase()
+                .table("user_settings")
+                .select("user_id, timezone")
+                .in_("user_id", pending)
+                .execute()
+            )
+            found = {str(r.get("user_id")): r.get("timezone") for r in (res.data or [])}
+        except Exception:
+            pass  # pre-db/78 / table missing: env/defaults only
+        for uid in pending:
+            out[uid] = found.get(str(uid)) or _env_timezone()
+    return out
+
+
 def resolve_domains(user_id: str | None = None) -> list[dict]:
     """Routing domains for the classifier/pulse.
 
@@ -15,6 +15,8 @@ from core.lib.graph_rules import resolve_alias, normalize_label, resolve_root_la
 from core.services.db import (
     get_tenant,
     maybe_single_safe,
+    scan_pages,
+    scan_rows,
     tenant_aware_client,
     tenant_scope,
 )
@@ -51,73 +53,88 @@ def with_retry(fn, retries=3, base_delay=1, label="operation"):
                 audit_log_sync("backfill_graph", "CRITICAL", f"{label} failed after {retries} attempts.")
                 raise e
 
-def fetch_all_paginated(table_name: str, select_str: str = "*", in_filter_col=None, in_filter_val=None, eq_filters: dict = None):
-    all_rows = []
-    start = 0
-    page_size = 1000
-    while True:
-        query = supabase.table(table_name).select(select_str)
+def _execute_with_retry(query):
+    return with_retry(query.execute, label="Paginated fetch")
+
+
+def iter_paginated(table_name: str, select_str: str = "*", in_filter_col=None, in_filter_val=None,
+                   eq_filters: dict = None, filters=None):
+    """Keyset-scan a table row by row (core.services.db.scan_rows), each page retried."""
+    def _filters(query):
         if in_filter_col and in_filter_val:
             query = query.in_(in_filter_col, in_filter_val)
         for eq_col, eq_val in (eq_filters or {}).items():
             query = query.eq(eq_col, eq_val)
-        
-        try:
-            res = with_retry(
-                lambda: query.range(start, start + page_size - 1).execute(),
-                label="Paginated fetch"
-            )
-            data = res.data or []
-        except Exception:
-            break
-        
-        all_rows.extend(data)
-        
-        if len(data) < page_size:
-            break
-        start += page_size
+        return filters(query) if filters else query
+
+    yield from scan_rows(supabase, table_name, select_str, filters=_filters,
+                         execute=_execute_with_retry)
+
+
+def fetch_all_paginated(table_name: str, select_str: str = "*", in_filter_col=None, in_filter_val=None, eq_filters: dict = None):
+    all_rows = []
+    try:
+        for row in iter_paginated(table_name, select_str, in_filter_col, in_filter_val, eq_filters):
+            all_rows.append(row)
+    except Exception:
+        pass  # with_retry already logged it; keep what was read
     return all_rows
 
 
 def fetch_memories():
-    existing_edges = fetch_all_paginated("graph_edges", "metadata")
+    # Streamed: only the memory ids are kept, never the edge rows themselves.
     processed_memory_ids = set()
-    for row in existing_edges or []:
-        try:
-            meta = _normalize_meta(row.get("metadata"))
-            if meta.get("memory_id"):
-                # Normalize: treat as int for comparison with memories.id
-                try:
-                    processed_memory_ids.add(int(meta["memory_id"]))
-                except (ValueError, TypeError) as e:
-                    audit_log_sync("backfill_graph", "WARNING", f"⚠️ memory_id parse error: {e}")
-        except Exception as e:
-            audit_log_sync("backfill_graph", "WARNING", f"⚠️ Metadata processing error: {e}")
-            
-    # Also check pending_graph_edges to prevent reprocessing memories that are staged for approval
-    pending_edges = fetch_all_paginated("pending_graph_edges", "source_text")
-    for row in pending_edges or []:
-        st = row.get("source_text", "")
-        if st and st.startswith("memories:"):
+    try:
+        for row in iter_paginated("graph_edges", "metadata"):
             try:
-                processed_memory_ids.add(int(st.split(":")[1]))
+                meta = _normalize_meta(row.get("metadata"))
+                if meta.get("memory_id"):
+                    # Normalize: treat as int for comparison with memories.id
+                    try:
+                        processed_memory_ids.add(int(meta["memory_id"]))
+                    except (ValueError, TypeError) as e:
+                        audit_log_sync("backfill_graph", "WARNING", f"⚠️ memory_id parse error: {e}")
+            except Exception as e:
+                audit_log_sync("backfill_graph", "WARNING", f"⚠️ Metadata processing error: {e}")
+
+        # Also check pending_graph_edges to prevent reprocessing memories that are staged for approval
+        for row in iter_paginated("pending_graph_edges", "source_text",
+                                  filters=lambda q: q.like("source_text", "memories:%")):
+            try:
+                processed_memory_ids.add(int(row["source_text"].split(":")[1]))
             except (ValueError, IndexError):
                 pass
-    
-    total_memories = fetch_all_paginated("memories", "id, memory_type, created_at")
+    except Exception:
+        pass  # with_retry already logged it; keep what was read
+
+    try:
+        total_memories = sum(len(page) for page in scan_pages(
+            supabase, "memories", "id", execute=_execute_with_retry))
+    except Exception:
+        total_memories = 0
     print("  MEMORY DIAGNOSTICS:")
-    print(f"    Total memories in DB: {len(total_memories) if total_memories else 0}")
-    
-    memories = fetch_all_paginated("memories", "id, content, memory_type, metadata, created_at", "memory_type", MEMORY_TYPES)
+    print(f"    Total memories in DB: {total_memories}")
 
     # Incremental window: scheduled runs only extract memories from the last
     # BACKFILL_WINDOW_DAYS. Ancient unprocessed rows (mostly never-extractable
     # content with no entities) made a run grind through hundreds of LLM
     # extractions and blow the job timeout. BACKFILL_FULL=1 bypasses the
-    # window for on-demand deep backfills.
+    # window for on-demand deep backfills. The window is applied server-side
+    # so out-of-window rows are never shipped.
+    cutoff = None
     if BACKFILL_WINDOW_DAYS and not os.getenv("BACKFILL_FULL"):
         cutoff = (datetime.now(timezone.utc) - timedelta(days=BACKFILL_WINDOW_DAYS)).isoformat()
-        memories = [m for m in (memories or []) if m.get("created_at", "") >= cutoff]
+
+    def _window(query):
+        return query.gte("created_at", cutoff) if cutoff else query
+
+    memories = []
+    try:
+        for m in iter_paginated("memories", "id, content, memory_type, metadata, created_at",
+                                "memory_type", MEMORY_TYPES, filters=_window):
+            memories.append(m)
+    except Exception:
+        pass  # with_retry already logged it; keep what was read
 
     # URL FILTER: Strip out any memory that contains a URL
     filtered_memories = [m for m in (memories or []) if 'http://' not in str(m.get('content', '')).lower() and 'https://' not in str(m.get('content', '')).lower()]
@@ -217,29 +234,16 @@ def backfill_embeddings():
     print("\n🔍 Embedding backfill: fetching memories with missing embeddings...")
 
     all_rows = []
-    start = 0
-    page_size = 500
-
-    while True:
-        try:
-            res = with_retry(
-                lambda: supabase.table("memories")
-                    .select("id, content, memory_type, metadata")
-                    .in_("memory_type", MEMORY_TYPES)
-                    .is_("embedding", "null")
-                    .range(start, start + page_size - 1)
-                    .execute(),
-                label="Fetch missing embeddings"
-            )
-            data = res.data or []
-        except Exception as e:
-            print(f"Failed to fetch missing-embedding rows: {e}")
-            break
-
-        all_rows.extend(data)
-        if len(data) < page_size:
-            break
-        start += page_size
+    try:
+        for row in scan_rows(
+            supabase, "memories", "id, content, memory_type, metadata",
+            filters=lambda q: q.in_("memory_type", MEMORY_TYPES).is_("embedding", "null"),
+            page_size=500,
+            execute=lambda q: with_retry(q.execute, label="Fetch missing embeddings"),
+        ):
+            all_rows.append(row)
+    except Exception as e:
+        print(f"Failed to fetch missing-embedding rows: {e}")
 
     total = len(all_rows)
     print(f"Found {total} memories with missing embeddings.\n")
@@ -916,18 +920,12 @@ def backfill_emotion_edges():
         if not es_nodes:
             return
             
-        feels_edges = []
-        page = 0
-        limit = 1000
-        while True:
-            res = supabase.table("graph_edges").select("target_node_id").eq("source_node_id", danny_id).eq("relationship", "FEELS").eq('is_current', True).range(page*limit, (page+1)*limit - 1).execute()
-            data = res.data or []
-            feels_edges.extend([e["target_node_id"] for e in data])
-            if len(data) < limit:
-                break
-            page += 1
-            
-        existing_target_ids = set(feels_edges)
+        existing_target_ids = {
+            e["target_node_id"]
+            for e in iter_paginated("graph_edges", "target_node_id", eq_filters={
+                "source_node_id": danny_id, "relationship": "FEELS", "is_current": True,
+            })
+        }
         
         edges_to_insert = []
         for es in es_nodes:
@@ -968,11 +966,14 @@ def backfill_orphaned_tasks():
             task_node_task_ids.add(int(tid))
     
     # Find existing task nodes that have ZERO edges
-    all_edges = fetch_all_paginated("graph_edges", "source_node_id, target_node_id")
+    # Streamed: only the endpoint ids are kept, never the edge rows.
     task_nodes_with_edges = set()
-    for e in (all_edges or []):
-        task_nodes_with_edges.add(e["source_node_id"])
-        task_nodes_with_edges.add(e["target_node_id"])
+    try:
+        for e in iter_paginated("graph_edges", "source_node_id, target_node_id"):
+            task_nodes_with_edges.add(e["source_node_id"])
+            task_nodes_with_edges.add(e["target_node_id"])
+    except Exception:
+        pass  # with_retry already logged it; keep what was read
         
     edgeless_existing_tasks = []
     for node in (existing_task_nodes or []):
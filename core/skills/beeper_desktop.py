@@ -11,7 +11,11 @@ For each tick it:
 
   - lists WhatsApp chats (paginated), skipping chats without new activity
     since their persisted per-chat cursor (`core_config` key
-    `beeper_desktop_cursor:{chat_id}`),
+    `beeper_desktop_cursor:{chat_id}`, all loaded in one query and written
+    back in one bulk upsert at the end of the tick),
+  - processes the visited chats DESKTOP_CHAT_CONCURRENCY at a time over the
+    one Desktop API connection (each chat still strictly oldest-first),
+    cancelling stragglers at TICK_DEADLINE_S so a tick fits its interval,
   - pages each active chat's messages backward (`cursor` param) so a
     long Mac-off gap never loses messages, bounded by MAX_MESSAGES_PER_TICK,
   - detects the USER's own sends (`isSender: true` — the Desktop API
@@ -62,6 +66,8 @@ MAX_CHATS_TOTAL = 2000        # safety cap on listing chats
 MAX_CHATS_PER_TICK = 60       # chats visited per tick (cold-start backfill)
 MAX_MESSAGES_PER_TICK = 500   # messages routed per tick (mirrors Matrix cap)
 COLD_START_WINDOW_DAYS = 30   # backfill chats active within this window only
+DESKTOP_CHAT_CONCURRENCY = 4  # chats in flight on the shared Desktop API client
+TICK_DEADLINE_S = 50          # stay inside the launchd StartInterval (60s)
 
 # ── Token resolution ────────────────────────────────────────────────────
 
@@ -231,8 +237,8 @@ def _cursor_key(chat_id: str) -> str:
     return f"{CURSOR_KEY_PREFIX}:{chat_id}"
 
 
-def _load_cursor(supabase, chat_id: str) -> dict | None:
-    """Load the persisted per-chat cursor from core_config.
+def _parse_cursor(content) -> dict | None:
+    """core_config.content → cursor dict (None when absent or garbage).
 
     core_config.content is a TEXT column — PostgREST returns it as a JSON
     string, NOT a dict. The old isinstance(content, dict) check was always
@@ -240,41 +246,62 @@ def _load_cursor(supabase, chat_id: str) -> dict | None:
     page and re-routed the same messages (the ~230 "duplicates" per tick),
     and gap-free backfill (page_back=bool(cursor)) never engaged.
     """
-    try:
-        import json
-        res = (
-            supabase.table("core_config")
-            .select("content")
-            .eq("key", _cursor_key(chat_id))
-            .limit(1)
-            .maybe_single()
-            .execute()
-        )
-        data = res.data if res else None
-        if not data:
-            return None
-        content = data.get("content")
-        if isinstance(content, dict):
-            return dict(content)
-        if isinstance(content, str) and content.strip():
+    import json
+    if isinstance(content, dict):
+        return dict(content)
+    if isinstance(content, str) and content.strip():
+        try:
             parsed = json.loads(content)
-            return dict(parsed) if isinstance(parsed, dict) else None
-    except Exception:
-        pass
+        except ValueError:
+            return None
+        return dict(parsed) if isinstance(parsed, dict) else None
     return None
 
 
-def _save_cursor(supabase, chat_id: str, content: dict) -> None:
+CURSOR_LOAD_CHUNK = 100  # keys per IN filter (keeps the PostgREST URL short)
+
+
+def _load_cursors(supabase, chat_ids: list[str]) -> dict[str, dict]:
+    """{chat_id: cursor} for every chat that has one — one query per
+    CURSOR_LOAD_CHUNK chats instead of one per chat. Chats without a row
+    (or with unreadable content) are absent; a failed read loads nothing,
+    which degrades to the cold-start visit rule, never to a lost message."""
+    by_key = {_cursor_key(cid): cid for cid in chat_ids}
+    keys = list(by_key)
+    cursors: dict[str, dict] = {}
+    for i in range(0, len(keys), CURSOR_LOAD_CHUNK):
+        try:
+            res = (
+                supabase.table("core_config")
+                .select("key, content")
+                .in_("key", keys[i:i + CURSOR_LOAD_CHUNK])
+                .execute()
+            )
+        except Exception as e:
+            audit_log_sync("beeper", "WARNING", f"desktop cursor load failed: {e}")
+            continue
+        for row in (res.data if res else None) or []:
+            cursor = _parse_cursor(row.get("content"))
+            if cursor is not None and row.get("key") in by_key:
+                cursors[by_key[row["key"]]] = cursor
+    return cursors
+
+
+def _save_cursors(supabase, cursors: dict[str, dict]) -> None:
+    """Write every advanced chat cursor back in ONE bulk upsert."""
+    if not cursors:
+        return
     try:
         # .execute() is mandatory — supabase-py builds requests lazily and a
         # bare core_config_upsert(...) is a silent no-op (the Matrix bridge's
         # cursor/room-map saves had exactly this bug: zero rows ever written).
-        core_config_upsert(supabase, {
-            "key": _cursor_key(chat_id),
-            "content": content,
-        }).execute()
+        core_config_upsert(supabase, [
+            {"key": _cursor_key(chat_id), "content": content}
+            for chat_id, content in cursors.items()
+        ]).execute()
     except Exception as e:
-        audit_log_sync("beeper", "WARNING", f"desktop cursor save failed: {e}")
+        audit_log_sync("beeper", "WARNING",
+                       f"desktop cursor save failed ({len(cursors)} chats): {e}")
 
 
 # ── Visit filter ────────────────────────────────────────────────────────
@@ -430,13 +457,19 @@ def _classify_error(e: Exception) -> tuple[str, str | None]:
 # ── Per-chat processing ─────────────────────────────────────────────────
 
 async def process_chat(supabase, client: BeeperDesktopClient, meta: dict,
-                       cursor: dict | None, summary: dict) -> None:
-    """Fetch + route new messages for one chat, then advance its cursor.
-
-    Cursor advances to the sortKey of the NEWEST message actually routed
-    this tick; if the per-tick budget cuts processing short, the remainder
-    stays newer than the cursor and is picked up next tick (no gaps).
+                       cursor: dict | None, summary: dict,
+                       cursors: dict[str, dict]) -> None:
+    """Fetch + route new messages for one chat, advancing its cursor.
+
+    Messages route oldest-first, one at a time, so per-chat order holds
+    even while other chats run concurrently. The chat's entry in `cursors`
+    (written back in bulk at the end of the tick) moves to the sortKey of
+    each message as it is routed — a budget cut or a tick-deadline
+    cancellation leaves the remainder newer than the cursor, picked up
+    next tick (no gaps).
     """
+    if summary["processed"] >= MAX_MESSAGES_PER_TICK:
+        return
     cursor_sort = int((cursor or {}).get("sortKey") or 0)
     collected = await collect_new_messages(client, meta["desktop_chat_id"],
                                            cursor_sort, page_back=bool(cursor))
@@ -448,8 +481,9 @@ async def process_chat(supabase, client: BeeperDesktopClient, meta: dict,
     for msg in reversed(collected):
         if summary["processed"] >= MAX_MESSAGES_PER_TICK:
             break
-        status, reason = await route_message(supabase, msg, meta)
+        # Claim the budget slot before awaiting: concurrent chats share it.
         summary["processed"] += 1
+        status, reason = await route_message(supabase, msg, meta)
         if status == "outgoing":
             summary["outgoing"] += 1
         elif status == "incoming":
@@ -463,12 +497,47 @@ async def process_chat(supabase, client: BeeperDesktopClient, meta: dict,
         else:  # ignored
             summary["ignored"] += 1
         new_cursor_sort = max(new_cursor_sort, _sort_key(msg))
+        cursors[meta["desktop_chat_id"]] = {
+            "sortKey": new_cursor_sort,
+            "lastActivity": meta.get("last_activity"),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+async def process_chats(supabase, client: BeeperDesktopClient,
+                        visits: list[tuple[dict, dict | None]],
+                        summary: dict) -> dict[str, dict]:
+    """Run process_chat over `visits` with DESKTOP_CHAT_CONCURRENCY in
+    flight on the shared client, bounded by TICK_DEADLINE_S.
+
+    Chats still running at the deadline are cancelled (counted in
+    summary["cancelled"]); whatever they routed before that keeps its
+    cursor. Returns the advanced cursors, {chat_id: content}.
+    """
+    cursors: dict[str, dict] = {}
+    gate = asyncio.Semaphore(DESKTOP_CHAT_CONCURRENCY)
 
-    _save_cursor(supabase, meta["desktop_chat_id"], {
-        "sortKey": new_cursor_sort,
-        "lastActivity": meta.get("last_activity"),
-        "updated_at": datetime.now(timezone.utc).isoformat(),
-    })
+    async def _one(meta, cursor):
+        async with gate:
+            try:
+                await process_chat(supabase, client, meta, cursor, summary, cursors)
+            except Exception as e:
+                summary["errors"] += 1
+                audit_log_sync("beeper", "WARNING",
+                               f"desktop chat {meta['desktop_chat_id'][:30]} failed: {e}")
+
+    tasks = [asyncio.create_task(_one(meta, cursor)) for meta, cursor in visits]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=TICK_DEADLINE_S)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            summary["cancelled"] = len(pending)
+            audit_log_sync("beeper", "WARNING",
+                           f"desktop tick hit {TICK_DEADLINE_S}s deadline — "
+                           f"{len(pending)} chats deferred to next tick")
+    return cursors
 
 
 # ── Top-level run ───────────────────────────────────────────────────────
@@ -488,7 +557,7 @@ async def run_desktop_sync() -> dict:
     summary = {
         "skipped": False, "chats_seen": 0, "visited": 0,
         "outgoing": 0, "incoming": 0, "ignored": 0,
-        "duplicate": 0, "errors": 0, "processed": 0,
+        "duplicate": 0, "errors": 0, "processed": 0, "cancelled": 0,
     }
 
     with channel_tenant_scope():
@@ -504,19 +573,19 @@ async def run_desktop_sync() -> dict:
                 cutoff = datetime.now(timezone.utc) - timedelta(days=COLD_START_WINDOW_DAYS)
                 chats = await client.list_all_chats(stop_before=cutoff)
                 summary["chats_seen"] = len(chats)
-                visited = 0
-                for chat in chats:
-                    if visited >= MAX_CHATS_PER_TICK or summary["processed"] >= MAX_MESSAGES_PER_TICK:
+                metas = [m for m in map(resolve_chat_meta, chats) if m]
+                stored = await asyncio.to_thread(
+                    _load_cursors, supabase, [m["desktop_chat_id"] for m in metas])
+                visits = []
+                for meta in metas:
+                    if len(visits) >= MAX_CHATS_PER_TICK:
                         break
-                    meta = resolve_chat_meta(chat)
-                    if not meta:
-                        continue
-                    cursor = _load_cursor(supabase, meta["desktop_chat_id"])
-                    if not should_visit_chat(meta.get("last_activity"), cursor, cutoff):
-                        continue
-                    visited += 1
-                    summary["visited"] += 1
-                    await process_chat(supabase, client, meta, cursor, summary)
+                    cursor = stored.get(meta["desktop_chat_id"])
+                    if should_visit_chat(meta.get("last_activity"), cursor, cutoff):
+                        visits.append((meta, cursor))
+                summary["visited"] = len(visits)
+                advanced = await process_chats(supabase, client, visits, summary)
+                await asyncio.to_thread(_save_cursors, supabase, advanced)
 
             # ── Liveness heartbeat ──
             # The VPS is now the SINGLE capture path (Mac agent + Modal
@@ -13,6 +13,61 @@ from datetime import datetime, timezone, timedelta
 from core.services.db import tenant_aware_client
 from core.lib.audit_logger import audit_log_sync
 
+# DLQ items older than this are no longer retried.
+DLQ_WINDOW_HOURS = 72
+
+
+def _parse_meta(row: dict) -> dict | None:
+    meta = row.get('metadata') or {}
+    if isinstance(meta, str):
+        try:
+            meta = json.loads(meta)
+        except Exception:
+            return None
+    return meta
+
+
+def _backoff_elapsed(meta: dict, now: datetime) -> bool:
+    """Exponential backoff: 2^retry_count minutes since the last retry."""
+    backoff_minutes = 2 ** meta.get('retry_count', 0)
+    last_retry_str = meta.get('last_retry_at')
+    if last_retry_str:
+        try:
+            last_retry = datetime.fromisoformat(str(last_retry_str).replace('Z', '+00:00'))
+            return now - last_retry >= timedelta(minutes=backoff_minutes)
+        except Exception:
+            pass
+    return True
+
+
+async def dlq_depth(max_retries: int = 3, scan_limit: int = 200) -> int:
+    """DLQ items due for a retry now, across all tenants.
+
+    Sizes the DLQ worker in the job runner's queue plan
+    (core/lib/job_runner.py); escalated items and items still backing off
+    are not counted, so a DLQ holding only those starts no worker.
+    """
+    from core.services.db import exec_query, get_supabase
+    now = datetime.now(timezone.utc)
+    cutoff = (now - timedelta(hours=DLQ_WINDOW_HOURS)).isoformat()
+    try:
+        rows = await exec_query(
+            get_supabase().table('audit_logs')
+            .select('metadata')
+            .eq('service', 'dlq')
+            .gte('created_at', cutoff)
+            .limit(scan_limit)
+        )
+    except Exception as e:
+        audit_log_sync("dlq_consumer", "WARNING", f"DLQ depth query failed: {e}")
+        return 0
+    depth = 0
+    for row in rows.data or []:
+        meta = _parse_meta(row)
+        if meta is not None and meta.get('retry_count', 0) < max_retries and _backoff_elapsed(meta, now):
+            depth += 1
+    return depth
+
 
 async def process_dlq(max_items: int = 5, max_retries: int = 3) -> dict:
     """Process items from the dead letter queue.
@@ -28,7 +83,7 @@ async def process_dlq(max_items: int = 5, max_retries: int = 3) -> dict:
     now = datetime.now(timezone.utc)
 
     # Query DLQ items from audit_logs
-    cutoff = (now - timedelta(hours=72)).isoformat()
+    cutoff = (now - timedelta(hours=DLQ_WINDOW_HOURS)).isoformat()
     try:
         rows = supabase.table('audit_logs') \
             .select('id, message, metadata') \
@@ -48,12 +103,9 @@ async def process_dlq(max_items: int = 5, max_retries: int = 3) -> dict:
     # DLQ items have metadata with: table, record_id, content, reason, retry_count
     dlq_items = []
     for row in rows.data:
-        meta = row.get('metadata') or {}
-        if isinstance(meta, str):
-            try:
-                meta = json.loads(meta)
-            except Exception:
-                continue
+        meta = _parse_meta(row)
+        if meta is None:
+            continue
         retry_count = meta.get('retry_count', 0)
         if retry_count < max_retries:
             dlq_items.append({"audit_id": row['id'], "meta": meta, "message": row.get('message', '')})
@@ -70,16 +122,8 @@ async def process_dlq(max_items: int = 5, max_retries: int = 3) -> dict:
         table = meta.get('table', '')
         record_id = meta.get('record_id', '')
 
-        # Compute backoff: 2^retry_count minutes (exponential)
-        backoff_minutes = 2 ** retry_count
-        last_retry_str = meta.get('last_retry_at')
-        if last_retry_str:
-            try:
-                last_retry = datetime.fromisoformat(str(last_retry_str).replace('Z', '+00:00'))
-                if datetime.now(timezone.utc) - last_retry < timedelta(minutes=backoff_minutes):
-                    continue  # Not time for retry yet
-            except Exception:
-                pass
+        if not _backoff_elapsed(meta, datetime.now(timezone.utc)):
+            continue  # Not time for retry yet
 
         # Attempt recovery based on table type
         success = False
@@ -104,9 +148,10 @@ async def process_dlq(max_items: int = 5, max_retries: int = 3) -> dict:
                     schedule_index_memory(int(record_id), item["message"][:5000], 'note', 'dlq_retry')
                     success = True
             elif table == 'pending_enrichment_jobs' and record_id:
-                # Reset dead_letter enrichment jobs back to 'failed' for re-processing
+                # Re-queue the dead_letter enrichment job with a fresh set of
+                # job-runner attempts (core/lib/job_runner.py claims 'pending').
                 supabase.table('pending_enrichment_jobs') \
-                    .update({'status': 'failed', 'error': None, 'retry_count': retry_count}) \
+                    .update({'status': 'pending', 'error': None, 'retry_count': 0}) \
                     .eq('id', int(record_id)) \
                     .eq('status', 'dead_letter') \
                     .execute()
@@ -13,19 +13,24 @@ from core.lib.duplicate_guard import check_duplicate
 from core.retrieval.pipeline import schedule_index_memory
 from core.lib.entity_context import extract_context_from_source
 from core.services.db import (
-    active_user_ids, channel_tenant_scope, maybe_single_safe, tenant_aware_client,
-    tenant_scope,
+    active_user_ids, afanout_tenants, channel_tenant_scope, exec_query,
+    maybe_single_safe, tenant_aware_client, tenant_scope,
 )
 from core.services.google_service import get_cached_service
+from core.lib.sync_cursor import GMAIL_HISTORY_CURSOR, load_sync_cursor, save_sync_cursor
 from core.lib.time_utils import compute_expires_at
 from core.services.llm import call_gemini_classify
 
 # Tenant #1 archive Gmail label — the SINGLE source of truth. Used
 # as the value seeded into core_config by scripts/seed_tenant1_m6_config.py.
 # NOT a runtime fallback — a tenant without an 'email_archive_label' row
-# scans INBOX-wide (see _archive_label_filter).
+# scans INBOX-wide (see _archive_label).
 TENANT1_EMAIL_ARCHIVE_LABEL = "Completed/Ashraya"
 
+# Per-tenant cap on one cron email cycle in run_fanout(); a tenant that
+# overruns is cancelled and picked up again by the next cron tick.
+EMAIL_INGEST_TENANT_DEADLINE_S = 300
+
 supabase = tenant_aware_client()
 
 NOREPLY_PATTERNS = [
@@ -349,11 +354,203 @@ def process_sent_email(msg_data: dict, gmail_service) -> tuple:
         return ('error', str(e))
 
 
+def _parse_email(full_msg: dict) -> dict:
+    """Headers + decoded body of a format='full' Gmail message."""
+    payload = full_msg.get('payload', {})
+    headers = {h['name'].lower(): h['value'] for h in payload.get('headers', [])}
+
+    sender_header = headers.get('from', '')
+    sender_name, sender_email = extract_email_address(sender_header)
+    received_at_raw = headers.get('date', '')
+    try:
+        received_at = parsedate_to_datetime(received_at_raw).isoformat()
+    except Exception:
+        received_at = datetime.now(timezone.utc).isoformat()
+
+    raw_plain = decode_body(payload)
+    body = raw_plain[:10000]
+    if not body.strip():
+        html_body = decode_html_body(payload)
+        raw_plain = re.sub(r'<[^>]+>', ' ', html_body).strip()
+        body = raw_plain[:10000]
+
+    return {
+        "thread_id": full_msg.get('threadId', ''),
+        "sender_header": sender_header,
+        "sender_name": sender_name,
+        "sender_email": sender_email,
+        "subject": headers.get('subject', '(No Subject)'),
+        "to_header": headers.get('to', ''),
+        "cc_header": headers.get('cc', ''),
+        "received_at": received_at,
+        "raw_plain": raw_plain,
+        "body": body,
+    }
+
+
+async def _classify_parsed(parsed: dict) -> dict:
+    """Classification for a parsed email. No-reply senders short-circuit to
+    'ignored' without an LLM call; classify_email errors propagate."""
+    if any(p in parsed["sender_email"].lower() for p in NOREPLY_PATTERNS):
+        return {"classification": "ignored", "summary": "No-reply sender", "suggested_task": None, "needs_draft": False, "linked_person_name": None, "linked_organization_name": None}
+    # We only pass the first 1500 chars to Gemini for classification to save tokens
+    return await classify_email(
+        parsed["sender_header"], parsed["subject"], parsed["body"][:1500],
+        parsed["to_header"], parsed["cc_header"],
+    )
+
+
+def _ignored_row(msg_id: str, parsed: dict) -> dict:
+    return {
+        "channel": "email",
+        "message_id": msg_id,
+        "thread_id": parsed["thread_id"],
+        "source": "gmail",
+        "sender_name": parsed["sender_name"],
+        "sender_id": parsed["sender_email"],
+        "subject": parsed["subject"],
+        "received_at": parsed["received_at"],
+        "classification": "ignored",
+        "processing_status": "completed",
+        "expires_at": compute_expires_at(parsed["subject"] or "", parsed["received_at"]),
+        "danny_decision": "skipped"
+    }
+
+
+def _record_email_error(msg_id: str, sender_name=None, sender_email=None, subject=None):
+    try:
+        now_iso = datetime.now(timezone.utc).isoformat()
+        supabase.table('messages').insert({
+            "channel": "email",
+            "message_id": msg_id,
+            "source": "gmail",
+            "sender_name": sender_name or "unknown",
+            "sender_id": sender_email or "unknown",
+            "classification": "error",
+            "processing_status": "failed",
+            "subject": subject or "processing_error",
+            "received_at": now_iso,
+            "expires_at": compute_expires_at(subject or "processing_error", now_iso)
+        }).execute()
+    except Exception as insert_err:
+        print(f"Failed to insert error record: {insert_err}")
+
+
+async def _commit_email(msg_id: str, parsed: dict, classification_data: dict, active_tasks: list, rejected_tasks: list) -> tuple:
+    """Write one classified email: ignored row, or fyi/actionable via ingest()."""
+    sender_name = parsed["sender_name"]
+    sender_email = parsed["sender_email"]
+    subject = parsed["subject"]
+    to_header = parsed["to_header"]
+    cc_header = parsed["cc_header"]
+    received_at = parsed["received_at"]
+    raw_plain = parsed["raw_plain"]
+    classification = classification_data.get('classification', 'ignored')
+
+    if classification == 'ignored':
+        supabase.table('messages').insert(_ignored_row(msg_id, parsed)).execute()
+        print(f"[ignored] {subject} | From: {sender_email}")
+        return (EmailStatus.IGNORED, subject)
+
+    if classification == 'fyi':
+        from core.lib.ingest import ingest
+        await ingest(
+            text=classification_data.get('summary', '') or subject,
+            source='email',
+            classification='fyi',
+            summary=classification_data.get('summary', '')[:1000],
+            is_human_sender=classification_data.get('is_human_sender', False),
+            has_memory_value=classification_data.get('has_memory_value', False),
+            channel_specific_data={
+                "sender_name": sender_name,
+                "sender_email": sender_email,
+                "subject": subject,
+                "to_header": to_header,
+                "cc_header": cc_header,
+                "body_raw": raw_plain[:20000],
+            },
+            tracking_id=msg_id,
+            received_at=received_at,
+            body=raw_plain[:20000],
+        )
+        print(f"[fyi] {subject} | From: {sender_email}")
+
+    elif classification == 'actionable':
+        linked_person_id = None
+        linked_person_name = classification_data.get('linked_person_name')
+
+        if linked_person_name:
+            if is_blocklisted_person(linked_person_name):
+                print(f"Skipping blocklisted linked person: {linked_person_name}")
+            else:
+                linked_person_id = await add_person_from_email(linked_person_name, None, source="email_ingest_linked")
+
+        is_human = classification_data.get('is_human_sender', False)
+        if is_human:
+            sender_id = await add_person_from_email(sender_name, sender_email)
+            if not linked_person_id:
+                linked_person_id = sender_id
+
+
+
+        suggested_task = classification_data.get('suggested_task')
+        dedup_decision = None  # None = normal, 'skipped', 'merged'
+
+        if suggested_task:
+            # Check rejected tasks first
+            rejected_guard = check_duplicate(suggested_task, rejected_tasks)
+            if rejected_guard['result'] in ['block', 'flag']:
+                print(f"Skipping task — matches rejected task: {rejected_guard['matched_title']}")
+                dedup_decision = 'skipped'
+            else:
+                guard = check_duplicate(suggested_task, active_tasks)
+                if guard['result'] == 'block':
+                    if guard['is_superset'] and guard['matched_id']:
+                        try:
+                            supabase.table('tasks').update({'title': suggested_task}).eq('id', guard['matched_id']).execute()
+                            print(f"Auto-merged task {guard['matched_id']}: '{guard['matched_title']}' → '{suggested_task}'")
+                            dedup_decision = 'merged'
+                        except Exception as upd_err:
+                            print(f"Auto-merge failed: {upd_err}")
+                            dedup_decision = 'skipped'
+                    else:
+                        dedup_decision = 'skipped'
+
+        # Route through ingest() — same contract for fyi, actionable, ignored
+        from core.lib.ingest import ingest
+        classification_for_ingest = 'ignored' if dedup_decision == 'skipped' else 'actionable'
+        await ingest(
+            text=classification_data.get('summary', '') or suggested_task or subject,
+            source='email',
+            classification=classification_for_ingest,
+            summary=classification_data.get('summary', '')[:1000],
+            suggested_title=suggested_task,                    suggested_project=None,
+            linked_person_id=linked_person_id,
+            is_human_sender=is_human,
+            has_memory_value=classification_data.get('has_memory_value', False),
+            needs_draft=classification_data.get('needs_draft', False),
+            channel_specific_data={
+                "sender_name": sender_name,
+                "sender_email": sender_email,
+                "subject": subject,
+                "to_header": to_header,
+                "cc_header": cc_header,
+                "danny_decision": dedup_decision,
+                "body_raw": raw_plain[:20000],
+            },
+            tracking_id=msg_id,
+            received_at=received_at,
+            body=raw_plain[:20000],
+        )
+        print(f"[actionable] {subject} | From: {sender_email}")
+
+    return (classification, subject)
+
+
 async def process_email(msg_data: dict, gmail_service, active_tasks: list, rejected_tasks: list) -> tuple:
+    """Serial single-message path: dedup, fetch, classify, commit."""
     msg_id = msg_data['id']
-    sender_name = None
-    sender_email = None
-    subject = None
+    parsed = {}
 
     try:
         existing = maybe_single_safe(supabase.table('messages').select('id').eq('channel', 'email').eq('message_id', msg_id))
@@ -364,169 +561,279 @@ async def process_email(msg_data: dict, gmail_service, active_tasks: list, rejec
 
     try:
         full_msg = gmail_service.users().messages().get(userId='me', id=msg_id, format='full').execute()
-        payload = full_msg.get('payload', {})
-        headers = {h['name'].lower(): h['value'] for h in payload.get('headers', [])}
-
-        sender_header = headers.get('from', '')
-        sender_name, sender_email = extract_email_address(sender_header)
-        subject = headers.get('subject', '(No Subject)')
-        to_header = headers.get('to', '')
-        cc_header = headers.get('cc', '')
-        received_at_raw = headers.get('date', '')
+        parsed = _parse_email(full_msg)
         try:
-            received_at = parsedate_to_datetime(received_at_raw).isoformat()
+            classification_data = await _classify_parsed(parsed)
         except Exception:
-            received_at = datetime.now(timezone.utc).isoformat()
+            print(f"[skipped - classification error] {parsed['subject']} | Will retry on next run")
+            return ("skipped_api_error", parsed['subject'])
+        return await _commit_email(msg_id, parsed, classification_data, active_tasks, rejected_tasks)
+    except Exception as e:
+        print(f"Error processing email {msg_id}: {e}")
+        _record_email_error(msg_id, parsed.get("sender_name"), parsed.get("sender_email"), parsed.get("subject"))
+        return (EmailStatus.ERROR, str(e))
 
-        raw_plain = decode_body(payload)
-        body = raw_plain[:10000]
-        if not body.strip():
-            html_body = decode_html_body(payload)
-            raw_plain = re.sub(r'<[^>]+>', ' ', html_body).strip()
-            body = raw_plain[:10000]
 
-        if any(p in sender_email.lower() for p in NOREPLY_PATTERNS):
-            classification_data = {"classification": "ignored", "summary": "No-reply sender", "suggested_task": None, "needs_draft": False, "linked_person_name": None, "linked_organization_name": None}
-        else:
+# ── Pipelined inbox ingest ──────────────────────────────────────────────────
+# The serial path pays one Gmail GET and one LLM round trip per message, back
+# to back. The pipeline dedups the whole listing in one query, fetches every
+# body through the Gmail batch endpoint, classifies with bounded concurrency
+# (each call still queues on flash_lite_limiter inside call_gemini), bulk-
+# inserts the ignored rows, and commits fyi/actionable in listing order so
+# the duplicate guard sees the same task lists the serial loop did.
+
+GMAIL_BATCH_SIZE = 50  # Gmail's recommended ceiling per batch request
+EMAIL_CLASSIFY_CONCURRENCY = 6  # in-flight classifications per tenant
+
+
+def _existing_email_ids(msg_ids: list) -> set | None:
+    """message_ids already stored (one IN query); None if the check failed."""
+    try:
+        res = supabase.table('messages').select('message_id').eq('channel', 'email').in_('message_id', msg_ids).execute()
+        return {r['message_id'] for r in (res.data or [])}
+    except Exception as e:
+        print(f"Bulk dedup check failed ({len(msg_ids)} ids): {e}")
+        return None
+
+
+def _fetch_full_messages(gmail_service, msg_ids: list) -> dict:
+    """{msg_id: format='full' message} via the Gmail batch endpoint.
+
+    Runs in one thread (the discovery client's transport is not thread-safe).
+    Ids a batch could not return are retried with a single GET; ids that
+    still fail are absent from the result.
+    """
+    fetched = {}
+
+    def _on_response(request_id, response, exception):
+        if exception is None and response:
+            fetched[request_id] = response
+
+    for i in range(0, len(msg_ids), GMAIL_BATCH_SIZE):
+        try:
+            batch = gmail_service.new_batch_http_request(callback=_on_response)
+            for msg_id in msg_ids[i:i + GMAIL_BATCH_SIZE]:
+                batch.add(
+                    gmail_service.users().messages().get(userId='me', id=msg_id, format='full'),
+                    request_id=msg_id,
+                )
+            batch.execute()
+        except Exception as e:
+            print(f"Gmail batch fetch failed, falling back to single GETs: {e}")
+
+    for msg_id in msg_ids:
+        if msg_id in fetched:
+            continue
+        try:
+            fetched[msg_id] = gmail_service.users().messages().get(userId='me', id=msg_id, format='full').execute()
+        except Exception as e:
+            print(f"Gmail fetch failed for {msg_id}: {e}")
+    return fetched
+
+
+async def process_inbox_batch(messages: list, gmail_service, active_tasks: list, rejected_tasks: list) -> list:
+    """Pipelined ingest of a listing. Returns (status, detail) per message,
+    in listing order, with the same statuses process_email returns."""
+    msg_ids = [m['id'] for m in messages]
+    existing = _existing_email_ids(msg_ids)
+    if existing is None:
+        # Dedup unknown: the serial path re-checks each message itself.
+        return [await process_email(m, gmail_service, active_tasks, rejected_tasks) for m in messages]
+
+    results = {m['id']: (EmailStatus.IGNORED, m.get('snippet', '')[:50]) for m in messages if m['id'] in existing}
+    new_ids = [i for i in msg_ids if i not in existing]
+    full = await asyncio.to_thread(_fetch_full_messages, gmail_service, new_ids) if new_ids else {}
+
+    parsed = {}
+    for msg_id in new_ids:
+        try:
+            if msg_id not in full:
+                raise LookupError("Gmail fetch failed")
+            parsed[msg_id] = _parse_email(full[msg_id])
+        except Exception as e:
+            print(f"Error processing email {msg_id}: {e}")
+            _record_email_error(msg_id)
+            results[msg_id] = (EmailStatus.ERROR, str(e))
+
+    gate = asyncio.Semaphore(EMAIL_CLASSIFY_CONCURRENCY)
+
+    async def _classify(msg_id):
+        async with gate:
             try:
-                # We only pass the first 1500 chars to Gemini for classification to save tokens
-                classification_data = await classify_email(sender_header, subject, body[:1500], to_header, cc_header)
+                return msg_id, await _classify_parsed(parsed[msg_id])
             except Exception:
-                print(f"[skipped - classification error] {subject} | Will retry on next run")
-                return ("skipped_api_error", subject)
-        classification = classification_data.get('classification', 'ignored')
-
-        if classification == 'ignored':
-            supabase.table('messages').insert({
-                "channel": "email",
-                "message_id": msg_id,
-                "thread_id": full_msg.get('threadId', ''),
-                "source": "gmail",
-                "sender_name": sender_name,
-                "sender_id": sender_email,
-                "subject": subject,
-                "received_at": received_at,
-                "classification": "ignored",
-                "processing_status": "completed",
-                "expires_at": compute_expires_at(subject or "", received_at),
-                "danny_decision": "skipped"
-            }).execute()
-            print(f"[ignored] {subject} | From: {sender_email}")
-            return (EmailStatus.IGNORED, subject)
-
-        if classification == 'fyi':
-            from core.lib.ingest import ingest
-            await ingest(
-                text=classification_data.get('summary', '') or subject,
-                source='email',
-                classification='fyi',
-                summary=classification_data.get('summary', '')[:1000],
-                is_human_sender=classification_data.get('is_human_sender', False),
-                has_memory_value=classification_data.get('has_memory_value', False),
-                channel_specific_data={
-                    "sender_name": sender_name,
-                    "sender_email": sender_email,
-                    "subject": subject,
-                    "to_header": to_header,
-                    "cc_header": cc_header,
-                    "body_raw": raw_plain[:20000],
-                },
-                tracking_id=msg_id,
-                received_at=received_at,
-                body=raw_plain[:20000],
-            )
-            print(f"[fyi] {subject} | From: {sender_email}")
-
-        elif classification == 'actionable':
-            linked_person_id = None
-            linked_person_name = classification_data.get('linked_person_name')
-
-            if linked_person_name:
-                if is_blocklisted_person(linked_person_name):
-                    print(f"Skipping blocklisted linked person: {linked_person_name}")
-                else:
-                    linked_person_id = await add_person_from_email(linked_person_name, None, source="email_ingest_linked")
+                return msg_id, None
+
+    classified = dict(await asyncio.gather(*(_classify(i) for i in parsed)))
+
+    ignored = []
+    for msg_id, data in classified.items():
+        p = parsed[msg_id]
+        if data is None:
+            print(f"[skipped - classification error] {p['subject']} | Will retry on next run")
+            results[msg_id] = ("skipped_api_error", p['subject'])
+        elif data.get('classification', 'ignored') == 'ignored':
+            ignored.append(msg_id)
+
+    if ignored:
+        try:
+            await exec_query(supabase.table('messages').insert([_ignored_row(i, parsed[i]) for i in ignored]))
+            for msg_id in ignored:
+                print(f"[ignored] {parsed[msg_id]['subject']} | From: {parsed[msg_id]['sender_email']}")
+                results[msg_id] = (EmailStatus.IGNORED, parsed[msg_id]['subject'])
+        except Exception as e:
+            print(f"Bulk insert of {len(ignored)} ignored emails failed, committing singly: {e}")
 
-            is_human = classification_data.get('is_human_sender', False)
-            if is_human:
-                sender_id = await add_person_from_email(sender_name, sender_email)
-                if not linked_person_id:
-                    linked_person_id = sender_id
+    for msg_id in new_ids:
+        if msg_id in results:
+            continue
+        p = parsed[msg_id]
+        try:
+            results[msg_id] = await _commit_email(msg_id, p, classified[msg_id], active_tasks, rejected_tasks)
+        except Exception as e:
+            print(f"Error processing email {msg_id}: {e}")
+            _record_email_error(msg_id, p["sender_name"], p["sender_email"], p["subject"])
+            results[msg_id] = (EmailStatus.ERROR, str(e))
 
+    return [results[i] for i in msg_ids]
 
 
-            suggested_task = classification_data.get('suggested_task')
-            dedup_decision = None  # None = normal, 'skipped', 'merged'
+# ── Incremental sync (Gmail history) ────────────────────────────────────────
+# A stored historyId lets each tick ask Gmail only for what changed since the
+# last one — messages added, plus labels added (mail filed into the archive
+# label after it arrived) — instead of re-listing 48h and deduping it away.
+# No cursor, an expired one (history.list 404s once startHistoryId falls out
+# of Gmail's retention), a changed archive label or an oversized delta all
+# take the bounded 48h scan, which re-seeds the cursor from getProfile.
+
+GMAIL_SCAN_MAX_RESULTS = 50  # per listing on the bounded-scan path
+GMAIL_HISTORY_MAX_MESSAGES = 200  # bigger deltas take the bounded scan instead
+
+
+def _archive_label() -> str:
+    """Per-tenant Gmail label (M6): core_config 'email_archive_label' is
+    authoritative when a row exists (empty content → INBOX only). Neutral
+    fallback: a tenant without the row gets no label ('' — INBOX-wide),
+    never another tenant's label."""
+    try:
+        res = supabase.table('core_config').select('content').eq('key', 'email_archive_label').execute()
+        if res.data:
+            return str(res.data[0].get('content') or '').strip()
+    except Exception:
+        pass
+    return ''
+
+
+def _http_status(exc) -> int | None:
+    """HTTP status of a googleapiclient HttpError (None for anything else)."""
+    return getattr(getattr(exc, 'resp', None), 'status', None)
+
+
+def _resolve_label_id(gmail_service, label: str, cursor: dict) -> str | None:
+    """Gmail label id for `label` (history records carry ids, not names).
+    Reuses the id stored on the cursor while the label is unchanged."""
+    if not label:
+        return None
+    if cursor.get('label') == label and cursor.get('label_id'):
+        return cursor['label_id']
+    labels = gmail_service.users().labels().list(userId='me').execute().get('labels', [])
+    return next((lb['id'] for lb in labels if lb.get('name') == label), None)
 
-            if suggested_task:
-                # Check rejected tasks first
-                rejected_guard = check_duplicate(suggested_task, rejected_tasks)
-                if rejected_guard['result'] in ['block', 'flag']:
-                    print(f"Skipping task — matches rejected task: {rejected_guard['matched_title']}")
-                    dedup_decision = 'skipped'
-                else:
-                    guard = check_duplicate(suggested_task, active_tasks)
-                    if guard['result'] == 'block':
-                        if guard['is_superset'] and guard['matched_id']:
-                            try:
-                                supabase.table('tasks').update({'title': suggested_task}).eq('id', guard['matched_id']).execute()
-                                print(f"Auto-merged task {guard['matched_id']}: '{guard['matched_title']}' → '{suggested_task}'")
-                                dedup_decision = 'merged'
-                            except Exception as upd_err:
-                                print(f"Auto-merge failed: {upd_err}")
-                                dedup_decision = 'skipped'
-                        else:
-                            dedup_decision = 'skipped'
 
-            # Route through ingest() — same contract for fyi, actionable, ignored
-            from core.lib.ingest import ingest
-            classification_for_ingest = 'ignored' if dedup_decision == 'skipped' else 'actionable'
-            await ingest(
-                text=classification_data.get('summary', '') or suggested_task or subject,
-                source='email',
-                classification=classification_for_ingest,
-                summary=classification_data.get('summary', '')[:1000],
-                suggested_title=suggested_task,                    suggested_project=None,
-                linked_person_id=linked_person_id,
-                is_human_sender=is_human,
-                has_memory_value=classification_data.get('has_memory_value', False),
-                needs_draft=classification_data.get('needs_draft', False),
-                channel_specific_data={
-                    "sender_name": sender_name,
-                    "sender_email": sender_email,
-                    "subject": subject,
-                    "to_header": to_header,
-                    "cc_header": cc_header,
-                    "danny_decision": dedup_decision,
-                    "body_raw": raw_plain[:20000],
-                },
-                tracking_id=msg_id,
-                received_at=received_at,
-                body=raw_plain[:20000],
-            )
-            print(f"[actionable] {subject} | From: {sender_email}")
-
-        return (classification, subject)
+def _history_delta(gmail_service, start_history_id: str, inbox_labels: set) -> tuple[list, list, str] | None:
+    """(inbox, sent, latest historyId) since `start_history_id`, oldest first.
 
+    Returns None when the delta exceeds GMAIL_HISTORY_MAX_MESSAGES. Raises
+    the client's HttpError (404) when the history id has expired.
+    """
+    inbox, sent = {}, {}
+    latest = start_history_id
+    page_token = None
+    while True:
+        params = {
+            'userId': 'me', 'startHistoryId': start_history_id,
+            'historyTypes': ['messageAdded', 'labelAdded'], 'maxResults': 500,
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        resp = gmail_service.users().history().list(**params).execute()
+        for record in resp.get('history', []):
+            for item in record.get('messagesAdded', []):
+                msg = item.get('message') or {}
+                labels = set(msg.get('labelIds') or [])
+                if not msg.get('id') or 'DRAFT' in labels:
+                    continue
+                if labels & inbox_labels:
+                    inbox.setdefault(msg['id'], {'id': msg['id'], 'threadId': msg.get('threadId')})
+                elif 'SENT' in labels:
+                    sent.setdefault(msg['id'], {'id': msg['id'], 'threadId': msg.get('threadId')})
+            for item in record.get('labelsAdded', []):
+                msg = item.get('message') or {}
+                if msg.get('id') and set(item.get('labelIds') or []) & inbox_labels:
+                    inbox.setdefault(msg['id'], {'id': msg['id'], 'threadId': msg.get('threadId')})
+        latest = str(resp.get('historyId') or latest)
+        if len(inbox) + len(sent) > GMAIL_HISTORY_MAX_MESSAGES:
+            return None
+        page_token = resp.get('nextPageToken')
+        if not page_token:
+            break
+    return list(inbox.values()), [m for i, m in sent.items() if i not in inbox], latest
+
+
+def _list_new_messages(gmail_service, after_timestamp: int) -> tuple[list, list, dict]:
+    """(inbox, sent, next cursor state) for this tick.
+
+    The cursor state carries no 'history_id' when none could be established
+    (getProfile or the sent listing failed) — the caller then saves nothing
+    and the next tick scans again.
+    """
+    label = _archive_label()
+    cursor = load_sync_cursor(supabase, GMAIL_HISTORY_CURSOR)
+    try:
+        label_id = _resolve_label_id(gmail_service, label, cursor)
+        label_ok = True
     except Exception as e:
-        print(f"Error processing email {msg_id}: {e}")
+        print(f"Gmail label lookup failed ({e}) — bounded scan.")
+        label_id, label_ok = None, False
+    state = {'label': label, 'label_id': label_id}
+
+    start = cursor.get('history_id')
+    if start and label_ok and cursor.get('label', '') == label:
+        inbox_labels = {'INBOX'} | ({label_id} if label_id else set())
         try:
-            now_iso = datetime.now(timezone.utc).isoformat()
-            supabase.table('messages').insert({
-                "channel": "email",
-                "message_id": msg_id,
-                "source": "gmail",
-                "sender_name": sender_name or "unknown",
-                "sender_id": sender_email or "unknown",
-                "classification": "error",
-                "processing_status": "failed",
-                "subject": subject or "processing_error",
-                "received_at": now_iso,
-                "expires_at": compute_expires_at(subject or "processing_error", now_iso)
-            }).execute()
-        except Exception as insert_err:
-            print(f"Failed to insert error record: {insert_err}")
-        return (EmailStatus.ERROR, str(e))
+            delta = _history_delta(gmail_service, start, inbox_labels)
+            if delta is not None:
+                inbox, sent, latest = delta
+                print(f"Gmail history since {start}: {len(inbox)} inbox, {len(sent)} sent.")
+                return inbox, sent, {**state, 'history_id': latest}
+            print(f"Gmail history delta over {GMAIL_HISTORY_MAX_MESSAGES} messages — bounded scan.")
+        except Exception as e:
+            if _http_status(e) == 404:
+                print("Gmail history cursor expired — bounded scan.")
+            else:
+                print(f"Gmail history sync failed ({e}) — bounded scan.")
+
+    # Profile first: anything arriving during the scan lands after this id
+    # and is picked up by the next tick's history call.
+    try:
+        history_id = gmail_service.users().getProfile(userId='me').execute().get('historyId')
+    except Exception as e:
+        print(f"Gmail getProfile failed, cursor not advanced: {e}")
+        history_id = None
+    label_part = f' OR label:"{label}"' if label else ''
+    query = f'(label:inbox{label_part}) after:{after_timestamp}'
+    inbox = gmail_service.users().messages().list(
+        userId='me', q=query, maxResults=GMAIL_SCAN_MAX_RESULTS).execute().get('messages', [])
+    try:
+        sent = gmail_service.users().messages().list(
+            userId='me', q=f'in:sent after:{after_timestamp}', maxResults=GMAIL_SCAN_MAX_RESULTS,
+        ).execute().get('messages', [])
+    except Exception as e:
+        print(f"Sent emails listing failed: {e}")
+        sent, history_id = [], None
+    if history_id:
+        state['history_id'] = str(history_id)
+    return inbox, sent, state
 
 
 async def main():
@@ -544,28 +851,8 @@ async def main():
 
     cutoff = datetime.now(timezone.utc) - timedelta(hours=48)
     after_timestamp = int(cutoff.timestamp())
-    # Per-tenant Gmail label (M6): core_config 'email_archive_label' is
-    # authoritative when a row exists (empty content → INBOX only). When the
-    # Neutral fallback: a tenant without an 'email_archive_label' row gets
-    # no label filter (INBOX-wide scan), never another tenant's label.
-    label_part = ''
-    try:
-        res = supabase.table('core_config').select('content').eq('key', 'email_archive_label').execute()
-        if res.data:
-            lbl = str(res.data[0].get('content') or '').strip()
-            label_part = f' OR label:"{lbl}"' if lbl else ''
-    except Exception:
-        pass
-    query = f'(label:inbox{label_part}) after:{after_timestamp}'
-    result = gmail_service.users().messages().list(userId='me', q=query, maxResults=50).execute()
-    messages = result.get('messages', [])
-
-    if not messages:
-        print("No new emails found.")
-        print("Email ingest complete. 0 processed, 0 ignored, 0 skipped (duplicates).")
-        return
-
-    print(f"Found {len(messages)} emails to process.")
+    messages, sent_messages, next_cursor = await asyncio.to_thread(
+        _list_new_messages, gmail_service, after_timestamp)
 
     processed = 0
     ignored = 0
@@ -573,7 +860,16 @@ async def main():
     skipped_api_error = 0
     results = []
     seen_ids = set()
+    # The cursor only advances past a window whose messages were all handled;
+    # a retryable failure leaves it so the next tick re-reads the same delta.
+    retry_window = False
 
+    if not messages:
+        print("No new emails found.")
+    else:
+        print(f"Found {len(messages)} emails to process.")
+
+    batch = []
     for msg in messages:
         if not msg:
             print("Skipping None message data")
@@ -584,36 +880,35 @@ async def main():
             skipped += 1
             continue
         seen_ids.add(msg_id)
+        batch.append(msg)
+
+    if batch:
         try:
-            status, detail = await process_email(msg, gmail_service, active_tasks, rejected_tasks)
-            if status == EmailStatus.IGNORED:
-                ignored += 1
-            elif status == EmailStatus.ERROR:
-                processed += 1
-            elif status == "skipped_api_error":
-                skipped_api_error += 1
-            else:
-                processed += 1
-            results.append((status, detail))
+            results = await process_inbox_batch(batch, gmail_service, active_tasks, rejected_tasks)
         except Exception as e:
-            print(f"Fatal error processing message: {e}")
+            print(f"Fatal error processing messages: {e}")
+            retry_window = True
+    for status, _detail in results:
+        if status == EmailStatus.IGNORED:
+            ignored += 1
+        elif status == "skipped_api_error":
+            skipped_api_error += 1
+        else:
+            processed += 1
+    retry_window = retry_window or skipped_api_error > 0
 
     print(f"Email ingest complete. {processed} processed, {ignored} ignored, {skipped} skipped (duplicates), {skipped_api_error} skipped (api error).")
-    
-    # --- FETCH SENT ITEMS ---
-    print("\nFetching Sent Items...")
-    sent_query = f'in:sent after:{after_timestamp}'
+
+    # --- SENT ITEMS ---
+    print("\nProcessing Sent Items...")
     try:
-        sent_result = gmail_service.users().messages().list(userId='me', q=sent_query, maxResults=50).execute()
-        sent_messages = sent_result.get('messages', [])
-        
         if not sent_messages:
             print("No new sent emails found.")
         else:
             print(f"Found {len(sent_messages)} sent emails to process.")
             sent_processed = 0
             sent_skipped = 0
-            
+
             for msg in sent_messages:
                 if not msg:
                     continue
@@ -622,16 +917,24 @@ async def main():
                     sent_skipped += 1
                     continue
                 seen_ids.add(msg_id)
-                
+
                 status, _ = process_sent_email(msg, gmail_service)
                 if status == 'processed':
                     sent_processed += 1
                 else:
                     sent_skipped += 1
-                    
+                    # No messages row was written: keep the cursor so the
+                    # next tick re-reads this delta and retries it.
+                    if status == 'error':
+                        retry_window = True
+
             print(f"Sent email ingest complete. {sent_processed} processed, {sent_skipped} skipped.")
     except Exception as e:
         print(f"Sent emails ingest failed: {e}")
+        retry_window = True
+
+    if next_cursor.get('history_id') and not retry_window:
+        save_sync_cursor(supabase, GMAIL_HISTORY_CURSOR, next_cursor)
 
 async def _run_email_ingest_for_tenant(uid: str):
     """Run one tenant's email ingest cycle under its own scope."""
@@ -645,7 +948,8 @@ async def run_fanout():
     (get_cached_service resolves per-user), and every write lands under
     their owner_id. A per-tenant failure is isolated and reported without
     aborting the other tenants. Tenants without Google creds are skipped
-    gracefully inside main() (no-op, no crash).
+    gracefully inside main() (no-op, no crash). Tenants run concurrently
+    under the shared fan-out cap, each with its own deadline.
 
     Legacy (pre-db/78, or no active users): runs once unscoped, exactly as
     the pre-M4 email ingest did — the channel tenant (or env creds) path.
@@ -654,13 +958,12 @@ async def run_fanout():
     if not uids:
         await _run_email_ingest_for_tenant_unscoped()
         return
-    for uid in uids:
-        try:
-            await _run_email_ingest_for_tenant(uid)
-        except Exception as e:
-            from core.lib.audit_logger import audit_log_sync
-            audit_log_sync("email_ingest", "ERROR", f"Email ingest failed for tenant {uid}: {e}")
-            print(f"❌ Email ingest failed for tenant {uid}: {e}")
+    # Bounded concurrent fan-out: each tenant's cycle is independent (own
+    # token, own owner_id), so they overlap instead of queueing.
+    await afanout_tenants(
+        _run_email_ingest_for_tenant, uids,
+        job_name="email_ingest", deadline_s=EMAIL_INGEST_TENANT_DEADLINE_S,
+    )
 
 
 async def _run_email_ingest_for_tenant_unscoped():
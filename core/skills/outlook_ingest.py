@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 
 from core.lib.constants import EmailStatus
 from core.lib.duplicate_guard import check_duplicate
+from core.lib.sync_cursor import OUTLOOK_INBOX_DELTA_CURSOR, load_sync_cursor, save_sync_cursor
 from core.lib.time_utils import compute_expires_at
 from core.services.db import channel_tenant_scope, maybe_single_safe, tenant_aware_client
 from core.services.llm import call_gemini_classify
@@ -139,19 +140,22 @@ async def classify_email(sender: str, subject: str, body: str, to_header: str =
     return json.loads(response.text)
 
 
-def fetch_outlook_sent_messages(limit=25):
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+INBOX_SELECT = "id,subject,receivedDateTime,from,bodyPreview,body,conversationId,isRead,hasAttachments,internetMessageId,toRecipients,ccRecipients"
+
+
+def _graph_get(url, params=None, prefer=None):
+    """GET a Graph URL with the tenant's token, refreshing once on 401.
+
+    Returns the response (caller checks status), or None when the tenant
+    has no usable Outlook token.
+    """
     access_token = get_access_token()
     if not access_token:
-        print("No Outlook token for this tenant — skipping sent-items fetch.")
-        return []
+        return None
     headers = {"Authorization": f"Bearer {access_token}"}
-
-    url = "https://graph.microsoft.com/v1.0/me/mailFolders/sentItems/messages"
-    params = {
-        "$top": limit,
-        "$select": "id,subject,sentDateTime,toRecipients,bodyPreview,body,conversationId,internetMessageId",
-        "$orderby": "sentDateTime DESC"
-    }
+    if prefer:
+        headers["Prefer"] = prefer
 
     response = requests.get(url, headers=headers, params=params, timeout=30)
 
@@ -159,10 +163,22 @@ def fetch_outlook_sent_messages(limit=25):
         from core.skills.outlook_token_helper import refresh_outlook_token
         result = refresh_outlook_token(write_back=True)
         if not result:
-            return []
-        access_token = result["access_token"]
-        headers["Authorization"] = f"Bearer {access_token}"
+            return None
+        headers["Authorization"] = f"Bearer {result['access_token']}"
         response = requests.get(url, headers=headers, params=params, timeout=30)
+    return response
+
+
+def fetch_outlook_sent_messages(limit=25):
+    params = {
+        "$top": limit,
+        "$select": "id,subject,sentDateTime,toRecipients,bodyPreview,body,conversationId,internetMessageId",
+        "$orderby": "sentDateTime DESC"
+    }
+    response = _graph_get(f"{GRAPH_BASE}/me/mailFolders/sentItems/messages", params)
+    if response is None:
+        print("No Outlook token for this tenant — skipping sent-items fetch.")
+        return []
 
     response.raise_for_status()
     messages = response.json().get("value", [])
@@ -170,35 +186,82 @@ def fetch_outlook_sent_messages(limit=25):
     return messages
 
 def fetch_outlook_messages(limit=25):
-    access_token = get_access_token()
-    if not access_token:
-        print("No Outlook token for this tenant — skipping inbox fetch.")
-        return []
-    headers = {"Authorization": f"Bearer {access_token}"}
-
-    url = "https://graph.microsoft.com/v1.0/me/mailFolders/inbox/messages"
     params = {
         "$top": limit,
-        "$select": "id,subject,receivedDateTime,from,bodyPreview,body,conversationId,isRead,hasAttachments,internetMessageId,toRecipients,ccRecipients",
+        "$select": INBOX_SELECT,
         "$orderby": "receivedDateTime DESC"
     }
-
-    response = requests.get(url, headers=headers, params=params, timeout=30)
-
-    if response.status_code == 401:
-        from core.skills.outlook_token_helper import refresh_outlook_token
-        result = refresh_outlook_token(write_back=True)
-        if not result:
-            return []
-        access_token = result["access_token"]
-        headers["Authorization"] = f"Bearer {access_token}"
-        response = requests.get(url, headers=headers, params=params, timeout=30)
+    response = _graph_get(f"{GRAPH_BASE}/me/mailFolders/inbox/messages", params)
+    if response is None:
+        print("No Outlook token for this tenant — skipping inbox fetch.")
+        return []
 
     response.raise_for_status()
     messages = response.json().get("value", [])
     print(f"fetched {len(messages)} outlook messages")
     return messages
 
+# ── Incremental sync (Graph delta) ──────────────────────────────────────────
+# The stored deltaLink returns only inbox messages created or changed since
+# the last round (see core/lib/sync_cursor.py). With no cursor, or when Graph
+# rejects it (410 Gone once the sync state expires), a fresh round is seeded
+# with a 48h receivedDateTime filter — the same window the plain listing
+# covers — and its deltaLink becomes the cursor.
+
+OUTLOOK_DELTA_PAGE_SIZE = 50
+OUTLOOK_DELTA_MAX_PAGES = 10  # larger rounds fall back to the plain listing
+
+
+def _delta_round(url, params=None):
+    """Follow one delta round to its deltaLink → (messages, delta_link).
+
+    None when the tenant has no token or the round runs past
+    OUTLOOK_DELTA_MAX_PAGES; HTTP errors raise.
+    """
+    messages = []
+    for _ in range(OUTLOOK_DELTA_MAX_PAGES):
+        response = _graph_get(url, params, prefer=f"odata.maxpagesize={OUTLOOK_DELTA_PAGE_SIZE}")
+        if response is None:
+            return None
+        response.raise_for_status()
+        page = response.json()
+        messages.extend(m for m in page.get("value", []) if "@removed" not in m)
+        if page.get("@odata.deltaLink"):
+            return messages, page["@odata.deltaLink"]
+        url, params = page.get("@odata.nextLink"), None
+        if not url:
+            break
+    return None
+
+
+def fetch_outlook_delta():
+    """(changed inbox messages, next deltaLink), or None → plain listing."""
+    delta_link = load_sync_cursor(supabase, OUTLOOK_INBOX_DELTA_CURSOR).get("delta_link")
+    if delta_link:
+        try:
+            delta = _delta_round(delta_link)
+            if delta is not None:
+                print(f"fetched {len(delta[0])} outlook messages via delta")
+                return delta
+        except requests.HTTPError as e:
+            status = getattr(e.response, "status_code", None)
+            print(f"Outlook delta cursor rejected ({status}) — reseeding.")
+        except Exception as e:
+            print(f"Outlook delta sync failed ({e}) — reseeding.")
+
+    cutoff = (datetime.now(timezone.utc) - timedelta(hours=48)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    try:
+        delta = _delta_round(f"{GRAPH_BASE}/me/mailFolders/inbox/messages/delta", {
+            "$select": INBOX_SELECT,
+            "$filter": f"receivedDateTime ge {cutoff}",
+        })
+    except Exception as e:
+        print(f"Outlook delta seed failed: {e}")
+        return None
+    if delta is not None:
+        print(f"fetched {len(delta[0])} outlook messages via delta seed")
+    return delta
+
 def normalize_outlook_message(msg):
     from_field = msg.get("from", {})
     email_address = from_field.get("emailAddress", {})
@@ -241,9 +304,15 @@ def normalize_outlook_message(msg):
     }
 
 async def ingest_outlook_messages(limit=25):
-    messages = fetch_outlook_messages(limit=limit)
+    delta = fetch_outlook_delta()
+    if delta is not None:
+        messages, next_delta_link = delta
+    else:
+        messages, next_delta_link = fetch_outlook_messages(limit=limit), None
     if not messages:
         print("No new Outlook messages found.")
+        if next_delta_link:
+            save_sync_cursor(supabase, OUTLOOK_INBOX_DELTA_CURSOR, {"delta_link": next_delta_link})
         return {"processed": 0, "ignored": 0, "skipped": 0}
 
     active_task_list = build_active_task_list()
@@ -452,6 +521,10 @@ async def ingest_outlook_messages(limit=25):
             continue
 
     print(f"Outlook ingest complete. {processed} processed, {ignored} ignored, {skipped} skipped (duplicates), {skipped_api_error} skipped (api error).")
+    # Advance only past a fully handled round; classification errors retry
+    # from the same deltaLink next tick (the message_id dedup absorbs the rest).
+    if next_delta_link and not skipped_api_error:
+        save_sync_cursor(supabase, OUTLOOK_INBOX_DELTA_CURSOR, {"delta_link": next_delta_link})
     
     # --- FETCH SENT ITEMS ---
     print("\nFetching Outlook Sent Items...")
@@ -30,7 +30,13 @@ from collections import Counter
 from datetime import datetime, timezone
 
 from core.lib.audit_logger import audit_log_sync
-from core.services.db import arun_tenant_fanout, get_supabase, tenant_scope
+from core.services.db import (
+    TENANT_FANOUT_CONCURRENCY,
+    arun_tenant_fanout,
+    get_supabase,
+    scan_rows,
+    tenant_scope,
+)
 from core.services.persona import (
     CARD_SCHEMA_VERSION,
     _PERSONA_KEY,
@@ -105,21 +111,13 @@ def _norm_label(s: str) -> str:
 def _paginate(
     table_name: str, cols: str, owner_id: str, cap: int, extra_eq: tuple = ()
 ) -> list[dict]:
-    db = get_supabase()
-    out: list[dict] = []
-    offset = 0
-    while offset < cap:
-        q = db.table(table_name).select(cols).eq("owner_id", owner_id)
-        if extra_eq:
-            q = q.eq(*extra_eq)
-        batch = q.range(offset, offset + _PAGE - 1).limit(_PAGE).execute().data
-        if not batch:
-            break
-        out.extend(batch)
-        offset += len(batch)
-        if len(batch) < _PAGE:
-            break
-    return out
+    def _filters(q):
+        q = q.eq("owner_id", owner_id)
+        return q.eq(*extra_eq) if extra_eq else q
+
+    return list(scan_rows(
+        get_supabase(), table_name, cols, filters=_filters, page_size=_PAGE, max_rows=cap,
+    ))
 
 
 def extract_facts(owner_id: str) -> dict:
@@ -606,11 +604,15 @@ async def _fanout(dry_run: bool, restore: bool) -> list[bool]:
         uid = current_user_id()
         if not uid:
             return False
+        # Sync DB/LLM work: off the loop so concurrent tenants overlap
+        # (to_thread carries the tenant_scope contextvar across).
         if restore:
-            return _restore(uid)
-        return synthesize_tenant(uid, dry_run=dry_run)
+            return await asyncio.to_thread(_restore, uid)
+        return await asyncio.to_thread(synthesize_tenant, uid, dry_run=dry_run)
 
-    return await arun_tenant_fanout(_per_tenant, job_name="persona")
+    return await arun_tenant_fanout(
+        _per_tenant, job_name="persona", concurrency=TENANT_FANOUT_CONCURRENCY
+    )
 
 
 def main() -> None:
@@ -5,6 +5,7 @@ from datetime import datetime
 
 from core.lib.audit_logger import audit_log_sync
 from core.lib.redis_cache import cache_get, cache_set
+from core.lib.tracing import traced
 from core.lib.time_utils import IST_TIMEZONE
 from core.llm.fallback import generate_content_with_fallback
 from core.llm.config import WorkloadProfile
@@ -21,6 +22,7 @@ supabase = tenant_aware_client()
 
 
 
+@traced("webhook.classify")
 async def classify_intent(text: str, context: list, ist_hour: int = None, core_json: str = "[]", conversation_history: str = "") -> dict:
     # ---
     # C3 FALLBACK CONTRACT (see core/FALLBACK_CONTRACTS.md):
@@ -19,8 +19,7 @@ from core.prompts.briefing import build_daily_brief_prompt
 from core.webhook.utils import supabase
 from core.pulse.graph import hybrid_search_graph
 from core.lib.decision_audit import log_decision, DecisionStage, set_decision_chain_id, get_decision_chain_id
-from core.lib.query_timer import mark
-from core.lib.audit_logger import trace_id_var
+from core.lib.tracing import checkpoint, span
 from core.actions import validate_factual_claims
 from core.lib.graph_rules import normalize_label
 from core.lib.constants import BOT_SENDERS
@@ -130,6 +129,7 @@ async def handle_daily_brief(text: str, chat_id: int, session_id: str = None):
         day_label = "Tomorrow" if day_offset else "Today"
 
         # ── Gather all independent queries in parallel ──
+        await context_provider.prefetch('calendar', 'tasks', 'recent_tasks', 'organizations')
         (
             cal_events_data,
             compressed_tasks_data,
@@ -795,6 +795,8 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
     try:
         # ── Shared context for this interrogation ──
         _shared = SharedQueryContext(query)
+        # One Redis MGET warms every ContextProvider cache hydration reads.
+        await context_provider.prefetch()
         
         # ── Determine date range and keyword-based flags (Phase 1 — no entity needed) ──
         start_dt, end_dt = resolve_dates_from_query(query)
@@ -897,7 +899,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
         _p1a_pending = asyncio.create_task(safe_fetch(context_provider.get_pending_decisions_context(), "None"))
         _phase1a_tasks.append(_p1a_pending)
         
-        mark(trace_id_var.get(), "phase1a_done")
+        checkpoint("phase1a_done")
         # ── AWAIT ANAPHORA (entity resolves now, while Phase 1 tasks continue in background) ──
         resolved_entity = None
         query_type = "general"
@@ -928,7 +930,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
         # again. The task was created at line ~867 and is almost certainly done.
         query_emb = await _embedding_future
 
-        mark(trace_id_var.get(), "anaphora_done")
+        checkpoint("anaphora_done")
         # ── PHASE 1b: Heavy context tasks (created AFTER anaphora with CORRECT flags) ──
         # These tasks are expensive (memories=15s, emails=3s, serendipity=2s) and MUST
         # use the query-type-overridden flags, not the initial keyword-derived ones.
@@ -975,7 +977,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
             context_provider.get_whatsapp_context(query, precomputed_embedding=query_emb), "None") if (fetch_all or is_comms) else safe_fetch(_empty_fetch("None"), "None"))
         _phase1b_tasks.append(_p1b_whatsapp)
         
-        mark(trace_id_var.get(), "phase1b_done")
+        checkpoint("phase1b_done")
         # ── Entity resolution: resolve to graph node, build anchor ──
         if resolved_entity:
             try:
@@ -1013,7 +1015,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
             except Exception as e:
                 audit_log_sync("webhook", "WARNING", f"Anchor node lookup failed: {e}")
         
-        mark(trace_id_var.get(), "entity_done")
+        checkpoint("entity_done")
         # ── PHASE 2: Entity-dependent context tasks ──
         # These start NOW while Phase 1 tasks may still be completing
         search_term = active_anchor["name"] if active_anchor else query
@@ -1163,12 +1165,13 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
         _phase2_tasks.append(_p2_raw_comms)
         
         
-        mark(trace_id_var.get(), "phase2_done")
+        checkpoint("phase2_done")
         # ── AWAIT ALL pending tasks ──
         # Phase 1a (lightweight, started before anaphora) + Phase 1b (heavy, started
         # after anaphora with correct flags) + Phase 2 (entity-dependent).
         # Wall-clock time = max(anaphora + phase1b + phase2, phase1a + phase1b + phase2)
         _all_results = await asyncio.gather(*_phase1a_tasks, *_phase1b_tasks, *_phase2_tasks)
+        checkpoint("context_ready")
         
         # Unpack: Phase 1a = 7 tasks, Phase 1b = 6 tasks, Phase 2 = 6 tasks
         _p1a_count = len(_phase1a_tasks)
@@ -1396,11 +1399,11 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
         )
         
         # Stream to Telegram progressively
-        mark(trace_id_var.get(), "gemini_start")
-        async with TelegramStreamAdapter(chat_id) as adapter:
+        checkpoint("gemini_start")
+        async with span("webhook.synthesis"), TelegramStreamAdapter(chat_id) as adapter:
             await adapter.send_header(f"{header}\n\n")
             answer = ""
-            mark(trace_id_var.get(), "llm_start")
+            checkpoint("llm_start")
             async for token in stream_with_fallback(
                 prompt=stream_prompt,
                 workload=WorkloadProfile.INTERACTIVE,
@@ -1409,7 +1412,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
                 answer += token
                 await adapter.send_chunk(token)
             
-            mark(trace_id_var.get(), "llm_end")
+            checkpoint("llm_end")
             # Stream complete — flush any remaining text
             if not answer.strip():
                 # GAP B: Empty LLM response → build structured fact-only fallback
@@ -1431,7 +1434,7 @@ async def interrogate_brain(query: str, chat_id: int, session_id: str = None, ac
             else:
                 await adapter.send_complete()
             final_reply = f"{header}\n\n{answer.strip()}"
-        mark(trace_id_var.get(), "gemini_done")
+        checkpoint("gemini_done")
         
         _last_reply = final_reply
         
@@ -6,9 +6,9 @@ import asyncio
 from datetime import datetime, timezone, timedelta
 from core.lib.time_utils import now_ist, IST_TIMEZONE
 from core.lib.audit_logger import trace_id_var, audit_log_sync
-from core.lib.telemetry import emit_observation
+from core.lib.telemetry import emit_observation, invalidate_pattern_snapshot
 from core.lib.decision_audit import set_decision_chain_id, log_decision, DecisionStage
-from core.lib.query_timer import start_timer, mark, report
+from core.lib.tracing import trace_request, checkpoint
 from core.lib.conversation import get_or_create_session, get_history, log_exchange, format_classify_context, _fresh_anchor
 from core.actions import capture_session_id, capture_response
 from core.webhook.telegram import send_telegram, download_telegram_file, answer_callback_query
@@ -341,6 +341,7 @@ async def process_callback_query(callback_query: dict):
                     supabase.table('subsystem_patterns').update({
                         'soft_accepted_count': current_count + 1,
                     }).eq('subsystem', subsystem).eq('feature_hash', feature_hash).execute()
+                    invalidate_pattern_snapshot(subsystem)
 
                     await send_telegram(chat_id, f"{subsystem} will auto-approve from now on.")
                     audit_log_sync("decision_pulse", "INFO", f"Suggest mode approve: {subsystem}:{feature_hash} pattern promoted to auto-approve")
@@ -518,9 +519,13 @@ async def process_webhook(update: dict):
     """Process an incoming Telegram (or app-simulated) update.
     (M3: wrapped in the channel tenant scope — Telegram traffic carries no
     API key, so the tenant resolves via resolve_channel_tenant().)
+
+    The whole update runs under one request root (core/lib/tracing.py):
+    its summary line splits the latency into the checkpointed phases and
+    the db/redis/llm spans nested under it.
     """
     from core.webhook.utils import webhook_tenant_scope
-    with webhook_tenant_scope():
+    with webhook_tenant_scope(), trace_request("webhook"):
         return await _process_webhook(update)
 
 
@@ -530,7 +535,6 @@ async def _process_webhook(update: dict):
     req_trace_id = str(uuid.uuid4())[:12]
     trace_id_var.set(req_trace_id)
     set_decision_chain_id()
-    start_timer(req_trace_id)
     
     try:
         from core.services.db import tenant_aware_client
@@ -599,7 +603,7 @@ async def _process_webhook(update: dict):
             audit_log_sync("webhook", "WARNING", f"core_config fetch failed: {e}")
             core_json = "[]"
 
-        mark(req_trace_id, "core_config")
+        checkpoint("core_config")
 
         if not chat_id:
             return {"success": True}
@@ -1379,6 +1383,7 @@ async def _process_webhook(update: dict):
 
         context = await get_recent_context(limit=2)
         classification = await classify_intent(text, context, ist_hour=now.hour, core_json=core_json, conversation_history=classify_context_text)
+        checkpoint("classify")
 
         intent = classification.get('intent', 'TASK')
         confidence = classification.get('confidence', 0.5)
@@ -1594,13 +1599,11 @@ async def _process_webhook(update: dict):
                             audit_log_sync("webhook", "ERROR", f"Failed to insert suggestion raw_dump: {e}")
                     
                     
-                    report(req_trace_id)
                     return {"success": True}
                 else:
                     if _anaphora_task:
                         _anaphora_task.cancel()
                     
-                    report(req_trace_id)
                     return {"success": True}
 
             await route_by_intent(intent, text, chat_id, session_id, classification=classification, source=source, sender=sender, active_anchor=active_anchor, anaphora_task=_anaphora_task)
@@ -1625,12 +1628,10 @@ async def _process_webhook(update: dict):
                 receipt=receipt
             )
 
-        report(req_trace_id)
         return {"success": True}
 
     except Exception as e:
         audit_log_sync("webhook", "ERROR", f"Webhook Error: {e}")
-        report(req_trace_id)
         try:
             if chat_id:
                 await send_telegram(chat_id, "Something went wrong. Try again or report this.")
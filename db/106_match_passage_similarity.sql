@@ -0,0 +1,58 @@
+-- db/106: Server-side passage similarity for associative retrieval
+--
+-- Root Cause: _compute_semantic_scores (core/retrieval/search.py) pulled
+-- EVERY passage embedding for the candidate memories over PostgREST — a
+-- 768-dim vector is ~9KB of pgvector text per row — only to reduce them to
+-- one max-similarity number per memory in Python. Payload and parse time
+-- grew linearly with candidate count and dominated the scoring phase.
+--
+-- Fix: push the query vector to Postgres and return only
+-- (memory_id, max_similarity) for the candidate id set. The Python side
+-- calls this RPC first and falls back to the local NumPy path when the
+-- function is not deployed yet, so this migration can land in any order
+-- relative to the code.
+--
+-- Owner scoping follows db/79: owner_id DEFAULT NULL, injected by the
+-- tenant facade (core/services/db.py tenant_rpc). Function grants come from
+-- the default privileges set in db/87.
+
+-- ════════════════════════════════════════════════════════════════════════
+-- Part 1: ANN index on passage embeddings
+-- ════════════════════════════════════════════════════════════════════════
+-- HNSW (same parameters as db/44) so ad-hoc nearest-passage queries
+-- (ORDER BY embedding <=> q LIMIT k) stay fast as the table grows. The
+-- candidate-scoped function below is bounded by idx_retrieval_passages_memory
+-- and does not need it.
+
+CREATE INDEX IF NOT EXISTS idx_retrieval_passages_embedding_hnsw
+    ON public.retrieval_passages
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- ════════════════════════════════════════════════════════════════════════
+-- Part 2: match_passage_similarity
+-- ════════════════════════════════════════════════════════════════════════
+-- Parameters are referenced function-qualified: owner_id and memory_ids
+-- collide with column names, and in a SQL function the column wins.
+
+CREATE OR REPLACE FUNCTION public.match_passage_similarity(
+    query_embedding vector(768),
+    memory_ids bigint[],
+    owner_id uuid DEFAULT NULL
+)
+RETURNS TABLE(
+    memory_id bigint,
+    max_similarity float
+)
+LANGUAGE sql STABLE AS $$
+    SELECT
+        p.memory_id,
+        max(1 - (p.embedding <=> match_passage_similarity.query_embedding))::float
+            AS max_similarity
+    FROM public.retrieval_passages p
+    WHERE p.memory_id = ANY(match_passage_similarity.memory_ids)
+      AND p.embedding IS NOT NULL
+      AND (match_passage_similarity.owner_id IS NULL
+           OR p.owner_id = match_passage_similarity.owner_id)
+    GROUP BY p.memory_id;
+$$;
@@ -0,0 +1,72 @@
+-- db/107: Atomic, batched subsystem_patterns increments
+--
+-- Root Cause: _update_pattern_count (core/lib/telemetry.py) did a
+-- read-modify-write per observation — SELECT the (subsystem, feature_hash)
+-- row, add 1 in Python, UPDATE or INSERT. Two round trips on every
+-- emit_observation, and two concurrent observations for the same pattern
+-- both read N and both wrote N+1: increments were silently lost (and two
+-- first observations raced into a unique-violation on the insert).
+--
+-- Fix: one statement per flush. The Python side coalesces observations in
+-- process (one element per feature hash, counts already summed) and sends
+-- them as a JSONB array; this function upserts them all by
+-- (owner_id, subsystem, feature_hash) — the db/89 unique index — adding the
+-- deltas to the stored counters and recomputing confidence
+-- (correct_count / total_count) from the post-increment values, all inside
+-- the row lock ON CONFLICT takes. The Python side falls back to the old
+-- per-pattern path when this function is not deployed yet, so the
+-- migration can land in any order relative to the code.
+--
+-- p_rows element shape:
+--   {"subsystem": text, "feature_hash": text, "feature_json": jsonb,
+--    "total": int, "correct": int, "corrected": int,
+--    "first_seen": timestamptz, "last_seen": timestamptz}
+--
+-- Owner param is p_owner (not owner_id) for the same reason as
+-- batch_whatsapp_message: the function writes a table with an owner_id
+-- column, and the facade injects under that name (_RPC_OWNER_PARAM).
+-- Function grants come from the default privileges set in db/87.
+
+CREATE OR REPLACE FUNCTION public.increment_subsystem_patterns(
+    p_rows  JSONB,
+    p_owner UUID DEFAULT NULL
+) RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n INTEGER;
+BEGIN
+    INSERT INTO public.subsystem_patterns AS sp (
+        owner_id, subsystem, feature_hash, feature_json,
+        total_count, correct_count, corrected_count, confidence,
+        first_seen, last_seen
+    )
+    -- GROUP BY: ON CONFLICT cannot touch the same row twice in one
+    -- statement, so duplicate keys in one payload are summed first.
+    SELECT p_owner, r.subsystem, r.feature_hash,
+           (array_agg(r.feature_json))[1],
+           sum(r.total), sum(r.correct), sum(r.corrected),
+           CASE WHEN sum(r.total) > 0
+                THEN sum(r.correct)::real / sum(r.total) ELSE 0.0 END,
+           min(coalesce(r.first_seen, now())), max(coalesce(r.last_seen, now()))
+    FROM jsonb_to_recordset(p_rows) AS r(
+        subsystem text, feature_hash text, feature_json jsonb,
+        total integer, correct integer, corrected integer,
+        first_seen timestamptz, last_seen timestamptz
+    )
+    GROUP BY r.subsystem, r.feature_hash
+    ON CONFLICT (owner_id, subsystem, feature_hash) DO UPDATE SET
+        total_count     = coalesce(sp.total_count, 0) + EXCLUDED.total_count,
+        correct_count   = coalesce(sp.correct_count, 0) + EXCLUDED.correct_count,
+        corrected_count = coalesce(sp.corrected_count, 0) + EXCLUDED.corrected_count,
+        confidence      = CASE
+            WHEN coalesce(sp.total_count, 0) + EXCLUDED.total_count > 0
+            THEN (coalesce(sp.correct_count, 0) + EXCLUDED.correct_count)::real
+                 / (coalesce(sp.total_count, 0) + EXCLUDED.total_count)
+            ELSE 0.0 END,
+        first_seen      = coalesce(sp.first_seen, EXCLUDED.first_seen),
+        last_seen       = greatest(sp.last_seen, EXCLUDED.last_seen);
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$;
@@ -0,0 +1,32 @@
+-- db/108: Windowed conversation history + rolling thread summary watermark
+--
+-- Root Cause: get_history (core/lib/conversation.py) read EVERY row of a
+-- thread ordered by created_at — and on a miss, every row again by
+-- session_id — then dropped the oldest pairs in Python until the rest fit
+-- the token budget. conversations has no index on thread_id or session_id,
+-- so each read was a filter over the whole table and the payload grew with
+-- the thread: long-lived threads got slower on every message. The
+-- background thread summary was rebuilt from an 8000-token history read
+-- after counting all of the thread's user rows, every third exchange.
+--
+-- Fix: get_history now pages newest-first (ORDER BY id DESC, keyset on id)
+-- and stops as soon as the stored token_count total meets the budget, so a
+-- call reads O(budget) rows however long the thread is. The two indexes
+-- below serve that scan for both lookup columns. conversations.id is an
+-- identity column, so id order is insert order.
+--
+-- summary_through_id is the rolling summary's watermark: the newest
+-- conversations.id already folded into conversation_threads.summary. The
+-- summary job folds only rows past it (previous summary + new rows → new
+-- summary) and advances it with a compare-and-set, so each update is a
+-- bounded read and a bounded prompt. NULL = no watermark yet (threads
+-- summarised before this migration, or never).
+
+CREATE INDEX IF NOT EXISTS idx_conversations_thread_id_desc
+    ON public.conversations (thread_id, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_session_id_desc
+    ON public.conversations (session_id, id DESC);
+
+ALTER TABLE public.conversation_threads
+    ADD COLUMN IF NOT EXISTS summary_through_id BIGINT;
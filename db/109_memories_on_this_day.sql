@@ -0,0 +1,63 @@
+-- db/109: Indexed "on this day" memory lookup
+--
+-- Root Cause: detect_temporal_patterns (core/pulse/memory.py) fetched the
+-- 100 most recent memories and kept those whose created_at string contained
+-- today's "-MM-DD". 100 recent rows rarely reach back a year, so the
+-- "On this day" section could almost never show a past year — the only
+-- thing it exists for — and every briefing still shipped 100 rows to
+-- find nothing. PostgREST cannot filter a timestamptz by month/day, which
+-- is why the filter lived in Python.
+--
+-- Fix: an IMMUTABLE month-day function (MMDD as an int, in UTC — the same
+-- calendar the old string match used on the ISO timestamps), an
+-- expression index on (owner_id, month-day), and an RPC returning the
+-- tenant's memories from PREVIOUS years whose month-day falls within
+-- ±p_window_days of p_day. p_window_days = 0 is "on this day"; a wider
+-- window is the seasonal variant. The window is expanded to its month-day
+-- values up front, so the lookup is an index scan on = ANY(...).
+--
+-- The Python side calls the RPC first and falls back to the old recent-rows
+-- filter when it is not deployed yet, so this migration can land in any
+-- order relative to the code. Owner scoping follows db/79: owner_id DEFAULT
+-- NULL, injected by the tenant facade (core/services/db.py tenant_rpc).
+-- Function grants come from the default privileges set in db/87.
+
+CREATE OR REPLACE FUNCTION public.utc_month_day(ts timestamptz)
+RETURNS integer
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT (extract(month FROM ts AT TIME ZONE 'UTC') * 100
+            + extract(day FROM ts AT TIME ZONE 'UTC'))::integer;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_memories_owner_month_day
+    ON public.memories (owner_id, public.utc_month_day(created_at));
+
+-- Parameters are referenced function-qualified: owner_id collides with the
+-- column name, and in a SQL function the column wins.
+CREATE OR REPLACE FUNCTION public.memories_on_this_day(
+    p_day date,
+    p_window_days integer DEFAULT 0,
+    p_limit integer DEFAULT 10,
+    owner_id uuid DEFAULT NULL
+)
+RETURNS TABLE(
+    id bigint,
+    content text,
+    memory_type text,
+    created_at timestamptz
+)
+LANGUAGE sql STABLE AS $$
+    SELECT m.id, m.content, m.memory_type, m.created_at
+    FROM public.memories m
+    WHERE public.utc_month_day(m.created_at) = ANY(ARRAY(
+              SELECT public.utc_month_day(d AT TIME ZONE 'UTC')
+              FROM generate_series(
+                  memories_on_this_day.p_day - greatest(memories_on_this_day.p_window_days, 0),
+                  memories_on_this_day.p_day + greatest(memories_on_this_day.p_window_days, 0),
+                  interval '1 day') AS d))
+      AND m.created_at < date_trunc('year', memories_on_this_day.p_day::timestamp) AT TIME ZONE 'UTC'
+      AND (memories_on_this_day.owner_id IS NULL
+           OR m.owner_id = memories_on_this_day.owner_id)
+    ORDER BY m.created_at DESC
+    LIMIT memories_on_this_day.p_limit;
+$$;
@@ -0,0 +1,134 @@
+-- db/110: Running-balance credit ledger (M6 cost controls)
+--
+-- Root Cause: the fallback entry gate calls credit_remaining() before EVERY
+-- LLM call, and cycle_spend_usd (core/llm/budget.py) answered it by
+-- downloading every llm_spend row the tenant wrote since cycle start and
+-- summing est_cost_usd in Python. Work per call grew with the tenant's
+-- usage — the heaviest tenants, late in their cycle, paid the most before
+-- every single LLM call.
+--
+-- Fix: llm_credit_balance keeps one running total per (tenant, billing
+-- cycle). log_llm_spend appends the ledger row AND adds its cost to the
+-- balance in one transaction, returning the new total; credit checks read
+-- one row. The cycle is part of the key (cycle_start is computed app-side
+-- from the signup day, core/llm/budget.cycle_start_utc), so a new cycle
+-- starts a new row at 0 — no reset job.
+--
+-- The first spend of a cycle (or the first after this migration) seeds the
+-- row from SUM(llm_spend) so spend recorded before the row existed is not
+-- lost; afterwards each call is a keyed UPDATE. llm_spend stays the source
+-- of truth: reconcile_llm_credit_balance re-derives the total from the
+-- ledger and overwrites the balance (daily sentinel piggyback,
+-- core/pulse/maintenance.run_credit_reconcile).
+--
+-- Owner param is p_owner (not owner_id) for the same reason as
+-- increment_subsystem_patterns: the functions write tables with an
+-- owner_id column, and the facade injects under that name
+-- (_RPC_OWNER_PARAM). budget.py calls them on the raw client with the uid
+-- passed explicitly, like its other ledger access. Function grants come
+-- from the default privileges set in db/87.
+
+CREATE TABLE IF NOT EXISTS public.llm_credit_balance (
+    owner_id      uuid NOT NULL,
+    cycle_start   timestamptz NOT NULL,
+    spent_usd     numeric(12, 6) NOT NULL DEFAULT 0,
+    updated_at    timestamptz NOT NULL DEFAULT now(),
+    reconciled_at timestamptz,
+    PRIMARY KEY (owner_id, cycle_start)
+);
+
+ALTER TABLE public.llm_credit_balance ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "llm_credit_balance owner access"
+    ON public.llm_credit_balance
+    FOR ALL
+    USING (owner_id = auth.uid())
+    WITH CHECK (owner_id = auth.uid());
+
+
+CREATE OR REPLACE FUNCTION public.log_llm_spend(
+    p_cycle_start   timestamptz,
+    p_model         text,
+    p_provider      text,
+    p_workload      text,
+    p_input_tokens  integer,
+    p_output_tokens integer,
+    p_cost          numeric,
+    p_outcome       text,
+    p_owner         uuid DEFAULT NULL
+) RETURNS numeric
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_spent numeric;
+BEGIN
+    IF p_owner IS NULL THEN
+        RAISE EXCEPTION 'log_llm_spend requires p_owner';
+    END IF;
+
+    INSERT INTO public.llm_spend (
+        owner_id, model, provider, workload,
+        input_tokens, output_tokens, est_cost_usd, outcome
+    ) VALUES (
+        p_owner, p_model, p_provider, p_workload,
+        p_input_tokens, p_output_tokens, p_cost, p_outcome
+    );
+
+    UPDATE public.llm_credit_balance b
+       SET spent_usd = b.spent_usd + p_cost, updated_at = now()
+     WHERE b.owner_id = p_owner AND b.cycle_start = p_cycle_start
+    RETURNING b.spent_usd INTO v_spent;
+
+    IF NOT FOUND THEN
+        -- First spend of the cycle: seed from the ledger (includes the row
+        -- just inserted). A concurrent first spend that wins the insert is
+        -- handled by ON CONFLICT adding only this call's cost.
+        INSERT INTO public.llm_credit_balance AS b (owner_id, cycle_start, spent_usd)
+        SELECT p_owner, p_cycle_start, coalesce(sum(s.est_cost_usd), 0)
+          FROM public.llm_spend s
+         WHERE s.owner_id = p_owner AND s.ts >= p_cycle_start
+        ON CONFLICT (owner_id, cycle_start) DO UPDATE
+            SET spent_usd = b.spent_usd + p_cost, updated_at = now()
+        RETURNING b.spent_usd INTO v_spent;
+    END IF;
+
+    RETURN v_spent;
+END;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.reconcile_llm_credit_balance(
+    p_cycle_start timestamptz,
+    p_owner       uuid DEFAULT NULL
+) RETURNS numeric
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_spent numeric;
+BEGIN
+    IF p_owner IS NULL THEN
+        RAISE EXCEPTION 'reconcile_llm_credit_balance requires p_owner';
+    END IF;
+
+    -- Lock the balance row BEFORE summing: a log_llm_spend that has
+    -- inserted its ledger row but not yet added to the balance waits here,
+    -- then adds its cost on top of a sum that does not include it.
+    PERFORM 1 FROM public.llm_credit_balance b
+     WHERE b.owner_id = p_owner AND b.cycle_start = p_cycle_start
+       FOR UPDATE;
+
+    INSERT INTO public.llm_credit_balance AS b (
+        owner_id, cycle_start, spent_usd, updated_at, reconciled_at
+    )
+    SELECT p_owner, p_cycle_start, coalesce(sum(s.est_cost_usd), 0), now(), now()
+      FROM public.llm_spend s
+     WHERE s.owner_id = p_owner AND s.ts >= p_cycle_start
+    ON CONFLICT (owner_id, cycle_start) DO UPDATE
+        SET spent_usd = EXCLUDED.spent_usd,
+            updated_at = now(),
+            reconciled_at = now()
+    RETURNING b.spent_usd INTO v_spent;
+
+    RETURN v_spent;
+END;
+$$;
@@ -0,0 +1,86 @@
+-- db/111: Batched llm_spend writes for the write-behind instrumentation sink
+--
+-- Root Cause: log_llm_outcome (core/llm/instrument.py) ran on the caller's
+-- path after every model call and made blocking round trips — the
+-- llm_spend write (db/110 log_llm_spend, one RPC per call) and a
+-- model_registry insert — adding their latency to every interactive reply
+-- and every LLM step of a pipeline.
+--
+-- Fix: instrumentation rows are queued in-process and flushed in bulk by
+-- the buffered writer (core/lib/audit_logger.py). llm_spend rows need more
+-- than a bulk insert — the db/110 running balance must move with them — so
+-- this function takes a whole flush: it inserts every ledger row, then adds
+-- each (owner, cycle) group's cost to its balance, seeding a missing
+-- balance row from SUM(llm_spend) exactly like log_llm_spend did. Groups
+-- are applied in (owner_id, cycle_start) order so concurrent flushes from
+-- several workers lock balance rows in the same order.
+--
+-- p_rows element shape (ts is the call time, captured when queued):
+--   {"owner_id": uuid, "ts": timestamptz, "cycle_start": timestamptz,
+--    "model": text, "provider": text, "workload": text,
+--    "input_tokens": int, "output_tokens": int, "est_cost_usd": numeric,
+--    "outcome": text}
+--
+-- The rows carry their own owner_id (the writer thread flushes many
+-- tenants' rows at once, outside any tenant scope), so the function takes
+-- no owner param: it is service-role only, like get_context_for (db/94).
+-- db/110's single-row log_llm_spend has no remaining caller and is dropped;
+-- the Python side falls back to a plain llm_spend insert while this
+-- function is not deployed (reconcile_llm_credit_balance repairs the
+-- balance).
+
+CREATE OR REPLACE FUNCTION public.log_llm_spend_batch(p_rows jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    n integer;
+    g record;
+BEGIN
+    INSERT INTO public.llm_spend (
+        owner_id, ts, model, provider, workload,
+        input_tokens, output_tokens, est_cost_usd, outcome
+    )
+    SELECT r.owner_id, coalesce(r.ts, now()), r.model, r.provider, r.workload,
+           coalesce(r.input_tokens, 0), coalesce(r.output_tokens, 0),
+           coalesce(r.est_cost_usd, 0), r.outcome
+    FROM jsonb_to_recordset(p_rows) AS r(
+        owner_id uuid, ts timestamptz, model text, provider text, workload text,
+        input_tokens integer, output_tokens integer, est_cost_usd numeric, outcome text
+    );
+    GET DIAGNOSTICS n = ROW_COUNT;
+
+    FOR g IN
+        SELECT r.owner_id, r.cycle_start, sum(coalesce(r.est_cost_usd, 0)) AS cost
+        FROM jsonb_to_recordset(p_rows) AS r(
+            owner_id uuid, cycle_start timestamptz, est_cost_usd numeric
+        )
+        WHERE r.cycle_start IS NOT NULL
+        GROUP BY r.owner_id, r.cycle_start
+        ORDER BY r.owner_id, r.cycle_start
+    LOOP
+        UPDATE public.llm_credit_balance b
+           SET spent_usd = b.spent_usd + g.cost, updated_at = now()
+         WHERE b.owner_id = g.owner_id AND b.cycle_start = g.cycle_start;
+
+        IF NOT FOUND THEN
+            INSERT INTO public.llm_credit_balance AS b (owner_id, cycle_start, spent_usd)
+            SELECT g.owner_id, g.cycle_start, coalesce(sum(s.est_cost_usd), 0)
+              FROM public.llm_spend s
+             WHERE s.owner_id = g.owner_id AND s.ts >= g.cycle_start
+            ON CONFLICT (owner_id, cycle_start) DO UPDATE
+                SET spent_usd = b.spent_usd + g.cost, updated_at = now();
+        END IF;
+    END LOOP;
+
+    RETURN n;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.log_llm_spend_batch(jsonb)
+    FROM public, anon, authenticated, rhodey_app;
+GRANT EXECUTE ON FUNCTION public.log_llm_spend_batch(jsonb) TO service_role;
+
+DROP FUNCTION IF EXISTS public.log_llm_spend(
+    timestamptz, text, text, text, integer, integer, numeric, text, uuid
+);
@@ -0,0 +1,120 @@
+-- db/112: Leased batch claiming for the durable job queues
+--
+-- Root Cause: pending_enrichment_jobs and pending_retrieval_index_jobs were
+-- drained only by the 5-minute sentinel piggyback, 3 and 2 jobs a cycle.
+-- Each job cost its own claim round trip (claim_pending_enrichment_job /
+-- a conditional UPDATE) and ran serially, so a bulk import left a backlog
+-- that took days to clear. A worker that died mid-job left the row in
+-- 'processing' forever (nothing swept these tables), and a failed
+-- enrichment job went to 'failed', which no code path ever picked up again.
+--
+-- Fix: one claim function for both queues (core/lib/job_runner.py):
+--   * claims up to p_limit ready jobs in ONE statement, highest priority
+--     first, with FOR UPDATE SKIP LOCKED so concurrent workers split the
+--     backlog instead of contending for the same rows;
+--   * leases instead of zombie sweeps: a claim sets lease_expires_at and a
+--     fresh lease_token; a 'processing' row whose lease has expired is
+--     claimable again (its worker is presumed dead), and the old worker's
+--     late completion no longer matches the token;
+--   * attempts are counted at claim time, so a job that keeps killing its
+--     worker still reaches dead_letter: an expired lease already at
+--     p_max_attempts is dead-lettered instead of re-claimed;
+--   * run_after is the retry visibility timeout — the runner sets it with
+--     backoff when a job fails, and the claim skips the row until then.
+--
+-- Rows carry their own owner_id (a worker drains every tenant's jobs and
+-- runs each under that tenant's scope), so the function is service-role
+-- only, like log_llm_spend_batch (db/111). p_owner narrows a claim to one
+-- tenant for the per-tenant sentinel backstop.
+--
+-- The Python side calls this first and falls back to the legacy
+-- select-then-claim loop while it is not deployed.
+
+ALTER TABLE public.pending_enrichment_jobs
+    ADD COLUMN IF NOT EXISTS priority         integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS lease_expires_at timestamptz,
+    ADD COLUMN IF NOT EXISTS lease_token      uuid,
+    ADD COLUMN IF NOT EXISTS run_after        timestamptz;
+
+ALTER TABLE public.pending_retrieval_index_jobs
+    ADD COLUMN IF NOT EXISTS lease_expires_at timestamptz,
+    ADD COLUMN IF NOT EXISTS lease_token      uuid,
+    ADD COLUMN IF NOT EXISTS run_after        timestamptz;
+
+-- Claim order scans: ready jobs by priority, expired leases by expiry.
+DROP INDEX IF EXISTS public.idx_pending_enrichment_jobs_claim;
+CREATE INDEX IF NOT EXISTS idx_pending_enrichment_jobs_claim
+    ON public.pending_enrichment_jobs (priority DESC, created_at ASC)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_pending_enrichment_jobs_lease
+    ON public.pending_enrichment_jobs (lease_expires_at)
+    WHERE status = 'processing';
+
+CREATE INDEX IF NOT EXISTS idx_pending_index_jobs_claim
+    ON public.pending_retrieval_index_jobs (priority DESC, created_at ASC)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_pending_index_jobs_lease
+    ON public.pending_retrieval_index_jobs (lease_expires_at)
+    WHERE status = 'processing';
+
+
+CREATE OR REPLACE FUNCTION public.claim_queue_jobs(
+    p_queue         text,
+    p_limit         integer DEFAULT 10,
+    p_lease_seconds integer DEFAULT 600,
+    p_max_attempts  integer DEFAULT 3,
+    p_owner         uuid DEFAULT NULL
+) RETURNS SETOF jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_lease interval := make_interval(secs => greatest(p_lease_seconds, 1));
+BEGIN
+    IF p_queue NOT IN ('pending_enrichment_jobs', 'pending_retrieval_index_jobs') THEN
+        RAISE EXCEPTION 'claim_queue_jobs: unknown queue %', p_queue;
+    END IF;
+
+    -- A lease that ran out on its last attempt: the job killed (or outlived)
+    -- its worker every time. Park it instead of handing it out again.
+    -- Rows claimed before this migration have no lease; their started_at
+    -- stands in for the claim time.
+    EXECUTE format(
+        'UPDATE public.%I
+            SET status = ''dead_letter'', lease_token = NULL, lease_expires_at = NULL,
+                error = ''lease expired on final attempt''
+          WHERE status = ''processing''
+            AND coalesce(lease_expires_at, started_at + $1) < now()
+            AND coalesce(retry_count, 0) >= $2
+            AND ($3 IS NULL OR owner_id = $3)',
+        p_queue)
+    USING v_lease, p_max_attempts, p_owner;
+
+    RETURN QUERY EXECUTE format(
+        'WITH ready AS (
+             SELECT id FROM public.%1$I
+              WHERE ((status = ''pending'' AND (run_after IS NULL OR run_after <= now()))
+                  OR (status = ''processing''
+                      AND coalesce(lease_expires_at, started_at + $2) < now()))
+                AND ($3 IS NULL OR owner_id = $3)
+              ORDER BY priority DESC, created_at ASC
+              LIMIT $1
+              FOR UPDATE SKIP LOCKED
+         )
+         UPDATE public.%1$I j
+            SET status = ''processing'',
+                started_at = now(),
+                lease_expires_at = now() + $2,
+                lease_token = gen_random_uuid(),
+                retry_count = coalesce(j.retry_count, 0) + 1
+           FROM ready
+          WHERE j.id = ready.id
+         RETURNING to_jsonb(j.*)',
+        p_queue)
+    USING greatest(p_limit, 0), v_lease, p_owner;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.claim_queue_jobs(text, integer, integer, integer, uuid)
+    FROM public, anon, authenticated, rhodey_app;
+GRANT EXECUTE ON FUNCTION public.claim_queue_jobs(text, integer, integer, integer, uuid)
+    TO service_role;
@@ -0,0 +1,36 @@
+-- db/113: (owner_id, id) indexes for keyset table scans
+--
+-- Root Cause: the backfills paged with .range(offset, offset + 999)
+-- (backfill_graph.fetch_all_paginated, persona_synthesis._paginate), so
+-- page N made Postgres walk and discard N*1000 rows first — a full
+-- graph_edges pass was quadratic in the table size, just to collect the
+-- memory ids already linked. memory_clusters and retrieval/backfill read
+-- whole tables with a bare .execute(), which PostgREST silently truncates
+-- at its max-rows cap.
+--
+-- Fix: every backfill now scans through core.services.db.scan_pages:
+-- `owner_id = $tenant AND id > $last ORDER BY id LIMIT n`. The
+-- single-column owner indexes from db/78 cannot serve that order, so each
+-- page was an owner filter plus a sort. A composite (owner_id, id) index
+-- turns every page into one index range scan, at the same cost for the
+-- last page as the first.
+--
+-- Plain CREATE INDEX, like the rest of db/ (run CONCURRENTLY by hand on a
+-- large production table, as db/22 notes).
+
+CREATE INDEX IF NOT EXISTS idx_memories_owner_id_keyset
+    ON public.memories (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_graph_edges_owner_id_keyset
+    ON public.graph_edges (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_graph_nodes_owner_id_keyset
+    ON public.graph_nodes (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_pending_graph_edges_owner_id_keyset
+    ON public.pending_graph_edges (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_retrieval_index_runs_owner_id_keyset
+    ON public.retrieval_index_runs (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_retrieval_memory_bundle_links_owner_id_keyset
+    ON public.retrieval_memory_bundle_links (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_retrieval_passage_phrase_links_owner_id_keyset
+    ON public.retrieval_passage_phrase_links (owner_id, id);
+CREATE INDEX IF NOT EXISTS idx_retrieval_edges_owner_id_keyset
+    ON public.retrieval_edges (owner_id, id);
@@ -62,6 +62,7 @@ def web_endpoint():
     Serves all endpoints including:
       - /api/webhook (Telegram)
       - /api/sentinel (called by cron-job.org every 5 min)
+      - /api/queue-cron (called by cron-job.org every minute)
       - /api/decision-pulse (called by cron-job.org every 30 min)
       - /api/roundup (called by cron-job.org 2x daily)
       - /api/health
@@ -107,6 +108,7 @@ def process_message_background(payload: dict):
     """
     import asyncio
     from api.index import _run_web_message_pipeline
+    from core.lib.audit_logger import flush_audit_logs
 
     fake_update = payload.get("fake_update")
     session_id = payload.get("session_id")
@@ -114,15 +116,21 @@ def process_message_background(payload: dict):
     if not fake_update:
         print("[process_message_background] Missing fake_update — aborting")
         return
-    if uid:
-        from core.services.db import tenant_scope
-        with tenant_scope(uid):
+    try:
+        if uid:
+            from core.services.db import tenant_scope
+            with tenant_scope(uid):
+                asyncio.run(_run_web_message_pipeline(fake_update, session_id))
+        else:
+            # Legacy shared-key / pre-db/78: no tenant context existed in the web
+            # route either, so the channel-tenant fallback is the original
+            # behavior — preserve it exactly.
             asyncio.run(_run_web_message_pipeline(fake_update, session_id))
-    else:
-        # Legacy shared-key / pre-db/78: no tenant context existed in the web
-        # route either, so the channel-tenant fallback is the original
-        # behavior — preserve it exactly.
-        asyncio.run(_run_web_message_pipeline(fake_update, session_id))
+    finally:
+        # Audit and LLM instrumentation rows (model_registry, llm_spend) are
+        # buffered in-process; a warm worker may not exit for minutes, so
+        # drain per input.
+        flush_audit_logs()
 
 
 # ── Per-Tenant Briefing Worker (Option B) ───────────────────────────
@@ -151,15 +159,50 @@ def brief_tenant(uid: str, auth_secret: str | None = None, trigger: str = "cron"
     same tenant even if two heartbeats overlap.
     """
     import asyncio
+    from core.lib.audit_logger import flush_audit_logs
     from core.pulse.briefing import process_pulse_for_tenant
 
-    result = asyncio.run(
-        process_pulse_for_tenant(uid, auth_secret=auth_secret, trigger=trigger)
-    )
+    try:
+        result = asyncio.run(
+            process_pulse_for_tenant(uid, auth_secret=auth_secret, trigger=trigger)
+        )
+    finally:
+        flush_audit_logs()
     print(f"[brief-tenant:{uid[:8]}] {result}", flush=True)
     return result
 
 
+# ── Durable Job Queue Worker ─────────────────────────────────────────
+# The enrichment / retrieval-index queues and the DLQ used to drain only in
+# the 5-minute sentinel piggyback, a few jobs per cycle. /api/queue-cron
+# (cron-job.org, every minute) now sizes the drain by queue depth: it
+# keeps one of these per JOBS_PER_WORKER claimable jobs running, up to
+# JOB_MAX_WORKERS per queue, each in its own container. Workers claim leased batches
+# (db/112, FOR UPDATE SKIP LOCKED), so parallel workers never run the same
+# job, and a worker that dies only delays its batch until the lease expires.
+# Each job runs under its row's owner_id tenant scope (core/lib/job_runner).
+# The cron counts live workers through Redis slots; max_containers is the
+# hard ceiling if Redis is down: JOB_MAX_WORKERS (5) for each of the two
+# table queues plus the single DLQ worker.
+@app.function(
+    secrets=secrets,
+    timeout=900,
+    max_containers=11,
+)
+def drain_job_queue(queue: str, worker_id: str = None):
+    """Drain ONE queue until it is empty or the worker deadline passes."""
+    import asyncio
+    from core.lib.audit_logger import flush_audit_logs
+    from core.lib.job_runner import run_queue_worker
+
+    try:
+        result = asyncio.run(run_queue_worker(queue, worker_id=worker_id))
+    finally:
+        flush_audit_logs()
+    print(f"[job-queue:{queue}] {result}", flush=True)
+    return result
+
+
 # ── Beeper Bridge (Phase B1): sync the Matrix stream every 60s ───────
 # PAUSED (Aug 13): the scheduled tick is removed. The VPS Desktop bridge
 # (core/skills/beeper_desktop.py, cron every 5 min on the always-on Oracle
@@ -180,7 +223,11 @@ def brief_tenant(uid: str, auth_secret: str | None = None, trigger: str = "cron"
 def beeper_bridge_sync():
     """Scheduled bridge tick: fan out the Beeper Matrix sync per tenant."""
     import asyncio
+    from core.lib.audit_logger import flush_audit_logs
     from core.skills.beeper_ingest import run_beeper_sync
-    result = asyncio.run(run_beeper_sync())
+    try:
+        result = asyncio.run(run_beeper_sync())
+    finally:
+        flush_audit_logs()
     print(f"[beeper-bridge] {result}", flush=True)
     return result
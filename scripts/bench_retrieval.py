@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Offline retrieval latency benchmark (core/retrieval/bench.py).
+
+Prints (or writes) diffable JSON: p50/p95/p99 per associative_retrieve stage
+for each synthetic graph size. No network, no credentials.
+
+    python scripts/bench_retrieval.py --nodes 1000 10000 --out bench.json
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add repo root to sys.path so core modules are importable
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000],
+                        help="phrase-node counts, one synthetic graph each")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rtt-ms", type=float, default=0.0,
+                        help="simulated PostgREST round-trip delay")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--local-similarity", action="store_true",
+                        help="score passages client-side (pre-db/106 path)")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    from core.retrieval.bench import run_benchmark_sync
+    result = run_benchmark_sync(
+        sizes=args.nodes, queries=args.queries, warmup=args.warmup, seed=args.seed,
+        rtt_ms=args.rtt_ms, dim=args.dim, server_similarity=not args.local_similarity,
+    )
+    text = json.dumps(result, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""check_blocking_execute.py — blocking-DB-call-in-coroutine lint (L0).
+
+A sync supabase `.execute()` inside an `async def` blocks the event loop
+for a full PostgREST round trip: every other request on a
+`@modal.concurrent` worker stalls behind it. Async code should use the
+async facade (`await async_tenant_aware_client().table(...).execute()`) or,
+where a sync builder is unavoidable, `await exec_query(builder)`.
+
+Flagged inside an `async def` body:
+  - `<builder>.execute()` that is not the direct operand of `await`
+  - `maybe_single_safe(...)` / `query_list_safe(...)` (sync wrappers that
+    call `.execute()` internally)
+
+Not flagged: nested sync `def`s and lambdas (they run wherever the caller
+puts them — typically `asyncio.to_thread`), and `exec_query(...)`.
+
+Ratchet: the tree predates this gate, so existing call sites are recorded
+per file in scripts/blocking_execute_baseline.json. A file fails when its
+count goes UP (or a new file has any); converting call sites lowers the
+count and `--update` rewrites the baseline to lock the gain in.
+
+Usage:
+    python scripts/check_blocking_execute.py            # check
+    python scripts/check_blocking_execute.py --update   # re-record baseline
+Exit code: 0 = clean, 1 = new blocking calls (CI fails).
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = ROOT / "scripts" / "blocking_execute_baseline.json"
+SCANNED = ("core", "api")
+SYNC_WRAPPERS = {"maybe_single_safe", "query_list_safe"}
+
+
+class _Finder(ast.NodeVisitor):
+    """Collect (lineno, description) for blocking calls in coroutine bodies."""
+
+    def __init__(self):
+        self.hits: list[tuple[int, str]] = []
+        self._in_async = False
+        self._awaited: set[int] = set()
+
+    def visit_AsyncFunctionDef(self, node):
+        outer, self._in_async = self._in_async, True
+        self.generic_visit(node)
+        self._in_async = outer
+
+    def visit_FunctionDef(self, node):
+        outer, self._in_async = self._in_async, False
+        self.generic_visit(node)
+        self._in_async = outer
+
+    def visit_Lambda(self, node):
+        outer, self._in_async = self._in_async, False
+        self.generic_visit(node)
+        self._in_async = outer
+
+    def visit_Await(self, node):
+        self._awaited.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if self._in_async and id(node) not in self._awaited:
+            func = node.func
+            if (isinstance(func, ast.Attribute) and func.attr == "execute"
+                    and not node.args and not node.keywords):
+                self.hits.append((node.lineno, ".execute()"))
+            elif isinstance(func, ast.Name) and func.id in SYNC_WRAPPERS:
+                self.hits.append((node.lineno, f"{func.id}()"))
+        self.generic_visit(node)
+
+
+def find_blocking_calls(source: str) -> list[tuple[int, str]]:
+    """Blocking DB calls inside coroutines in `source`, sorted by line."""
+    finder = _Finder()
+    finder.visit(ast.parse(source))
+    return sorted(finder.hits)
+
+
+def scan(root: Path = ROOT) -> dict[str, list[tuple[int, str]]]:
+    """{relative path: hits} for every scanned file with at least one hit."""
+    found = {}
+    for top in SCANNED:
+        for path in sorted((root / top).rglob("*.py")):
+            if "__pycache__" in path.parts:
+                continue
+            try:
+                hits = find_blocking_calls(path.read_text())
+            except SyntaxError:
+                continue
+            if hits:
+                found[path.relative_to(root).as_posix()] = hits
+    return found
+
+
+def compare(found: dict, baseline: dict) -> tuple[list[str], list[str]]:
+    """(regressions, improvements) of `found` against per-file `baseline`."""
+    regressions, improvements = [], []
+    for path in sorted(set(found) | set(baseline)):
+        now, allowed = len(found.get(path, [])), baseline.get(path, 0)
+        if now > allowed:
+            lines = ", ".join(str(ln) for ln, _ in found[path])
+            regressions.append(f"  {path}: {now} (baseline {allowed}) — lines {lines}")
+        elif now < allowed:
+            improvements.append(f"  {path}: {now} (baseline {allowed})")
+    return regressions, improvements
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true",
+                        help="rewrite the baseline from the current tree")
+    args = parser.parse_args()
+
+    found = scan()
+    if args.update:
+        counts = {path: len(hits) for path, hits in found.items()}
+        BASELINE.write_text(json.dumps(counts, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline updated: {sum(counts.values())} call sites in {len(counts)} files")
+        return 0
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    regressions, improvements = compare(found, baseline)
+    if improvements:
+        print("Fewer blocking calls than the baseline — run with --update to lock in:")
+        print("\n".join(improvements))
+    if regressions:
+        print("ERROR: new blocking .execute() inside async def "
+              "(await the async client, or wrap in exec_query):")
+        print("\n".join(regressions))
+        return 1
+    print(f"OK: no new blocking DB calls in coroutines "
+          f"({sum(len(h) for h in found.values())} baselined)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
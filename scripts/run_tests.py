@@ -194,6 +194,8 @@ def tier_fast(args) -> bool:
             env=env, verbose=args.verbose),
         run([sys.executable, "scripts/check_marker_presence.py"], "L0 · marker-presence lint",
             env=env, verbose=args.verbose),
+        run([sys.executable, "scripts/check_blocking_execute.py"], "L0 · blocking-execute lint",
+            env=env, verbose=args.verbose),
     ]
     # Coverage floors (plans/75 §11) live on the FAST tier: the full mock
     # suite runs on every push and is the context the floors were calibrated
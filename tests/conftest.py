@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 
 # If LIVE_DB is set, force load real credentials from .env
@@ -153,6 +154,18 @@ def _leaked_test_rows() -> list[str]:
     return leaked
 
 
+@pytest.fixture(autouse=True)
+def _reset_telemetry_state():
+    """emit_observation is write-behind and pattern lookups are snapshotted
+    (core/lib/telemetry.py): discard anything a test queued or cached so it
+    can never leak into the next test's fakes."""
+    yield
+    telemetry = sys.modules.get("core.lib.telemetry")
+    if telemetry is not None:
+        telemetry._buffer.drain()
+        telemetry._snapshots.clear()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def _verify_no_cross_tenant_leaks():
     """Fail the session if any test-marker row leaked into another tenant."""
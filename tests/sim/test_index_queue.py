@@ -44,6 +44,18 @@ def _cleanup_jobs(supabase, memory_id: int):
         pass
 
 
+def _skip_backoff(supabase, memory_id: int):
+    """Make a failed job claimable now (the runner sets run_after backoff, db/112)."""
+    try:
+        supabase.table("pending_retrieval_index_jobs") \
+            .update({"run_after": None}) \
+            .eq("memory_id", memory_id) \
+            .eq("status", "pending") \
+            .execute()
+    except Exception:
+        pass  # pre-db/112: no backoff column, retries are immediate
+
+
 # ── C1: Enqueue ────────────────────────────────────────────────────────
 
 
@@ -161,10 +173,12 @@ async def test_failed_job_retries_then_dead_letter(seed_test_data):
             # Attempt 1: should stay as pending (retry_count=1)
             n1 = await process_pending_index_jobs(max_jobs=10)
             assert n1 >= 1
+            _skip_backoff(supabase, mem_id)
 
             # Attempt 2: should stay as pending (retry_count=2)
             n2 = await process_pending_index_jobs(max_jobs=10)
             assert n2 >= 1
+            _skip_backoff(supabase, mem_id)
 
             # Attempt 3: retry_count reaches 3 → dead_letter
             n3 = await process_pending_index_jobs(max_jobs=10)
@@ -8,8 +8,15 @@ from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 from core.retrieval.chunker import chunk_text, compute_fingerprint, _split_into_paragraphs
 from core.retrieval.normalizer import normalize_phrase, is_noise_phrase, expand_shorthand, classify_node_type
-from core.retrieval.ppr import personalized_pagerank, build_adjacency_from_edges, normalize_scores
+from core.retrieval.ppr import (
+    PPRGraph, personalized_pagerank, personalized_pagerank_batch, personalized_pagerank_reference,
+    build_adjacency_from_edges, build_ppr_graph, normalize_scores,
+)
 from core.retrieval.ranking import rank_memories, WeightConfig
+from core.retrieval.similarity import (
+    parse_vector, cosine_scores, cosine_similarity,
+    mean_pairwise_similarity, mean_cross_similarity, _cosine_py,
+)
 from core.retrieval.schema import Passage
 from core.retrieval.pipeline import index_memory, retry_failed_index_runs
 pytestmark = pytest.mark.retrieval
@@ -116,6 +123,81 @@ class TestPPR:
         assert adj[1] == [(2, 1.0)]
         assert adj[2] == [(3, 0.5)]
 
+    def _random_adjacency(self, seed=7, nodes=300, edges=2000):
+        import random
+        rng = random.Random(seed)
+        return build_adjacency_from_edges(
+            [(rng.randrange(nodes), rng.randrange(nodes), rng.uniform(0.1, 1.0)) for _ in range(edges)]
+        )
+
+    def test_sparse_matches_reference(self):
+        adj = self._random_adjacency()
+        seeds = {3: 0.9, 41: 0.4, 250: 0.1}
+        expected = personalized_pagerank_reference(adj, seeds)
+        actual = PPRGraph(adj).run(seeds)
+        assert actual.keys() == expected.keys()
+        for nid, score in expected.items():
+            assert actual[nid] == pytest.approx(score, abs=1e-12)
+
+    def test_sparse_matches_reference_on_edge_cases(self):
+        # Duplicate edges, self-loops, sink nodes and a seed outside the graph.
+        adj = {
+            1: [(2, 1.0), (2, 0.5), (1, 0.3)],
+            2: [(3, 1.0)],
+            4: [(5, 0.2)],
+        }
+        seeds = {1: 1.0, 99: 2.0}
+        expected = personalized_pagerank_reference(adj, seeds, iterations=50, tolerance=0.0)
+        actual = personalized_pagerank(adj, seeds, iterations=50, tolerance=0.0)
+        assert actual.keys() == expected.keys()
+        for nid, score in expected.items():
+            assert actual[nid] == pytest.approx(score, abs=1e-12)
+
+    def test_prebuilt_graph_reused_across_seeds(self):
+        adj = self._random_adjacency(seed=11)
+        graph = build_ppr_graph(adj)
+        for seed in (0, 17, 123):
+            expected = personalized_pagerank_reference(adj, {seed: 1.0})
+            actual = personalized_pagerank(adj, {seed: 1.0}, graph=graph)
+            assert max(abs(actual[n] - expected[n]) for n in expected) < 1e-12
+
+    def test_zero_seed_mass_returns_empty(self):
+        assert personalized_pagerank({1: [(2, 1.0)]}, {1: 0.0}) == {}
+        assert build_ppr_graph({}) is None
+
+    def test_batch_matches_solo_runs(self):
+        adj = self._random_adjacency(seed=5)
+        seed_sets = {"a": {1: 1.0}, "b": {2: 0.5, 7: 0.5}, "c": {999: 1.0, 3: 1.0}, "empty": {}}
+        batched = personalized_pagerank_batch(adj, seed_sets)
+        assert batched.keys() == seed_sets.keys()
+        assert batched["empty"] == {}
+        for key in ("a", "b", "c"):
+            solo = personalized_pagerank_reference(adj, seed_sets[key])
+            assert batched[key].keys() == solo.keys()
+            assert max(abs(batched[key][n] - solo[n]) for n in solo) < 1e-12
+
+    def test_batch_blocks_under_memory_cap(self):
+        adj = self._random_adjacency(seed=9)
+        seed_sets = {i: {i: 1.0} for i in range(12)}
+        whole = personalized_pagerank_batch(adj, seed_sets)
+        # A 1-byte cap forces one column per block.
+        blocked = personalized_pagerank_batch(adj, seed_sets, max_block_bytes=1)
+        for key in seed_sets:
+            assert max(abs(whole[key][n] - blocked[key][n]) for n in whole[key]) < 1e-15
+
+    def test_batch_empty_graph(self):
+        assert personalized_pagerank_batch({}, {1: {1: 1.0}}) == {1: {}}
+
+    def test_memory_cluster_seed_ppr_shape(self):
+        from core.pulse.memory_clusters import _run_seed_ppr
+        adj = {1: [(2, 1.0)], 2: [(3, 1.0)], 3: [(1, 1.0)]}
+        seeds = [{"id": 1, "weight": 0.9}, {"id": 3, "weight": 0.4}]
+        phrase_to_memories = {1: {100}, 2: {100, 200}, 3: {300}}
+        results = _run_seed_ppr(adj, seeds, phrase_to_memories)
+        assert set(results) == {1, 3}
+        assert set(results[1]) == {100, 200, 300}
+        assert all(0.0 <= v <= 1.0 for v in results[1].values())
+
     def test_score_normalization(self):
         scores = {1: 10.0, 2: 20.0, 3: 30.0}
         norm = normalize_scores(scores)
@@ -159,6 +241,91 @@ class TestRanking:
         assert ranked[0][0] == 1
 
 
+class TestSimilarity:
+    def test_parse_pgvector_text_and_string_lists(self):
+        assert parse_vector("[0.5,-1,2e-1]").tolist() == pytest.approx([0.5, -1.0, 0.2])
+        assert parse_vector(["0.5", 0.25]).tolist() == [0.5, 0.25]
+        assert parse_vector("[0.5,abc]") is None
+        assert parse_vector("[1,2,3]", dim=2) is None
+        assert parse_vector(None) is None
+
+    def test_batch_scores_match_per_pair_reference(self):
+        q = [0.3, -0.2, 0.9]
+        vecs = [[1.0, 0.0, 0.0], "[0.3,-0.2,0.9]", [0.0, 0.0, 0.0], [1.0, 2.0], "[-0.1,0.4,0.2]"]
+        got = cosine_scores(q, vecs)
+        parsed = [parse_vector(v, 3) for v in vecs]
+        want = [_cosine_py(q, None if p is None else p.tolist()) for p in parsed]
+        assert got == pytest.approx(want, abs=1e-6)
+        assert got[1] == pytest.approx(1.0) and got[2] == 0.0 and got[3] == 0.0
+
+    def test_pairwise_and_cross_means(self):
+        vecs = [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]
+        pairs = [cosine_similarity(vecs[i], vecs[j]) for i in range(3) for j in range(i + 1, 3)]
+        assert mean_pairwise_similarity(vecs) == pytest.approx(sum(pairs) / 3)
+        cross = [cosine_similarity(a, b) for a in vecs[:2] for b in vecs[1:]]
+        assert mean_cross_similarity(vecs[:2], vecs[1:]) == pytest.approx(sum(cross) / 4)
+        assert mean_pairwise_similarity(vecs[:1]) == 0.0
+
+
+class TestSemanticScores:
+    """_compute_semantic_scores: server-side RPC first, local NumPy fallback."""
+
+    def _client(self, rpc_result=None, rpc_error=None, passages=()):
+        client = MagicMock()
+        if rpc_error is not None:
+            client.rpc.return_value.execute.side_effect = rpc_error
+        else:
+            client.rpc.return_value.execute.return_value = MagicMock(data=rpc_result)
+        table = client.table.return_value.select.return_value.in_.return_value
+        table.execute.return_value = MagicMock(data=list(passages))
+        return client
+
+    @pytest.fixture(autouse=True)
+    def _reset_rpc_flag(self):
+        import core.retrieval.search as search
+        search._passage_similarity_rpc = None
+        yield
+        search._passage_similarity_rpc = None
+
+    def test_rpc_scores_skip_embedding_fetch(self):
+        import core.retrieval.search as search
+        client = self._client(rpc_result=[{"memory_id": 1, "max_similarity": 0.8}])
+        with patch.object(search, "supabase", client):
+            scores = search._compute_semantic_scores([1, 2], [1.0, 0.0])
+        assert scores == {1: 0.8, 2: 0.0}
+        name, params = client.rpc.call_args.args
+        assert name == "match_passage_similarity"
+        assert params["memory_ids"] == [1, 2]
+        client.table.assert_not_called()
+
+    def test_missing_rpc_falls_back_and_latches(self):
+        import core.retrieval.search as search
+        err = Exception("Could not find the function public.match_passage_similarity "
+                        "in the schema cache")
+        passages = [
+            {"id": 10, "memory_id": 1, "embedding": "[1,0]"},
+            {"id": 11, "memory_id": 1, "embedding": "[0,1]"},
+            {"id": 12, "memory_id": 2, "embedding": "[0,1]"},
+        ]
+        client = self._client(rpc_error=err, passages=passages)
+        with patch.object(search, "supabase", client):
+            first = search._compute_semantic_scores([1, 2], [1.0, 0.0])
+            second = search._compute_semantic_scores([1, 2], [1.0, 0.0])
+        assert first == second == {1: pytest.approx(1.0), 2: pytest.approx(0.0)}
+        assert client.rpc.call_count == 1
+        assert search._passage_similarity_rpc is False
+
+    def test_transient_rpc_error_falls_back_without_latching(self):
+        import core.retrieval.search as search
+        client = self._client(rpc_error=Exception("timeout"),
+                              passages=[{"id": 10, "memory_id": 1, "embedding": "[1,0]"}])
+        with patch.object(search, "supabase", client), \
+             patch("core.lib.audit_logger.audit_log_sync"):
+            scores = search._compute_semantic_scores([1], [1.0, 0.0])
+        assert scores == {1: pytest.approx(1.0)}
+        assert search._passage_similarity_rpc is None
+
+
 class TestSchema:
     def test_passage_defaults(self):
         p = Passage(source_type="test", source_id="1", passage_index=0, text="hello")
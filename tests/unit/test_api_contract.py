@@ -82,6 +82,7 @@ PINNED_ROUTES = {
     "/api/inbox": ["get"],
     "/api/maintenance": ["get", "post"],
     "/api/messages": ["get"],
+    "/api/metrics": ["get"],
     "/api/multimodal-input": ["post"],
     "/api/oauth/callback": ["get"],
     "/api/oauth/exchange": ["post"],
@@ -97,6 +98,7 @@ PINNED_ROUTES = {
     "/api/persona": ["get"],
     "/api/pulse": ["post"],
     "/api/pulse-cron": ["get", "post"],
+    "/api/queue-cron": ["get", "post"],
     "/api/register-device": ["post"],
     "/api/roundup": ["get", "post"],
     "/api/send-draft": ["post"],
@@ -149,8 +151,8 @@ def test_route_surface_matches_pin():
 def test_pin_operation_count_is_stable():
     """Sanity guard so the pin can't silently shrink while paths stay equal."""
     total = sum(len(m) for m in PINNED_ROUTES.values())
-    assert total == 93
-    assert len(PINNED_ROUTES) == 82
+    assert total == 96
+    assert len(PINNED_ROUTES) == 84
 
 
 # ── 2. OpenAPI spec validity ──────────────────────────────────────────────
@@ -25,15 +25,18 @@ import core.lib.audit_logger as al  # noqa: E402  (env must be set first)
 @pytest.fixture(autouse=True)
 def _mock_supabase():
     mock_db = MagicMock()
+    al.flush_audit_logs()  # rows queued by other tests must not land here
     with patch.object(al, "supabase", mock_db):
         yield mock_db
+        al.flush_audit_logs()
 
 
 def test_audit_log_omits_owner_id_when_no_tenant(_mock_supabase):
     """Legacy (pre-db/78, unscoped): no owner_id key in the payload — the
     regression that broke every audit write on the unmigrated live DB."""
     al.audit_log_sync("db", "INFO", "legacy message")
-    payload = _mock_supabase.table.return_value.insert.call_args.args[0]
+    al.flush_audit_logs()
+    payload = _mock_supabase.table.return_value.insert.call_args.args[0][0]
     assert payload["service"] == "db"
     assert payload["level"] == "INFO"
     assert "owner_id" not in payload
@@ -44,7 +47,8 @@ def test_audit_log_includes_owner_id_when_tenant_set(_mock_supabase):
     gates (M4 intent preserved)."""
     with patch("core.services.db.get_tenant", return_value="u1"):
         al.audit_log_sync("db", "INFO", "scoped message")
-    payload = _mock_supabase.table.return_value.insert.call_args.args[0]
+    al.flush_audit_logs()
+    payload = _mock_supabase.table.return_value.insert.call_args.args[0][0]
     assert payload["owner_id"] == "u1"
 
 
@@ -53,5 +57,59 @@ def test_audit_log_async_omits_owner_id_when_no_tenant(_mock_supabase):
     import asyncio
 
     asyncio.run(al.audit_log("db", "INFO", "legacy async message"))
-    payload = _mock_supabase.table.return_value.insert.call_args.args[0]
+    al.flush_audit_logs()
+    payload = _mock_supabase.table.return_value.insert.call_args.args[0][0]
     assert "owner_id" not in payload
+
+
+# ── Buffered writer ─────────────────────────────────────────────────────────
+
+def test_buffered_rows_share_one_insert_per_table_and_keyset(_mock_supabase):
+    writer = al._AuditWriter(max_queue=10, batch_size=10, interval_s=60)
+    writer.submit("audit_logs", {"service": "a", "level": "INFO"})
+    writer.submit("audit_logs", {"service": "b", "level": "INFO"})
+    writer.submit("audit_logs", {"service": "c", "level": "INFO", "owner_id": "u1"})
+    writer.submit("dead_letter_queue", {"source_table": "memories"})
+    writer.flush()
+
+    tables = [c.args[0] for c in _mock_supabase.table.call_args_list]
+    assert tables == ["audit_logs", "audit_logs", "dead_letter_queue"]
+    sizes = [len(c.args[0]) for c in _mock_supabase.table.return_value.insert.call_args_list]
+    assert sizes == [2, 1, 1]
+
+
+def test_full_buffer_drops_oldest_and_reports_count(_mock_supabase):
+    writer = al._AuditWriter(max_queue=2, batch_size=10, interval_s=60)
+    for svc in ("first", "second", "third"):
+        writer.submit("audit_logs", {"service": svc, "level": "INFO"})
+    writer.flush()
+
+    rows = [r for c in _mock_supabase.table.return_value.insert.call_args_list
+            for r in c.args[0]]
+    assert [r["service"] for r in rows] == ["audit_logger", "second", "third"]
+    assert "dropped 1" in rows[0]["message"]
+
+
+def test_drop_accounting_is_per_table(_mock_supabase):
+    writer = al._AuditWriter(max_queue=2, batch_size=10, interval_s=60)
+    writer.submit("model_registry", {"model_name": "m"})
+    writer.submit("llm_spend", {"est_cost_usd": 0.1})
+    writer.submit("audit_logs", {"service": "x", "level": "INFO"})
+    writer.flush()
+
+    rows = [r for c in _mock_supabase.table.return_value.insert.call_args_list
+            for r in c.args[0]]
+    assert "dropped 1 oldest entries (model_registry: 1)" in rows[0]["message"]
+
+
+def test_registered_bulk_writer_replaces_plain_insert(_mock_supabase):
+    seen = []
+    with patch.dict(al._bulk_writers, {"llm_spend": seen.append}):
+        writer = al._AuditWriter(max_queue=10, batch_size=10, interval_s=60)
+        writer.submit("llm_spend", {"est_cost_usd": 0.1})
+        writer.submit("llm_spend", {"est_cost_usd": 0.2})
+        writer.submit("model_registry", {"model_name": "m"})
+        writer.flush()
+
+    assert seen == [[{"est_cost_usd": 0.1}, {"est_cost_usd": 0.2}]]
+    assert [c.args[0] for c in _mock_supabase.table.call_args_list] == ["model_registry"]
@@ -340,19 +340,21 @@ def test_route_outgoing_constraint_violation_counts_duplicate():
 
 # ── cursor persistence must actually execute ──────────────────────────
 
-def test_save_cursor_executes_upsert():
+def test_save_cursors_executes_one_bulk_upsert():
     """Regression: supabase-py builds upserts lazily — a bare
     core_config_upsert(...) without .execute() is a SILENT no-op (no error,
     no audit, zero rows ever written). The live tick proved it: messages
-    routed fine but no cursor row ever landed. The save must execute."""
-    from core.skills.beeper_desktop import _save_cursor, _cursor_key
+    routed fine but no cursor row ever landed. The save must execute —
+    once, for every advanced chat."""
+    from core.skills.beeper_desktop import _save_cursors
 
     executed = []
+    rows_seen = []
     fake_builder = MagicMock()
     fake_builder.execute.side_effect = lambda: executed.append(True) or fake_builder
 
-    def _fake_upsert(supabase, row):
-        assert row["key"] == _cursor_key("!c1:beeper.local")
+    def _fake_upsert(supabase, rows):
+        rows_seen.append(rows)
         return fake_builder
 
     warned = []
@@ -360,74 +362,87 @@ def test_save_cursor_executes_upsert():
     with patch("core.skills.beeper_desktop.core_config_upsert", new=_fake_upsert), \
          patch("core.skills.beeper_desktop.audit_log_sync",
                side_effect=lambda *a, **k: warned.append(a)):
-        _save_cursor(supabase, "!c1:beeper.local", {"sortKey": 500})
+        _save_cursors(supabase, {"!c1:beeper.local": {"sortKey": 500},
+                                 "!c2:beeper.local": {"sortKey": 7}})
     assert executed == [True], "upsert must be executed, not just built"
+    assert [r["key"] for r in rows_seen[0]] == [_cursor_key("!c1:beeper.local"),
+                                                _cursor_key("!c2:beeper.local")]
     assert warned == [], f"no warnings expected, got {warned}"
 
 
-def test_save_cursor_audits_on_failure():
-    from core.skills.beeper_desktop import _save_cursor
+def test_save_cursors_skips_empty_tick():
+    from core.skills.beeper_desktop import _save_cursors
+
+    with patch("core.skills.beeper_desktop.core_config_upsert") as upsert:
+        _save_cursors(MagicMock(), {})
+    upsert.assert_not_called()
+
+
+def test_save_cursors_audits_on_failure():
+    from core.skills.beeper_desktop import _save_cursors
 
     warned = []
     supabase = MagicMock()
 
-    def _fake_upsert(supabase, row):
+    def _fake_upsert(supabase, rows):
         raise RuntimeError("boom")
 
     with patch("core.skills.beeper_desktop.core_config_upsert", new=_fake_upsert), \
          patch("core.skills.beeper_desktop.audit_log_sync",
                side_effect=lambda *a, **k: warned.append(a)):
-        _save_cursor(supabase, "!c1:beeper.local", {"sortKey": 500})
+        _save_cursors(supabase, {"!c1:beeper.local": {"sortKey": 500}})
     assert warned, "failure must audit a WARNING"
-    assert "desktop cursor save failed" in warned[0][2]# ── cursor loads must parse TEXT content ─────────────────────────────
+    assert "desktop cursor save failed" in warned[0][2]
+
+# ── cursor loads must parse TEXT content ─────────────────────────────
+
+def _cursor_rows(rows):
+    supabase = MagicMock()
+    supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = rows
+    return supabase
+
 
-def test_load_cursor_parses_string_content():
+def test_load_cursors_parses_string_content_in_one_query():
     """Regression: core_config.content is a TEXT column — PostgREST returns
     it as a JSON string, NOT a dict. The old isinstance(content, dict) check
     was always False, so cursors NEVER loaded: every tick re-fetched each
     chat's newest page and re-routed the same messages (the ~230
     "duplicates" per tick) and gap-free backfill never engaged."""
     import json
-    from core.skills.beeper_desktop import _load_cursor, _cursor_key
-
-    class _Res:
-        data = {"content": json.dumps({"sortKey": 952787, "lastActivity": "2026-08-13T11:55:15Z"})}
-
-    supabase = MagicMock()
-    builder = MagicMock()
-    builder.execute.return_value = _Res()
-    supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.maybe_single.return_value = builder
-
-    cursor = _load_cursor(supabase, _cursor_key("!c1:beeper.local"))
-    assert cursor == {"sortKey": 952787, "lastActivity": "2026-08-13T11:55:15Z"}
-
-
-def test_load_cursor_handles_missing_row():
-    from core.skills.beeper_desktop import _load_cursor, _cursor_key
-
-    class _Res:
-        data = None
+    from core.skills.beeper_desktop import _load_cursors
+
+    supabase = _cursor_rows([
+        {"key": _cursor_key("!c1:beeper.local"),
+         "content": json.dumps({"sortKey": 952787, "lastActivity": "2026-08-13T11:55:15Z"})},
+        {"key": _cursor_key("!c2:beeper.local"), "content": {"sortKey": 5}},
+    ])
+    cursors = _load_cursors(supabase, ["!c1:beeper.local", "!c2:beeper.local", "!c3:beeper.local"])
+    assert cursors == {
+        "!c1:beeper.local": {"sortKey": 952787, "lastActivity": "2026-08-13T11:55:15Z"},
+        "!c2:beeper.local": {"sortKey": 5},
+    }
+    supabase.table.return_value.select.return_value.in_.assert_called_once()
 
-    supabase = MagicMock()
-    builder = MagicMock()
-    builder.execute.return_value = _Res()
-    supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.maybe_single.return_value = builder
 
-    assert _load_cursor(supabase, _cursor_key("!c1:beeper.local")) is None
+def test_load_cursors_chunks_large_tick():
+    from core.skills.beeper_desktop import _load_cursors
 
+    supabase = _cursor_rows([])
+    with patch("core.skills.beeper_desktop.CURSOR_LOAD_CHUNK", 2):
+        _load_cursors(supabase, ["a", "b", "c"])
+    assert supabase.table.return_value.select.return_value.in_.call_count == 2
 
-def test_load_cursor_handles_garbage_content():
-    from core.skills.beeper_desktop import _load_cursor, _cursor_key
 
-    class _Res:
-        data = {"content": "not-json{{{"}
+def test_load_cursors_handles_garbage_content_and_failure():
+    from core.skills.beeper_desktop import _load_cursors
 
-    supabase = MagicMock()
-    builder = MagicMock()
-    builder.execute.return_value = _Res()
-    supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.maybe_single.return_value = builder
+    supabase = _cursor_rows([{"key": _cursor_key("!c1:beeper.local"), "content": "not-json{{{"}])
+    assert _load_cursors(supabase, ["!c1:beeper.local"]) == {}
 
-    assert _load_cursor(supabase, _cursor_key("!c1:beeper.local")) is None
+    broken = MagicMock()
+    broken.table.side_effect = RuntimeError("db down")
+    with patch("core.skills.beeper_desktop.audit_log_sync"):
+        assert _load_cursors(broken, ["!c1:beeper.local"]) == {}
 
 
 # ── scoped message ids ─────────────────────────────────────────────────
@@ -550,9 +565,6 @@ async def _run_process_chat(messages, cursor=None, budget=None):
 
     saved = {}
 
-    def _fake_save(supabase, chat_id, content):  # real _save_cursor is sync
-        saved[chat_id] = content
-
     summary = {"processed": 0, "outgoing": 0, "incoming": 0,
                "ignored": 0, "duplicate": 0, "errors": 0}
     supabase = MagicMock()
@@ -561,10 +573,9 @@ async def _run_process_chat(messages, cursor=None, budget=None):
         return {"status": "filed"}
 
     with patch("core.lib.ingest.record_outgoing_message", new=_fake_record), \
-         patch("core.skills.beeper_desktop._save_cursor", new=_fake_save), \
          patch("core.skills.beeper_desktop.MAX_MESSAGES_PER_TICK",
                budget if budget is not None else 500):
-        await process_chat(supabase, _FakeClient(), _wa_meta(), cursor, summary)
+        await process_chat(supabase, _FakeClient(), _wa_meta(), cursor, summary, saved)
     return summary, saved
 
 
@@ -584,3 +595,65 @@ def test_process_chat_budget_cut_keeps_remainder_for_next_tick():
     summary, saved = asyncio.run(_run_process_chat(msgs, budget=1))
     assert summary["outgoing"] == 1
     assert saved["!c1:beeper.local"]["sortKey"] == 300
+
+
+# ── process_chats: concurrent chats, per-chat order, tick deadline ─────
+
+def _chat_meta(chat_id):
+    return dict(_wa_meta(), desktop_chat_id=chat_id, chat_key=chat_id)
+
+
+async def _run_process_chats(chat_msgs, budget=500, deadline=50, slow=()):
+    """chat_msgs: {chat_id: newest-first messages}; routes are recorded."""
+    from core.skills.beeper_desktop import process_chats
+
+    class _FakeClient:
+        async def list_messages(self, chat_id, cursor=None):
+            return {"items": chat_msgs[chat_id], "hasMore": False}
+
+    routed, in_flight, peak = [], 0, 0
+
+    async def _fake_route(supabase, msg, meta):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(5 if meta["desktop_chat_id"] in slow else 0.01)
+        in_flight -= 1
+        routed.append((meta["desktop_chat_id"], msg["id"]))
+        return "outgoing", None
+
+    summary = {"processed": 0, "outgoing": 0, "incoming": 0, "ignored": 0,
+               "duplicate": 0, "errors": 0, "cancelled": 0}
+    visits = [(_chat_meta(cid), None) for cid in chat_msgs]
+    with patch("core.skills.beeper_desktop.route_message", new=_fake_route), \
+         patch("core.skills.beeper_desktop.MAX_MESSAGES_PER_TICK", budget), \
+         patch("core.skills.beeper_desktop.TICK_DEADLINE_S", deadline), \
+         patch("core.skills.beeper_desktop.audit_log_sync"):
+        cursors = await process_chats(MagicMock(), _FakeClient(), visits, summary)
+    return summary, cursors, routed, peak
+
+
+def test_process_chats_overlaps_chats_and_keeps_per_chat_order():
+    chats = {f"c{i}": [_msg(f"c{i}-2", 20), _msg(f"c{i}-1", 10)] for i in range(6)}
+    summary, cursors, routed, peak = asyncio.run(_run_process_chats(chats))
+    from core.skills.beeper_desktop import DESKTOP_CHAT_CONCURRENCY
+    assert 1 < peak <= DESKTOP_CHAT_CONCURRENCY
+    for cid in chats:
+        assert [m for c, m in routed if c == cid] == [f"{cid}-1", f"{cid}-2"]
+        assert cursors[cid]["sortKey"] == 20
+    assert summary["outgoing"] == 12
+
+
+def test_process_chats_shares_the_message_budget():
+    chats = {f"c{i}": [_msg(f"c{i}-{j}", j) for j in range(5, 0, -1)] for i in range(4)}
+    summary, _, routed, _ = asyncio.run(_run_process_chats(chats, budget=7))
+    assert summary["processed"] == 7 and len(routed) == 7
+
+
+def test_process_chats_deadline_defers_slow_chat_keeping_progress():
+    chats = {"fast": [_msg("f1", 10)], "slow": [_msg("s2", 20), _msg("s1", 10)]}
+    summary, cursors, routed, _ = asyncio.run(
+        _run_process_chats(chats, deadline=0.1, slow={"slow"}))
+    assert summary["cancelled"] == 1
+    assert cursors == {"fast": cursors["fast"]}  # slow chat: cursor untouched
+    assert routed == [("fast", "f1")]
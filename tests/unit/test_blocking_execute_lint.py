@@ -0,0 +1,67 @@
+"""Blocking-DB-call lint (scripts/check_blocking_execute.py).
+
+A sync `.execute()` inside an `async def` stalls the event loop for a full
+PostgREST round trip. The lint flags un-awaited calls in coroutine bodies,
+ignores nested sync defs/lambdas, and ratchets per file against a committed
+baseline so converted modules stay converted.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.pulse
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+_spec = importlib.util.spec_from_file_location(
+    "_check_blocking_execute", ROOT / "scripts" / "check_blocking_execute.py"
+)
+_lint = importlib.util.module_from_spec(_spec)
+assert _spec.loader is not None
+_spec.loader.exec_module(_lint)
+
+
+def test_flags_unawaited_execute_in_coroutine():
+    src = (
+        "async def f():\n"
+        "    res = supabase.table('t').select('*').execute()\n"
+        "    row = maybe_single_safe(supabase.table('t').select('*'))\n"
+    )
+    assert _lint.find_blocking_calls(src) == [
+        (2, ".execute()"), (3, "maybe_single_safe()"),
+    ]
+
+
+def test_awaited_threaded_and_sync_calls_pass():
+    src = (
+        "def sync():\n"
+        "    supabase.table('t').select('*').execute()\n"
+        "async def f():\n"
+        "    await asupabase.table('t').select('*').execute()\n"
+        "    await amaybe_single_safe(asupabase.table('t').select('*'))\n"
+        "    await exec_query(supabase.table('t').select('*'))\n"
+        "    await asyncio.to_thread(lambda: supabase.table('t').execute())\n"
+        "    def inner():\n"
+        "        return supabase.table('t').execute()\n"
+        "    cursor.execute('select 1')\n"
+    )
+    assert _lint.find_blocking_calls(src) == []
+
+
+def test_ratchet_fails_only_on_increase():
+    found = {"core/a.py": [(1, ".execute()"), (2, ".execute()")],
+             "core/new.py": [(5, ".execute()")]}
+    baseline = {"core/a.py": 3, "core/b.py": 1}
+    regressions, improvements = _lint.compare(found, baseline)
+    assert [r.split(":")[0].strip() for r in regressions] == ["core/new.py"]
+    assert len(improvements) == 2
+
+
+def test_tree_is_within_baseline():
+    """The committed tree never exceeds its baseline."""
+    baseline = json.loads((ROOT / "scripts" / "blocking_execute_baseline.json").read_text())
+    regressions, _ = _lint.compare(_lint.scan(ROOT), baseline)
+    assert regressions == []
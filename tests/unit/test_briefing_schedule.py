@@ -12,6 +12,8 @@ Covers `core/services/briefing_schedule.py`:
   - `resolve_briefing_schedule`: fail-closed → balanced default when the
     owner-scoped row is missing or broken.
   - `schedule_for_preset` / `presets_payload`: template + picker payload.
+  - `resolve_briefing_schedules` + briefing._due_tenants: the set-based
+    heartbeat gate (one query per table, same per-tenant answers).
 
 All pure or mocked-DB — no network, no real rows.
 """
@@ -204,3 +206,71 @@ def test_presets_and_payload_stay_in_sync():
 def test_schedule_for_preset_unknown_returns_default():
     assert schedule_for_preset("nope")["preset"] == DEFAULT_PRESET
     assert schedule_for_preset(None)["preset"] == DEFAULT_PRESET
+
+
+# ------------------------------------------------- bulk heartbeat gate
+
+class _Rows:
+    """Fake raw client: each table answers one set-based select with fixed
+    rows and counts the round trips it was asked for."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(name)
+        q = MagicMock()
+        for verb in ("select", "eq", "in_", "gte"):
+            getattr(q, verb).return_value = q
+        q.execute.return_value.data = self.tables.get(name, [])
+        return q
+
+
+def test_resolve_many_is_one_query_with_per_tenant_fallback():
+    from core.services.briefing_schedule import resolve_briefing_schedules
+    db = _Rows({"core_config": [
+        {"owner_id": "a", "content": json.dumps({"weekday": ["06:00"], "weekend": []})},
+        {"owner_id": "b", "content": "{not json"},
+    ]})
+    with patch("core.services.briefing_schedule.get_supabase", return_value=db):
+        out = resolve_briefing_schedules(["a", "b", "c"])
+        assert out["a"]["weekday"] == ["06:00"]
+        assert out["b"]["preset"] == out["c"]["preset"] == DEFAULT_PRESET
+        # Cached: a second heartbeat inside the TTL costs nothing.
+        resolve_briefing_schedules(["a", "b", "c"])
+    assert db.calls == ["core_config"]
+
+
+def test_bulk_due_matches_per_tenant_gate():
+    """Three tenants, three timezones, one completed run: the bulk gate
+    issues one query per table regardless of tenant count."""
+    from core.pulse import briefing
+    from core.services import user_settings
+    user_settings.clear_cache()
+    classic = PRESETS["classic"]
+    db = _Rows({
+        "core_config": [{"owner_id": u, "content": json.dumps(classic)} for u in ("ist", "tyo", "done")],
+        "user_settings": [
+            {"user_id": "ist", "timezone": "Asia/Kolkata"},
+            {"user_id": "tyo", "timezone": "Asia/Tokyo"},
+            {"user_id": "done", "timezone": "Asia/Kolkata"},
+        ],
+        "pulse_runs": [{"owner_id": "done"}],
+    })
+    # Monday 02:00 UTC = 07:30 IST (classic slot) = 11:00 JST (no slot).
+    now = datetime(2026, 1, 5, 2, 0, tzinfo=ZoneInfo("UTC"))
+    with patch("core.services.briefing_schedule.get_supabase", return_value=db), \
+         patch("core.services.user_settings.get_supabase", return_value=db), \
+         patch.object(briefing, "get_supabase", return_value=db):
+        assert briefing._due_tenants(["ist", "tyo", "done"], now) == ["ist"]
+    assert sorted(db.calls) == ["core_config", "pulse_runs", "user_settings"]
+    user_settings.clear_cache()
+
+
+def test_bulk_due_fails_closed():
+    from core.pulse import briefing
+    with patch("core.services.briefing_schedule.resolve_briefing_schedules",
+               side_effect=RuntimeError("db down")), \
+         patch.object(briefing, "audit_log_sync"):
+        assert briefing._due_tenants(["a"]) == []
@@ -0,0 +1,144 @@
+"""Windowed conversation history + rolling thread summary (core/lib/conversation).
+
+get_history pages newest-first and stops once the token budget is met, so
+a long thread costs the same as a short one; _fold_thread_summary folds
+only the rows past the summary watermark (db/108) into the stored summary.
+Supabase and the LLM are faked — no network.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from core.lib import conversation as conv
+pytestmark = pytest.mark.webhook
+
+
+class _Query:
+    """Minimal PostgREST builder over an in-memory table."""
+
+    def __init__(self, db, name):
+        self.db, self.name = db, name
+        self.filters, self.desc, self.n, self.payload = [], False, None, None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, col, val):
+        self.filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def is_(self, col, _null):
+        self.filters.append(lambda r: r.get(col) is None)
+        return self
+
+    def lt(self, col, val):
+        self.filters.append(lambda r: r[col] < val)
+        return self
+
+    def gt(self, col, val):
+        self.filters.append(lambda r: r[col] > val)
+        return self
+
+    def order(self, col, desc=False):
+        self.desc = desc
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def update(self, payload):
+        self.payload = payload
+        return self
+
+    def execute(self):
+        rows = [r for r in self.db.tables[self.name] if all(f(r) for f in self.filters)]
+        if self.payload is not None:
+            for r in rows:
+                r.update(self.payload)
+            return type("R", (), {"data": rows})()
+        self.db.reads.append((self.name, self.n))
+        rows = sorted(rows, key=lambda r: r.get("id", 0), reverse=self.desc)
+        return type("R", (), {"data": [dict(r) for r in rows[:self.n]]})()
+
+
+class _DB:
+    def __init__(self, conversations, thread=None):
+        self.tables = {
+            "conversations": conversations,
+            "conversation_threads": [thread or {"id": "t1", "summary": None, "summary_through_id": None}],
+        }
+        self.reads = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _thread_rows(n_pairs, tokens=100, thread_id="t1"):
+    rows = []
+    for i in range(n_pairs):
+        for role in ("user", "bot"):
+            rows.append({"id": len(rows) + 1, "thread_id": thread_id, "session_id": thread_id,
+                         "role": role, "intent": "QUERY", "content": f"{role} {i}",
+                         "token_count": tokens})
+    return rows
+
+
+def test_history_reads_a_bounded_window_of_a_long_thread():
+    db = _DB(_thread_rows(500))  # 1000 rows, 100k tokens
+    with patch.object(conv, "tenant_aware_client", return_value=db):
+        pairs = conv.get_history("t1", max_tokens=1000)
+
+    assert len(pairs) == 5
+    assert [p["user"]["content"] for p in pairs] == [f"user {i}" for i in range(495, 500)]
+    # One page read, not the thread.
+    assert db.reads == [("conversations", conv.HISTORY_PAGE_ROWS)]
+
+
+def test_history_pages_until_budget_and_keeps_order():
+    db = _DB(_thread_rows(60, tokens=10))  # 120 rows, 1200 tokens
+    with patch.object(conv, "tenant_aware_client", return_value=db):
+        pairs = conv.get_history("t1", max_tokens=1000)
+
+    assert len(pairs) == 50
+    assert pairs[0]["user"]["content"] == "user 10" and pairs[-1]["bot"]["content"] == "bot 59"
+    assert len(db.reads) == 3
+
+
+def test_history_falls_back_to_session_id():
+    rows = _thread_rows(2)
+    for r in rows:
+        r["thread_id"] = None
+    db = _DB(rows)
+    with patch.object(conv, "tenant_aware_client", return_value=db):
+        pairs = conv.get_history("t1")
+    assert [p["bot"]["content"] for p in pairs] == ["bot 0", "bot 1"]
+
+
+def test_fold_summarises_only_rows_past_the_watermark():
+    db = _DB(_thread_rows(10), thread={"id": "t1", "summary": "earlier: pricing", "summary_through_id": 14})
+    prompts = []
+
+    def fake_summary(pairs, previous=""):
+        prompts.append((previous, [p["user"]["content"] for p in pairs]))
+        return "pricing and renewals"
+
+    with patch.object(conv, "tenant_aware_client", return_value=db), \
+         patch.object(conv, "_compress_to_classify_summary", side_effect=fake_summary):
+        assert conv._fold_thread_summary("t1") is True
+        # Watermark advanced — nothing new to fold.
+        assert conv._fold_thread_summary("t1") is False
+
+    assert prompts == [("earlier: pricing", ["user 7", "user 8", "user 9"])]
+    thread = db.tables["conversation_threads"][0]
+    assert thread["summary"] == "pricing and renewals"
+    assert thread["summary_through_id"] == 20
+
+
+def test_fold_keeps_watermark_when_llm_unavailable():
+    db = _DB(_thread_rows(3))
+    with patch.object(conv, "tenant_aware_client", return_value=db), \
+         patch.object(conv, "_compress_to_classify_summary", return_value=""):
+        assert conv._fold_thread_summary("t1") is False
+    assert db.tables["conversation_threads"][0]["summary_through_id"] is None
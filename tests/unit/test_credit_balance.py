@@ -0,0 +1,142 @@
+"""Running-balance credit ledger (core/llm/budget.py, db/110).
+
+The per-call credit check reads one cached llm_credit_balance row instead
+of summing the cycle's llm_spend ledger; record_llm_spend queues the row
+(write-behind) and bumps the cached balance; the flush appends and
+increments in one db/111 batch RPC; the ledger SUM survives as the
+pre-db/110 fallback and the reconcile source.
+Supabase is faked — no network.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.llm import budget
+pytestmark = pytest.mark.auth
+
+UID = "00000000-0000-0000-0000-000000000001"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_budget_state():
+    budget.clear_cache()
+    budget._balance_enabled = None
+    budget._user_row_cache[UID] = (float("inf"), {
+        "monthly_credit_usd": 10.0, "credit_cycle_day": 1, "created_at": "2026-01-01T00:00:00+00:00",
+    })
+    yield
+    budget.clear_cache()
+    budget._balance_enabled = None
+
+
+class _Supabase:
+    def __init__(self, balance=None, ledger=(), missing=False):
+        self.balance = balance  # stored spent_usd, None = no row this cycle
+        self.ledger = list(ledger)
+        self.missing = missing
+        self.rpcs = []
+        self.reads = {"llm_credit_balance": 0, "llm_spend": 0}
+        self.inserts = []
+
+    def _missing(self, name):
+        return Exception(f"Could not find the function public.{name} in the schema cache")
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        call = MagicMock()
+        if self.missing:
+            call.execute.side_effect = self._missing(name)
+        elif name == "log_llm_spend_batch":
+            for row in params["p_rows"]:
+                self.ledger.append(row["est_cost_usd"])
+                self.balance = (self.balance if self.balance is not None else 0.0) + row["est_cost_usd"]
+            call.execute.return_value = MagicMock(data=len(params["p_rows"]))
+        elif name == "reconcile_llm_credit_balance":
+            self.balance = sum(self.ledger)
+            call.execute.return_value = MagicMock(data=self.balance)
+        return call
+
+    def table(self, name):
+        q = MagicMock()
+        for verb in ("select", "eq", "gte", "limit"):
+            getattr(q, verb).return_value = q
+
+        def _execute():
+            if name == "llm_credit_balance" and self.missing:
+                raise Exception('relation "llm_credit_balance" does not exist')
+            self.reads[name] += 1
+            if name == "llm_credit_balance":
+                rows = [] if self.balance is None else [{"spent_usd": self.balance}]
+            else:
+                rows = [{"est_cost_usd": c} for c in self.ledger]
+            return MagicMock(data=rows)
+        q.execute.side_effect = _execute
+        q.insert.side_effect = lambda row: (self.inserts.append(row), q)[1]
+        return q
+
+
+def test_credit_check_reads_one_cached_balance_row():
+    db = _Supabase(balance=9.0, ledger=[0.01] * 5000)
+    with patch.object(budget, "get_supabase", return_value=db):
+        assert budget.credit_remaining(UID) == pytest.approx(1.0)
+        assert budget.credit_warning(UID) is True
+        assert budget.credit_exhausted(UID) is False
+
+    # Three checks, one balance read, the 5000-row ledger never touched.
+    assert db.reads == {"llm_credit_balance": 1, "llm_spend": 0}
+
+
+def test_first_read_of_a_cycle_seeds_from_the_ledger():
+    db = _Supabase(balance=None, ledger=[1.5, 2.5])
+    with patch.object(budget, "get_supabase", return_value=db):
+        assert budget.cycle_spend_usd(UID) == pytest.approx(4.0)
+    assert [name for name, _ in db.rpcs] == ["reconcile_llm_credit_balance"]
+    assert db.rpcs[0][1]["p_owner"] == UID
+
+
+def test_spend_is_queued_and_bumps_the_cached_balance():
+    db = _Supabase(balance=9.99)
+    queued = []
+    with patch.object(budget, "get_supabase", return_value=db), \
+         patch.object(budget, "enqueue_row", side_effect=lambda t, r: queued.append((t, r))), \
+         patch.object(budget, "estimate_cost_usd", return_value=0.02):
+        assert budget.credit_exhausted(UID) is False
+        budget.record_llm_spend(UID, "gemini", "google", "chat", 100, 50, "success")
+        # This worker's gate sees the spend before any flush.
+        assert budget.credit_exhausted(UID) is True
+
+    assert db.rpcs == [] and db.inserts == []  # nothing on the caller's path
+    assert db.reads["llm_credit_balance"] == 1
+    (table, row), = queued
+    assert table == "llm_spend" and row["est_cost_usd"] == 0.02
+    assert row["cycle_start"] == budget.cycle_start_utc(UID).isoformat()
+
+
+def test_flush_writes_ledger_and_balance_in_one_rpc():
+    db = _Supabase(balance=1.0)
+    rows = [{"owner_id": UID, "cycle_start": "c", "est_cost_usd": 0.25}] * 3
+    with patch.object(budget, "get_supabase", return_value=db):
+        budget._write_spend_rows(rows)
+    assert [name for name, _ in db.rpcs] == ["log_llm_spend_batch"]
+    assert db.balance == pytest.approx(1.75)
+    assert db.inserts == []
+
+
+def test_missing_migration_falls_back_to_ledger_sum_and_insert():
+    db = _Supabase(ledger=[3.0, 4.0], missing=True)
+    rows = [{"owner_id": UID, "cycle_start": "c", "est_cost_usd": 0.5}]
+    with patch.object(budget, "get_supabase", return_value=db):
+        assert budget.cycle_spend_usd(UID) == pytest.approx(7.0)
+        budget._write_spend_rows(rows)
+
+    assert budget._balance_enabled is False
+    assert db.rpcs == []  # not retried once confirmed missing
+    assert db.inserts == [[{"owner_id": UID, "est_cost_usd": 0.5}]]
+
+
+def test_reconcile_reports_drift():
+    db = _Supabase(balance=2.0, ledger=[1.0, 1.25])
+    with patch.object(budget, "get_supabase", return_value=db):
+        assert budget.reconcile_credit_balance(UID) == pytest.approx(0.25)
+        assert budget.cycle_spend_usd(UID) == pytest.approx(2.25)
@@ -0,0 +1,176 @@
+"""Pipelined inbox ingest (core/skills/email_ingest.process_inbox_batch).
+
+One dedup query for the whole listing, one Gmail batch request for the
+bodies, classifications overlapping under EMAIL_CLASSIFY_CONCURRENCY, one
+bulk insert for ignored rows, and fyi/actionable commits in listing order.
+Gmail, Supabase and the LLM are all faked — no network.
+"""
+
+import asyncio
+import base64
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.lib.constants import EmailStatus
+from core.skills import email_ingest as ei
+pytestmark = pytest.mark.email
+
+
+def _gmail_msg(msg_id, sender="Ana <ana@example.com>"):
+    body = base64.urlsafe_b64encode(f"body of {msg_id}".encode()).decode()
+    return {
+        "id": msg_id,
+        "threadId": f"t-{msg_id}",
+        "payload": {
+            "headers": [
+                {"name": "From", "value": sender},
+                {"name": "Subject", "value": f"subject {msg_id}"},
+                {"name": "Date", "value": "Mon, 05 Jan 2026 08:00:00 +0000"},
+            ],
+            "body": {"data": body},
+        },
+    }
+
+
+class _Gmail:
+    """Discovery-client stand-in: batch + single GET, both counted."""
+
+    def __init__(self, store, batch_fails=False):
+        self.store = store
+        self.batch_fails = batch_fails
+        self.batches = []
+        self.single_gets = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format):
+        req = MagicMock()
+        req.msg_id = id
+
+        def _execute():
+            self.single_gets.append(id)
+            return self.store[id]
+        req.execute.side_effect = _execute
+        return req
+
+    def new_batch_http_request(self, callback):
+        gmail = self
+        added = []
+
+        class _Batch:
+            def add(self, request, request_id):
+                added.append(request_id)
+
+            def execute(self):
+                gmail.batches.append(list(added))
+                if gmail.batch_fails:
+                    raise RuntimeError("batch endpoint down")
+                for rid in added:
+                    callback(rid, gmail.store[rid], None)
+        return _Batch()
+
+
+class _Supabase:
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.inserts = []
+        self.dedup_queries = 0
+
+    def table(self, name):
+        q = MagicMock()
+        for verb in ("select", "eq"):
+            getattr(q, verb).return_value = q
+
+        def _in(col, ids):
+            self.dedup_queries += 1
+            q.execute.return_value.data = [{"message_id": i} for i in ids if i in self.existing]
+            return q
+        q.in_.side_effect = _in
+
+        def _insert(payload):
+            self.inserts.append(payload)
+            return q
+        q.insert.side_effect = _insert
+        return q
+
+
+@pytest.fixture
+def wired(monkeypatch):
+    db = _Supabase(existing={"m0"})
+    monkeypatch.setattr(ei, "supabase", db)
+    committed = []
+
+    async def fake_commit(msg_id, parsed, data, active, rejected):
+        committed.append(msg_id)
+        return (data["classification"], parsed["subject"])
+    monkeypatch.setattr(ei, "_commit_email", fake_commit)
+    return db, committed
+
+
+@pytest.mark.asyncio
+async def test_pipeline_batches_fetch_and_overlaps_classification(wired, monkeypatch):
+    db, committed = wired
+    in_flight = peak = 0
+
+    async def fake_classify(sender, subject, body, to, cc):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        n = int(subject.split("m")[-1])
+        return {"classification": "ignored" if n % 2 else "actionable"}
+    monkeypatch.setattr(ei, "classify_email", fake_classify)
+
+    ids = [f"m{i}" for i in range(9)]
+    gmail = _Gmail({i: _gmail_msg(i) for i in ids})
+    results = await ei.process_inbox_batch([{"id": i, "snippet": ""} for i in ids], gmail, [], [])
+
+    assert db.dedup_queries == 1
+    assert gmail.batches == [ids[1:]] and gmail.single_gets == []
+    assert 1 < peak <= ei.EMAIL_CLASSIFY_CONCURRENCY
+    # m0 already stored; odd ids are one bulk insert; even ids commit in order.
+    assert results[0][0] == EmailStatus.IGNORED
+    assert len(db.inserts) == 1 and [r["message_id"] for r in db.inserts[0]] == ["m1", "m3", "m5", "m7"]
+    assert committed == ["m2", "m4", "m6", "m8"]
+    assert [r[0] for r in results[1:]] == ["ignored", "actionable"] * 4
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_falls_back_to_single_gets(wired, monkeypatch):
+    db, committed = wired
+
+    async def boom(*a):
+        raise RuntimeError("LLM down")
+    monkeypatch.setattr(ei, "classify_email", boom)
+
+    gmail = _Gmail({"m1": _gmail_msg("m1"), "m2": _gmail_msg("m2", "noreply@bank.com")}, batch_fails=True)
+    results = await ei.process_inbox_batch([{"id": "m1"}, {"id": "m2"}], gmail, [], [])
+
+    assert gmail.single_gets == ["m1", "m2"]
+    assert results[0] == ("skipped_api_error", "subject m1")
+    # No-reply short-circuit never hits the LLM.
+    assert results[1] == (EmailStatus.IGNORED, "subject m2")
+    assert committed == []
+
+
+@pytest.mark.asyncio
+async def test_dedup_failure_uses_serial_path(monkeypatch):
+    broken = MagicMock()
+    broken.table.side_effect = RuntimeError("db down")
+    monkeypatch.setattr(ei, "supabase", broken)
+    seen = []
+
+    async def fake_process(msg, *a):
+        seen.append(msg["id"])
+        return ("fyi", msg["id"])
+    monkeypatch.setattr(ei, "process_email", fake_process)
+
+    results = await ei.process_inbox_batch([{"id": "a"}, {"id": "b"}], _Gmail({}), [], [])
+    assert seen == ["a", "b"]
+    assert results == [("fyi", "a"), ("fyi", "b")]
@@ -0,0 +1,105 @@
+"""Batched embeddings: get_embeddings() and single-call coalescing (no network).
+
+The Gemini client and embedding limiter are faked; each test counts how many
+embed_content requests and limiter acquisitions a workload costs.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import core.llm.embedding as emb
+from core.llm.embedding_cache import EmbeddingCache
+
+pytestmark = pytest.mark.retrieval
+
+
+class _FakeModels:
+    def __init__(self):
+        self.calls = []
+
+    def embed_content(self, model, contents, config):
+        self.calls.append(list(contents))
+        return SimpleNamespace(embeddings=[
+            SimpleNamespace(values=[float(len(t))] * 3) for t in contents
+        ])
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    models = _FakeModels()
+    acquires = []
+
+    async def _acquire():
+        acquires.append(1)
+        return 0
+
+    monkeypatch.setattr("core.llm.client.get_gemini_clients",
+                        lambda: [SimpleNamespace(models=models)])
+    monkeypatch.setattr("core.lib.rate_limiter.embedding_limiter.acquire_async", _acquire)
+    monkeypatch.setattr(emb, "embedding_cache", EmbeddingCache())
+    monkeypatch.setattr(emb, "_coalescer", emb._EmbeddingCoalescer())
+    return SimpleNamespace(models=models, acquires=acquires)
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_batches_dedupes_and_keeps_order(fake_gemini, monkeypatch):
+    monkeypatch.setattr(emb, "EMBED_BATCH_MAX", 2)
+    texts = ["a", "bb", "", "a", "ccc"]
+    results = await emb.get_embeddings(texts)
+
+    assert [r.vector[0] for r in results] == [1.0, 2.0, 0.0, 1.0, 3.0]
+    assert results[2].degraded_reason == "empty_text"
+    assert sorted(map(tuple, fake_gemini.models.calls)) == [("a", "bb"), ("ccc",)]
+    assert len(fake_gemini.acquires) == 2  # one limiter token per request
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_skips_cached_texts(fake_gemini):
+    await emb.get_embeddings(["a", "bb"])
+    await emb.get_embeddings(["a", "bb", "dddd"])
+    assert fake_gemini.models.calls == [["a", "bb"], ["dddd"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_embedding_calls_coalesce(fake_gemini):
+    results = await asyncio.gather(*[emb.get_embedding(t) for t in ["x", "yy", "x", "zzz"]])
+    assert [r.vector[0] for r in results] == [1.0, 2.0, 1.0, 3.0]
+    assert fake_gemini.models.calls == [["x", "yy", "zzz"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_degrades_every_text(fake_gemini, monkeypatch):
+    def _boom(model, contents, config):
+        raise ValueError("invalid argument")
+
+    monkeypatch.setattr(fake_gemini.models, "embed_content", _boom)
+    results = await emb.get_embeddings(["a", "bb"])
+    assert all(r.degraded and r.is_zero_vector for r in results)
+    assert emb.embedding_cache.local_bytes == 0
+
+
+def test_threads_with_their_own_loops_each_coalesce(fake_gemini):
+    """_run_batch_concurrently-style workers: every thread runs its own
+    asyncio.run(get_embedding(...)) at the same time. Each call must
+    resolve on its own loop instead of being orphaned by another's window."""
+    barrier = threading.Barrier(8)
+    out = {}
+
+    def worker(i):
+        async def go():
+            await asyncio.to_thread(barrier.wait)  # all loops live at once
+            return await asyncio.gather(emb.get_embedding("t" * (i + 1)), emb.get_embedding("t" * (i + 1)))
+        out[i] = asyncio.run(asyncio.wait_for(go(), timeout=5))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(out) == list(range(8))
+    assert all(a.vector[0] == b.vector[0] == float(i + 1) for i, (a, b) in out.items())
+    assert sorted(len(c[0]) for c in fake_gemini.models.calls) == [i + 1 for i in range(8)]
@@ -0,0 +1,79 @@
+"""Two-tier embedding cache: packed vectors, byte-bounded LRU, shared tier.
+
+Redis is replaced by an in-memory dict behind the raw MGET/MSET helpers.
+"""
+
+import pytest
+
+import core.llm.embedding_cache as ec
+from core.llm.response import EmbeddingResult
+
+pytestmark = pytest.mark.retrieval
+
+MODEL, DIM = "test-embed", 4
+
+
+def _ok(vec):
+    return EmbeddingResult(vector=vec, success=True, degraded=False, degraded_reason=None,
+                           provider="gemini", model=MODEL, latency_ms=5)
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    store = {}
+
+    async def mget(keys):
+        return [store.get(k) for k in keys]
+
+    async def mset(mapping, ttl):
+        store.update(mapping)
+
+    monkeypatch.setattr(ec, "acache_mget_raw", mget)
+    monkeypatch.setattr(ec, "acache_mset_raw", mset)
+    return store
+
+
+def test_pack_roundtrip_float32_and_float16():
+    vec = [0.5, -0.25, 0.125, 1.0]
+    assert ec.unpack_vector(ec.pack_vector(vec)) == vec
+    assert ec.unpack_vector(ec.pack_vector(vec, "e")) == vec
+    assert len(ec.pack_vector([0.1] * 768)) == 1 + 768 * 4
+
+
+def test_key_separates_model_and_dimension():
+    assert ec.cache_key("hi", "m1", 768) != ec.cache_key("hi", "m2", 768)
+    assert ec.cache_key("hi", "m1", 768) != ec.cache_key("hi", "m1", 256)
+
+
+def test_local_tier_is_bounded_by_bytes(shared):
+    entry = len(ec.pack_vector([0.0] * DIM))
+    cache = ec.EmbeddingCache(max_bytes=entry * 2)
+    for t in ("a", "b", "c"):
+        cache._local_put(ec.cache_key(t, MODEL, DIM), ec.pack_vector([1.0] * DIM))
+    assert cache.local_bytes == entry * 2
+    assert cache.get_local("a", MODEL, DIM) is None
+    assert cache.get_local("c", MODEL, DIM) is not None
+    assert cache.stats["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_survives_a_fresh_process(shared):
+    await ec.EmbeddingCache().store({"hello": _ok([1.0, 2.0, 3.0, 4.0])}, MODEL, DIM)
+
+    fresh = ec.EmbeddingCache()  # new container: empty local tier
+    found = await fresh.lookup(["hello", "missing"], MODEL, DIM)
+    assert found["hello"].vector == [1.0, 2.0, 3.0, 4.0]
+    assert "missing" not in found
+    assert fresh.stats["shared_hits"] == 1 and fresh.stats["misses"] == 1
+
+    await fresh.lookup(["hello"], MODEL, DIM)  # promoted to local
+    assert fresh.stats["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_degraded_results_are_never_cached(shared):
+    cache = ec.EmbeddingCache()
+    bad = EmbeddingResult(vector=[0.0] * DIM, success=False, degraded=True,
+                          degraded_reason="x", provider="none", model="none", latency_ms=0)
+    await cache.store({"t": bad}, MODEL, DIM)
+    assert shared == {} and cache.local_bytes == 0
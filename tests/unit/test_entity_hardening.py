@@ -14,7 +14,7 @@ import pytest
 import json
 
 from core.lib.graph_rules import sanitize_edge_label, resolve_edge_label
-from core.lib.entity_detector import detect_entities, DetectedEntity
+from core.lib.entity_detector import detect_entities, DetectedEntity, invalidate_entity_index
 from core.skills.backfill_graph import extract_graph_elements
 pytestmark = pytest.mark.graph
 
@@ -79,6 +79,7 @@ class _MockSupabase:
 
 
 def _patch_supabase(monkeypatch, fail=False):
+    invalidate_entity_index(all_tenants=True)
     monkeypatch.setattr(
         "core.lib.entity_detector.tenant_aware_client",
         lambda: _MockSupabase(fail=fail),
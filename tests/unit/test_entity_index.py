@@ -0,0 +1,105 @@
+"""Phase 1 known-entity index for detect_entities.
+
+The index is one graph_nodes read per tenant, cached (TTL + explicit
+invalidation), matched with a token trie instead of per-node n-gram checks.
+"""
+
+import pytest
+
+from core.lib import entity_detector
+from core.lib.entity_detector import detect_entities, invalidate_entity_index
+from core.services.db import tenant_scope
+
+pytestmark = pytest.mark.graph
+
+
+class _MockData:
+    def __init__(self, data):
+        self.data = data
+
+
+class _MockBuilder:
+    def __init__(self, db):
+        self._db = db
+
+    def select(self, *a, **k): return self
+    def in_(self, *a, **k): return self
+    def neq(self, *a, **k): return self
+    def eq(self, *a, **k): return self
+
+    def execute(self):
+        self._db.reads += 1
+        return _MockData(list(self._db.rows))
+
+
+class _MockSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    def table(self, name):
+        assert name == "graph_nodes"
+        return _MockBuilder(self)
+
+
+def _node(id_, label, type_, status="asserted", db_record_id=None, aliases=None):
+    meta = {"aliases": aliases} if aliases else {}
+    return {"id": id_, "label": label, "type": type_, "epistemic_status": status,
+            "db_record_id": db_record_id, "metadata": meta}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    invalidate_entity_index(all_tenants=True)
+    mock = _MockSupabase([
+        _node("n-acme", "Acme Corp", "organization", db_record_id="legacy-acme"),
+        _node("n-joel", "Joel Mathew", "person", aliases=["JM"]),
+        _node("n-pune", "Pune", "place"),
+        _node("n-hypo", "Qhord", "organization", status="hypothetical"),
+        _node("n-idea", "Blue Sky", "place", status="hypothetical"),
+    ])
+    monkeypatch.setattr(entity_detector, "tenant_aware_client", lambda: mock)
+    monkeypatch.setattr(entity_detector, "_find_capitalized_phrases", lambda text: [])
+    yield mock
+    invalidate_entity_index(all_tenants=True)
+
+
+def _db_hits(text):
+    return [(e.label, e.type, e.db_id) for e in detect_entities(text) if e.source == "db_lookup"]
+
+
+def test_matches_labels_aliases_and_preserves_db_ids(db):
+    hits = _db_hits("Met JM from acme corp in Pune about Qhord and blue sky ideas")
+    assert hits == [
+        ("Acme Corp", "organization", "legacy-acme"),
+        ("Joel Mathew", "person", "n-joel"),
+        ("Pune", "place", "n-pune"),
+        ("Qhord", "organization", "n-hypo"),
+    ]
+
+
+def test_partial_label_does_not_match(db):
+    assert _db_hits("acme shipped it") == []
+
+
+def test_index_is_cached_until_invalidated(db):
+    _db_hits("Pune")
+    _db_hits("Pune again")
+    assert db.reads == 1
+
+    db.rows.append(_node("n-goa", "Goa", "place"))
+    assert _db_hits("Goa trip") == []
+    invalidate_entity_index()
+    assert _db_hits("Goa trip") == [("Goa", "place", "n-goa")]
+    assert db.reads == 2
+
+
+def test_index_is_per_tenant(db):
+    with tenant_scope("tenant-a"):
+        _db_hits("Pune")
+    with tenant_scope("tenant-b"):
+        _db_hits("Pune")
+        invalidate_entity_index()
+    with tenant_scope("tenant-a"):
+        _db_hits("Pune")
+    assert db.reads == 2
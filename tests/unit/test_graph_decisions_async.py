@@ -0,0 +1,118 @@
+"""Graph decision writes run on the async client (core/pulse/graph.py).
+
+process_graph_pending_decision / process_pending_edge_decision are awaited
+on the request loop, so every read and write goes through
+`asupabase` (async_tenant_aware_client) — a sync `.execute()` there would
+stall every other request on the worker for a PostgREST round trip. The
+sync client is replaced with one that fails on use. No network.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.pulse import graph
+
+pytestmark = [pytest.mark.graph, pytest.mark.decision]
+
+
+class _AsyncClient:
+    """Self-chaining async builder; `rows(table, op)` answers each execute."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self.writes = []  # (table, op, payload) per executed write
+
+    def table(self, name):
+        state = {"op": "select", "payload": None}
+        q = MagicMock()
+        for method in ("select", "eq", "ilike", "in_", "filter", "limit",
+                       "maybe_single", "single", "order"):
+            getattr(q, method).return_value = q
+
+        def _write(op):
+            def _call(payload, **kw):
+                state.update(op=op, payload=payload)
+                return q
+            return _call
+
+        for op in ("update", "insert", "upsert"):
+            getattr(q, op).side_effect = _write(op)
+
+        async def _execute():
+            if state["op"] != "select":
+                self.writes.append((name, state["op"], state["payload"]))
+            return MagicMock(data=self._rows(name, state["op"]))
+
+        q.execute.side_effect = _execute
+        return q
+
+
+def _no_sync_client():
+    return MagicMock(table=MagicMock(side_effect=AssertionError("sync execute in a coroutine")))
+
+
+def _patched(client):
+    return [
+        patch.object(graph, "asupabase", client),
+        patch.object(graph, "supabase", _no_sync_client()),
+        patch.object(graph, "record_decision"),
+        patch.object(graph, "emit_observation", AsyncMock()),
+        patch.object(graph, "fire_briefing_refresh"),
+        patch.object(graph, "audit_log_sync"),
+    ]
+
+
+async def _run(client, coro_fn, *args, **kwargs):
+    patches = _patched(client)
+    for p in patches:
+        p.start()
+    try:
+        return await coro_fn(*args, **kwargs)
+    finally:
+        for p in patches:
+            p.stop()
+
+
+@pytest.mark.asyncio
+async def test_edge_approval_writes_through_the_async_client():
+    nodes = {"Asha": {"id": "n1", "type": "person", "label": "Asha"},
+             "Acme": {"id": "n2", "type": "organization", "label": "Acme"}}
+    lookups = iter([nodes["Asha"], nodes["Acme"]])
+
+    def rows(table, op):
+        if op != "select":
+            return [{}]
+        if table == "pending_graph_edges":
+            return {"id": 7, "status": "pending", "source_label": "Asha", "target_label": "Acme",
+                    "relationship": "WORKS_AT", "source_type": "person",
+                    "target_type": "organization", "source_text": "memories:3"}
+        return next(lookups, {"label": "Acme", "metadata": {}})
+
+    client = _AsyncClient(rows)
+    result = await _run(client, graph.process_pending_edge_decision, 7, "approve")
+
+    assert result["action"] == "approved", result
+    ops = [(t, op) for t, op, _ in client.writes]
+    assert ("graph_edges", "upsert") in ops
+    assert ("pending_graph_edges", "update") in ops
+    edge = next(p for t, op, p in client.writes if t == "graph_edges")
+    assert (edge["source_node_id"], edge["target_node_id"]) == ("n1", "n2")
+
+
+@pytest.mark.asyncio
+async def test_node_rejection_cascades_through_the_async_client():
+    def rows(table, op):
+        if table == "pending_nodes" and op == "select":
+            return {"id": 4, "label": "Acme", "node_type": "concept", "status": "pending"}
+        return [{}]
+
+    client = _AsyncClient(rows)
+    result = await _run(client, graph.process_graph_pending_decision, 4, "reject")
+
+    assert result["action"] == "rejected", result
+    assert [(t, op, p) for t, op, p in client.writes] == [
+        ("pending_nodes", "update", {"status": "rejected"}),
+        ("pending_graph_edges", "update", {"status": "rejected"}),
+        ("pending_graph_edges", "update", {"status": "rejected"}),
+    ]
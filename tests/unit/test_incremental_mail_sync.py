@@ -0,0 +1,239 @@
+"""Incremental mail sync: core_config cursors (core/lib/sync_cursor.py),
+Gmail history deltas (email_ingest) and Graph delta rounds (outlook_ingest).
+
+Gmail, Graph and Supabase are faked — no network.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from core.lib import sync_cursor
+from core.skills import email_ingest as ei
+from core.skills import outlook_ingest as oi
+pytestmark = pytest.mark.email
+
+
+def _cursor_client(content):
+    client = MagicMock()
+    q = client.table.return_value
+    for verb in ("select", "eq", "limit", "maybe_single"):
+        getattr(q, verb).return_value = q
+    q.execute.return_value.data = {"content": content} if content is not None else None
+    return client
+
+
+class TestCursorStore:
+    def test_load_accepts_text_and_dict_content(self):
+        state = {"history_id": "42"}
+        assert sync_cursor.load_sync_cursor(_cursor_client(json.dumps(state)), "k") == state
+        assert sync_cursor.load_sync_cursor(_cursor_client(state), "k") == state
+        assert sync_cursor.load_sync_cursor(_cursor_client(None), "k") == {}
+        assert sync_cursor.load_sync_cursor(_cursor_client("not json"), "k") == {}
+
+    def test_save_executes_the_upsert(self):
+        client = MagicMock()
+        with patch("core.services.db.tenant_mode_enabled", return_value=True):
+            assert sync_cursor.save_sync_cursor(client, "k", {"delta_link": "d"}) is True
+        upsert = client.table.return_value.upsert
+        row = upsert.call_args.args[0]
+        assert row["key"] == "k" and row["content"]["delta_link"] == "d"
+        upsert.return_value.execute.assert_called_once()
+
+
+class _Gmail:
+    """users() stand-in for history.list / getProfile / messages.list / labels.list."""
+
+    def __init__(self, pages=(), history_error=None, profile_id="900", labels=()):
+        self.pages = list(pages)
+        self.history_error = history_error
+        self.profile_id = profile_id
+        self.labels_list = [{"id": i, "name": n} for i, n in labels]
+        self.history_calls = []
+        self.list_queries = []
+
+    def users(self):
+        return self
+
+    def _req(self, value=None, error=None):
+        req = MagicMock()
+        if error is not None:
+            req.execute.side_effect = error
+        else:
+            req.execute.return_value = value
+        return req
+
+    def history(self):
+        gmail = self
+        hist = MagicMock()
+
+        def _list(**params):
+            gmail.history_calls.append(params)
+            if gmail.history_error is not None:
+                return gmail._req(error=gmail.history_error)
+            return gmail._req(gmail.pages.pop(0))
+        hist.list.side_effect = _list
+        return hist
+
+    def getProfile(self, userId):
+        return self._req({"historyId": self.profile_id})
+
+    def labels(self):
+        lbl = MagicMock()
+        lbl.list.return_value = self._req({"labels": self.labels_list})
+        return lbl
+
+    def messages(self):
+        gmail = self
+        msgs = MagicMock()
+
+        def _list(userId, q, maxResults):
+            gmail.list_queries.append(q)
+            return gmail._req({"messages": [{"id": "sent1"}] if "in:sent" in q else [{"id": "scan1"}]})
+        msgs.list.side_effect = _list
+        return msgs
+
+
+def _added(msg_id, *labels):
+    return {"messagesAdded": [{"message": {"id": msg_id, "threadId": "t", "labelIds": list(labels)}}]}
+
+
+@pytest.fixture
+def gmail_cursor(monkeypatch):
+    state = {}
+    monkeypatch.setattr(ei, "_archive_label", lambda: "Archive")
+    monkeypatch.setattr(ei, "load_sync_cursor", lambda client, key: dict(state))
+    return state
+
+
+class TestGmailHistory:
+    def test_history_delta_splits_inbox_sent_and_label_moves(self, gmail_cursor):
+        gmail_cursor.update(history_id="100", label="Archive", label_id="L7")
+        gmail = _Gmail(pages=[
+            {"history": [_added("a", "INBOX"), _added("s", "SENT"), _added("d", "DRAFT")],
+             "nextPageToken": "p2", "historyId": "150"},
+            {"history": [{"labelsAdded": [{"message": {"id": "old"}, "labelIds": ["L7"]}]},
+                         _added("self", "INBOX", "SENT")],
+             "historyId": "180"},
+        ])
+        inbox, sent, state = ei._list_new_messages(gmail, 0)
+
+        assert [m["id"] for m in inbox] == ["a", "old", "self"]
+        assert [m["id"] for m in sent] == ["s"]
+        assert state == {"label": "Archive", "label_id": "L7", "history_id": "180"}
+        assert gmail.history_calls[1]["pageToken"] == "p2"
+        assert gmail.list_queries == []
+
+    def test_expired_history_falls_back_to_bounded_scan(self, gmail_cursor):
+        gmail_cursor.update(history_id="1", label="Archive", label_id="L7")
+        expired = Exception("404 historyId too old")
+        expired.resp = MagicMock(status=404)
+        gmail = _Gmail(history_error=expired, profile_id="900")
+        inbox, sent, state = ei._list_new_messages(gmail, 1700000000)
+
+        assert [m["id"] for m in inbox] == ["scan1"] and [m["id"] for m in sent] == ["sent1"]
+        assert state["history_id"] == "900"
+        assert gmail.list_queries[0] == '(label:inbox OR label:"Archive") after:1700000000'
+
+    def test_no_cursor_scans_and_resolves_label_id(self, gmail_cursor):
+        gmail = _Gmail(labels=[("L7", "Archive"), ("L8", "Other")])
+        _, _, state = ei._list_new_messages(gmail, 0)
+        assert gmail.history_calls == []
+        assert state == {"label": "Archive", "label_id": "L7", "history_id": "900"}
+
+    def test_oversized_delta_takes_the_scan(self, gmail_cursor, monkeypatch):
+        monkeypatch.setattr(ei, "GMAIL_HISTORY_MAX_MESSAGES", 1)
+        gmail_cursor.update(history_id="100", label="Archive", label_id="L7")
+        gmail = _Gmail(pages=[{"history": [_added("a", "INBOX"), _added("b", "INBOX")], "historyId": "2"}])
+        inbox, _, state = ei._list_new_messages(gmail, 0)
+        assert [m["id"] for m in inbox] == ["scan1"] and state["history_id"] == "900"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("statuses, advanced", [
+    ([("fyi", "x")], True),
+    ([("skipped_api_error", "x")], False),
+])
+async def test_main_advances_cursor_only_after_a_clean_window(monkeypatch, statuses, advanced):
+    saved = []
+
+    async def fake_batch(*a):
+        return statuses
+    monkeypatch.setattr(ei, "get_cached_service", lambda *a: object())
+    monkeypatch.setattr(ei, "build_active_task_list", lambda: [])
+    monkeypatch.setattr(ei, "fetch_rejected_email_tasks", lambda: [])
+    monkeypatch.setattr(ei, "_list_new_messages", lambda *a: ([{"id": "m1"}], [], {"history_id": "7"}))
+    monkeypatch.setattr(ei, "process_inbox_batch", fake_batch)
+    monkeypatch.setattr(ei, "save_sync_cursor", lambda client, key, state: saved.append(state))
+
+    await ei.main()
+    assert saved == ([{"history_id": "7"}] if advanced else [])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sent_status, advanced", [
+    ("processed", True),
+    ("ignored", True),
+    ("error", False),
+])
+async def test_failed_sent_email_holds_the_cursor(monkeypatch, sent_status, advanced):
+    saved = []
+
+    async def fake_batch(*a):
+        return []
+    monkeypatch.setattr(ei, "get_cached_service", lambda *a: object())
+    monkeypatch.setattr(ei, "build_active_task_list", lambda: [])
+    monkeypatch.setattr(ei, "fetch_rejected_email_tasks", lambda: [])
+    monkeypatch.setattr(ei, "_list_new_messages", lambda *a: ([], [{"id": "s1"}], {"history_id": "8"}))
+    monkeypatch.setattr(ei, "process_inbox_batch", fake_batch)
+    monkeypatch.setattr(ei, "process_sent_email", lambda msg, svc: (sent_status, "x"))
+    monkeypatch.setattr(ei, "save_sync_cursor", lambda client, key, state: saved.append(state))
+
+    await ei.main()
+    assert saved == ([{"history_id": "8"}] if advanced else [])
+
+
+def _graph_response(status=200, body=None):
+    resp = MagicMock(status_code=status)
+    resp.json.return_value = body or {}
+    if status >= 400:
+        resp.raise_for_status.side_effect = requests.HTTPError(response=resp)
+    return resp
+
+
+class TestOutlookDelta:
+    def test_stored_delta_link_pages_to_next_link(self, monkeypatch):
+        monkeypatch.setattr(oi, "load_sync_cursor", lambda client, key: {"delta_link": "D0"})
+        pages = {
+            "D0": _graph_response(body={"value": [{"id": "a"}, {"id": "gone", "@removed": {}}],
+                                        "@odata.nextLink": "N1"}),
+            "N1": _graph_response(body={"value": [{"id": "b"}], "@odata.deltaLink": "D1"}),
+        }
+        monkeypatch.setattr(oi, "_graph_get", lambda url, params=None, prefer=None: pages[url])
+
+        messages, link = oi.fetch_outlook_delta()
+        assert [m["id"] for m in messages] == ["a", "b"] and link == "D1"
+
+    def test_expired_delta_link_reseeds_with_bounded_window(self, monkeypatch):
+        monkeypatch.setattr(oi, "load_sync_cursor", lambda client, key: {"delta_link": "OLD"})
+        calls = []
+
+        def fake_get(url, params=None, prefer=None):
+            calls.append((url, params))
+            if url == "OLD":
+                return _graph_response(410)
+            return _graph_response(body={"value": [{"id": "a"}], "@odata.deltaLink": "NEW"})
+        monkeypatch.setattr(oi, "_graph_get", fake_get)
+
+        messages, link = oi.fetch_outlook_delta()
+        assert link == "NEW" and [m["id"] for m in messages] == ["a"]
+        seed_url, seed_params = calls[1]
+        assert seed_url.endswith("/me/mailFolders/inbox/messages/delta")
+        assert seed_params["$filter"].startswith("receivedDateTime ge ")
+
+    def test_no_token_means_plain_listing(self, monkeypatch):
+        monkeypatch.setattr(oi, "load_sync_cursor", lambda client, key: {})
+        monkeypatch.setattr(oi, "_graph_get", lambda *a, **k: None)
+        assert oi.fetch_outlook_delta() is None
@@ -0,0 +1,311 @@
+"""Durable job runner (core/lib/job_runner.py, db/112).
+
+Batches are leased by one claim_queue_jobs call, run with bounded
+concurrency under each row's tenant, and finished under the lease token:
+completed, retried later with backoff, or dead-lettered on the last
+attempt. Before db/112 the legacy select + conditional claim runs one
+batch. Workers are planned from claimable depth minus the live workers
+held in Redis slots, and the DLQ worker is single-flight. Supabase and
+Redis are faked — no network.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.lib import job_runner
+from core.services.db import get_tenant
+pytestmark = pytest.mark.retrieval
+
+TABLE = "test_jobs"
+UID_A = "00000000-0000-0000-0000-00000000000a"
+UID_B = "00000000-0000-0000-0000-00000000000b"
+
+
+@pytest.fixture(autouse=True)
+def _isolated_runner():
+    job_runner._claim_rpc = None
+    yield
+    job_runner._queues.pop(TABLE, None)
+    job_runner._claim_rpc = None
+
+
+class _Supabase:
+    """Claim RPC serving `batches` in order; records every update."""
+
+    def __init__(self, batches=(), missing_rpc=False, pending=()):
+        self.batches = [list(b) for b in batches]
+        self.missing_rpc = missing_rpc
+        self.pending = list(pending)
+        self.claims = []
+        self.updates = []  # (fields, {column: value})
+
+    def rpc(self, name, params):
+        self.claims.append(params)
+        call = MagicMock()
+        if self.missing_rpc:
+            call.execute.side_effect = Exception(
+                f"Could not find the function public.{name} in the schema cache")
+        else:
+            call.execute.return_value = MagicMock(data=self.batches.pop(0) if self.batches else [])
+        return call
+
+    def table(self, name):
+        q = MagicMock()
+        filters = {}
+        state = {"fields": None}
+        for verb in ("select", "order", "limit"):
+            getattr(q, verb).return_value = q
+
+        def _eq(col, val):
+            filters[col] = val
+            return q
+
+        def _update(fields):
+            state["fields"] = fields
+            return q
+
+        def _execute():
+            if state["fields"] is None:
+                return MagicMock(data=list(self.pending))
+            self.updates.append((state["fields"], dict(filters)))
+            return MagicMock(data=[{"id": filters.get("id")}])
+        q.eq.side_effect = _eq
+        q.update.side_effect = _update
+        q.execute.side_effect = _execute
+        return q
+
+
+def _job(i, attempt=1, owner=UID_A):
+    return {"id": i, "owner_id": owner, "retry_count": attempt, "lease_token": f"lease-{i}"}
+
+
+def _register(handler, **kw):
+    job_runner.register_queue(job_runner.JobQueue(table=TABLE, service="test", handler=handler, **kw))
+
+
+@pytest.mark.asyncio
+async def test_batches_are_claimed_once_and_run_with_bounded_concurrency():
+    db = _Supabase(batches=[[_job(i) for i in range(5)], [_job(5), _job(6)]])
+    running, peak = 0, 0
+
+    async def handler(job):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+
+    _register(handler)
+    with patch.object(job_runner, "get_supabase", return_value=db):
+        stats = await job_runner.run_queue(TABLE, batch_size=5, concurrency=2)
+
+    assert (stats.claimed, stats.completed) == (7, 7)
+    assert len(db.claims) == 3  # two batches, then an empty claim ends the run
+    assert db.claims[0]["p_queue"] == TABLE and db.claims[0]["p_limit"] == 5
+    assert peak == 2
+    fields, where = db.updates[0]
+    assert fields["status"] == "completed" and fields["lease_token"] is None
+    assert where == {"id": 0, "lease_token": "lease-0"}
+
+
+@pytest.mark.asyncio
+async def test_failures_back_off_then_dead_letter_on_the_last_attempt():
+    db = _Supabase(batches=[[_job(1, attempt=1), _job(2, attempt=3)]])
+
+    async def handler(job):
+        raise RuntimeError("extractor down")
+
+    _register(handler, retry_delay_s=30)
+    with patch.object(job_runner, "get_supabase", return_value=db):
+        stats = await job_runner.run_queue(TABLE)
+
+    assert (stats.retried, stats.dead_lettered) == (1, 1)
+    by_id = {where["id"]: fields for fields, where in db.updates}
+    assert by_id[1]["status"] == "pending" and by_id[1]["run_after"]
+    assert "RuntimeError: extractor down (attempt 1)" == by_id[1]["error"]
+    assert by_id[2]["status"] == "dead_letter" and "run_after" not in by_id[2]
+
+
+@pytest.mark.asyncio
+async def test_each_job_runs_in_its_owners_tenant_scope():
+    db = _Supabase(batches=[[_job(1, owner=UID_A), _job(2, owner=UID_B)]])
+    seen = {}
+
+    async def handler(job):
+        seen[job["id"]] = get_tenant()
+        return True
+
+    _register(handler)
+    with patch.object(job_runner, "get_supabase", return_value=db):
+        await job_runner.run_queue(TABLE)
+
+    assert seen == {1: UID_A, 2: UID_B}
+    assert get_tenant() is None
+
+
+@pytest.mark.asyncio
+async def test_missing_claim_rpc_falls_back_to_one_legacy_batch():
+    db = _Supabase(missing_rpc=True, pending=[
+        {"id": 1, "owner_id": UID_A, "retry_count": 0},
+        {"id": 2, "owner_id": UID_A, "retry_count": 1},
+    ])
+    handled = []
+
+    async def handler(job):
+        handled.append((job["id"], job["retry_count"]))
+        return True
+
+    _register(handler)
+    with patch.object(job_runner, "get_supabase", return_value=db):
+        stats = await job_runner.run_queue(TABLE)
+        await job_runner.run_queue(TABLE)
+
+    assert job_runner._claim_rpc is False
+    assert len(db.claims) == 1  # RPC not retried once confirmed missing
+    assert stats.completed == 2
+    assert sorted(handled[:2]) == [(1, 1), (2, 2)]  # attempt counted at claim
+    claims = [(f, w) for f, w in db.updates if f["status"] == "processing"]
+    assert all(w["status"] == "pending" for _, w in claims)
+    finishes = [(f, w) for f, w in db.updates if f["status"] == "completed"]
+    assert all(w.get("status") == "processing" and "lease_token" not in f for f, w in finishes)
+
+
+@pytest.mark.asyncio
+async def test_worker_plan_scales_with_depth_and_counts_live_workers():
+    depths = {"pending_enrichment_jobs": 120, "pending_retrieval_index_jobs": 0, "dlq": 4}
+    live = {"pending_enrichment_jobs": 0, "dlq": 0}
+
+    async def depth(name):
+        return depths[name]
+
+    with patch.object(job_runner, "queue_depth", side_effect=depth), \
+         patch.object(job_runner, "live_workers", side_effect=lambda name: live[name]), \
+         patch.object(job_runner, "JOBS_PER_WORKER", 50), \
+         patch.object(job_runner, "JOB_MAX_WORKERS", 5):
+        plan = await job_runner.plan_queue_workers()
+        depths["pending_enrichment_jobs"] = 10_000
+        capped = await job_runner.plan_queue_workers()
+        live.update(pending_enrichment_jobs=4, dlq=1)  # still running from earlier ticks
+        topped_up = await job_runner.plan_queue_workers()
+
+    assert plan == {"pending_enrichment_jobs": 3, "dlq": 1}
+    assert capped["pending_enrichment_jobs"] == 5
+    assert topped_up == {"pending_enrichment_jobs": 1}
+
+
+class _CountingSupabase:
+    """count="exact" queries evaluated over in-memory rows (eq/is_/lte/lt)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        preds = []
+        q = MagicMock()
+        q.select.return_value = q
+        q.limit.return_value = q
+
+        def _add(pred):
+            preds.append(pred)
+            return q
+        q.eq.side_effect = lambda c, v: _add(lambda r: r.get(c) == v)
+        q.is_.side_effect = lambda c, v: _add(lambda r: r.get(c) is None)
+        q.lte.side_effect = lambda c, v: _add(lambda r: r.get(c) is not None and r[c] <= v)
+        q.lt.side_effect = lambda c, v: _add(lambda r: r.get(c) is not None and r[c] < v)
+        q.execute.side_effect = lambda: MagicMock(
+            count=sum(all(p(r) for p in preds) for r in self.rows))
+        return q
+
+
+@pytest.mark.asyncio
+async def test_depth_counts_only_claimable_rows():
+    past, future = "2000-01-01T00:00:00+00:00", "2999-01-01T00:00:00+00:00"
+    backing_off = [{"status": "pending", "run_after": future}] * 4
+    db = _CountingSupabase(backing_off + [
+        {"status": "pending", "run_after": None},
+        {"status": "pending", "run_after": past},
+        {"status": "processing", "lease_expires_at": past},    # dead worker
+        {"status": "processing", "lease_expires_at": future},  # live lease
+        {"status": "completed", "run_after": None},
+    ])
+    only_backing_off = _CountingSupabase(backing_off)
+
+    with patch.object(job_runner, "get_supabase", return_value=db):
+        assert await job_runner.queue_depth(TABLE) == 3
+    with patch.object(job_runner, "get_supabase", return_value=only_backing_off), \
+         patch.object(job_runner, "registered_queues", return_value={TABLE: MagicMock()}), \
+         patch.object(job_runner, "live_workers", return_value=0), \
+         patch("core.skills.dlq_consumer.dlq_depth", return_value=0):
+        assert await job_runner.queue_depth(TABLE) == 0
+        assert await job_runner.plan_queue_workers() == {}
+
+
+@pytest.mark.asyncio
+async def test_dlq_worker_is_single_flight_and_frees_its_slot():
+    async def fanout(*a, **kw):
+        return [{"processed": 2}]
+
+    released = []
+    with patch.object(job_runner, "acquire_lock", side_effect=[True, False]) as lock, \
+         patch.object(job_runner, "release_lock") as unlock, \
+         patch.object(job_runner, "release_worker_slot",
+                      side_effect=lambda name, wid: released.append(wid)), \
+         patch("core.services.db.arun_tenant_fanout", side_effect=fanout) as run:
+        first = await job_runner.run_queue_worker(job_runner.DLQ_QUEUE, worker_id="w1")
+        second = await job_runner.run_queue_worker(job_runner.DLQ_QUEUE, worker_id="w2")
+
+    assert first == {"queue": "dlq", "processed": 2}
+    assert second == {"queue": "dlq", "skipped": "already_running"}
+    assert run.call_count == 1
+    assert lock.call_args.args[0] == unlock.call_args.args[0] == job_runner.DLQ_LOCK_KEY
+    assert unlock.call_count == 1
+    assert released == ["w1", "w2"]
+
+
+class _Redis:
+    """Sorted-set subset used by the worker slots."""
+
+    def __init__(self):
+        self.zsets = {}
+
+    def pipeline(self):
+        redis, ops = self, []
+        pipe = MagicMock()
+        for verb in ("zadd", "expire", "zremrangebyscore", "zcard"):
+            getattr(pipe, verb).side_effect = (lambda v: lambda *a: ops.append((v, a)))(verb)
+
+        def _exec():
+            out = []
+            for verb, args in ops:
+                z = redis.zsets.setdefault(args[0], {})
+                if verb == "zadd":
+                    z.update(args[1])
+                elif verb == "zremrangebyscore":
+                    for k in [k for k, score in z.items() if args[1] <= score <= args[2]]:
+                        del z[k]
+                out.append(len(z) if verb == "zcard" else True)
+            return out
+        pipe.exec.side_effect = _exec
+        return pipe
+
+    def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+
+def test_worker_slots_count_until_released_or_expired():
+    redis = _Redis()
+    with patch.object(job_runner, "get_redis", return_value=redis):
+        a = job_runner.reserve_worker_slot(TABLE)
+        job_runner.reserve_worker_slot(TABLE)
+        assert job_runner.live_workers(TABLE) == 2
+        job_runner.release_worker_slot(TABLE, a)
+        assert job_runner.live_workers(TABLE) == 1
+        with patch.object(job_runner.time, "time", return_value=time.time() + job_runner.WORKER_SLOT_TTL_S + 1):
+            assert job_runner.live_workers(TABLE) == 0  # crashed worker's slot expired
+    with patch.object(job_runner, "get_redis", return_value=None):
+        assert job_runner.reserve_worker_slot(TABLE) is None
+        assert job_runner.live_workers(TABLE) == 0
@@ -0,0 +1,167 @@
+"""Keyset table scans (core/services/db.py scan_pages / scan_rows).
+
+Every page is `id > last ORDER BY id LIMIT n` — no offset, so each round
+trip is an index range scan and only one page is held at a time. The
+backfills (backfill_graph, persona_synthesis, memory_clusters,
+retrieval/backfill) all read through it. Supabase is faked — no network.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.services import db
+pytestmark = pytest.mark.retrieval
+
+
+class _Client:
+    """In-memory table supporting the scan's select/eq/in_/gt/order/limit chain."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []  # one dict per executed page
+
+    def table(self, name):
+        rows = self.tables[name]
+        state = {"table": name, "columns": None, "eq": {}, "in": {}, "gt": None, "limit": None}
+        q = MagicMock()
+
+        def _select(columns="*", **kw):
+            state["columns"] = columns
+            return q
+
+        def _eq(col, val):
+            state["eq"][col] = val
+            return q
+
+        def _in(col, vals):
+            state["in"][col] = list(vals)
+            return q
+
+        def _gt(col, val):
+            state["gt"] = (col, val)
+            return q
+
+        def _limit(n):
+            state["limit"] = n
+            return q
+
+        def _execute():
+            self.queries.append(dict(state))
+            out = [
+                r for r in rows
+                if all(r.get(c) == v for c, v in state["eq"].items())
+                and all(r.get(c) in v for c, v in state["in"].items())
+                and (state["gt"] is None or r[state["gt"][0]] > state["gt"][1])
+            ]
+            out.sort(key=lambda r: r["id"])
+            return MagicMock(data=out[:state["limit"]])
+
+        q.select.side_effect = _select
+        q.eq.side_effect = _eq
+        q.in_.side_effect = _in
+        q.gt.side_effect = _gt
+        q.limit.side_effect = _limit
+        q.order.return_value = q
+        q.execute.side_effect = _execute
+        q.range.side_effect = AssertionError("offset pagination")
+        return q
+
+
+def _rows(n, **extra):
+    return [{"id": i, "kind": "a" if i % 2 else "b", **extra} for i in range(1, n + 1)]
+
+
+def test_pages_follow_the_key_cursor_and_stop_on_a_short_page():
+    client = _Client({"t": _rows(25)})
+    pages = list(db.scan_pages(client, "t", "kind", page_size=10))
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [q["gt"] for q in client.queries] == [None, ("id", 10), ("id", 20)]
+    assert client.queries[0]["columns"] == "id, kind"  # cursor column projected
+
+
+def test_filters_apply_to_every_page_and_max_rows_caps_the_scan():
+    client = _Client({"t": _rows(40)})
+    rows = list(db.scan_rows(
+        client, "t", "id, kind", filters=lambda q: q.eq("kind", "a"),
+        page_size=4, after=10, max_rows=6,
+    ))
+
+    assert [r["id"] for r in rows] == [11, 13, 15, 17, 19, 21]
+    assert all(q["eq"] == {"kind": "a"} for q in client.queries)
+    assert [q["limit"] for q in client.queries] == [4, 2]  # last page trimmed to the cap
+
+
+def test_exact_multiple_costs_one_empty_probe():
+    client = _Client({"t": _rows(20)})
+    assert len(list(db.scan_rows(client, "t", page_size=10))) == 20
+    assert len(client.queries) == 3
+
+
+def test_backfill_graph_streams_processed_memory_ids():
+    from core.skills import backfill_graph
+
+    client = _Client({
+        "graph_edges": [
+            {"id": 1, "metadata": {"memory_id": "2"}},
+            {"id": 2, "metadata": '{"memory_id": 3}'},
+            {"id": 3, "metadata": {}},
+        ],
+        "pending_graph_edges": [{"id": 9, "source_text": "memories:4"}],
+        "memories": [
+            {"id": i, "content": f"note {i}", "memory_type": "note", "metadata": {},
+             "created_at": "2026-10-01T00:00:00+00:00"}
+            for i in range(1, 6)
+        ],
+    })
+    pending_like = []
+
+    def table(name):
+        q = client.table(name)
+        q.like.side_effect = lambda col, pattern: pending_like.append(pattern) or q
+        return q
+
+    with patch.object(backfill_graph, "supabase", MagicMock(table=table)), \
+         patch.dict("os.environ", {"BACKFILL_FULL": "1"}):
+        memories = backfill_graph.fetch_memories()
+
+    assert [m["id"] for m in memories] == [1, 5]
+    assert pending_like == ["memories:%"]
+    assert all(q["gt"] is None or q["gt"][0] == "id" for q in client.queries)
+
+
+def test_persona_paginate_is_owner_scoped_and_capped():
+    from core.skills import persona_synthesis
+
+    client = _Client({"memories": _rows(30, owner_id="u1") + [{"id": 99, "owner_id": "u2"}]})
+    with patch.object(persona_synthesis, "get_supabase", return_value=client), \
+         patch.object(persona_synthesis, "_PAGE", 8):
+        rows = persona_synthesis._paginate("memories", "kind", "u1", 20)
+
+    assert [r["id"] for r in rows] == list(range(1, 21))
+    assert all(q["eq"] == {"owner_id": "u1"} for q in client.queries)
+
+
+@pytest.mark.asyncio
+async def test_pattern_snapshot_keyset_scans_one_subsystem():
+    from core.lib import telemetry
+
+    patterns = [{"id": i, "subsystem": "entity_extraction" if i % 3 else "classification",
+                 "feature_hash": f"h{i}"} for i in range(1, 31)]
+    client = _Client({"subsystem_patterns": patterns, "core_config": []})
+    client_table = client.table
+
+    def table(name):
+        q = client_table(name)
+        q.like.return_value = q
+        return q
+
+    with patch.object(telemetry, "tenant_aware_client", return_value=MagicMock(table=table)), \
+         patch.object(telemetry, "_SNAPSHOT_PAGE", 8):
+        snap = await telemetry._load_pattern_snapshot("entity_extraction")
+
+    assert sorted(snap.rows, key=lambda h: int(h[1:])) == [f"h{i}" for i in range(1, 31) if i % 3]
+    scans = [q for q in client.queries if q["table"] == "subsystem_patterns"]
+    assert [q["gt"] for q in scans] == [None, ("id", 11), ("id", 23)]
+    assert all(q["eq"] == {"subsystem": "entity_extraction"} for q in scans)
@@ -1,8 +1,9 @@
 """Learning-loop END tests — the vision-#4 behavior delta (no DB required).
 
 Covers the loop as a two-phase contract:
-  Phase A (persist): a decision is recorded → emit_observation() upserts the
-  subsystem_patterns rolling counter (via _update_pattern_count).
+  Phase A (persist): a decision is recorded → emit_observation() queues it
+  and the write-behind flush adds it to the subsystem_patterns rolling
+  counter (increment_subsystem_patterns, db/107).
   Phase B (re-run → behavior change): compute_pattern_confidence() on the
   SAME features now returns a different recommendation than before the
   decisions — the "learns from every decision" promise.
@@ -20,10 +21,12 @@ Tests:
   L5 — fail-open: undo correction never breaks on missing payload/DB errors.
 
 The stateful fake client accumulates subsystem_patterns rows the way the
-real DB does (select-then-insert-or-update), so emit → compute exercises the
-real code path end to end without a database.
+real DB does (the db/107 upsert-and-add), so emit → flush → compute
+exercises the real code path end to end without a database.
 """
 
+from contextlib import asynccontextmanager
+
 import pytest
 from datetime import datetime, timezone, timedelta
 
@@ -32,6 +35,7 @@ from unittest.mock import patch, AsyncMock, MagicMock
 from core.lib.telemetry import (
     emit_observation,
     compute_pattern_confidence,
+    flush_observations,
 )
 from core.webhook.utils import emit_undo_correction
 pytestmark = pytest.mark.learning
@@ -48,7 +52,8 @@ _T2_AGO = (_RECENT - timedelta(days=5)).isoformat()
 
 class _StatefulClient:
     """Stand-in for tenant_aware_client(): subsystem_patterns rows persist
-    across emit → compute, keyed by (subsystem, feature_hash)."""
+    across emit → compute, keyed by (subsystem, feature_hash). `aio` is the
+    async_tenant_aware_client() view (awaited execute) over the same store."""
 
     def __init__(self):
         self.patterns = {}  # (subsystem, feature_hash) -> row dict
@@ -61,6 +66,47 @@ class _StatefulClient:
         # the store handles, not the builder.
         return _Builder(self, name)
 
+    @property
+    def aio(self):
+        return _AsyncView(self)
+
+
+class _AsyncView:
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return _AsyncBuilder(self._client, name)
+
+    def rpc(self, name, params):
+        assert name == "increment_subsystem_patterns"
+        return _IncrementCall(self._client, params["p_rows"])
+
+
+class _IncrementCall:
+    """db/107 semantics: add each delta to its row, recompute confidence."""
+
+    def __init__(self, client, rows):
+        self._client = client
+        self._rows = rows
+
+    async def execute(self):
+        for inc in self._rows:
+            key = (inc["subsystem"], inc["feature_hash"])
+            row = self._client.patterns.setdefault(key, {
+                "id": len(self._client.patterns) + 1,
+                "subsystem": inc["subsystem"], "feature_hash": inc["feature_hash"],
+                "feature_json": inc["feature_json"], "total_count": 0,
+                "correct_count": 0, "corrected_count": 0,
+                "first_seen": inc["first_seen"],
+            })
+            row["total_count"] += inc["total"]
+            row["correct_count"] += inc["correct"]
+            row["corrected_count"] += inc["corrected"]
+            row["confidence"] = row["correct_count"] / row["total_count"]
+            row["last_seen"] = inc["last_seen"]
+        return MagicMock(data=len(self._rows))
+
 
 class _Builder:
     """Self-chaining builder that resolves against the stateful store."""
@@ -87,6 +133,15 @@ class _Builder:
     def maybe_single(self):
         return self
 
+    def order(self, *a, **k):
+        return self
+
+    def range(self, *a):
+        return self
+
+    def like(self, *a):
+        return self
+
     def insert(self, payload):
         self._action = "insert"
         self._payload = payload
@@ -111,6 +166,12 @@ class _Builder:
                     if row.get("id") == self._eq.get("id"):
                         row.update(self._payload)
                 return MagicMock(data=[])
+            if "feature_hash" not in self._eq:
+                # snapshot load — every row for the subsystem
+                return MagicMock(data=[
+                    row for (sub, _), row in self._client.patterns.items()
+                    if sub == self._eq.get("subsystem")
+                ])
             # select — return the row for (subsystem, feature_hash)
             key = (self._eq.get("subsystem"), self._eq.get("feature_hash"))
             row = self._client.patterns.get(key)
@@ -124,6 +185,21 @@ class _Builder:
         return MagicMock(data=[self._payload] if self._payload is not None else [])
 
 
+class _AsyncBuilder(_Builder):
+    async def execute(self):
+        return _Builder.execute(self)
+
+
+@asynccontextmanager
+async def _patched(client):
+    """Route both telemetry facades (sync reads, async writes) to `client`,
+    flushing the write-behind buffer before the patches lift."""
+    with patch("core.lib.telemetry.tenant_aware_client", return_value=client), \
+         patch("core.lib.telemetry.async_tenant_aware_client", return_value=client.aio):
+        yield
+        await flush_observations()
+
+
 # ── L1: escalation boundary — the 3rd decision flips behavior ───────────
 
 @pytest.mark.asyncio
@@ -139,7 +215,7 @@ async def test_l1_escalation_boundary_two_review_three_approve():
     client = _StatefulClient()
     # Two approved observations
     for _ in range(2):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="entity_extraction",
                 event_type="approval",
@@ -147,20 +223,20 @@ async def test_l1_escalation_boundary_two_review_three_approve():
                 outcome="confirmed",
             )
 
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         result = await compute_pattern_confidence(features, "entity_extraction")
     assert result["recommendation"] != "approve", \
         f"2 obs must NOT auto-approve — got {result['recommendation']}"
 
     # Third approved observation crosses the boundary
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         await emit_observation(
             subsystem="entity_extraction",
             event_type="approval",
             features=features,
             outcome="confirmed",
         )
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         result = await compute_pattern_confidence(features, "entity_extraction")
     assert result["recommendation"] == "approve", \
         f"3 obs must auto-approve — got {result['recommendation']}"
@@ -178,14 +254,14 @@ async def test_l2_corrections_demote_approved_pattern():
     client = _StatefulClient()
 
     for _ in range(3):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="entity_extraction",
                 event_type="approval",
                 features=features,
                 outcome="confirmed",
             )
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         before = await compute_pattern_confidence(features, "entity_extraction")
     assert before["recommendation"] == "approve"
 
@@ -194,14 +270,14 @@ async def test_l2_corrections_demote_approved_pattern():
     # 0.5 — boundary), so four on three = 4/7 = 0.57 > 0.5 → demoted. Use a
     # steeper mix: 3 approvals + 4 corrections.
     for _ in range(4):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="entity_extraction",
                 event_type="rejection",
                 features=features,
                 outcome="rejected",
             )
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         after = await compute_pattern_confidence(features, "entity_extraction")
     assert after["recommendation"] != "approve", \
         f"corrected pattern must not auto-approve — got {after['recommendation']}"
@@ -224,13 +300,13 @@ async def test_l3_two_phase_loop_persist_then_behavior_change():
     features = {"source": "telegram", "node_type": "concept"}
 
     client = _StatefulClient()
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         before = await compute_pattern_confidence(features, "classification")
     assert before["recommendation"] == "review"
     assert before["total_observations"] == 0
 
     for _ in range(3):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="classification",
                 event_type="approval",
@@ -238,7 +314,7 @@ async def test_l3_two_phase_loop_persist_then_behavior_change():
                 outcome="confirmed",
             )
 
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         after = await compute_pattern_confidence(features, "classification")
     assert after["recommendation"] == "approve"
     assert after["total_observations"] == 3
@@ -254,25 +330,25 @@ async def test_l3_rejections_flip_loop_back_to_review():
     client = _StatefulClient()
 
     for _ in range(3):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="classification",
                 event_type="approval",
                 features=features,
                 outcome="confirmed",
             )
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         assert (await compute_pattern_confidence(features, "classification"))["recommendation"] == "approve"
 
     for _ in range(4):
-        with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        async with _patched(client):
             await emit_observation(
                 subsystem="classification",
                 event_type="rejection",
                 features=features,
                 outcome="rejected",
             )
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    async with _patched(client):
         result = await compute_pattern_confidence(features, "classification")
     assert result["recommendation"] != "approve"
 
@@ -0,0 +1,174 @@
+"""Unit tests for the batched and async Redis cache API, and for
+ContextProvider.prefetch() collapsing hydration into one MGET."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from core.lib import redis_cache as rc
+from core.lib.loop_local import LoopLocal
+pytestmark = pytest.mark.retrieval
+
+
+class _Upstash:
+    """MockTransport handler speaking the Upstash /pipeline protocol."""
+
+    def __init__(self):
+        self.store = {}
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        commands = json.loads(request.content)
+        self.requests.append(commands)
+        out = []
+        for cmd in commands:
+            if cmd[0] == "MGET":
+                out.append({"result": [self.store.get(k) for k in cmd[1:]]})
+            elif cmd[0] == "SET":
+                self.store[cmd[1]] = cmd[2]
+                out.append({"result": "OK"})
+        return httpx.Response(200, json=out)
+
+
+@pytest.fixture
+def upstash(monkeypatch):
+    server = _Upstash()
+    client = httpx.AsyncClient(base_url="https://redis.test",
+                               transport=httpx.MockTransport(server))
+    monkeypatch.setattr(rc, "_get_async_http", lambda: client)
+    return server
+
+
+class TestSyncBatch:
+    def test_get_many_decodes_hits_only(self):
+        client = MagicMock()
+        client.mget.return_value = [json.dumps({"a": 1}), None, "not json"]
+        with patch.object(rc, "get_redis", return_value=client):
+            assert rc.cache_get_many(["k1", "k2", "k3"]) == {"k1": {"a": 1}}
+        client.mget.assert_called_once_with("k1", "k2", "k3")
+
+    def test_set_many_is_one_pipeline(self):
+        client = MagicMock()
+        with patch.object(rc, "get_redis", return_value=client):
+            rc.cache_set_many({"k1": [1], "k2": "x"}, ttl=30)
+        pipe = client.pipeline.return_value
+        assert pipe.set.call_count == 2
+        pipe.set.assert_any_call("k1", "[1]", ex=30)
+        pipe.exec.assert_called_once()
+
+    def test_unavailable_redis_is_a_miss(self):
+        with patch.object(rc, "get_redis", return_value=None):
+            assert rc.cache_get_many(["k"]) == {}
+            rc.cache_set_many({"k": 1})
+
+
+class TestAsync:
+    @pytest.mark.asyncio
+    async def test_set_then_get_many_one_request_each(self, upstash):
+        await rc.acache_set_many({"a": {"x": 1}, "b": [2]}, ttl=60)
+        assert upstash.requests[-1] == [["SET", "a", '{"x": 1}', "EX", "60"],
+                                        ["SET", "b", "[2]", "EX", "60"]]
+        hits = await rc.acache_get_many(["a", "b", "missing"])
+        assert hits == {"a": {"x": 1}, "b": [2]}
+        assert upstash.requests[-1] == [["MGET", "a", "b", "missing"]]
+        assert len(upstash.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_single_key_helpers(self, upstash):
+        await rc.acache_set("k", {"v": 1}, ttl=5)
+        assert await rc.acache_get("k") == {"v": 1}
+        assert await rc.acache_get("nope") is None
+
+    @pytest.mark.asyncio
+    async def test_transport_error_degrades_to_miss(self, monkeypatch):
+        def boom(request):
+            raise httpx.ConnectError("down")
+        client = httpx.AsyncClient(base_url="https://redis.test", transport=httpx.MockTransport(boom))
+        monkeypatch.setattr(rc, "_get_async_http", lambda: client)
+        with patch.object(rc, "audit_log_sync"):
+            assert await rc.acache_mget_raw(["a", "b"]) == [None, None]
+            assert await rc.acache_get_many(["a"]) == {}
+            await rc.acache_set("a", 1)
+
+    def test_client_is_pooled_per_loop_and_closed_with_it(self, monkeypatch):
+        monkeypatch.setenv("UPSTASH_REDIS_REST_URL", "https://redis.test")
+        monkeypatch.setenv("UPSTASH_REDIS_REST_TOKEN", "t")
+        monkeypatch.setattr(rc, "_async_http", LoopLocal(rc._new_async_http, aclose=lambda c: c.aclose()))
+
+        async def grab():
+            return rc._get_async_http(), rc._get_async_http()
+
+        a1, a2 = asyncio.run(grab())
+        b1, _ = asyncio.run(grab())
+        assert a1 is a2
+        assert b1 is not a1
+        assert a1.headers["Authorization"] == "Bearer t"
+        assert a1.is_closed and b1.is_closed  # closed as each asyncio.run returned
+
+    def test_concurrent_loops_keep_their_own_client(self, monkeypatch):
+        monkeypatch.setenv("UPSTASH_REDIS_REST_URL", "https://redis.test")
+        monkeypatch.setenv("UPSTASH_REDIS_REST_TOKEN", "t")
+        monkeypatch.setattr(rc, "_async_http", LoopLocal(rc._new_async_http, aclose=lambda c: c.aclose()))
+        barrier = threading.Barrier(4)
+        stable = []
+
+        async def hold():
+            first = rc._get_async_http()
+            await asyncio.to_thread(barrier.wait)  # every loop is alive at once
+            stable.append((first, rc._get_async_http() is first))
+
+        threads = [threading.Thread(target=asyncio.run, args=(hold(),)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(same for _, same in stable)
+        assert len({id(c) for c, _ in stable}) == 4
+
+    def test_unconfigured_has_no_client(self, monkeypatch):
+        for var in ("UPSTASH_REDIS_REST_URL", "UPSTASH_REDIS_URL"):
+            monkeypatch.delenv(var, raising=False)
+        assert asyncio.run(rc.acache_get_many(["a"])) == {}
+
+
+class TestContextPrefetch:
+    @pytest.mark.asyncio
+    async def test_hydration_reads_redis_once(self):
+        from core.pulse import context as ctx
+        provider = ctx.ContextProvider()
+        people_key = provider.caches["people"]._key()
+        seen = []
+
+        async def fake_get_many(keys):
+            seen.append(list(keys))
+            return {people_key: [{"name": "Ana"}]}
+
+        with patch.object(ctx, "acache_get_many", fake_get_many), \
+             patch.object(ctx, "cache_get") as sync_get:
+            await provider.prefetch()
+            assert len(seen) == 1 and len(seen[0]) == 6
+            assert provider.caches["people"].get() == [{"name": "Ana"}]
+            # Known miss: straight to the DB, no second Redis round trip.
+            assert provider.caches["tasks"].get() is None
+            sync_get.assert_not_called()
+            # The miss grace is one-shot.
+            provider.caches["tasks"].get()
+            sync_get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fresh_entries_are_not_refetched(self):
+        from core.pulse import context as ctx
+        provider = ctx.ContextProvider()
+        with patch.object(ctx, "cache_set"):
+            provider.caches["tasks"].set([{"id": 1}])
+
+        async def fake_get_many(keys):
+            assert provider.caches["tasks"]._key() not in keys
+            return {}
+
+        with patch.object(ctx, "acache_get_many", fake_get_many):
+            await provider.prefetch("tasks", "people")
@@ -0,0 +1,66 @@
+"""Unit tests for the offline retrieval benchmark harness.
+
+Runs associative_retrieve end to end against the in-memory stand-ins on a
+tiny synthetic graph — no DB, no LLM, no Redis.
+"""
+
+import json
+
+import pytest
+from core.retrieval.bench import (
+    STAGES, SyntheticGraph, _parse_select, _percentile, run_benchmark,
+)
+pytestmark = pytest.mark.retrieval
+
+
+class TestHelpers:
+    def test_percentile_interpolates(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert _percentile(values, 50) == pytest.approx(2.5)
+        assert _percentile(values, 99) == pytest.approx(3.97)
+        assert _percentile([], 95) == 0.0
+
+    def test_parse_select_nested_embeds(self):
+        parsed = _parse_select("node_id, retrieval_phrase_nodes!inner(id, retrieval_node_stats!inner(specificity_score))")
+        assert parsed == ["node_id", ("retrieval_phrase_nodes", True,
+                                      ["id", ("retrieval_node_stats", True, ["specificity_score"])])]
+
+    def test_fake_embeds_follow_relations(self):
+        graph = SyntheticGraph(200, dim=8)
+        rows = graph.client().table("retrieval_passage_phrase_links") \
+            .select("node_id, passage_id, retrieval_passages!inner(id, retrieval_memory_bundle_links!inner(memory_id))") \
+            .in_("node_id", [1]).execute().data
+        assert rows
+        for row in rows:
+            links = row["retrieval_passages"]["retrieval_memory_bundle_links"]
+            assert links and links[0]["memory_id"] == (row["passage_id"] + 1) // 2
+
+    def test_missing_rpc_raises_schema_cache_error(self):
+        client = SyntheticGraph(50, dim=8).client(server_similarity=False)
+        with pytest.raises(Exception, match="schema cache"):
+            client.rpc("match_passage_similarity", {})
+
+
+class TestRunBenchmark:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("server_similarity", [True, False])
+    async def test_reports_every_stage_as_json(self, server_similarity):
+        result = await run_benchmark(sizes=(300,), queries=6, warmup=1, dim=16,
+                                     server_similarity=server_similarity)
+        json.dumps(result)  # JSON-serializable as-is
+        (run,) = result["runs"]
+        assert run["nodes"] == 300
+        assert run["total"]["n"] == 6
+        assert set(run["stages"]) == set(STAGES)
+        ran = 6 - run["short_circuited"]
+        assert ran > 0
+        for stage in STAGES:
+            stats = run["stages"][stage]
+            assert stats["p50"] <= stats["p95"] <= stats["p99"]
+        assert run["stages"]["bundle_assembly"]["n"] == ran
+
+    def test_same_seed_same_workload(self):
+        a = SyntheticGraph(500, seed=3, dim=8)
+        b = SyntheticGraph(500, seed=3, dim=8)
+        assert a.counts == b.counts
+        assert a.queries(5) == b.queries(5)
@@ -3,10 +3,12 @@ Unit tests for Tier 5 Meta-Cognitive Learning Layer telemetry module.
 
 Tests:
 T1 — hash_features is deterministic and unique per subsystem
-T2 — emit_observation writes to subsystem_telemetry
-T3 — emit_observation fail-open returns False on error
+T2 — emit_observation queues; flush_observations writes telemetry rows and
+     coalesced pattern deltas (db/107 RPC, per-pattern fallback)
+T3 — emit_observation / flush fail-open
 T4 — compute_pattern_confidence returns 'review' for <3 observations
-T5 — compute_pattern_confidence returns correct values for known pattern
+T5 — compute_pattern_confidence returns correct values for known pattern,
+     resolved from the per-subsystem pattern snapshot
 T6 — get_pattern_summary returns sorted results
 T7 — weekly_synthesis returns structured output
 
@@ -15,15 +17,21 @@ directly — every DB touch goes through `tenant_aware_client()` and
 `maybe_single_safe()`. The tests therefore patch
 `core.lib.telemetry.tenant_aware_client` with a self-chaining builder client
 (any chain shape resolves; `.execute()` returns the configured data).
+The write path (emit_observation, the pattern counter) runs on
+`async_tenant_aware_client()`; those tests pass `is_async=True` so
+`.execute()` is awaitable.
 """
 
 
 
+import asyncio
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 from datetime import datetime, timezone, timedelta
 from core.lib.telemetry import (
     emit_observation,
+    flush_observations,
     hash_features,
     get_pattern_summary,
     compute_pattern_confidence,
@@ -40,30 +48,35 @@ _T1_AGO = (_RECENT - timedelta(days=6)).isoformat()
 _T2_AGO = (_RECENT - timedelta(days=5)).isoformat()
 
 
-def _make_builder(data=None):
+def _make_builder(data=None, is_async=False):
     """Self-chaining query builder mock: every chain verb returns self,
-    `.execute()` returns a response whose `.data` is `data`."""
+    `.execute()` returns (or, async, resolves to) a response whose `.data`
+    is `data`."""
     m = MagicMock()
     for verb in (
         "select", "eq", "in_", "or_", "is_", "not_", "gte", "lt", "lte", "gt",
-        "order", "limit", "range", "maybe_single", "ilike", "neq", "filter",
+        "order", "limit", "range", "maybe_single", "like", "ilike", "neq", "filter",
         "text_search", "insert", "update", "upsert", "delete",
     ):
         getattr(m, verb).return_value = m
-    m.execute.return_value = MagicMock(data=data)
+    if is_async:
+        m.execute = AsyncMock(return_value=MagicMock(data=data))
+    else:
+        m.execute.return_value = MagicMock(data=data)
     return m
 
 
 class _FakeClient:
     """Stand-in for tenant_aware_client(): per-table self-chaining builders."""
 
-    def __init__(self, table_data=None):
+    def __init__(self, table_data=None, is_async=False):
         self._data = table_data or {}
+        self._is_async = is_async
         self.builders = {}
 
     def table(self, name):
         if name not in self.builders:
-            self.builders[name] = _make_builder(self._data.get(name))
+            self.builders[name] = _make_builder(self._data.get(name), self._is_async)
         return self.builders[name]
 
 
@@ -95,14 +108,28 @@ def test_t1_hash_null_values_filtered():
 
 # ── T2: emit_observation writes to subsystem_telemetry ──────────────────────
 
+class _RpcClient(_FakeClient):
+    """Async fake with .rpc(); `rpc_error` makes the counter RPC raise."""
+
+    def __init__(self, table_data=None, rpc_error=None):
+        super().__init__(table_data, is_async=True)
+        self.rpc_calls = []
+        self._rpc_error = rpc_error
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        call = MagicMock()
+        call.execute = AsyncMock(side_effect=self._rpc_error)
+        return call
+
+
 @pytest.mark.asyncio
 async def test_t2_emit_inserts_row():
-    """emit_observation inserts into subsystem_telemetry and returns True."""
-    # subsystem_patterns returns no existing row → the counter takes the
-    # insert branch (both are exercised through the self-chaining builder).
-    client = _FakeClient({"subsystem_patterns": None})
+    """emit_observation queues; the flush inserts into subsystem_telemetry
+    and adds the pattern delta through the atomic counter RPC."""
+    client = _RpcClient()
 
-    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+    with patch("core.lib.telemetry.async_tenant_aware_client", return_value=client):
         result = await emit_observation(
             subsystem="classification",
             event_type="correction",
@@ -113,16 +140,71 @@ async def test_t2_emit_inserts_row():
             confidence=0.6,
             source="test",
         )
-
         assert result is True
+        assert client.builders == {}  # nothing written inline
+
+        assert await flush_observations() == 1
         telemetry_builder = client.builders["subsystem_telemetry"]
-        assert telemetry_builder.insert.called
         insert_payload = telemetry_builder.insert.call_args[0][0]
-        assert insert_payload["subsystem"] == "classification"
-        assert insert_payload["event_type"] == "correction"
-        assert insert_payload["outcome"] == "corrected"
-        # The rolling pattern counter also wrote a row.
-        assert client.builders["subsystem_patterns"].insert.called
+        assert len(insert_payload) == 1
+        assert insert_payload[0]["subsystem"] == "classification"
+        assert insert_payload[0]["event_type"] == "correction"
+        assert insert_payload[0]["outcome"] == "corrected"
+        name, params = client.rpc_calls[0]
+        assert name == "increment_subsystem_patterns"
+        assert [(r["total"], r["correct"], r["corrected"]) for r in params["p_rows"]] == [(1, 0, 1)]
+
+
+@pytest.mark.asyncio
+async def test_t2_flush_coalesces_per_pattern():
+    """A burst is one telemetry insert and one RPC with summed deltas."""
+    client = _RpcClient()
+    with patch("core.lib.telemetry.async_tenant_aware_client", return_value=client):
+        for outcome in ("confirmed", "confirmed", "rejected"):
+            await emit_observation("classification", "approval", {"source": "email"}, outcome=outcome)
+        await emit_observation("classification", "approval", {"source": "telegram"}, outcome="correct")
+        assert await flush_observations() == 4
+
+    assert len(client.builders["subsystem_telemetry"].insert.call_args[0][0]) == 4
+    assert len(client.rpc_calls) == 1
+    deltas = {r["feature_json"]["source"]: (r["total"], r["correct"], r["corrected"])
+              for r in client.rpc_calls[0][1]["p_rows"]}
+    assert deltas == {"email": (3, 2, 1), "telegram": (1, 1, 0)}
+
+
+@pytest.mark.asyncio
+async def test_t2_missing_rpc_falls_back_to_per_pattern_upsert(monkeypatch):
+    """Pre-db/107: the counter falls back to the read-modify-write path
+    once, then stops trying the RPC."""
+    import core.lib.telemetry as telemetry_mod
+    monkeypatch.setattr(telemetry_mod, "_increment_rpc", None)
+    missing = Exception("Could not find the function public.increment_subsystem_patterns "
+                        "in the schema cache")
+    client = _RpcClient({"subsystem_patterns": None}, rpc_error=missing)
+    with patch("core.lib.telemetry.async_tenant_aware_client", return_value=client):
+        await emit_observation("classification", "approval", {"source": "email"}, outcome="confirmed")
+        await emit_observation("classification", "approval", {"source": "email"}, outcome="confirmed")
+        await flush_observations()
+        inserted = client.builders["subsystem_patterns"].insert.call_args[0][0]
+        assert inserted["total_count"] == 2 and inserted["confidence"] == 1.0
+        assert telemetry_mod._increment_rpc is False
+
+        await emit_observation("classification", "approval", {"source": "email"}, outcome="confirmed")
+        await flush_observations()
+    assert len(client.rpc_calls) == 1
+
+
+def test_t2_loop_shutdown_flushes_the_tail():
+    """asyncio.run() cancels the pending flush task; it writes before exiting."""
+    client = _RpcClient()
+
+    async def _job():
+        await emit_observation("classification", "approval", {"source": "email"}, outcome="confirmed")
+
+    with patch("core.lib.telemetry.async_tenant_aware_client", return_value=client):
+        asyncio.run(_job())
+    assert client.builders["subsystem_telemetry"].insert.called
+    assert len(client.rpc_calls) == 1
 
 
 # ── T3: emit_observation fail-open ─────────────────────────────────────────
@@ -130,16 +212,24 @@ async def test_t2_emit_inserts_row():
 @pytest.mark.asyncio
 async def test_t3_emit_fail_open():
     """emit_observation failure returns False, doesn't crash."""
-    with patch(
-        "core.lib.telemetry.tenant_aware_client", side_effect=Exception("DB down")
-    ):
-        result = await emit_observation(
-            subsystem="classification",
-            event_type="correction",
-            features={"source": "test"},
-            outcome="corrected",
-        )
-        assert result is False  # fail-open returns False, doesn't raise
+    result = await emit_observation(
+        subsystem="classification",
+        event_type="correction",
+        features={"source": "test"},
+        predicted=object(),  # not JSON-serializable → cannot be queued
+        outcome="corrected",
+    )
+    assert result is False  # fail-open returns False, doesn't raise
+
+
+@pytest.mark.asyncio
+async def test_t3_flush_fail_open():
+    """A failing flush is audited and dropped, never raised."""
+    with patch("core.lib.telemetry.async_tenant_aware_client", side_effect=Exception("DB down")), \
+         patch("core.lib.telemetry.audit_log_sync") as warn:
+        assert await emit_observation("classification", "correction", {"source": "test"}) is True
+        assert await flush_observations() == 1
+    assert warn.called
 
 
 # ── T4: compute_pattern_confidence with <3 observations returns 'review' ────
@@ -164,8 +254,10 @@ async def test_t4_compute_confidence_insufficient():
 @pytest.mark.asyncio
 async def test_t5_compute_confidence_known():
     """With 42 approve + 0 reject, returns approve recommendation."""
+    features = {"source": "email", "node_type": "person"}
     client = _FakeClient({
-        "subsystem_patterns": {
+        "subsystem_patterns": [{
+            "feature_hash": hash_features(features, "entity_extraction"),
             "total_count": 42,
             "correct_count": 42,
             "corrected_count": 0,
@@ -173,13 +265,11 @@ async def test_t5_compute_confidence_known():
             "feature_json": {"source": "email", "node_type": "person"},
             "first_seen": _T1_AGO,
             "last_seen": _T2_AGO,
-        }
+        }]
     })
 
     with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
-        result = await compute_pattern_confidence(
-            {"source": "email", "node_type": "person"}, "entity_extraction"
-        )
+        result = await compute_pattern_confidence(features, "entity_extraction")
 
         assert result["confidence"] == 1.0
         assert result["total_observations"] == 42
@@ -201,7 +291,8 @@ async def test_t5b_user_approved_overrides_stats():
     key_hash = hash_features(features, "entity_extraction")
     # Zero correct answers → normally "review"; the override must flip it.
     client = _FakeClient({
-        "subsystem_patterns": {
+        "subsystem_patterns": [{
+            "feature_hash": key_hash,
             "total_count": 3,
             "correct_count": 0,
             "corrected_count": 0,
@@ -209,7 +300,7 @@ async def test_t5b_user_approved_overrides_stats():
             "feature_json": {"source": "email", "node_type": "person"},
             "first_seen": _T1_AGO,
             "last_seen": _T2_AGO,
-        },
+        }],
         "core_config": [{"key": f"suggest_approved:entity_extraction:{key_hash}"}],
     })
 
@@ -243,6 +334,38 @@ async def test_t5c_no_override_without_suggest_key():
     assert result["recommendation"] != "approve"
 
 
+@pytest.mark.asyncio
+async def test_t5d_snapshot_loaded_once_until_invalidated():
+    """Repeated scoring for one subsystem reads the snapshot, not the DB."""
+    from core.lib.telemetry import invalidate_pattern_snapshot
+
+    features = {"source": "email", "node_type": "person"}
+    client = _FakeClient({
+        "subsystem_patterns": [{
+            "feature_hash": hash_features(features, "entity_extraction"),
+            "total_count": 42,
+            "correct_count": 42,
+            "corrected_count": 0,
+            "soft_accepted_count": 0,
+            "feature_json": features,
+            "first_seen": _T1_AGO,
+            "last_seen": _T2_AGO,
+        }],
+        "core_config": [],
+    })
+    patterns = client.table("subsystem_patterns")
+
+    with patch("core.lib.telemetry.tenant_aware_client", return_value=client):
+        for _ in range(3):
+            result = await compute_pattern_confidence(features, "entity_extraction")
+            assert result["recommendation"] == "approve"
+        assert patterns.execute.call_count == 1
+
+        invalidate_pattern_snapshot("entity_extraction")
+        await compute_pattern_confidence(features, "entity_extraction")
+        assert patterns.execute.call_count == 2
+
+
 # ── T6: get_pattern_summary returns sorted results ─────────────────────────
 
 @pytest.mark.asyncio
@@ -0,0 +1,87 @@
+"""'On this day' lookup (core/pulse/memory.detect_temporal_patterns).
+
+The section is served by one db/109 memories_on_this_day RPC call across
+all previous years; before the function is deployed it falls back to the
+old recent-rows filter. Supabase is faked — no network.
+"""
+
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.pulse import memory
+pytestmark = pytest.mark.briefing
+
+
+@pytest.fixture(autouse=True)
+def _reset_rpc_flag():
+    memory._on_this_day_rpc = None
+    yield
+    memory._on_this_day_rpc = None
+
+
+def _client(rpc_rows=None, rpc_error=None, table_rows=()):
+    client = MagicMock()
+
+    def _rpc(name, params):
+        call = MagicMock()
+        if rpc_error:
+            call.execute.side_effect = rpc_error
+        else:
+            call.execute.return_value = MagicMock(data=rpc_rows)
+        return call
+    client.rpc.side_effect = _rpc
+    chain = client.table.return_value
+    chain.select.return_value = chain.order.return_value = chain.limit.return_value = chain
+    chain.execute.return_value = MagicMock(data=list(table_rows))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_previous_years_come_from_one_rpc_call():
+    client = _client(rpc_rows=[
+        {"content": "Signed the Acme lease", "memory_type": "decision", "created_at": "2024-03-14T09:00:00+00:00"},
+        {"content": "Signed the Acme lease", "memory_type": "decision", "created_at": "2023-03-14T09:00:00+00:00"},
+        {"content": "Ran the half marathon", "memory_type": "note", "created_at": "2022-03-14T07:00:00+00:00"},
+    ])
+    with patch.object(memory, "supabase", client):
+        out = await memory.detect_temporal_patterns()
+
+    (name, params), _ = client.rpc.call_args
+    assert name == "memories_on_this_day"
+    assert params["p_day"] == date.today().isoformat() and params["p_window_days"] == 0
+    client.table.assert_not_called()
+    assert "On this day" in out
+    assert "2024: [DECISION] Signed the Acme lease" in out
+    assert "2022: [NOTE] Ran the half marathon" in out
+    assert "2023" not in out  # duplicate content collapsed
+
+
+@pytest.mark.asyncio
+async def test_seasonal_window_is_passed_through():
+    client = _client(rpc_rows=[
+        {"content": "Q1 planning offsite", "memory_type": "note", "created_at": "2025-03-10T09:00:00+00:00"},
+    ])
+    with patch.object(memory, "supabase", client):
+        out = await memory.detect_temporal_patterns(window_days=7)
+
+    assert client.rpc.call_args[0][1]["p_window_days"] == 7
+    assert "±7 days" in out
+
+
+@pytest.mark.asyncio
+async def test_missing_rpc_falls_back_once_and_stays_off():
+    today = date.today()
+    stamp = f"{today.year}-{today.month:02}-{today.day:02}T08:00:00+00:00"
+    client = _client(
+        rpc_error=Exception("Could not find the function public.memories_on_this_day in the schema cache"),
+        table_rows=[{"content": "today's note", "memory_type": "note", "created_at": stamp}],
+    )
+    with patch.object(memory, "supabase", client):
+        first = await memory.detect_temporal_patterns()
+        await memory.detect_temporal_patterns()
+
+    assert "today's note" in first
+    assert client.rpc.call_count == 1
+    assert memory._on_this_day_rpc is False
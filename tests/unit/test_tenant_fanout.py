@@ -0,0 +1,143 @@
+"""Concurrent tenant fan-out (core/services/db.py afanout_tenants).
+
+Pins the contract process_pulse / email_ingest / persona synthesis rely on:
+tenants overlap up to the cap, each runs under its own tenant_scope, a
+slow tenant is cancelled at its deadline, and failures are reported per
+tenant without aborting the rest — in input order.
+"""
+
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+pytestmark = pytest.mark.briefing
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:1")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-key")
+
+from core.services import db as db_mod  # noqa: E402  (env must be set first)
+
+
+@pytest.fixture(autouse=True)
+def _quiet_audit():
+    with patch("core.lib.audit_logger.audit_log_sync"):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_tenants_overlap_and_stay_isolated():
+    seen = {}
+
+    async def run(uid):
+        await asyncio.sleep(0.05)
+        seen[uid] = db_mod.get_tenant()
+        return uid.upper()
+
+    t0 = time.monotonic()
+    summary = await db_mod.afanout_tenants(run, ["a", "b", "c", "d"], concurrency=4)
+    assert time.monotonic() - t0 < 0.15  # slowest tenant, not the sum
+    assert seen == {"a": "a", "b": "b", "c": "c", "d": "d"}
+    assert summary.results == ["A", "B", "C", "D"]
+    assert db_mod.get_tenant() is None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_is_respected():
+    in_flight = peak = 0
+
+    async def run(uid):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    await db_mod.afanout_tenants(run, [str(i) for i in range(7)], concurrency=2)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_deadline_and_errors_are_per_tenant():
+    async def run(uid):
+        if uid == "slow":
+            await asyncio.sleep(5)
+        if uid == "bad":
+            raise RuntimeError("boom")
+        return uid
+
+    summary = await db_mod.afanout_tenants(
+        run, ["ok1", "slow", "bad", "ok2"], job_name="t", deadline_s=0.05,
+    )
+    assert [o.status for o in summary.outcomes] == ["ok", "timeout", "error", "ok"]
+    assert summary.results == ["ok1", "ok2"]
+    assert summary.outcomes[2].error == "boom"
+    assert "2 ok, 1 failed, 1 timed out" in summary.describe()
+
+
+@pytest.mark.asyncio
+async def test_arun_tenant_fanout_keeps_serial_default():
+    order = []
+
+    async def job():
+        order.append(db_mod.get_tenant())
+        await asyncio.sleep(0)
+        return db_mod.get_tenant()
+
+    with patch.object(db_mod, "active_user_ids", return_value=["u1", "u2"]):
+        assert await db_mod.arun_tenant_fanout(job, job_name="t") == ["u1", "u2"]
+    assert order == ["u1", "u2"]
+
+
+@pytest.mark.asyncio
+async def test_process_pulse_briefs_tenants_concurrently():
+    from core.pulse import briefing
+
+    async def fake_for_tenant(uid, *_):
+        await asyncio.sleep(0.05)
+        if uid == "u2":
+            raise RuntimeError("llm down")
+        return {"tenant": uid, "briefing": f"hi {uid}"}
+
+    with patch.object(briefing, "active_user_ids", return_value=["u1", "u2", "u3"]), \
+         patch.object(briefing, "process_pulse_for_tenant", fake_for_tenant):
+        t0 = time.monotonic()
+        out = await briefing.process_pulse(trigger="api")
+    assert time.monotonic() - t0 < 0.15
+    assert out["briefed"] is True
+    assert out["briefing"] == "hi u1"
+    assert out["results"][1] == {"tenant": "u2", "error": "llm down"}
+    assert out["results"][2]["briefing"] == "hi u3"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_tenant_releases_its_lock_and_fails_its_run(monkeypatch):
+    from unittest.mock import AsyncMock, MagicMock
+    from core.pulse import briefing, run_logger
+
+    monkeypatch.delenv("PULSE_SECRET", raising=False)
+    released, completed = [], []
+
+    async def hang():
+        await asyncio.sleep(5)
+
+    async def complete(_sb, run_id, **kw):
+        completed.append((run_id, kw["status"]))
+
+    with patch.object(briefing, "active_user_ids", return_value=["u1"]), \
+         patch.object(briefing, "BRIEFING_TENANT_DEADLINE_S", 0.05), \
+         patch.object(briefing, "supabase", MagicMock()), \
+         patch.object(briefing, "acquire_lock", return_value=True), \
+         patch.object(briefing, "release_lock", side_effect=released.append), \
+         patch.object(briefing, "get_tasks_service", return_value=None), \
+         patch.object(briefing, "sync_completed_tasks_from_google", return_value=[]), \
+         patch.object(briefing, "update_heartbeat", side_effect=hang), \
+         patch.object(run_logger, "reap_stuck_pulse_runs"), \
+         patch.object(run_logger, "create_pulse_run", AsyncMock(return_value=42)), \
+         patch.object(run_logger, "complete_pulse_run", side_effect=complete):
+        out = await briefing.process_pulse(trigger="api")
+
+    assert out["fanout"] and "1 timed out" in out["fanout"]
+    assert released == ["pulse_concurrency_lock:u1"]
+    assert completed == [(42, "failed")]
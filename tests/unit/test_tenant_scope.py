@@ -5,15 +5,18 @@ Unit tests for:
   - TenantTable read scoping (owner_id eq pre-applied)
   - write owner injection (insert dict/list, upsert, update)
   - tenant_rpc owner param injection
+  - async facade: same scoping on the pooled per-loop async client
   - key hashing + resolve_user_by_api_key query shape (incl. pre-db/78)
   - require_api_auth resolution (user key vs legacy key vs unknown/dev)
 """
 
 
 
+import asyncio
 import hashlib
 import os
-from unittest.mock import MagicMock, patch
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 pytestmark = pytest.mark.auth
@@ -316,7 +319,6 @@ def test_tenant_context_isolated_across_concurrent_async_tasks():
     """Two concurrent coroutines each carry their own tenant — proving the
     contextvar cannot bleed between requests sharing an event loop (the
     home-feed gather pattern, background tasks, etc.)."""
-    import asyncio
 
     async def worker(uid: str, seen: dict):
         with tenant_scope(uid):
@@ -401,3 +403,100 @@ def test_tenant_scope_restores_outer_context_on_exception():
         assert get_tenant() == "outer"
     finally:
         db_mod._tenant_var.set(None)
+
+
+# ── Async facade (async_tenant_aware_client) ─────────────────────────────
+
+
+@pytest.fixture
+def _mock_async_supabase():
+    mock_db = MagicMock()
+    with patch.object(db_mod, "get_async_supabase", return_value=mock_db):
+        yield mock_db
+
+
+def test_async_tenant_table_scopes_on_the_async_client(_mock_supabase, _mock_async_supabase):
+    """Same scoping and owner injection as tenant_table, but every builder
+    comes from the async client — the sync client is never touched."""
+    with tenant_scope("u1"):
+        db_mod.async_tenant_table("tasks").select("id")
+        db_mod.async_tenant_table("tasks").insert({"title": "a"})
+    tbl = _mock_async_supabase.table.return_value
+    tbl.select.return_value.eq.assert_called_with("owner_id", "u1")
+    tbl.insert.assert_called_with({"title": "a", "owner_id": "u1"})
+    _mock_supabase.table.assert_not_called()
+
+
+def test_async_client_routes_rpcs(_mock_async_supabase):
+    db_mod._tenant_mode = True
+    try:
+        client = db_mod.async_tenant_aware_client()
+        with tenant_scope("u1"):
+            client.rpc("match_memories", {"q": 1})
+            _mock_async_supabase.rpc.assert_called_with(
+                "match_memories", {"q": 1, "owner_id": "u1"})
+            client.rpc("run_sql", {"sql": "select 1"})
+            _mock_async_supabase.rpc.assert_called_with("run_sql", {"sql": "select 1"})
+    finally:
+        _reset_tenant_mode()
+
+
+def test_async_client_legacy_mode_is_unscoped(_mock_async_supabase):
+    db_mod._tenant_mode = False
+    try:
+        db_mod.async_tenant_aware_client().table("tasks").select("id")
+        _mock_async_supabase.table.return_value.select.return_value.eq.assert_not_called()
+    finally:
+        _reset_tenant_mode()
+
+
+def test_async_execute_is_awaited(_mock_async_supabase):
+    builder = _mock_async_supabase.table.return_value.select.return_value.eq.return_value
+    builder.execute = AsyncMock(return_value=MagicMock(data=[{"id": 1}]))
+
+    async def run():
+        with tenant_scope("u1"):
+            return await db_mod.async_tenant_table("tasks").select("id").execute()
+
+    assert asyncio.run(run()).data == [{"id": 1}]
+
+
+def test_get_async_supabase_is_pooled_per_loop_and_closed_with_it():
+    """httpx connections belong to their loop: one client per loop, reused
+    within it, closed when its asyncio.run returns (Modal's per-input loop)
+    and never shared with a concurrently running loop."""
+    closed = []
+
+    async def _close(client):
+        closed.append(client)
+
+    def fresh():
+        return db_mod.LoopLocal(lambda: db_mod._new_async_client(), aclose=_close)
+
+    with patch.object(db_mod, "_new_async_client", side_effect=lambda: object()), \
+         patch.object(db_mod, "_async_supabase", fresh()):
+        async def grab():
+            return db_mod.get_async_supabase(), db_mod.get_async_supabase()
+
+        a1, a2 = asyncio.run(grab())
+        b1, _ = asyncio.run(grab())
+        assert a1 is a2
+        assert b1 is not a1
+        assert closed == [a1, b1]
+
+        barrier = threading.Barrier(3)
+        held = []
+
+        async def hold():
+            first = db_mod.get_async_supabase()
+            await asyncio.to_thread(barrier.wait)
+            held.append((first, db_mod.get_async_supabase() is first))
+
+        threads = [threading.Thread(target=asyncio.run, args=(hold(),)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert all(same for _, same in held)
+    assert len({id(c) for c, _ in held}) == 3
+    assert len(closed) == 5
@@ -0,0 +1,121 @@
+"""Span tracer and latency histograms (core/lib/tracing.py).
+
+Spans nest through the contextvar across asyncio tasks and to_thread
+workers, the request root prints one summary line keyed on the
+audit_logger trace id, PostgREST builders are instrumented at import, and
+/api/metrics serves the histograms behind the cron secret. No network —
+PostgREST runs on an httpx MockTransport.
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:1")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-key")
+
+from core.lib import tracing  # noqa: E402
+from core.lib.audit_logger import trace_id_var  # noqa: E402
+from core.services.db import exec_query  # noqa: E402  (installs the PostgREST patch)
+pytestmark = pytest.mark.webhook
+
+
+@pytest.fixture(autouse=True)
+def _fresh_histograms():
+    tracing.reset_histograms()
+    yield
+    tracing.reset_histograms()
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks_and_threads(capsys):
+    seen = {}
+
+    @tracing.traced("child.async")
+    async def child():
+        seen["async_parent"] = tracing.current_span().parent.name
+
+    def blocking():
+        with tracing.span("child.thread") as s:
+            seen["thread_root"] = s.root.name
+
+    with tracing.trace_request("webhook"):
+        trace_id_var.set("trace-abc")
+        tracing.checkpoint("setup")
+        async with tracing.span("webhook.synthesis"):
+            await asyncio.gather(child(), asyncio.create_task(child()))
+            await asyncio.to_thread(blocking)
+        tracing.checkpoint("done")
+
+    assert seen == {"async_parent": "webhook.synthesis", "thread_root": "webhook"}
+    assert tracing.current_span() is None
+    line = capsys.readouterr().out.strip()
+    assert line.startswith("[PERF:trace-abc] TOTAL=")
+    assert "| setup=" in line and "| done=" in line
+    assert "child.async=2x" in line and "child.thread=1x" in line
+    for name in ("webhook", "webhook.setup", "webhook.synthesis", "child.async"):
+        assert tracing.get_histogram(name).count >= 1
+
+
+def test_spans_outside_a_request_only_feed_histograms(capsys):
+    with tracing.span("cron.job"):
+        tracing.checkpoint("ignored")
+    assert capsys.readouterr().out == ""
+    assert tracing.get_histogram("cron.job").count == 1
+    assert tracing.get_histogram("cron.job.ignored") is None
+
+
+def test_histogram_quantiles_stay_within_bucket_precision():
+    hist = tracing.LatencyHistogram()
+    for ms in range(1, 1001):  # 1ms .. 1s, uniform
+        hist.record(ms / 1000)
+    assert hist.count == 1000
+    assert hist.max_s == pytest.approx(1.0)
+    assert hist.total_s == pytest.approx(500.5)
+    for q, expected in ((0.5, 0.5), (0.9, 0.9), (0.99, 0.99)):
+        assert hist.quantile(q) == pytest.approx(expected, rel=0.035)
+
+
+@pytest.mark.asyncio
+async def test_postgrest_execute_and_exec_query_are_spanned():
+    from postgrest import SyncPostgrestClient
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=[{"id": 1}]))
+    client = SyncPostgrestClient(
+        "http://db.test/rest/v1", http_client=httpx.Client(transport=transport),
+    )
+    res = await exec_query(client.from_("memories").select("id").eq("owner_id", "u"))
+    client.rpc("get_context_for", {}).execute()
+
+    assert res.data == [{"id": 1}]
+    assert tracing.get_histogram("db.exec_query").count == 1
+    assert tracing.get_histogram("postgrest.get.memories").count == 1
+    assert tracing.get_histogram("postgrest.rpc.get_context_for").count == 1
+
+
+def test_prometheus_text_format():
+    tracing.observe("postgrest.get.memories", 0.25)
+    tracing.observe('odd"name', 0.5)
+    text = tracing.render_prometheus()
+    assert "# TYPE rhodey_span_duration_seconds summary" in text
+    assert 'rhodey_span_duration_seconds{span="postgrest.get.memories",quantile="0.99"} 0.250000' in text
+    assert 'rhodey_span_duration_seconds_count{span="postgrest.get.memories"} 1' in text
+    assert 'rhodey_span_duration_seconds_max{span="odd\\"name"} 0.500000' in text
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint_requires_the_cron_secret(monkeypatch):
+    from fastapi.testclient import TestClient
+    from api.index import app
+
+    monkeypatch.setenv("CRON_SECRET", "test-secret")
+    tracing.observe("llm.generate", 1.5)
+    client = TestClient(app)
+
+    assert client.get("/api/metrics").status_code == 401
+    res = client.get("/api/metrics", headers={"Authorization": "Bearer test-secret"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'rhodey_span_duration_seconds_count{span="llm.generate"} 1' in res.text